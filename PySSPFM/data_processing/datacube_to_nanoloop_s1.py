@@ -9,6 +9,7 @@ import tkinter.filedialog as tkf
 import os
 import shutil
 import time
+import traceback
 from datetime import datetime
 import numpy as np
 import matplotlib.pyplot as plt
@@ -16,12 +17,15 @@ import matplotlib as mpl
 
 from PySSPFM.settings import get_setting, get_config
 from PySSPFM.utils.core.figure import print_plots
-from PySSPFM.utils.core.path_management import \
-    get_filenames_with_conditions, sort_filenames
-from PySSPFM.utils.raw_extraction import data_extraction, csv_meas_sheet_extract
+from PySSPFM.utils.core.fitting import WarmStart
+from PySSPFM.utils.raw_extraction import data_extraction, \
+    csv_meas_sheet_extract, datacube_filenames, GRID_DATACUBE_NAME
 from PySSPFM.utils.signal_bias import sspfm_time, sspfm_generator, write_vec
 from PySSPFM.utils.nanoloop.plot import main_plot
-from PySSPFM.utils.nanoloop.file import save_nanoloop_file, sort_nanoloop_data
+from PySSPFM.utils.nanoloop.file import \
+    save_nanoloop_file, sort_nanoloop_data, nanoloop_data, \
+    nanoloop_file_name, init_nanoloop_store, write_nanoloop_store, \
+    close_nanoloop_store
 from PySSPFM.utils.nanoloop.phase import \
     (phase_calibration, gen_dict_pha, phase_offset_determination,
      apply_phase_offset, mean_phase_offset)
@@ -35,7 +39,8 @@ from PySSPFM.utils.datacube_to_nanoloop.file import \
     print_params, get_phase_tab_offset
 from PySSPFM.utils.datacube_to_nanoloop.analysis import \
     (cut_function, external_calib, SegmentInfo, SegmentSweep,
-     SegmentStable, SegmentStableDFRT, extract_other_properties)
+     SegmentStable, SegmentStableDFRT, SegmentBatch, SegmentBlocks,
+     extract_other_properties)
 mpl.rcParams.update({'figure.max_open_warning': 0})
 PHA_CORR = 'offset'
 PHA_FWD = 0
@@ -53,7 +58,8 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
                   get_phase_offset=False, mode='max', root_out=None,
                   dir_path_out_fig=None, dir_path_out_nanoloops=None,
                   test_dict=None, verbose=False, show_plots=False,
-                  save_plots=False, txt_save=False, index=None):
+                  save_plots=False, txt_save=False, index=None,
+                  return_nanoloops=False, warm_start=None, run_plan=None):
     """
     Data analysis of a measurement file (i.e., a pixel), print the graphs +
     info and save the nanoloop data in a txt file.
@@ -100,6 +106,16 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
         Activation key for txt nanoloop save.
     index: int, optional
         Index of the measurement file.
+    return_nanoloops: bool, optional
+        If True, the nanoloop data are also returned in memory (for the fused
+        step 1 -> step 2 analysis, without txt nanoloop file).
+    warm_start: WarmStart, optional
+        Converged fits of the neighbor pixels ('fit' mode, object engine):
+        the peak fit of each segment starts from the fit of the same segment
+        of a neighbor pixel, and the fits of the pixel are saved in it.
+    run_plan: dict, optional
+        Run plan of the measurement, common to all the files (see
+        gen_run_plan). If None, it is computed for this file.
 
     Returns
     -------
@@ -107,6 +123,9 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
         Dictionary containing phase offset data of a single file resulting from
         analysis of histogram of phase segment values. If 'get_phase_offset' is
         False, this value is None.
+    tab_nanoloops: list of tuple
+        Only if return_nanoloops is True: (name of the nanoloop txt file,
+        nanoloop data) for each mode, off field first (see nanoloop_data).
     """
     assert mode in ['max', 'fit', 'single_freq', 'dfrt']
     assert root_out or (dir_path_out_nanoloops and dir_path_out_fig)
@@ -126,7 +145,7 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
     if test_dict is None:
         dict_meas, _ = data_extraction(
             file_path_in, mode_dfrt=bool(mode.lower() == 'dfrt'),
-            verbose=verbose)
+            verbose=verbose, sign_pars=sign_pars)
     else:
         dict_meas = gen_segments(
             sign_pars, mode=mode, seg_noise_pars=test_dict['seg noise'],
@@ -136,6 +155,8 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
     # Init and cut measurements
     if sign_pars['Min volt (R) [V]'] == sign_pars['Max volt (R) [V]']:
         sign_pars['Mode (R)'] = 'Single Read Step'
+    if run_plan is None:
+        run_plan = gen_run_plan(meas_pars, sign_pars, mode=mode)
 
     # Debug mode: Debugging section for performing automatic segmentation
     # of the raw data (activable with the DEBUG key)
@@ -154,7 +175,7 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
         cut_dict['on f'] = cut_dict['on f'][:-1]
         cut_dict['off f'] = cut_dict['off f'][:-1]
     else:
-        cut_dict, _ = cut_function(sign_pars)
+        cut_dict = run_plan['cut dict']
 
     # Print SS PFM bias info
     print_params(meas_pars, sign_pars, user_pars, verbose=verbose)
@@ -187,12 +208,9 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
     if rad_phase:
         dict_meas['pha'] = 360/(2*np.pi)*np.array(dict_meas['pha'])
 
-    # Generate SS PFM signal segment values
-    ss_pfm_bias = sspfm_generator(sign_pars)
-
-    # SS PFM signal determination
-    par = sspfm_time(ss_pfm_bias, sign_pars)
-    (_, ss_pfm_bias_calc) = par
+    # SS PFM signal segment values and SS PFM signal (run plan)
+    ss_pfm_bias = run_plan['sspfm bias']
+    ss_pfm_bias_calc = run_plan['sspfm bias calc']
 
     # Apply offset to all phase values
     if user_pars['pha pars']['method'] is not None:
@@ -247,6 +265,7 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
         filter_freq = None
     filter_order = user_pars['seg pars']['filter ord'] if \
         filter_type else None
+    q_interp = bool(user_pars['seg pars'].get('q interp', False))
     if on_field_mode:
         seg_pars_on['index cut'] = cut_dict['on f']
         seg_pars_on['ite'] = sign_pars['Seg sample (W)']
@@ -262,11 +281,56 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
         seg_pars_off['title map'] = 'Off Field Map'
         seg_pars['Off field'] = seg_pars_off
 
+    # Batch engine: all the segments are treated at once (vectorized), only
+    # for analysis without figure, phase fit or dfrt sidebands
+    target_keys = ['amp', 'pha', 'freq', 'amp sb_l', 'pha sb_l', 'freq sb_l',
+                   'amp sb_r', 'pha sb_r', 'freq sb_r']
+    batch_engine = bool(
+        user_pars['seg pars'].get('engine', 'object') == 'batch' and
+        not (mode == 'fit' and user_pars['fit pars']['fit pha']) and
+        not make_plots and not all(key in dict_meas for key in target_keys))
+
     # Fill segment list
     for tuple_dict in seg_pars.items():
         seg_tab = []
         if verbose:
             print('Cut performing: ', tuple_dict[0])
+        if batch_engine:
+            method_segment = 'batch'
+            seg_tab = SegmentBatch(
+                tuple_dict[1]['index cut'], tuple_dict[1]['ite'], dict_meas,
+                mode=mode,
+                start_freq_init=freq_ini if mode in ['max', 'fit'] else None,
+                end_freq_init=freq_end if mode in ['max', 'fit'] else None,
+                cut_seg=cut_seg, filter_type=filter_type,
+                filter_cutoff_frequency=filter_freq, filter_order=filter_order,
+                fit_pars=user_pars['fit pars'], q_interp=q_interp)
+            if get_phase_offset:
+                phase_offset_val[tuple_dict[0]], _ = \
+                    phase_offset_determination(list(seg_tab.pha),
+                                               dict_str=None, make_plots=False)
+            else:
+                phase_offset_val = None
+            seg_dict[tuple_dict[0]] = seg_tab
+            continue
+        # Initial guesses of the peak fits from a neighbor pixel
+        guess_tab = warm_start.guess(tuple_dict[0]) \
+            if warm_start is not None and mode == 'fit' else None
+        # Measurements of all the segments, filtered at once (full segments,
+        # only used for figures, are dropped in lean mode)
+        if mode in ['max', 'fit']:
+            meas_keys, filter_cut = ['amp', 'pha'], True
+        elif all(key in dict_meas for key in target_keys):
+            meas_keys, filter_cut = target_keys, True
+        else:
+            meas_keys = [key for key in ['amp', 'pha', 'freq']
+                         if len(dict_meas.get(key, [])) > 0]
+            filter_cut = False
+        seg_blocks = SegmentBlocks(
+            tuple_dict[1]['index cut'], tuple_dict[1]['ite'], dict_meas,
+            meas_keys, cut_seg=cut_seg, filter_type=filter_type,
+            filter_cutoff_frequency=filter_freq, filter_order=filter_order,
+            filter_cut=filter_cut, lean=not make_plots)
         for cont, elem in enumerate(tuple_dict[1]['index cut']):
             # init segment with SegmentInfo
             segment_info = SegmentInfo(
@@ -284,12 +348,14 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
                     cut_seg=cut_seg, filter_type=filter_type,
                     filter_cutoff_frequency=filter_freq,
                     filter_order=filter_order,
-                    fit_pars=user_pars['fit pars']))
+                    freq_axis=run_plan['freq axis'][tuple_dict[0]],
+                    fit_pars=user_pars['fit pars'],
+                    guess_init=guess_tab[cont] if guess_tab and
+                    cont < len(guess_tab) else None,
+                    filtered_meas=seg_blocks.segment(cont),
+                    lean=not make_plots, q_interp=q_interp))
                 freq_range = {'start': freq_ini, 'end': freq_end}
             else:
-                target_keys = ['amp', 'pha', 'freq',
-                               'amp sb_l', 'pha sb_l', 'freq sb_l',
-                               'amp sb_r', 'pha sb_r', 'freq sb_r']
                 freq_range = None
                 flag = bool(all(key in dict_meas for key in target_keys))
                 if flag:
@@ -299,7 +365,9 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
                         segment_info, dict_meas, cut_seg=cut_seg,
                         filter_type=filter_type,
                         filter_cutoff_frequency=filter_freq,
-                        filter_order=filter_order))
+                        filter_order=filter_order,
+                        filtered_meas=seg_blocks.segment(cont),
+                        lean=not make_plots))
                 else:
                     # SegmentStable
                     method_segment = 'stable'
@@ -307,7 +375,9 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
                         segment_info, dict_meas, cut_seg=cut_seg,
                         filter_type=filter_type,
                         filter_cutoff_frequency=filter_freq,
-                        filter_order=filter_order))
+                        filter_order=filter_order,
+                        filtered_meas=seg_blocks.segment(cont),
+                        lean=not make_plots))
             # Plot segments
             if cont in (0, len(tuple_dict[1]['index cut']) - 1) and make_plots:
                 fig = []
@@ -323,6 +393,10 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
                         fig = plt_seg_max(seg_tab[cont], unit=unit)
                 figs.append(fig)
 
+        if warm_start is not None and mode == 'fit':
+            warm_start.update(tuple_dict[0],
+                              [seg.peak_params() for seg in seg_tab])
+
         # Perform analysis and get phase offset from histogram of phase segment
         # values
         if get_phase_offset:
@@ -352,16 +426,17 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
             seg_tab_off_f = tuple_dict[1]
 
     # Init of treatment parameters
-    dict_pha = gen_dict_pha(meas_pars, pha_corr=PHA_CORR, pha_fwd=PHA_FWD,
-                            pha_rev=PHA_REV, func=PHA_FUNC, main_elec=MAIN_ELEC,
-                            locked_elec_slope=LOCKED_ELEC_SLOPE)
+    dict_pha = run_plan['dict pha']
 
     # Generate nanoloops array
     label, col = ['Off field', 'On field'], ['w', 'y']
-    loop_tab, pha_calib = [], {}
+    write_v = run_plan['write volt']
+    loop_tab, pha_calib, tab_nanoloops = [], {}, []
     for cont_list, (seg_tab, mode) in enumerate(zip([seg_tab_off_f, seg_tab_on_f],
                                                     [off_field_mode, on_field_mode])):
-        if method_segment in ['sweep', 'stable_dfrt']:
+        if method_segment == 'batch':
+            dict_res = seg_tab.dict_res() if seg_tab else {}
+        elif method_segment in ['sweep', 'stable_dfrt']:
             dict_res = {'Amplitude': [elem.amp for elem in seg_tab],
                         'Phase': [elem.pha for elem in seg_tab],
                         'Res Freq': [elem.res_freq for elem in seg_tab],
@@ -389,58 +464,36 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
             (_, pha_calib, figs_1) = par
             for fig in figs_1:
                 figs.append(fig)
-            # Create list of nanoloops
-            read_volt = 0
-            (amplitude, phase, res_freq, q_fact, amp_sigma, pha_sigma,
-             res_freq_sigma, loop_tab) = [], [], [], [], [], [], [], []
-            for i in range(1, sign_pars['Nb volt (R)'] + 1):
-                amplitude.append([])
-                phase.append([])
-                res_freq.append([])
-                q_fact.append([])
-                amp_sigma.append([])
-                pha_sigma.append([])
-                res_freq_sigma.append([])
-                for cont, elem in enumerate(nanoloops['Index Pix']):
-                    if elem == i:
-                        amplitude[i - 1].append(nanoloops['Amplitude'][cont])
-                        phase[i - 1].append(nanoloops['Phase'][cont])
-                        if nanoloops['Res Freq']:
-                            res_freq[i - 1].append(nanoloops['Res Freq'][cont])
-                        if nanoloops['Q Fact']:
-                            q_fact[i - 1].append(nanoloops['Q Fact'][cont])
-                        if nanoloops['Sigma Amp']:
-                            amp_sigma[i - 1].append(
-                                nanoloops['Sigma Amp'][cont])
-                        if nanoloops['Sigma Pha']:
-                            pha_sigma[i - 1].append(
-                                nanoloops['Sigma Pha'][cont])
-                        if nanoloops['Sigma Res Freq']:
-                            res_freq_sigma[i - 1].append(
-                                nanoloops['Sigma Res Freq'][cont])
-                        read_volt = nanoloops['Read Volt'][cont]
-                write_v = write_vec(sign_pars)
-                multi_loop_amp, multi_loop_pha = amplitude[i - 1], phase[i - 1]
-                multi_loop_res_freq = res_freq[i - 1] \
-                    if nanoloops['Res Freq'] else None
-                multi_loop_q_fact = q_fact[i - 1] \
-                    if nanoloops['Q Fact'] else None
-                multi_loop_amp_sigma = amp_sigma[i - 1] \
-                    if nanoloops['Sigma Amp'] else None
-                multi_loop_pha_sigma = pha_sigma[i - 1] \
-                    if nanoloops['Sigma Pha'] else None
-                multi_loop_res_freq_sigma = res_freq_sigma[i - 1] \
-                    if nanoloops['Sigma Res Freq'] else None
-
+            # Nanoloops grouped by read voltage: one line per read voltage
+            nb_read = sign_pars['Nb volt (R)']
+            loop_arr = {
+                key: None if nanoloops[key] is None else
+                np.reshape(np.asarray(nanoloops[key]), (nb_read, -1))
+                for key in ['Amplitude', 'Phase', 'Res Freq', 'Q Fact',
+                            'Sigma Amp', 'Sigma Pha', 'Sigma Res Freq']}
+            read_volt = np.reshape(np.asarray(nanoloops['Read Volt']),
+                                   (nb_read, -1))[:, -1]
+            loop_tab = []
+            for i in range(nb_read):
+                loop_i = {key: None if value is None else value[i]
+                          for key, value in loop_arr.items()}
                 loop_tab.append(AllMultiLoop(
-                    write_v, multi_loop_amp, multi_loop_pha, pha_calib,
-                    read_volt, mode=label[cont_list],
-                    res_freq=multi_loop_res_freq, q_fact=multi_loop_q_fact,
-                    amp_sigma=multi_loop_amp_sigma,
-                    pha_sigma=multi_loop_pha_sigma,
-                    res_freq_sigma=multi_loop_res_freq_sigma,
+                    write_v, loop_i['Amplitude'], loop_i['Phase'], pha_calib,
+                    read_volt[i], mode=label[cont_list],
+                    res_freq=loop_i['Res Freq'], q_fact=loop_i['Q Fact'],
+                    amp_sigma=loop_i['Sigma Amp'],
+                    pha_sigma=loop_i['Sigma Pha'],
+                    res_freq_sigma=loop_i['Sigma Res Freq'],
                     q_fact_sigma=None))
 
+        # Nanoloop data in memory
+        if return_nanoloops and mode is True:
+            tab_nanoloops.append((
+                nanoloop_file_name(os.path.splitext(file_name_in)[0],
+                                   mode=label[cont_list]),
+                nanoloop_data(nanoloops, header, other_properties,
+                              mode=label[cont_list])))
+
         # Save nanoloop data in txt file
         if txt_save is True and mode is True:
             save_dict = {'label': label[cont_list],
@@ -452,8 +505,9 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
                 dir_path_out_nanoloops = os.path.join(
                     root_out, nanoloops_folder_name)
             save_nanoloop_file(
-                dir_path_out_nanoloops, file_name_in[:-4], nanoloops, fmt,
-                header, other_properties, mode=save_dict['label'])
+                dir_path_out_nanoloops, os.path.splitext(file_name_in)[0],
+                nanoloops, fmt, header, other_properties,
+                mode=save_dict['label'])
         # Plot loops
         if make_plots is True and mode is True:
             plot_dict = {'label': label[cont_list], 'col': col[cont_list],
@@ -471,14 +525,111 @@ def single_script(user_pars, file_path_in, meas_pars, sign_pars, phase_offset=0,
                 dirname=dir_path_out_fig, transparent=False)
     plt.close('all')
 
+    if return_nanoloops:
+        return phase_offset_val, tab_nanoloops
+
     return phase_offset_val
 
 
+def gen_run_plan(meas_pars, sign_pars, mode='max'):
+    """
+    Run plan of a measurement: bias signal, segment indexes, phase
+    calibration parameters and frequency axis of the segments only depend on
+    the measurement sheet, and are computed once for all the measurement
+    files (i.e. pixels).
+
+    Parameters
+    ----------
+    meas_pars: dict
+        Dictionary of measurement parameters.
+    sign_pars: dict
+        Dictionary of SSPFM bias signal parameters.
+    mode: str, optional
+        Operating mode for analysis: 'max', 'fit', 'single_freq' or 'dfrt'.
+
+    Returns
+    -------
+    run_plan: dict
+        - 'cut dict': starting index of the on and off field segments
+        (see cut_function)
+        - 'nb seg': total number of segments
+        - 'sspfm bias': SS PFM signal segment values (in V)
+        - 'sspfm bias calc': SS PFM signal sample values (in V)
+        - 'write volt': write voltage values of a nanoloop (in V)
+        - 'dict pha': phase calibration parameters (see gen_dict_pha)
+        - 'freq axis': frequency axis of the 'On field' and 'Off field'
+        segments (in kHz), only for 'max' and 'fit' modes
+    """
+    if sign_pars['Min volt (R) [V]'] == sign_pars['Max volt (R) [V]']:
+        sign_pars['Mode (R)'] = 'Single Read Step'
+    cut_dict, nb_seg_tot = cut_function(sign_pars)
+    ss_pfm_bias = sspfm_generator(sign_pars)
+    _, ss_pfm_bias_calc = sspfm_time(ss_pfm_bias, sign_pars)
+    freq_axis = {'On field': None, 'Off field': None}
+    if mode in ['max', 'fit']:
+        for key, seg_sample in zip(['On field', 'Off field'],
+                                   ['Seg sample (W)', 'Seg sample (R)']):
+            freq_axis[key] = np.linspace(
+                sign_pars['Low freq [kHz]'], sign_pars['High freq [kHz]'],
+                sign_pars[seg_sample], endpoint=False)
+    dict_pha = gen_dict_pha(meas_pars, pha_corr=PHA_CORR, pha_fwd=PHA_FWD,
+                            pha_rev=PHA_REV, func=PHA_FUNC, main_elec=MAIN_ELEC,
+                            locked_elec_slope=LOCKED_ELEC_SLOPE)
+
+    return {'cut dict': cut_dict,
+            'nb seg': nb_seg_tot,
+            'sspfm bias': ss_pfm_bias,
+            'sspfm bias calc': ss_pfm_bias_calc,
+            'write volt': write_vec(sign_pars),
+            'dict pha': dict_pha,
+            'freq axis': freq_axis}
+
+
+def write_store_pixel(store, index, tab_nanoloops, label, errors):
+    """
+    Write the nanoloops of a pixel in the nanoloop store: a pixel not
+    consistent with the store is not written (see write_nanoloop_store), and
+    its error is added to the error report without aborting the run
+
+    Parameters
+    ----------
+    store: dict
+        Nanoloop store in writing mode (see init_nanoloop_store)
+    index: int
+        Index of the pixel
+    tab_nanoloops: list of tuple
+        Name of the nanoloop file and nanoloop data of each mode (see
+        nanoloop_data)
+    label: str
+        Label of the pixel for the error report (e.g. path of the file)
+    errors: list of dict
+        Error report (see run_tasks), completed if the pixel is not written
+
+    Returns
+    -------
+    None
+    """
+    try:
+        write_nanoloop_store(store, index, tab_nanoloops)
+    except IOError as error:
+        errors.append({'index': index, 'label': label,
+                       'error': f'{type(error).__name__}: {error}',
+                       'traceback': traceback.format_exc()})
+
+
 def multi_script(user_pars, dir_path_in, meas_pars, sign_pars, mode='max',
                  file_format='.spm', root_out=None, verbose=False, save=False):
     """
     Data analysis of a list of spm files in a directory by using the single
     script for each file and save the parameters in a text file.
+    With the 'nanoloop_store' setting, the nanoloops of all the files are
+    saved in a consolidated nanoloop store (see init_nanoloop_store), written
+    by this process only (also in multiprocessing mode).
+    With the 'warm_start' setting, the peak fits of each file start from the
+    fits of a neighbor pixel (see WarmStart).
+    The run plan of the measurement (see gen_run_plan) is computed once and
+    shared by all the files (sent with the common arguments of the tasks in
+    multiprocessing mode).
 
     Parameters
     ----------
@@ -525,12 +676,25 @@ def multi_script(user_pars, dir_path_in, meas_pars, sign_pars, mode='max',
         phase_tab = None
 
     # Start single script for each measurement file
-    file_names = get_filenames_with_conditions(dir_path_in,
-                                               extension=file_format)
-    file_names, _, _ = sort_filenames(file_names)
+    file_names = datacube_filenames(dir_path_in, extension=file_format)
     if 'SS_PFM_bias.txt' in file_names:
         file_names.remove('SS_PFM_bias.txt')
 
+    # Consolidated nanoloop store (single writer)
+    store, store_errors = None, []
+    if save and get_setting("nanoloop_store"):
+        nanoloops_folder_name = get_setting('default_nanoloops_folder_name')
+        store = init_nanoloop_store(
+            os.path.join(root_out, nanoloops_folder_name),
+            [os.path.splitext(file_name)[0] for file_name in file_names])
+
+    # Run plan common to all the files
+    run_plan = gen_run_plan(meas_pars, sign_pars, mode=mode)
+
+    # Warm start of the peak fits from the fits of the neighbor pixels
+    warm_start = bool(get_setting("warm_start") and mode == 'fit')
+    nb_cols = meas_pars.get('Grid x [pix]')
+
     # Multi processing mode
     multiproc = get_setting("multi_processing")
     if multiproc:
@@ -553,15 +717,25 @@ def multi_script(user_pars, dir_path_in, meas_pars, sign_pars, mode='max',
             "verbose": verbose,
             "show_plots": False,
             "save_plots": False,
-            "txt_save": save,
-            "index": 0}
+            "txt_save": save and store is None,
+            "index": 0,
+            "return_nanoloops": store is not None,
+            "run_plan": run_plan}
         if phase_file_path is not None:
             common_args = {key: value for key, value in common_args.items()
                            if not key == "phase_offset"}
-        run_multi_proc_s1(file_paths, phase_tab, common_args, processes=16)
+        consumer = None
+        if store is not None:
+            def consumer(index, result):
+                write_store_pixel(store, index, result[1], file_paths[index],
+                                  store_errors)
+        run_multi_proc_s1(file_paths, phase_tab, common_args,
+                          consumer=consumer, warm_start=warm_start,
+                          nb_cols=nb_cols)
 
     # Mono processing mode
     else:
+        warm_start = WarmStart(nb_cols=nb_cols) if warm_start else None
         for i, elem in enumerate(file_names):
             if elem.endswith(file_format) and not \
                     elem.endswith('SS_PFM_bias.txt'):
@@ -579,20 +753,35 @@ def multi_script(user_pars, dir_path_in, meas_pars, sign_pars, mode='max',
                         "setting 'pha_params' / 'method' should be in "
                         "['static', 'dynamic', None]")
                 file_path_in = os.path.join(dir_path_in, elem)
-                phase_offset_val = \
-                    single_script(user_pars, file_path_in, meas_pars, sign_pars,
-                                  phase_offset=phase_offset,
-                                  get_phase_offset=get_phase_offset, mode=mode,
-                                  root_out=root_out, verbose=verbose,
-                                  txt_save=save, index=i+1)
+                if warm_start is not None:
+                    warm_start.move(i)
+                out = single_script(
+                    user_pars, file_path_in, meas_pars, sign_pars,
+                    phase_offset=phase_offset,
+                    get_phase_offset=get_phase_offset, mode=mode,
+                    root_out=root_out, verbose=verbose,
+                    txt_save=save and store is None, index=i+1,
+                    return_nanoloops=store is not None,
+                    warm_start=warm_start, run_plan=run_plan)
+                if store is not None:
+                    phase_offset_val, tab_nanoloops = out
+                    write_store_pixel(store, i, tab_nanoloops, file_path_in,
+                                      store_errors)
+                else:
+                    phase_offset_val = out
+
+    if store is not None:
+        close_nanoloop_store(store)
+    if store_errors:
+        from PySSPFM.utils.core.multi_proc import error_report
+        print(error_report(store_errors))
 
     if save:
         if verbose:
             print('\nSS PFM parameter analysis ...\n')
 
         # Find number of segment
-        _, nb_seg_tot = cut_function(sign_pars)
-        meas_pars['nb seg'] = nb_seg_tot
+        meas_pars['nb seg'] = run_plan['nb seg']
 
 
 def main_script(user_pars, file_path_in, verbose=False, show_plots=False,
@@ -605,7 +794,8 @@ def main_script(user_pars, file_path_in, verbose=False, show_plots=False,
     user_pars: dict
         Dictionary of user parameters for data processing
     file_path_in: str
-        Path to the Spm or txt datacube sspfm file (in)
+        Path to the Spm or txt datacube sspfm file (in), or to the grid
+        datacube container (datacube_grid.npy)
     verbose: bool, optional
         Activation key for verbosity
     show_plots: bool, optional
@@ -623,6 +813,11 @@ def main_script(user_pars, file_path_in, verbose=False, show_plots=False,
     # Single Script
     seg_pars = user_pars['seg pars']
     mode = seg_pars['mode']
+    # Grid datacube container: analysis starts with its first pixel
+    if os.path.split(file_path_in)[1] == GRID_DATACUBE_NAME + '.npy':
+        dir_path_in = os.path.split(file_path_in)[0]
+        file_path_in = os.path.join(
+            dir_path_in, datacube_filenames(dir_path_in, extension='grid')[0])
     file_format = '.' + file_path_in.split('.')[-1]
     if verbose:
         print('\n############################################')
@@ -742,6 +937,25 @@ def parameters(fname_json=None):
         Value: An integer value, with a minimum value of 1.
         Active if: This parameter is active when the 'filter type' option is
         not None.
+    - engine: str
+        Segment Treatment Engine
+        This parameter selects how the segments are processed.
+        Two possible values:
+            --> 'object': Each segment is processed with its own Segment
+            object (default).
+            --> 'batch': All the segments are processed at once with
+            vectorized operations (faster, same nanoloop results).
+        Active if: This parameter is active when no figure is generated,
+        except for 'fit' mode with phase fitting and 'dfrt' mode with
+        sideband measurements. Otherwise, the 'object' engine is used.
+    - q interp: bool
+        Interpolation of the Bandwidth for the Quality Factor
+        This parameter determines whether the edges of the -3 dB bandwidth
+        are linearly interpolated between the frequency samples to compute
+        the quality factor (sub-sample accuracy).
+        Value: False (default) keeps the edges on the frequency samples.
+        Active if: This parameter is active when the data processing mode is
+        set to 'max', with both engines.
     - fit pha: bool
         Indicator for Fitting Phase Measurements
         This parameter determines whether phase measurements should undergo
@@ -799,7 +1013,8 @@ def parameters(fname_json=None):
         Path of datacube SSPFM raw file measurements.
         This parameter specifies the path where datacube SSPFM raw file
         measurements are located. It is used to indicate the path to the file
-        containing these measurements.
+        containing these measurements. It can also be the path of a grid
+        datacube container (datacube_grid.npy): all its pixels are analyzed.
     - root_out: str
         Saving directory for the result of analysis (out).
         If None saving folder created automatically as
@@ -841,7 +1056,9 @@ def parameters(fname_json=None):
                 "filter type": None,
                 "filter freq 1": 1e3,
                 "filter freq 2": 3e3,
-                "filter ord": 4
+                "filter ord": 4,
+                "engine": "object",
+                "q interp": False
             },
             "fit_params": {
                 "fit pha": False,
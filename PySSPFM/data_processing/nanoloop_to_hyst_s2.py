@@ -12,34 +12,38 @@ import matplotlib.pyplot as plt
 
 from PySSPFM.settings import get_setting, get_config
 from PySSPFM.utils.core.figure import print_plots
+from PySSPFM.utils.core.fitting import WarmStart
 from PySSPFM.utils.nanoloop.file import extract_nanoloop_data
 from PySSPFM.utils.nanoloop.plot import plot_ckpfm
 from PySSPFM.utils.nanoloop.phase import gen_dict_pha
 from PySSPFM.utils.nanoloop.analysis import nanoloop_treatment, gen_ckpfm_meas
 from PySSPFM.utils.nanoloop_to_hyst.file import \
-    (generate_file_nanoloop_paths, save_properties, save_best_nanoloops,
-     extract_main_elec_tab)
+    (generate_file_nanoloop_paths, nanoloop_file_names, save_properties,
+     save_property_store, save_best_nanoloops, extract_main_elec_tab)
 from PySSPFM.utils.nanoloop_to_hyst.plot import plot_nanoloop_on_off
 from PySSPFM.utils.nanoloop_to_hyst.electrostatic import differential_analysis
 from PySSPFM.utils.nanoloop_to_hyst.gen_data import gen_data_dict
 from PySSPFM.utils.nanoloop_to_hyst.analysis import \
-    gen_analysis_mode, find_best_nanoloop, hyst_analysis, electrostatic_analysis
+    (gen_analysis_mode, find_best_nanoloop, hyst_analysis,
+     electrostatic_analysis, batch_hyst_fit)
 from PySSPFM.utils.path_for_runable import create_json_res, copy_json_res
-from PySSPFM.utils.raw_extraction import csv_meas_sheet_extract
+from PySSPFM.utils.raw_extraction import \
+    csv_meas_sheet_extract, datacube_filenames
+from PySSPFM.utils.datacube_to_nanoloop.file import get_phase_tab_offset
+from PySSPFM.data_processing.datacube_to_nanoloop_s1 import \
+    single_script as single_script_s1, gen_run_plan
 
 DEFAULT_LIMIT = {'min': -5., 'max': 5.}
 DEFAULT_FRACTION_LIMIT = 4
 
 
-def single_analysis(file_path_in, user_pars, meas_pars, sign_pars,
-                    analysis_mode='on_f_loop', cont=1, test_dict=None,
-                    make_plots=False):
+def prepare_single_analysis(file_path_in, user_pars, meas_pars, sign_pars,
+                            analysis_mode='on_f_loop', cont=1, test_dict=None,
+                            make_plots=False, nanoloop=None):
     """
-    Analyze data from a measurement file (pixel), extract nanoloop data from
-    a txt
-    file, find the best nanoloop based on the analysis mode, fit and
-    extract properties from hysteresis, and analyze the electrostatic
-    component.
+    First part of the single analysis (before the hysteresis fit): extract
+    nanoloop data from a txt file and find the best nanoloop based on the
+    analysis mode.
 
     Parameters
     ----------
@@ -60,25 +64,27 @@ def single_analysis(file_path_in, user_pars, meas_pars, sign_pars,
         Dictionary of test parameters (used for testing the module).
     make_plots: bool, optional
         Flag to generate figures.
+    nanoloop: tuple, optional
+        Nanoloop data of the pixel already in memory (data_dict, dict_str,
+        other_properties), see nanoloop_data: the txt file is not read if
+        provided.
 
     Returns
     -------
-    best_loop: loop (MultiLoop or MeanLoop) object
-        Best nanoloop depending on the analysis mode for the pixel.
-    properties: dict
-        Properties of the pixel (result of single analysis).
-    other_properties: dict
-        Other properties about the segment (topography, mechanical measurement).
-    dict_str: dict
-        Dictionary used for figure annotation.
-    figs: list of matplotlib.pyplot.Figure
-        Figures of the single analysis.
+    pixel: dict
+        Result of the first part of the single analysis: 'best loop',
+        'x hyst' and 'y hyst' (hysteresis to fit, without nan values),
+        'read volt', 'bckgnd tab', 'properties', 'other properties',
+        'dict str', 'dict pha', 'analysis mode' and 'figs'.
     """
     assert analysis_mode in ['multi_loop', 'mean_loop', 'on_f_loop']
 
     figs, bckgnd_tab, read_volt, properties = [], [], [], {}
 
-    if test_dict is None:
+    if nanoloop is not None:
+        data_dict, dict_str, other_properties = nanoloop
+        dict_str = dict(dict_str)
+    elif test_dict is None:
         data_dict, dict_str, other_properties = \
             extract_nanoloop_data(file_path_in)
     else:
@@ -142,17 +148,100 @@ def single_analysis(file_path_in, user_pars, meas_pars, sign_pars,
         x_hyst_filtered.append(filtered_row_x)
         y_hyst_filtered.append(filtered_row_y)
 
+    return {'best loop': best_loop, 'x hyst': x_hyst_filtered,
+            'y hyst': y_hyst_filtered, 'read volt': read_volt,
+            'bckgnd tab': bckgnd_tab, 'properties': properties,
+            'other properties': other_properties, 'dict str': dict_str,
+            'dict pha': dict_pha, 'analysis mode': analysis_mode,
+            'figs': figs}
+
+
+def single_analysis(file_path_in, user_pars, meas_pars, sign_pars,
+                    analysis_mode='on_f_loop', cont=1, test_dict=None,
+                    make_plots=False, nanoloop=None, pixel=None,
+                    fit_params=None, warm_start=None):
+    """
+    Analyze data from a measurement file (pixel), extract nanoloop data from
+    a txt
+    file, find the best nanoloop based on the analysis mode, fit and
+    extract properties from hysteresis, and analyze the electrostatic
+    component.
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the txt nanoloop file (input).
+    user_pars: dict
+        User-defined parameters for the analysis.
+    meas_pars: dict
+        Measurement parameters.
+    sign_pars: dict
+        SSPFM bias signal parameters.
+    analysis_mode: str, optional
+        Operating mode for the analysis: 'on_f_loop', 'mean_loop', or
+        'multi_loop'.
+    cont: int, optional
+        Index of the corresponding file.
+    test_dict: dict, optional
+        Dictionary of test parameters (used for testing the module).
+    make_plots: bool, optional
+        Flag to generate figures.
+    nanoloop: tuple, optional
+        Nanoloop data of the pixel already in memory (data_dict, dict_str,
+        other_properties), see nanoloop_data: the txt file is not read if
+        provided.
+    pixel: dict, optional
+        Result of prepare_single_analysis for the pixel (computed if None).
+    fit_params: dict, optional
+        Fitted values of the hysteresis parameters of the pixel (see
+        batch_hyst_fit): the hysteresis is not fitted if provided.
+    warm_start: WarmStart, optional
+        Converged fits of the neighbor pixels: the hysteresis fit starts from
+        the fit of a neighbor pixel (same analysis mode), and the fit of the
+        pixel is saved in it.
+
+    Returns
+    -------
+    best_loop: loop (MultiLoop or MeanLoop) object
+        Best nanoloop depending on the analysis mode for the pixel.
+    properties: dict
+        Properties of the pixel (result of single analysis).
+    other_properties: dict
+        Other properties about the segment (topography, mechanical measurement).
+    dict_str: dict
+        Dictionary used for figure annotation.
+    figs: list of matplotlib.pyplot.Figure
+        Figures of the single analysis.
+    """
+    if pixel is None:
+        pixel = prepare_single_analysis(
+            file_path_in, user_pars, meas_pars, sign_pars,
+            analysis_mode=analysis_mode, cont=cont, test_dict=test_dict,
+            make_plots=make_plots, nanoloop=nanoloop)
+    best_loop, dict_str, dict_pha = \
+        pixel['best loop'], pixel['dict str'], pixel['dict pha']
+    properties, other_properties = \
+        pixel['properties'], pixel['other properties']
+    figs = list(pixel['figs'])
+    init_fit_params = warm_start.guess(pixel['analysis mode']) \
+        if warm_start is not None and fit_params is None else None
+
     par = hyst_analysis(
-        x_hyst_filtered, y_hyst_filtered, best_loop,
+        pixel['x hyst'], pixel['y hyst'], best_loop,
         dict_pha['counterclockwise'], dict_pha['grounded tip'],
         dict_str=dict_str, infl_threshold=user_pars['inf thresh'],
         sat_threshold=user_pars['sat thresh'], model=user_pars['func'],
         asymmetric=user_pars['asymmetric'], method=user_pars['method'],
-        analysis_mode=analysis_mode,
+        analysis_mode=pixel['analysis mode'],
         locked_elec_slope=dict_pha['locked elec slope'],
-        make_plots=make_plots)
+        make_plots=make_plots, fit_params=fit_params,
+        init_fit_params=init_fit_params)
     best_hyst, props_tot, props_no_bckgnd, figs_hyst = par
     figs += figs_hyst
+    if warm_start is not None and best_hyst.success:
+        warm_start.update(pixel['analysis mode'],
+                          {key: param.value for key, param in
+                           best_hyst.params.items() if not param.expr})
 
     for key in ['offset', 'slope', 'ampli_0', 'ampli_1', 'coef_0', 'coef_1',
                 'x0_0', 'x0_1']:
@@ -174,9 +263,10 @@ def single_analysis(file_path_in, user_pars, meas_pars, sign_pars,
     else:
         raise NotImplementedError("sat domain must be 'auto' or 'set'")
     par = electrostatic_analysis(
-        best_loop, analysis_mode=analysis_mode, sat_domain=sat_domain,
-        make_plots=make_plots, dict_str=dict_str, read_volt=read_volt,
-        bckgnd_tab=bckgnd_tab, func=user_pars['pha func'])
+        best_loop, analysis_mode=pixel['analysis mode'],
+        sat_domain=sat_domain, make_plots=make_plots, dict_str=dict_str,
+        read_volt=pixel['read volt'], bckgnd_tab=pixel['bckgnd tab'],
+        func=user_pars['pha func'])
     electrostatic_dict, figs_elec = par
     for key, value in electrostatic_dict.items():
         properties[key] = value
@@ -229,7 +319,9 @@ def coupled_analysis(best_loops, offset_off=0.0, limit=None, dict_str=None,
 
 
 def single_script(tab_path_in, user_pars, meas_pars, sign_pars, cont=1,
-                  limit=None, test_dicts=None, make_plots=False, verbose=False):
+                  limit=None, test_dicts=None, make_plots=False, verbose=False,
+                  tab_nanoloops=None, pixels=None, tab_fit_params=None,
+                  warm_start=None):
     """
     Data analysis of a measurement file (i.e., a pixel).
 
@@ -254,6 +346,18 @@ def single_script(tab_path_in, user_pars, meas_pars, sign_pars, cont=1,
         Activation key for figure generation.
     verbose: bool, optional
         Activation key for verbosity.
+    tab_nanoloops: list of tuple, optional
+        Nanoloop data already in memory for each file of tab_path_in (see
+        nanoloop_data): the txt files are not read if provided.
+    pixels: list of dict, optional
+        Result of prepare_single_analysis for each file of tab_path_in.
+    tab_fit_params: list of dict, optional
+        Fitted values of the hysteresis parameters for each file of
+        tab_path_in (see batch_hyst_fit): the hysteresis are not fitted if
+        provided.
+    warm_start: WarmStart, optional
+        Converged fits of the neighbor pixels, used as initial values of the
+        hysteresis fits (see single_analysis).
 
     Returns
     -------
@@ -283,11 +387,15 @@ def single_script(tab_path_in, user_pars, meas_pars, sign_pars, cont=1,
                 print(f'\tanalysis mode: {analysis_mode}')
 
         test_dict = test_dicts[cont * 2 + sub_cont] if test_dicts else None
+        nanoloop = tab_nanoloops[sub_cont] if tab_nanoloops else None
+        pixel = pixels[sub_cont] if pixels else None
+        fit_params = tab_fit_params[sub_cont] if tab_fit_params else None
 
         par = single_analysis(
             file_path_in, user_pars, meas_pars, sign_pars,
             analysis_mode=analysis_mode, cont=cont, test_dict=test_dict,
-            make_plots=make_plots)
+            make_plots=make_plots, nanoloop=nanoloop, pixel=pixel,
+            fit_params=fit_params, warm_start=warm_start)
 
         best_loops[mode], properties[mode], other_properies[mode], dict_str, \
             single_figs = par
@@ -397,24 +505,15 @@ def multi_script(user_pars, dir_path_in, meas_pars, sign_pars,
                 return 'on_f'
             else:
                 raise ValueError("Aucun fichier ne commence par 'off_f_' ou 'on_f_'.")
-        mode = determine_mode([file for file in os.listdir(dir_path_in)
-                               if file.endswith('.txt')])
+        mode = determine_mode(nanoloop_file_names(dir_path_in))
         file_paths_in = generate_file_nanoloop_paths(dir_path_in, mode=mode)
 
     if verbose:
         print('\nSingle script analysis in progress ...')
         print('Single script for:')
 
-    all_properties = {'on': {}, 'off': {}, 'coupled': {}}
     tab_best_loops = {'on': [], 'off': []}
-    if user_pars['diff mode'] == 'auto':
-        write_range = sign_pars['Max volt (W) [V]'] - \
-                      sign_pars['Min volt (W) [V]']
-        write_fraction = write_range / DEFAULT_FRACTION_LIMIT
-        limit = {'min': sign_pars['Min volt (W) [V]'] + write_fraction,
-                 'max': sign_pars['Max volt (W) [V]'] - write_fraction}
-    else:
-        limit = user_pars['diff domain']
+    limit = differential_limit(user_pars, sign_pars)
     make_plots = bool(show_plots or save)
     _, properties, other_properties, figs = single_script(
         file_paths_in[0], user_pars, meas_pars, sign_pars, cont=0, limit=limit,
@@ -422,24 +521,20 @@ def multi_script(user_pars, dir_path_in, meas_pars, sign_pars,
     print_plots(figs, save_plots=save, show_plots=show_plots,
                 dirname=dir_path_out_fig, transparent=False)
 
-    for key, value in properties.items():
-        all_properties[key] = {sub_key: [] for sub_key in value}
-        all_properties['other'] = {key: [] for key in
-                                   list(other_properties.values())[0].keys()}
+    all_properties = init_all_properties(properties, other_properties)
 
     if user_pars["main_elec_file_path"]:
         main_elec_tab = extract_main_elec_tab(user_pars["main_elec_file_path"])
-        tab_user_pars = []
-        for revert_val in main_elec_tab:
-            user_pars_copy = {
-                key: (bool(int(revert_val) == 1))
-                if key == "main elec" else value
-                for key, value in user_pars.items()}
-            tab_user_pars.append(user_pars_copy)
+        tab_user_pars = gen_tab_user_pars(user_pars, main_elec_tab)
     else:
         main_elec_tab = None
         tab_user_pars = None
 
+    # Warm start of the hysteresis fits from the fits of the neighbor pixels
+    warm_start = bool(get_setting("warm_start") and
+                      user_pars.get('engine', 'object') != 'batch')
+    nb_cols = meas_pars.get('Grid x [pix]')
+
     # Multi processing mode
     multiproc = get_setting("multi_processing")
     if multiproc:
@@ -460,53 +555,462 @@ def multi_script(user_pars, dir_path_in, meas_pars, sign_pars,
                 key: value for key, value in common_args.items()
                 if not key == "user_pars"}
         res = run_multi_proc_s2(file_paths_in, tab_user_pars, common_args,
-                                processes=16)
+                                warm_start=warm_start, nb_cols=nb_cols)
         (list_best_loops, list_properties, list_other_properties) = res
         for elem_best_loops, elem_properties, elem_other_properties in \
                 zip(list_best_loops, list_properties, list_other_properties):
-            for key, value in elem_properties.items():
-                for sub_key, sub_value in value.items():
-                    all_properties[key][sub_key].append(sub_value)
-            for key, value in list(elem_other_properties.values())[0].items():
-                all_properties['other'][key].append(value)
-            for key, value in elem_best_loops.items():
-                tab_best_loops[key].append(value)
+            gather_pixel_results(all_properties, tab_best_loops,
+                                 elem_best_loops, elem_properties,
+                                 elem_other_properties)
 
     # Mono processing mode
     else:
+        # Batch engine: hysteresis of all the pixels fitted at once
+        if user_pars.get('engine', 'object') == 'batch':
+            tab_pixels, tab_fit_params = batch_hyst_pixels(
+                file_paths_in, user_pars, meas_pars, sign_pars,
+                test_dicts=test_dicts, main_elec_tab=main_elec_tab)
+        else:
+            tab_pixels, tab_fit_params = None, None
+        warm_start = WarmStart(nb_cols=nb_cols) if warm_start else None
         for cont, tab_path_in in enumerate(file_paths_in):
             if user_pars["main_elec_file_path"] is not None:
                 user_pars["main elec"] = main_elec_tab[cont]
+            if warm_start is not None:
+                warm_start.move(cont)
             best_loops, properties, other_properties, _ = single_script(
                 tab_path_in, user_pars, meas_pars, sign_pars, cont=cont,
-                test_dicts=test_dicts, verbose=verbose)
-            for key, value in properties.items():
-                for sub_key, sub_value in value.items():
-                    all_properties[key][sub_key].append(sub_value)
-            for key, value in list(other_properties.values())[0].items():
-                all_properties['other'][key].append(value)
-            for key, value in best_loops.items():
-                tab_best_loops[key].append(value)
+                test_dicts=test_dicts, verbose=verbose,
+                pixels=tab_pixels[cont] if tab_pixels else None,
+                tab_fit_params=tab_fit_params[cont] if tab_fit_params
+                else None, warm_start=warm_start)
+            gather_pixel_results(all_properties, tab_best_loops, best_loops,
+                                 properties, other_properties)
             plt.close('all')
 
+    if save:
+        save_results(all_properties, tab_best_loops, meas_pars, root_out,
+                     dir_path_out_props=dir_path_out_props,
+                     dir_path_out_best_loops=dir_path_out_best_loops)
+
+
+def batch_hyst_pixels(file_paths_in, user_pars, meas_pars, sign_pars,
+                      test_dicts=None, main_elec_tab=None):
+    """
+    Prepare the single analysis of all the pixels and fit their hysteresis
+    at once for each mode (batch engine)
+
+    Parameters
+    ----------
+    file_paths_in: list(n) of list of str
+        Mode-specific nanoloop files of each pixel.
+    user_pars: dict
+        Dictionary of all user parameters for the treatment.
+    meas_pars: dict
+        Dictionary of measurement parameters.
+    sign_pars: dict
+        Dictionary of sspfm bias signal parameters.
+    test_dicts: list, optional
+        List of dictionaries used for testing the function with corresponding
+        parameters.
+    main_elec_tab: list(n) of bool, optional
+        Dominant electrostatics in on field mode for each pixel.
+
+    Returns
+    -------
+    tab_pixels: list(n) of list of dict
+        Result of prepare_single_analysis for each file of each pixel.
+    tab_fit_params: list(n) of list of dict
+        Fitted values of the hysteresis parameters for each file of each
+        pixel.
+    """
+    tab_pixels = []
+    for cont, tab_path_in in enumerate(file_paths_in):
+        if main_elec_tab is not None:
+            user_pars["main elec"] = main_elec_tab[cont]
+        pixels = []
+        for sub_cont, file_path_in in enumerate(tab_path_in):
+            mode = os.path.split(file_path_in)[1].split('_')[0]
+            analysis_mode = gen_analysis_mode(
+                mode, read_mode=sign_pars['Mode (R)'])
+            test_dict = test_dicts[cont * 2 + sub_cont] if test_dicts \
+                else None
+            pixels.append(prepare_single_analysis(
+                file_path_in, user_pars, meas_pars, sign_pars,
+                analysis_mode=analysis_mode, cont=cont, test_dict=test_dict))
+        tab_pixels.append(pixels)
+
+    tab_fit_params = [[] for _ in tab_pixels]
+    for sub_cont in range(len(tab_pixels[0])):
+        pixels = [elem[sub_cont] for elem in tab_pixels]
+        fit_params, _, _ = batch_hyst_fit(
+            [pixel['x hyst'] for pixel in pixels],
+            [pixel['y hyst'] for pixel in pixels],
+            [pixel['dict pha']['counterclockwise'] for pixel in pixels],
+            [pixel['dict pha']['grounded tip'] for pixel in pixels],
+            analysis_mode=pixels[0]['analysis mode'],
+            model=user_pars['func'], asymmetric=user_pars['asymmetric'],
+            locked_elec_slope=pixels[0]['dict pha']['locked elec slope'])
+        for cont, fit_params_pixel in enumerate(tab_fit_params):
+            fit_params_pixel.append(
+                {key: value[cont] for key, value in fit_params.items()})
+
+    return tab_pixels, tab_fit_params
+
+
+def differential_limit(user_pars, sign_pars):
+    """
+    Write voltage axis range for differential analysis
+
+    Parameters
+    ----------
+    user_pars: dict
+        User-defined parameters for the treatment ('diff mode' and
+        'diff domain' keys).
+    sign_pars: dict
+        SSPFM bias signal parameters.
+
+    Returns
+    -------
+    limit: dict
+        Initial values of the write voltage axis range for differential
+        analysis (in V).
+    """
+    if user_pars['diff mode'] == 'auto':
+        write_range = sign_pars['Max volt (W) [V]'] - \
+                      sign_pars['Min volt (W) [V]']
+        write_fraction = write_range / DEFAULT_FRACTION_LIMIT
+        limit = {'min': sign_pars['Min volt (W) [V]'] + write_fraction,
+                 'max': sign_pars['Max volt (W) [V]'] - write_fraction}
+    else:
+        limit = user_pars['diff domain']
+
+    return limit
+
+
+def gen_tab_user_pars(user_pars, main_elec_tab):
+    """
+    User parameters of each pixel, with the main electrostatic key of the
+    main_elec_tab file
+
+    Parameters
+    ----------
+    user_pars: dict
+        User-defined parameters for the treatment.
+    main_elec_tab: list
+        Main electrostatic key (1 or 0) of each pixel.
+
+    Returns
+    -------
+    tab_user_pars: list of dict
+        User-defined parameters for each pixel.
+    """
+    tab_user_pars = []
+    for revert_val in main_elec_tab:
+        user_pars_copy = {
+            key: (bool(int(revert_val) == 1))
+            if key == "main elec" else value
+            for key, value in user_pars.items()}
+        tab_user_pars.append(user_pars_copy)
+
+    return tab_user_pars
+
+
+def init_all_properties(properties, other_properties):
+    """
+    Init the properties of all the pixels with the keys of the properties
+    of a pixel
+
+    Parameters
+    ----------
+    properties: dict
+        Measurements of a pixel (result of single script analysis).
+    other_properties: dict
+        Other properties of a pixel (topography, mechanical measurement).
+
+    Returns
+    -------
+    all_properties: dict
+        Empty lists of properties for all the pixels.
+    """
+    all_properties = {'on': {}, 'off': {}, 'coupled': {}}
+    for key, value in properties.items():
+        all_properties[key] = {sub_key: [] for sub_key in value}
+        all_properties['other'] = {key: [] for key in
+                                   list(other_properties.values())[0].keys()}
+
+    return all_properties
+
+
+def gather_pixel_results(all_properties, tab_best_loops, best_loops,
+                         properties, other_properties):
+    """
+    Append the results of a pixel to the results of all the pixels
+
+    Parameters
+    ----------
+    all_properties: dict
+        Properties of all the pixels (updated).
+    tab_best_loops: dict
+        Best loops of all the pixels for each mode (updated).
+    best_loops: dict
+        Best loops of the pixel depending on analysis mode.
+    properties: dict
+        Measurements of the pixel (result of single script analysis).
+    other_properties: dict
+        Other properties of the pixel (topography, mechanical measurement).
+
+    Returns
+    -------
+    None
+    """
+    for key, value in properties.items():
+        for sub_key, sub_value in value.items():
+            all_properties[key][sub_key].append(sub_value)
+    for key, value in list(other_properties.values())[0].items():
+        all_properties['other'][key].append(value)
+    for key, value in best_loops.items():
+        tab_best_loops[key].append(value)
+
+
+def save_results(all_properties, tab_best_loops, meas_pars, root_out,
+                 dir_path_out_props=None, dir_path_out_best_loops=None):
+    """
+    Save the properties and the best loops of all the pixels in txt files
+    (properties saved in a binary property store with the 'property_store'
+    setting, see save_property_store)
+
+    Parameters
+    ----------
+    all_properties: dict
+        Properties of all the pixels.
+    tab_best_loops: dict
+        Best loops of all the pixels for each mode.
+    meas_pars: dict
+        Measurement parameters (grid dimensions).
+    root_out: str
+        Path of saving directory for sspfm analysis (out).
+    dir_path_out_props: str, optional
+        Path of the saving directory for txt properties.
+    dir_path_out_best_loops: str, optional
+        Path of the saving directory for best loops.
+
+    Returns
+    -------
+    None
+    """
     dim_pix = {'x': meas_pars['Grid x [pix]'],
                'y': meas_pars['Grid y [pix]']}
     dim_mic = {'x': meas_pars['Grid x [um]'],
                'y': meas_pars['Grid y [um]']}
 
-    if save:
-        properties_folder_name = get_setting('default_properties_folder_name')
-        dir_path_out_props = dir_path_out_props or os.path.join(
-            root_out, properties_folder_name)
-        best_nanoloops_folder_name = \
-            get_setting('default_best_nanoloop_folder_name')
-        dir_path_out_best_loops = dir_path_out_best_loops or os.path.join(
-            root_out, best_nanoloops_folder_name)
-        save_best_nanoloops(tab_best_loops, dir_path_out_best_loops)
+    properties_folder_name = get_setting('default_properties_folder_name')
+    dir_path_out_props = dir_path_out_props or os.path.join(
+        root_out, properties_folder_name)
+    best_nanoloops_folder_name = \
+        get_setting('default_best_nanoloop_folder_name')
+    dir_path_out_best_loops = dir_path_out_best_loops or os.path.join(
+        root_out, best_nanoloops_folder_name)
+    save_best_nanoloops(tab_best_loops, dir_path_out_best_loops)
+    if get_setting("property_store"):
+        save_property_store(all_properties, dir_path_out_props,
+                            dim_pix=dim_pix, dim_mic=dim_mic)
+    else:
         save_properties(all_properties, dir_path_out_props, dim_pix=dim_pix,
                         dim_mic=dim_mic)
 
 
+def single_script_fused(file_path_in, user_pars_s1, user_pars, meas_pars,
+                        sign_pars, phase_offset=0, mode='max', cont=1,
+                        limit=None, root_out=None, txt_save=False,
+                        make_plots=False, verbose=False, run_plan=None):
+    """
+    Fused step 1 -> step 2 analysis of a measurement file (i.e., a pixel):
+    the nanoloops generated by the first step
+    (datacube_to_nanoloop_s1.single_script) are analyzed in memory by the
+    second step, without txt nanoloop file round trip.
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the measurement file (in).
+    user_pars_s1: dict
+        User parameters for the first step (datacube_to_nanoloop_s1).
+    user_pars: dict
+        User parameters for the second step.
+    meas_pars: dict
+        Measurement parameters.
+    sign_pars: dict
+        SSPFM bias signal parameters.
+    phase_offset: float, optional
+        Phase offset to apply to all phase values.
+    mode: str, optional
+        Operating mode for the first step analysis: 'max', 'fit',
+        'single_freq' or 'dfrt'.
+    cont: int, optional
+        Index of the measurement file.
+    limit: dict, optional
+        Initial values of the write voltage axis range for differential
+        analysis (in V).
+    root_out: str, optional
+        Path of the saving directory (out).
+    txt_save: bool, optional
+        If True, the txt nanoloop files are also saved (side output).
+    make_plots: bool, optional
+        Activation key for figure generation (second step).
+    verbose: bool, optional
+        Activation key for verbosity.
+    run_plan: dict, optional
+        Run plan of the measurement for the first step, common to all the
+        files (see datacube_to_nanoloop_s1.gen_run_plan).
+
+    Returns
+    -------
+    best_loops: dict
+        Best loops depending on analysis mode.
+    properties: dict
+        Measurements of the pixel (result of single script analysis).
+    other_properties: dict
+        Other properties about the segment (topography, mechanical measurement).
+    figs: list of matplotlib.pyplot.Figure
+        Figures of single and coupled analysis.
+    """
+    _, tab_nanoloops = single_script_s1(
+        user_pars_s1, file_path_in, meas_pars, sign_pars,
+        phase_offset=phase_offset, mode=mode, root_out=root_out,
+        verbose=verbose, txt_save=txt_save, index=cont + 1,
+        return_nanoloops=True, run_plan=run_plan)
+
+    return single_script(
+        [file_name for file_name, _ in tab_nanoloops], user_pars, meas_pars,
+        sign_pars, cont=cont, limit=limit, make_plots=make_plots,
+        verbose=verbose,
+        tab_nanoloops=[nanoloop for _, nanoloop in tab_nanoloops])
+
+
+def multi_script_fused(user_pars_s1, user_pars, dir_path_in, meas_pars,
+                       sign_pars, mode='max', file_format='.spm',
+                       verbose=False, show_plots=False, save=False,
+                       txt_save=False, root_out=None):
+    """
+    Fused step 1 -> step 2 analysis of the measurement files of a directory
+    (see single_script_fused): the nanoloops of each pixel are analyzed in
+    the same process (worker process in multiprocessing mode) just after
+    their generation. The txt nanoloop files are an optional side output.
+    The phase offset is static (or read in the phase file).
+
+    Parameters
+    ----------
+    user_pars_s1: dict
+        User parameters for the first step (datacube_to_nanoloop_s1).
+    user_pars: dict
+        User parameters for the second step.
+    dir_path_in: str
+        Path of the measurement file directory (in).
+    meas_pars: dict
+        Measurement parameters.
+    sign_pars: dict
+        SSPFM bias signal parameters.
+    mode: str, optional
+        Operating mode for the first step analysis: 'max', 'fit',
+        'single_freq' or 'dfrt'.
+    file_format: str, optional
+        Format of the measurement files ('.spm', '.txt', '.csv', '.xlsx',
+        '.npy' or '.grid').
+    verbose: bool, optional
+        Activate verbosity.
+    show_plots: bool, optional
+        Activate figure plotting (second step figures of the first pixel).
+    save: bool, optional
+        Activate saving of the properties, best loops and figures.
+    txt_save: bool, optional
+        Activate saving of the txt nanoloop files (side output).
+    root_out: str, optional
+        Path of saving directory for sspfm analysis (out).
+
+    Returns
+    -------
+    all_properties: dict
+        Properties of all the pixels.
+    tab_best_loops: dict
+        Best loops of all the pixels for each mode.
+    """
+    assert root_out
+    make_plots = bool(show_plots or save)
+
+    # Phase offset of each file: phase file or static value
+    file_names = datacube_filenames(dir_path_in, extension=file_format)
+    if 'SS_PFM_bias.txt' in file_names:
+        file_names.remove('SS_PFM_bias.txt')
+    file_paths_in = [os.path.join(dir_path_in, file_name)
+                     for file_name in file_names]
+    phase_file_path = user_pars_s1["pha pars"]["phase_file_path"]
+    if phase_file_path is not None:
+        phase_tab = get_phase_tab_offset(phase_file_path)
+    else:
+        phase_tab = [user_pars_s1["pha pars"]["offset"]] * len(file_paths_in)
+
+    if user_pars["main_elec_file_path"]:
+        tab_user_pars = gen_tab_user_pars(
+            user_pars, extract_main_elec_tab(user_pars["main_elec_file_path"]))
+    else:
+        tab_user_pars = [user_pars] * len(file_paths_in)
+
+    limit = differential_limit(user_pars, sign_pars)
+    tab_best_loops = {'on': [], 'off': []}
+    common_args = {
+        "user_pars_s1": user_pars_s1,
+        "meas_pars": meas_pars,
+        "sign_pars": sign_pars,
+        "mode": mode,
+        "limit": limit,
+        "root_out": root_out,
+        "txt_save": txt_save,
+        "verbose": verbose,
+        "run_plan": gen_run_plan(meas_pars, sign_pars, mode=mode)}
+
+    # Figures of the first pixel
+    if make_plots:
+        _, _, _, figs = single_script_fused(
+            file_paths_in[0], user_pars=tab_user_pars[0],
+            phase_offset=phase_tab[0], cont=0, make_plots=True,
+            **{**common_args, "txt_save": False})
+        figures_folder_name = get_setting('default_figures_folder_name')
+        print_plots(figs, save_plots=save, show_plots=show_plots,
+                    dirname=os.path.join(root_out, figures_folder_name),
+                    transparent=False)
+
+    # Multi processing mode
+    multiproc = get_setting("multi_processing")
+    if multiproc:
+        from PySSPFM.utils.core.multi_proc import run_multi_proc_fused
+        results = zip(*run_multi_proc_fused(
+            file_paths_in, phase_tab, tab_user_pars, common_args))
+
+    # Mono processing mode
+    else:
+        results = []
+        for cont, (file_path_in, phase_offset, user_pars_pix) in enumerate(
+                zip(file_paths_in, phase_tab, tab_user_pars)):
+            best_loops, properties, other_properties, _ = single_script_fused(
+                file_path_in, user_pars=user_pars_pix,
+                phase_offset=phase_offset, cont=cont, **common_args)
+            results.append((best_loops, properties, other_properties))
+            plt.close('all')
+
+    all_properties = None
+    for best_loops, properties, other_properties in results:
+        if all_properties is None:
+            all_properties = init_all_properties(properties, other_properties)
+        gather_pixel_results(all_properties, tab_best_loops, best_loops,
+                             properties, other_properties)
+
+    if save:
+        save_results(all_properties, tab_best_loops, meas_pars, root_out)
+
+    return all_properties, tab_best_loops
+
+
 def main_script(user_pars, dir_path_in, verbose=False, show_plots=False,
                 save=False, root_out=None):
     """
@@ -576,6 +1080,17 @@ def parameters(fname_json=None):
         This parameter specifies the fitting method used for the analysis.
         'leastsq' or 'least_square' (faster but harder to converge) or
         'nelder' (vice versa)
+    - engine: str
+        Hysteresis Fit Engine
+        This parameter selects how the hysteresis are fitted.
+        Two possible values:
+            --> 'object': The hysteresis of each pixel is fitted with its
+            own Hysteresis object and the selected method (default).
+            --> 'batch': The hysteresis of all the pixels are fitted at once
+            with a vectorized Levenberg-Marquardt solver (faster, same bounds
+            and initial guesses).
+        Active if: This parameter is active in mono processing mode.
+        Otherwise, the 'object' engine is used.
     - asymmetric: bool
         Asymmetric Hysteresis Fit
         This parameter determines whether an asymmetric fit of hysteresis
@@ -721,6 +1236,7 @@ def parameters(fname_json=None):
             "user_pars": {
                 "func": "sigmoid",
                 "method": "least_square",
+                "engine": "object",
                 "asymmetric": False,
                 "inf thresh": 10,
                 "sat thresh": 90,
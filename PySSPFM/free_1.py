@@ -81,6 +81,11 @@ def plot_best_loops(tab_best_loops, modes, legends):
         best_loops_write[mode] = []
         best_loops_piezorep[mode] = []
         for cont, best_loops in enumerate(tab_best_loops):
+            # File failed in multiprocessing mode (see fill_failed)
+            if best_loops[mode] is None:
+                best_loops_write[mode].append([])
+                best_loops_piezorep[mode].append([])
+                continue
             best_loops_write[mode].append(best_loops[mode].piezorep.write_volt)
             best_loops_piezorep[mode].append(best_loops[mode].piezorep.y_meas)
 
@@ -314,7 +319,7 @@ def main_free(dir_path_in, user_pars, modes, key_properties,
         }
         tab_best_loops, tab_properties, tab_mean_voltage, \
             tab_diff_piezorep_mean = \
-            run_multi_proc_free(file_names, common_args, processes=16)
+            run_multi_proc_free(file_names, common_args)
 
         for properties, mean_voltage, diff_piezorep_mean in \
                 zip(tab_properties, tab_mean_voltage, tab_diff_piezorep_mean):
@@ -254,15 +254,16 @@ def main(parent=None):
     label_extension = ttk.Label(scrollable_frame, text="Extension:")
     row = grid_item(label_extension, row, column=0, sticky="e", increment=False)
     extension_var = ttk.Combobox(scrollable_frame,
-                                 values=["spm", "txt", "csv", "xlsx"])
+                                 values=["spm", "txt", "csv", "xlsx", "npy",
+                                         "grid"])
     extension_var.set(user_parameters['extension'])
     row = grid_item(extension_var, row, column=1, sticky="ew")
     strg = "- Name: mode\n" \
            "- Summary: Extension of converted spm files.\n" \
            "- Description: This parameter determines the extension type " \
            "used for conversion of .spm file.\n" \
-           "- Value: A string with four possible values: " \
-           "'spm' or 'txt' or 'csv' or 'xlsx'"
+           "- Value: A string with six possible values: " \
+           "'spm' or 'txt' or 'csv' or 'xlsx' or 'npy' or 'grid'"
     extension_var.bind(
         "<Enter>", lambda event, mess=strg: show_tooltip(extension_var, mess))
     row = add_grid_separator(scrollable_frame, row=row)
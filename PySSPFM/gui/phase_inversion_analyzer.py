@@ -184,15 +184,16 @@ def main(parent=None):
                                 text="Extension of raw SSPFM file")
     row = grid_item(label_extension, row, column=0, sticky="e", increment=False)
     extension_var = ttk.Combobox(scrollable_frame,
-                                 values=["spm", "txt", "csv", "xlsx"])
+                                 values=["spm", "txt", "csv", "xlsx", "npy",
+                                         "grid"])
     extension_var.set(user_parameters['extension'])
     row = grid_item(extension_var, row, column=1, sticky="ew")
     strg = "- Name: mode\n" \
            "- Summary: Extension of measurement files.\n" \
            "- Description: This parameter determines the file extension type " \
            "for measurement files.\n" \
-           "- Value: A string with four possible values: 'spm', 'txt', " \
-           "'csv', or 'xlsx'."
+           "- Value: A string with six possible values: 'spm', 'txt', " \
+           "'csv', 'xlsx', 'npy', or 'grid'."
     extension_var.bind(
         "<Enter>", lambda event, mess=strg: show_tooltip(extension_var, mess))
 
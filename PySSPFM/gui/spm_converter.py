@@ -1,7 +1,8 @@
 """
 --> Executable Script
 Graphical interface for SPM file converter to another extension
-('txt', 'csv', 'xlsx') (run spm_converter.main_spm_converter)
+('txt', 'csv', 'xlsx', 'npy', 'grid') (run
+spm_converter.main_spm_converter)
 """
 
 import tkinter as tk
@@ -148,15 +149,15 @@ def main(parent=None):
     label_extension = ttk.Label(scrollable_frame, text="Extension:")
     row = grid_item(label_extension, row, column=0, sticky="e", increment=False)
     extension_var = ttk.Combobox(scrollable_frame,
-                                 values=["txt", "csv", "xlsx"])
+                                 values=["txt", "csv", "xlsx", "npy", "grid"])
     extension_var.set(user_parameters['extension'])
     row = grid_item(extension_var, row, column=1, sticky="ew")
     strg = "- Name: mode\n" \
            "- Summary: Extension of converted spm files.\n" \
            "- Description: This parameter determines the extension type " \
            "used for conversion of .spm file.\n" \
-           "- Value: A string with three possible values: " \
-           "'txt' or 'csv' or 'xlsx'"
+           "- Value: A string with five possible values: " \
+           "'txt' or 'csv' or 'xlsx' or 'npy' or 'grid'"
     extension_var.bind(
         "<Enter>", lambda event, mess=strg: show_tooltip(extension_var, mess))
     row = add_grid_separator(scrollable_frame, row=row)
@@ -60,6 +60,22 @@ MULTI_PROCESSING: bool
     and the offset analyzer of the toolbox.
     Default is False.
 
+PROCESSES: int or str
+    Number of worker processes in multiprocessing mode ('auto': number of
+    physical cores of the computer).
+    Default is 'auto'.
+
+CHUNKSIZE: int or str
+    Number of pixels sent together to a worker process in multiprocessing
+    mode ('auto': pixels split in 4 chunks per worker process).
+    Default is 'auto'.
+
+MAX_TASKS_PER_CHILD: int or None
+    Number of pixels processed by a worker process before it is replaced by
+    a new one (release of the memory of long runs). Worker processes are
+    never replaced if None.
+    Default is None.
+
 EXTRACT_PARAMETERS: str
     Method used to extract processing parameters. It can be extracted from json
     file (extract_parameters = 'json') that have been created in the same
@@ -163,9 +179,50 @@ ELECTROSTATIC_OFFSET: bool
     offset of off field measurements is electrostatics and not ferroelectric
     effects (like frozen polarisation), this parameter should be True.
     Default is True.
+
+RAW_CACHE: bool
+    Flag to control whether measurements extracted from raw measurement files
+    (spm, txt, csv, xlsx) are saved in an on-disk binary cache. The cache is
+    used by all the scripts (data processing and toolbox) in order not to
+    parse the same file several times.
+    Default is False.
+
+RAW_CACHE_PATH: str
+    Directory of the on-disk cache of raw measurement files.
+    Default is r'~/.pysspfm/raw_cache'.
+
+RAW_CACHE_SIZE: float
+    Maximum size of the on-disk cache of raw measurement files (in MB).
+    Least recently used entries are removed beyond this size.
+    Default is 2048.
+
+NANOLOOP_STORE: bool
+    Flag to control whether the nanoloops of step 1 of the data analysis are
+    saved in a consolidated store (a single binary array file and a json
+    header for all the pixels of the grid) instead of one txt file per pixel
+    and per mode. Step 2 and the toolbox read the nanoloops of the store.
+    Default is False.
+
+PROPERTY_STORE: bool
+    Flag to control whether the properties of step 2 of the data analysis
+    are saved in a binary property store (a single memory-mapped array file
+    and a json header) instead of txt files. The toolbox reads the
+    properties of the store, which can be exported in txt files with
+    export_property_store.
+    Default is False.
+
+WARM_START: bool
+    Flag to control whether the per-pixel fits (SHO peak fits of step 1 in
+    'fit' mode and hysteresis fits of step 2, 'object' engine) start from
+    the converged fit of a neighbor pixel (left pixel, else upper pixel)
+    instead of the default initial guess, with a fallback to the default
+    initial guess if the fit is unsuccessful. In multiprocessing mode, each
+    worker process handles a contiguous block of rows of the grid.
+    Default is False.
 """
 import sys
 import os
+import copy
 from pathlib import Path
 import shutil
 
@@ -173,6 +230,9 @@ from PySSPFM.utils.core.extract_params_from_file import \
     load_parameters_from_file
 
 
+SETTINGS_CACHE = {"files": {}, "snapshot": None}
+
+
 def get_setting(key):
     """
     Get a setting value based on the specified key. This function allows you
@@ -180,6 +240,8 @@ def get_setting(key):
     In such cases, examples settings are used to align with example data and
     achieve the correct target values for tests. Otherwise, user-adjustable
     settings are extracted.
+    Settings files are parsed once per process and kept in memory
+    (see get_settings): they are only read again if they are modified.
 
     Parameters
     ----------
@@ -191,6 +253,31 @@ def get_setting(key):
     setting : object
         The value associated with the provided key in the settings dictionaries.
     """
+    setting = get_settings()[key]
+
+    # Mutable values are copied to keep the cache unaltered
+    if isinstance(setting, (dict, list)):
+        setting = copy.deepcopy(setting)
+
+    return setting
+
+
+def get_settings():
+    """
+    Get the dictionary of all the settings used for the current process:
+    examples settings (completed with user settings) if the initial code
+    launch is a test or an example, user settings otherwise.
+    If a snapshot has been loaded (see load_settings_snapshot), it is
+    returned without any file access.
+
+    Returns
+    -------
+    settings : dict
+        Settings dictionary (must not be modified).
+    """
+    if SETTINGS_CACHE["snapshot"] is not None:
+        return SETTINGS_CACHE["snapshot"]
+
     origin_path = sys.argv[0]
     sep_origin_path = origin_path.split(os.path.sep)
 
@@ -199,36 +286,114 @@ def get_setting(key):
     examples_config_path = Path(__file__).parent / 'examples_settings.json'
     user_config_path = Path.home() / '.pysspfm' / 'pysspfm.json'
 
-    # If the ~/.pysspfm directory doesn't exist, create it
-    user_config_path.parent.mkdir(parents=True, exist_ok=True)
-
     # If the user configuration file doesn't exist, copy the default
-    # configuration file
+    # configuration file (and create the ~/.pysspfm directory)
     if not user_config_path.exists():
+        user_config_path.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy(Path(__file__).parent / 'default_settings.json',
                     user_config_path)
 
-    settings_dict = get_settings_dict(user_config_path)
-    # Update the settings dictionary with the path information.
-    settings_dict = get_path_from_json(settings_dict)
+    # Settings dictionary updated with the path information.
+    # Default settings are used for the keys missing in the user settings
+    # (user settings file created with a previous version of PySSPFM)
+    default_settings_dict = get_cached_settings_dict(
+        Path(__file__).parent / 'default_settings.json', path=True)
+    settings_dict = get_cached_settings_dict(
+        user_config_path, path=True, fallback=default_settings_dict)
 
+    # Use the examples settings if 'examples' or 'test' is in the script path
     # All default constants for PySSPFM examples and tests
     # examples settings must not be modified
-    def_settings_dict = get_settings_dict(examples_config_path)
-
-    # Use the examples settings if 'examples' or 'test' is in the script path
-    if "PySSPFM" not in sep_origin_path:
-        settings_to_use = def_settings_dict
-    elif 'examples' in sep_origin_path or 'test' in sep_origin_path:
-        settings_to_use = def_settings_dict
+    if "PySSPFM" not in sep_origin_path or 'examples' in sep_origin_path or \
+            'test' in sep_origin_path:
+        settings = get_cached_settings_dict(examples_config_path,
+                                            fallback=settings_dict)
     else:
-        settings_to_use = settings_dict
-    try:
-        setting = settings_to_use[key]
-    except KeyError:
-        setting = settings_dict[key]
+        settings = settings_dict
 
-    return setting
+    return settings
+
+
+def get_cached_settings_dict(json_file_path, path=False, fallback=None):
+    """
+    Returns the settings dictionary from a JSON file, parsed only once per
+    process. The file is parsed again only if its modification time (or its
+    size) has changed since the last call.
+
+    Parameters
+    ----------
+    json_file_path: str or pathlib.Path
+        Path to the JSON file.
+    path: bool, optional
+        If True, the settings dictionary is updated with the path information
+        (see get_path_from_json).
+    fallback: dict, optional
+        Settings dictionary used for the keys missing in the JSON file.
+
+    Returns
+    -------
+    settings_dict: dict
+        The settings dictionary (must not be modified).
+    """
+    stat = os.stat(json_file_path)
+    file_key = (str(json_file_path), path)
+    signature = (stat.st_mtime_ns, stat.st_size, id(fallback))
+    cached = SETTINGS_CACHE["files"].get(file_key)
+
+    if cached is None or cached[0] != signature:
+        settings_dict = get_settings_dict(json_file_path)
+        if path:
+            settings_dict = get_path_from_json(settings_dict)
+        if fallback is not None:
+            settings_dict = {**fallback, **settings_dict}
+        cached = (signature, settings_dict)
+        SETTINGS_CACHE["files"][file_key] = cached
+
+    return cached[1]
+
+
+def settings_snapshot():
+    """
+    Snapshot of the settings of the current process, to be transmitted to
+    worker processes (see load_settings_snapshot).
+
+    Returns
+    -------
+    snapshot : dict
+        Copy of the settings dictionary.
+    """
+    return copy.deepcopy(get_settings())
+
+
+def load_settings_snapshot(snapshot):
+    """
+    Load a settings snapshot in the current process: settings files are no
+    longer read. Typically used as initializer of a multiprocessing pool, in
+    order to share the settings of the parent process with the workers.
+
+    Parameters
+    ----------
+    snapshot : dict or None
+        Settings dictionary (see settings_snapshot). If None, settings are
+        read again from the settings files.
+
+    Returns
+    -------
+    None
+    """
+    SETTINGS_CACHE["snapshot"] = snapshot
+
+
+def clear_settings_cache():
+    """
+    Clear the settings kept in memory (parsed files and loaded snapshot).
+
+    Returns
+    -------
+    None
+    """
+    SETTINGS_CACHE["files"].clear()
+    SETTINGS_CACHE["snapshot"] = None
 
 
 def get_settings_dict(json_file_name):
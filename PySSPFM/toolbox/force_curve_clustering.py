@@ -21,9 +21,8 @@ import pandas as pd
 
 from PySSPFM.settings import get_setting, get_config
 from PySSPFM.utils.core.figure import print_plots
-from PySSPFM.utils.core.path_management import sort_filenames
-from PySSPFM.utils.raw_extraction import \
-    raw_data_extraction_without_script, csv_meas_sheet_extract
+from PySSPFM.utils.raw_extraction import raw_data_extraction_without_script, \
+    csv_meas_sheet_extract, datacube_filenames
 from PySSPFM.utils.path_for_runable import save_path_management, \
     create_json_res, copy_json_res
 from PySSPFM.utils.datacube_to_nanoloop.analysis import \
@@ -266,7 +265,8 @@ def single_script(file_path_in, mode='classic', tip_stiffness=3,
     _, file_extension = os.path.splitext(file_path_in)
     dict_meas = raw_data_extraction_without_script(
         file_path_in, extension=file_extension[1:],
-        mode_dfrt=bool(mode.lower() == 'dfrt'))
+        mode_dfrt=bool(mode.lower() == 'dfrt'),
+        channels=['height', 'deflection'])
 
     raw_height = dict_meas['height']
     raw_deflection = dict_meas['deflection']
@@ -368,9 +368,7 @@ def main_force_curve_analysis(
     height_tab = []
     force_tab = []
     tab_other_properties = []
-    filenames = [filename for filename in os.listdir(dir_path_in) if
-                 filename.endswith(extension)]
-    sorted_filenames, _, _ = sort_filenames(filenames)
+    sorted_filenames = datacube_filenames(dir_path_in, extension=extension)
 
     # Multi processing mode
     multiproc = get_setting("multi_processing")
@@ -385,7 +383,7 @@ def main_force_curve_analysis(
             "hold_samples": hold_samples,
             "verbose": verbose
         }
-        res = run_multi_proc_forcecurve(file_paths, common_args, processes=16)
+        res = run_multi_proc_forcecurve(file_paths, common_args)
         (height_tab, force_tab, tab_other_properties) = res
     else:
         for filename in sorted_filenames:
@@ -471,7 +469,8 @@ def parameters(fname_json=None):
         Extension of files.
         This parameter determines the extension of datacube SSPFM raw file
         measurements.
-        Four possible values: 'spm' or 'txt' or 'csv' or 'xlsx'.
+        Six possible values: 'spm' or 'txt' or 'csv' or 'xlsx' or 'npy' or
+        'grid' (grid datacube container).
 
     - dir_path_in: str
         Directory containing datacube SSPFM raw file measurements.
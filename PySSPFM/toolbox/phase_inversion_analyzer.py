@@ -10,9 +10,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from PySSPFM.settings import get_setting, get_config
-from PySSPFM.utils.core.path_management import \
-    get_filenames_with_conditions, sort_filenames
-from PySSPFM.utils.raw_extraction import data_extraction, csv_meas_sheet_extract
+from PySSPFM.utils.raw_extraction import \
+    data_extraction, csv_meas_sheet_extract, datacube_filenames
 from PySSPFM.utils.signal_bias import sspfm_time, sspfm_generator
 from PySSPFM.utils.datacube_to_nanoloop.analysis import \
     (cut_function, external_calib, SegmentInfo, SegmentSweep,
@@ -163,7 +162,8 @@ def single_script(file_path_in, user_pars, meas_pars, sign_pars,
 
     # Extract sspfm measurement from file
     dict_meas, _ = data_extraction(
-        file_path_in, mode_dfrt=bool(mode.lower() == 'dfrt'), verbose=False)
+        file_path_in, mode_dfrt=bool(mode.lower() == 'dfrt'), verbose=False,
+        sign_pars=sign_pars)
 
     # Init and cut measurements
     if sign_pars['Min volt (R) [V]'] == sign_pars['Max volt (R) [V]']:
@@ -423,7 +423,7 @@ def multi_script(dir_path_in, file_names, user_pars, meas_pars, sign_pars,
                            if not key == "phase_offset"}
         tab_phase_grad = \
             run_multi_phase_inversion_analyzer(
-                file_paths_in, phase_tab, common_args, processes=16)
+                file_paths_in, phase_tab, common_args)
 
         # Append phase grad bias values
         for elem in tab_phase_grad:
@@ -495,8 +495,7 @@ def main_phase_inversion_analyzer(user_pars, dir_path_in, range_file=None,
     figures: list
         Generated figures
     """
-    file_names = get_filenames_with_conditions(dir_path_in, extension=extension)
-    file_names, _, _ = sort_filenames(file_names)
+    file_names = datacube_filenames(dir_path_in, extension=extension)
     file_names = file_names[range_file[0]:range_file[1]] \
         if range_file is not None else file_names
 
@@ -627,7 +626,8 @@ def parameters(fname_json=None):
         Extension of raw SSPFM measurement files.
         This parameter determines the file extension type of raw SSPFM
         measurement files.
-        Four possible values: 'spm', 'txt', 'csv', or 'xlsx'.
+        Six possible values: 'spm', 'txt', 'csv', 'xlsx', 'npy', or 'grid'
+        (grid datacube container).
     - verbose: bool
         Activation key for printing verbosity during analysis.
         This parameter serves as an activation key for printing verbose
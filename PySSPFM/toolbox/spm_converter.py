@@ -1,7 +1,7 @@
 """
 --> Executable Script
 Conversion of .spm datacube file (SS PFM) to other datacube file extension
-(txt, csv, xlsx)
+(txt, csv, xlsx, npy) or to a grid datacube container (grid)
 Inspired by SS_PFM script, Nanoscope, Bruker
 """
 
@@ -13,7 +13,8 @@ import pandas as pd
 import numpy as np
 
 from PySSPFM.settings import get_setting, get_config
-from PySSPFM.utils.raw_extraction import data_extraction
+from PySSPFM.utils.raw_extraction import \
+    data_extraction, save_datacube_npy, save_grid_datacube
 
 
 def single_script(dir_path_out, file_path_in, extension='txt', mode='classic',
@@ -30,7 +31,7 @@ def single_script(dir_path_out, file_path_in, extension='txt', mode='classic',
     mode: str, optional
         Measurement mode ('classic' or 'dfrt')
     extension: str, optional
-        File extension for saving ('txt', 'csv', 'xlsx')
+        File extension for saving ('txt', 'csv', 'xlsx', 'npy')
     verbose: bool, optional
         Activation key for verbosity
 
@@ -38,7 +39,7 @@ def single_script(dir_path_out, file_path_in, extension='txt', mode='classic',
     -------
     None
     """
-    assert extension in ['txt', 'csv', 'xlsx']
+    assert extension in ['txt', 'csv', 'xlsx', 'npy']
 
     # Print file name
     _, file_name_in = os.path.split(file_path_in)
@@ -83,9 +84,13 @@ def single_script(dir_path_out, file_path_in, extension='txt', mode='classic',
             with pd.ExcelWriter(excel_file_path) as writer:  # noqa
                 data_frame.to_excel(writer, sheet_name='Measurements',
                                     index=False)
+    elif extension == 'npy':
+        # Binary file format (+ json header), memory-mapped when read
+        save_datacube_npy(file_path_out, raw_data, header)
 
     else:
-        raise IOError("extension should be 'txt', or 'csv', or 'xlsx'")
+        raise IOError("extension should be 'txt', or 'csv', or 'xlsx', or "
+                      "'npy'")
 
 
 def multi_script(dir_path_in, mode='classic', extension='txt',
@@ -101,7 +106,7 @@ def multi_script(dir_path_in, mode='classic', extension='txt',
     mode: str, optional
         Measurement mode ('classic' or 'dfrt')
     extension: str, optional
-        File extension for saving ('txt', 'csv', 'xlsx')
+        File extension for saving ('txt', 'csv', 'xlsx', 'npy', 'grid')
     dir_path_out: str, optional
         Directory path of saving txt measurement (out)
     verbose: bool, optional
@@ -119,6 +124,12 @@ def multi_script(dir_path_in, mode='classic', extension='txt',
     if dir_name_out not in os.listdir(root_out):
         os.makedirs(dir_path_out)
 
+    # Grid datacube container: all the spm files in a single file
+    if extension == 'grid':
+        save_grid_datacube(dir_path_in, extension='spm',
+                           dir_path_out=dir_path_out, verbose=verbose)
+        return
+
     # Copy measurement sheet to saving folder in another extension
     file_name_csv_in = ''
     for elem in os.listdir(dir_path_in):
@@ -162,7 +173,11 @@ def main_spm_converter(dir_path_in, mode='classic', extension='txt',
         Extension of converted spm files.
         This parameter determines the extension type used for conversion of
         .spm file.
-        Three possible values: 'txt' or 'csv' or 'xlsx'.
+        Five possible values: 'txt' or 'csv' or 'xlsx' or 'npy' or 'grid'.
+        'npy' is a binary format (one .npy file per pixel with a json header
+        file for channel names), much faster to read than text formats.
+        'grid' is a binary container of all the pixels (single .npy file
+        with a json header file for channel names and pixel index).
     dir_path_out: str, optional
         Saving directory for conversion results
         (optional, default: 'title_meas'_datacube_'extension' directory in
@@ -223,7 +238,7 @@ def main(fname_json=None):
         verbose = True
         # mode = 'dfrt' or 'classic' (sweep or single frequency)
         mode = 'classic'
-        # extension = 'txt' or 'csv' or 'xlsx'
+        # extension = 'txt' or 'csv' or 'xlsx' or 'npy' or 'grid'
         extension = 'txt'
     else:
         raise NotImplementedError("setting 'extract_parameters' "
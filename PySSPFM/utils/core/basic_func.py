@@ -18,6 +18,15 @@ def linear(x, offset, slope, der=0):
         return np.zeros_like(x)
 
 
+def linear_jac(x, offset, slope):
+    r"""
+    Return partial derivatives of Linear function with respect to its
+    parameters (offset, slope)
+    """
+    shape = np.broadcast(x, offset, slope).shape
+    return {'offset': np.ones(shape), 'slope': np.broadcast_to(x, shape)}
+
+
 def sigmoid(x, ampli, coef, x0, is_centered=True, der=0):
     r"""
     Return Sigmoid function defined as:
@@ -41,6 +50,18 @@ def sigmoid(x, ampli, coef, x0, is_centered=True, der=0):
         raise NotImplementedError("'der' should be in [0, 1, 2]")
 
 
+def sigmoid_jac(x, ampli, coef, x0, is_centered=True):
+    r"""
+    Return partial derivatives of Sigmoid function with respect to its
+    parameters (ampli, coef, x0)
+    """
+    exp = np.exp(-coef * (x - x0))
+    der_exp = exp / (1. + exp) ** 2
+    return {'ampli': 1. / (1. + exp) - 0.5 * is_centered,
+            'coef': ampli * (x - x0) * der_exp,
+            'x0': - ampli * coef * der_exp}
+
+
 def arctan(x, ampli, coef, x0, der=0):
     r"""
     Return Arctan function defined as: :math:`ampli * atan(-coef * (x-x0))`
@@ -57,6 +78,17 @@ def arctan(x, ampli, coef, x0, der=0):
         raise NotImplementedError("'der' should be in [0, 1, 2]")
 
 
+def arctan_jac(x, ampli, coef, x0):
+    r"""
+    Return partial derivatives of Arctan function with respect to its
+    parameters (ampli, coef, x0)
+    """
+    denom = 1 + coef ** 2 * (x - x0) ** 2
+    return {'ampli': np.arctan(coef * (x - x0)),
+            'coef': ampli * (x - x0) / denom,
+            'x0': - ampli * coef / denom}
+
+
 def gaussian(x, ampli, fwhm, x0, der=0):
     r"""
     Return Gaussian function defined as:
@@ -134,6 +166,19 @@ def sho(x, ampli, coef, x0, der=0):
         raise NotImplementedError("'der' should be in [0, 1, 2]")
 
 
+def sho_jac(x, ampli, coef, x0):
+    r"""
+    Return partial derivatives of Simple Harmonic Oscillator peak resonance
+    function with respect to its parameters (ampli, coef, x0)
+    """
+    denom = (x0 ** 2 - x ** 2) ** 2 + ((x * x0 / coef) ** 2)
+    der_denom_x0 = 4 * x0 * (x0 ** 2 - x ** 2) + 2 * x0 * (x / coef) ** 2
+    return {'ampli': x0 ** 2 / np.sqrt(denom),
+            'coef': ampli * (x0 ** 2 * x) ** 2 / (coef ** 3 * denom ** (3 / 2)),
+            'x0': ampli * (2 * x0 / np.sqrt(denom) -
+                           x0 ** 2 * der_denom_x0 / (2 * denom ** (3 / 2)))}
+
+
 def sho_phase(x, ampli, coef, x0, der=0):
     r"""
     Return Simple Harmonic Oscillator phase resonance function
@@ -161,6 +206,19 @@ def sho_phase(x, ampli, coef, x0, der=0):
         raise NotImplementedError("'der' should be in [0, 1, 2]")
 
 
+def sho_phase_jac(x, ampli, coef, x0):
+    r"""
+    Return partial derivatives of Simple Harmonic Oscillator phase resonance
+    function with respect to its parameters (ampli, coef, x0)
+    """
+    num = x * x0
+    denom = coef * (x0 ** 2 - x ** 2)
+    norm = num ** 2 + denom ** 2
+    return {'ampli': np.arctan2(num, denom),
+            'coef': - ampli * num * (x0 ** 2 - x ** 2) / norm,
+            'x0': ampli * (denom * x - num * 2 * coef * x0) / norm}
+
+
 def sho_phase_switch(x, ampli, coef, x0, der=0):
     r"""
     Return Simple Harmonic Oscillator phase (with switch) resonance function
@@ -181,6 +239,16 @@ def sho_phase_switch(x, ampli, coef, x0, der=0):
         raise NotImplementedError("'der' should be in [0, 1, 2]")
 
 
+def sho_phase_switch_jac(x, ampli, coef, x0):
+    r"""
+    Return partial derivatives of Simple Harmonic Oscillator phase (with
+    switch) resonance function with respect to its parameters (ampli, coef, x0)
+    """
+    jac = sho_phase_jac(x, ampli, coef, x0)
+    jac['ampli'] = np.arctan(x * x0 / (coef * (x0 ** 2 - x ** 2)))
+    return jac
+
+
 def sho_complex(x, x0, coef_q, y0, z0):
     """
     Return Simple Harmonic Oscillator complex (with switch) resonance func
@@ -8,7 +8,9 @@ from lmfit import Model, Parameters, minimize, report_fit
 from sklearn.metrics import r2_score
 
 from PySSPFM.utils.core.basic_func import \
-    linear, sigmoid, arctan # pylint:disable=W0611
+    (linear, sigmoid, arctan,  # pylint:disable=W0611
+     linear_jac, sigmoid_jac, arctan_jac)
+from PySSPFM.utils.core.fitting import batch_least_squares
 
 
 class Hysteresis:
@@ -26,6 +28,9 @@ class Hysteresis:
     model: lmfit.CompositeModel
         Hysteresis composite model that consists in linear + (sigmoid or arctan)
         functions
+    model_func: callable
+        Function associated to the branch model (sigmoid or arctan), used for
+        the direct numpy evaluation of the hysteresis
     params: lmfit.Parameters
         Dictionary of parameters associated to the model where keys are:
         ('offset', 'slope','ampli_0', 'ampli_1', ... 'ampli_{nbranches-1}',
@@ -33,6 +38,8 @@ class Hysteresis:
          'x0_{nbranches-1}')
     props: dict
         Properties associated to the centered fitted hysteresis
+    success: bool
+        Convergence flag of the last fit (None if not fitted)
 
     Parameters
     ----------
@@ -67,8 +74,10 @@ class Hysteresis:
         self.model_name = model
         self.model = Model(linear, independent_vars=['x', 'der'])
         self.model += Model(eval(model), independent_vars=['x', 'der'])
+        self.model_func = eval(model)
         self.params = None
         self.props = None
+        self.success = None
 
         self.init_params(offset=offset, slope=slope,
                          ampli=ampli, coef=coef, x0=x0)
@@ -128,15 +137,91 @@ class Hysteresis:
             Results of the hysteresis evaluation on the x-support
         """
         params = params or self.params
-        return self.model.eval(x=np.array(x).ravel(),
-                               offset=params['offset'].value,
-                               slope=params['slope'].value,
-                               ampli=params[f'ampli_{i}'].value,
-                               coef=params[f'coef_{i}'].value,
-                               x0=params[f'x0_{i}'].value,
-                               der=der)
+        x = np.array(x, dtype=float).ravel()
+        return linear(x, params['offset'].value, params['slope'].value,
+                      der=der) + \
+            self.model_func(x, params[f'ampli_{i}'].value,
+                            params[f'coef_{i}'].value,
+                            params[f'x0_{i}'].value, der=der)
+
+    @staticmethod
+    def stack_branches(x):
+        """
+        Concatenate the branches of the hysteresis in a single support
+
+        Parameters
+        ----------
+        x: list of n np.ndarrays
+            List of x-coordinates associated to the n-branches of the
+            hysteresis
+
+        Returns
+        -------
+        x_tab: numpy.array(p) of float
+            Concatenated x-coordinates of the branches
+        index: numpy.array(p) of int
+            Index of the branch associated to each x-coordinate
+        """
+        x = [np.array(x_i, dtype=float).ravel() for x_i in x]
+        x_tab = np.concatenate(x)
+        index = np.repeat(np.arange(len(x)), [len(x_i) for x_i in x])
+
+        return x_tab, index
+
+    def branch_params(self, params, index):
+        """
+        Return the branch parameters ('ampli', 'coef', 'x0') associated to
+        each value of a stacked support
 
-    def residue(self, params, x, y):
+        Parameters
+        ----------
+        params: lmfit.Parameters
+            Dictionary of parameters associated to the model ('offset', 'slope',
+            'ampli', 'coef', 'x0_0', 'x0_1', ... 'x0_{nbranches-1}')
+        index: numpy.array(p) of int
+            Index of the branch associated to each value (see stack_branches)
+
+        Returns
+        -------
+        ampli, coef, x0: numpy.array(p) of float
+            Parameters of the branch model for each value
+        """
+        return np.array([[params[f'{key}_{i}'].value
+                          for i in range(self.nbranches)]
+                         for key in ['ampli', 'coef', 'x0']])[:, index]
+
+    def eval_branches(self, x_tab, index, params=None, der=0, out=None):
+        """
+        Return the evaluation of all the hysteresis branches on a stacked
+        support, computed in a single broadcasted numpy expression
+
+        Parameters
+        ----------
+        x_tab: numpy.array(p) of float
+            Concatenated x-coordinates of the branches (see stack_branches)
+        index: numpy.array(p) of int
+            Index of the branch associated to each x-coordinate
+        params: lmfit.Parameters, optional
+            Dictionary of parameters associated to the model ('offset', 'slope',
+            'ampli', 'coef', 'x0_0', 'x0_1', ... 'x0_{nbranches-1}')
+        der: int, optional
+            Degree associated to the hysteresis derivatives evaluation
+        out: numpy.array(p) of float, optional
+            Preallocated array in which the result is written
+
+        Returns
+        -------
+        out: numpy.array(p) of float
+            Results of the hysteresis evaluation on the stacked support
+        """
+        params = params or self.params
+        ampli, coef, x0 = self.branch_params(params, index)
+        return np.add(linear(x_tab, params['offset'].value,
+                             params['slope'].value, der=der),
+                      self.model_func(x_tab, ampli, coef, x0, der=der),
+                      out=out)
+
+    def residue(self, params, x, y, index=None, out=None):
         """
         Return the residue between model evaluation and y
 
@@ -145,19 +230,74 @@ class Hysteresis:
         params: lmfit.Parameters
             Dictionary of parameters associated to the model ('offset', 'slope',
             'ampli', 'coef', 'x0_0', 'x0_1', ... 'x0_{nbranches-1}')
-        x, y = list of np.ndarrays
+        x, y = list of np.ndarrays or numpy.array(p) of float
             List of (x, y) coordinates associated to the n-branches of the
-            hysteresis
+            hysteresis, or concatenated coordinates if 'index' is given
+        index: numpy.array(p) of int, optional
+            Index of the branch associated to each value of stacked x and y
+            (see stack_branches)
+        out: numpy.array(p) of float, optional
+            Preallocated array in which the residue is written
 
         Returns
         -------
         res_tot: numpy.array(p)
             Residue (flattened) issued from the n-branches evaluation
         """
-        res_tot = []
-        for i, (x_i, y_i) in enumerate(zip(x, y)):
-            res_tot.append(self.eval(x_i, params, i) - y_i)
-        return np.concatenate(res_tot)
+        if index is None:
+            x, index = self.stack_branches(x)
+            y = np.concatenate([np.array(y_i, dtype=float).ravel()
+                                for y_i in y])
+        res_tot = self.eval_branches(x, index, params, out=out)
+        res_tot -= y
+
+        return res_tot
+
+    def jacobian(self, params, x, y=None, index=None):
+        """
+        Return the analytic jacobian of the residue with respect to the free
+        parameters
+
+        Parameters
+        ----------
+        params: lmfit.Parameters
+            Dictionary of parameters associated to the model ('offset', 'slope',
+            'ampli', 'coef', 'x0_0', 'x0_1', ... 'x0_{nbranches-1}')
+        x, y = list of np.ndarrays or numpy.array(p) of float
+            List of (x, y) coordinates associated to the n-branches of the
+            hysteresis, or concatenated coordinates if 'index' is given
+            (y is not used, kept for lmfit call signature)
+        index: numpy.array(p) of int, optional
+            Index of the branch associated to each value of stacked x
+            (see stack_branches)
+
+        Returns
+        -------
+        jac_tot: numpy.array(p*q)
+            Jacobian (p residue values, q free parameters)
+        """
+        if index is None:
+            x, index = self.stack_branches(x)
+        var_names = [name for name, par in params.items()
+                     if par.vary and not par.expr]
+        jac_func = {'sigmoid': sigmoid_jac, 'arctan': arctan_jac}
+        jac_tot = np.zeros((len(x), len(var_names)))
+        jac_branch = {
+            **linear_jac(x, params['offset'].value, params['slope'].value),
+            **jac_func[self.model_name](
+                x, *self.branch_params(params, index))}
+        for key, value in jac_branch.items():
+            branches = [None] if key in ['offset', 'slope'] else \
+                range(self.nbranches)
+            for i in branches:
+                name = key if i is None else f'{key}_{i}'
+                # constrained parameters (e.g. 'ampli_1' = 'ampli_0')
+                while params[name].expr:
+                    name = params[name].expr.strip()
+                if name in var_names:
+                    jac_tot[:, var_names.index(name)] += \
+                        value if i is None else value * (index == i)
+        return jac_tot
 
     def fit(self, x, y, verbosity=True, **kwargs):
         """
@@ -173,8 +313,31 @@ class Hysteresis:
         kwargs:
             Extra parameters associated to lmfit.minimize()
         """
-        result = minimize(self.residue, self.params, args=(x, y), **kwargs)
+        # Analytic jacobian for least squares methods (if the constraints
+        # between parameters are simple equalities). With 'leastsq', the bounds
+        # transformation cancels the gradient of a parameter initialized on a
+        # bound: finite differences are kept in this case.
+        method = kwargs.get('method', 'leastsq')
+        simple_expr = all(par.expr is None or par.expr.strip() in self.params
+                          for par in self.params.values())
+        inside_bounds = all(par.min < par.value < par.max
+                            for par in self.params.values()
+                            if par.vary and not par.expr)
+        x_tab, index = self.stack_branches(x)
+        y_tab = np.concatenate([np.array(y_i, dtype=float).ravel()
+                                for y_i in y])
+        if method.lower().startswith('least') and simple_expr and \
+                (inside_bounds or method.lower().startswith('least_s')):
+            kwargs.setdefault('Dfun', lambda params, *args, **kws:
+                              self.jacobian(params, x_tab, index=index))
+        # Residue written in a preallocated buffer with 'leastsq' only
+        # (MINPACK copies it at each call, other methods may keep it)
+        out = np.empty_like(x_tab) if method.lower() == 'leastsq' else None
+        result = minimize(self.residue, self.params, args=(x_tab, y_tab),
+                          kws={'index': index, 'out': out}, **kwargs)
         self.params = result.params
+        self.success = bool(result.success) and all(
+            np.isfinite(par.value) for par in self.params.values())
         if verbosity:
             report_fit(result)
 
@@ -209,9 +372,10 @@ class Hysteresis:
                 ax.plot(x_i, y_i, 'ko', ms=2)
         if self.params is not None:
             ax.set_prop_cycle(None)
+            x_tab, index = self.stack_branches(x)
+            y_eval = self.eval_branches(x_tab, index)
             for i, x_i in enumerate(x):
-                y_eval = self.eval(x_i, self.params, i=i)
-                ax.plot(x_i, y_eval, label=labels[i])
+                ax.plot(x_i, y_eval[index == i], label=labels[i])
         ax.legend()
 
         return fig, ax
@@ -258,9 +422,11 @@ class Hysteresis:
         # Hysteresis plotting
         if plot_hyst:
             ax.set_prop_cycle(None)
+            x_tab, index = self.stack_branches(x)
+            y_eval = self.eval_branches(x_tab, index)
             for i, x_i in enumerate(x):
-                y_eval = self.eval(x_i, self.params, i=i)
-                ax.plot(x_i, y_eval, '--', label=f'prop branch{i + 1} (fit)')
+                ax.plot(x_i, y_eval[index == i], '--',
+                        label=f'prop branch{i + 1} (fit)')
 
         # Init plot_dict
         plot_dict = plot_dict or {}
@@ -342,78 +508,13 @@ class Hysteresis:
             x0.append(self.params[f'x0_{i}'].value)
         x0_l, ind_l = min(x0), np.argmin(x0)
         x0_r, ind_r = max(x0), np.argmax(x0)
-
-        ampli_r = self.params[f'ampli_{ind_r}'].value
-        coef_r = self.params[f'coef_{ind_r}'].value
-        ampli_l = self.params[f'ampli_{ind_l}'].value
-        coef_l = self.params[f'coef_{ind_l}'].value
-
-        # Hysteresis branches definition
-        sigmo_r = Hysteresis(nbranches=1, model=self.model_name,
-                             offset=offset, slope=slope,
-                             ampli=ampli_r, coef=coef_r, x0=x0_r)
-
-        sigmo_l = Hysteresis(nbranches=1, model=self.model_name,
-                             offset=offset, slope=slope,
-                             ampli=ampli_l, coef=coef_l, x0=x0_l)
-
-        # Hysteresis properties calculation
-        x_shift = (x0_r + x0_l) / 2
-        x0_wid = x0_r - x0_l
-        y0_r = float(sigmo_r.eval(x_shift))
-        y0_l = float(sigmo_l.eval(x_shift))
-        area = 0.5 * (ampli_r + ampli_l) * (x0_r - x0_l)
-        diff_coef = (coef_r - coef_l) / coef_r
-
-        # Intersections points calculation
-        x_inters_r = root(sigmo_r.eval, x0=x0_r).x[0]
-        x_inters_l = root(sigmo_l.eval, x0=x0_l).x[0]
-        x_window = x_inters_r - x_inters_l
-        y_inters_r = float(sigmo_r.eval(0.))
-        y_inters_l = float(sigmo_l.eval(0.))
-        y_window = y_inters_l - y_inters_r
-
-        # Inflection points calculation
-        x_infl0_r = inflection(offset, slope, ampli_r, coef_r,
-                               model=self.model_name, threshold=infl_threshold)
-        x_infl0_l = inflection(offset, slope, ampli_l, coef_l,
-                               model=self.model_name, threshold=infl_threshold)
-        x_infl_r = x0_r - x_infl0_r
-        x_infl_l = x0_l + x_infl0_l
-        y_infl_r = float(sigmo_r.eval(x_infl_r))
-        y_infl_l = float(sigmo_l.eval(x_infl_l))
-
-        # Saturation domain calculation
-        x_sat0_r = saturation(ampli_r, coef_r, model=self.model_name,
-                              threshold=sat_threshold)
-        x_sat0_l = saturation(ampli_l, coef_l, model=self.model_name,
-                              threshold=sat_threshold)
-        x_sat_r = x0_r - x_sat0_r
-        x_sat_l = x0_l + x_sat0_l
-
-        self.props = {'x sat l': x_sat_l,
-                      'x sat r': x_sat_r,
-                      'y sat l': ampli_l / 2 + offset,
-                      'y sat r': -ampli_r / 2 + offset,
-                      'x infl l': x_infl_l,
-                      'x infl r': x_infl_r,
-                      'y infl l': y_infl_l,
-                      'y infl r': y_infl_r,
-                      'x0 l': x0_l,
-                      'x0 r': x0_r,
-                      'x0 wid': abs(x0_wid),
-                      'x shift': x_shift,
-                      'y shift': offset,
-                      'y0 l': y0_l,
-                      'y0 r': y0_r,
-                      'x inter l': x_inters_l,
-                      'x inter r': x_inters_r,
-                      'x wdw': abs(x_window),
-                      'y inter l': y_inters_l,
-                      'y inter r': y_inters_r,
-                      'y wdw': abs(y_window),
-                      'area': abs(area),
-                      'diff coef': abs(diff_coef)}
+        props = hysteresis_properties(
+            offset, slope, self.params[f'ampli_{ind_l}'].value,
+            self.params[f'coef_{ind_l}'].value, x0_l,
+            self.params[f'ampli_{ind_r}'].value,
+            self.params[f'coef_{ind_r}'].value, x0_r, model=self.model_name,
+            infl_threshold=infl_threshold, sat_threshold=sat_threshold)
+        self.props = {key: float(value) for key, value in props.items()}
 
     def r_square(self, x, y):
         """
@@ -426,27 +527,566 @@ class Hysteresis:
         y: list of n np.ndarrays, optional
             List of y-coordinates associated to the n-branches of the hysteresis
         """
+        x_tab, index = self.stack_branches(x)
+        y_eval = self.eval_branches(x_tab, index)
         r_squared = []
-        for i, (x_i, y_i) in enumerate(zip(x, y)):
-            y_eval = self.eval(x_i, self.params, i=i)
-            r_squared.append(r2_score(y_i, y_eval))
+        for i, y_i in enumerate(y):
+            r_squared.append(r2_score(y_i, y_eval[index == i]))
 
         self.props.update({'R_2 hyst': np.mean(r_squared)})
 
 
+class HysteresisBatchFit:
+    """
+    HysteresisBatchFit object: fitting of a stack of 2-branch hysteresis
+    (e.g. one per pixel) with a vectorized Levenberg-Marquardt solver. Same
+    model and constraints as Hysteresis(nbranches=2): 'ampli_1' is equal to
+    'ampli_0' and 'coef_1' to 'coef_0' (if the hysteresis is symmetric).
+    """
+    par_names = ['offset', 'slope', 'ampli_0', 'ampli_1', 'coef_0', 'coef_1',
+                 'x0_0', 'x0_1']
+
+    def __init__(self, asymmetric=False, model='sigmoid', swap_x0=True,
+                 max_iter=200, ftol=1e-8, xtol=1e-8):
+        """
+        Main function of the class
+
+        Parameters
+        ----------
+        asymmetric: bool, optional
+            Activation keyword to deal with asymmetric hysteresis
+        model: str, optional
+            Model name associated to the branch: 'sigmoid' or 'arctan'
+        swap_x0: bool, optional
+            Activation keyword for a second start of the fit with swapped
+            'x0_0' and 'x0_1' initial values (the best fit is kept for each
+            hysteresis)
+        max_iter: int, optional
+            Maximum number of iterations
+        ftol: float, optional
+            Tolerance on the relative reduction of the cost function
+        xtol: float, optional
+            Tolerance on the relative change of the parameters
+        """
+        model_valid = ['sigmoid', 'arctan']
+        assert model in model_valid, f"'model' should be in {model_valid}"
+
+        self.asymmetric = asymmetric
+        self.model_name = model
+        self.swap_x0 = swap_x0
+        self.max_iter = max_iter
+        self.ftol = ftol
+        self.xtol = xtol
+        # Constrained parameters (e.g. 'ampli_1' = 'ampli_0')
+        self.tied = {'ampli_1': 'ampli_0'}
+        if not asymmetric:
+            self.tied['coef_1'] = 'coef_0'
+        self.params = None
+        self.values = None
+        self.success = None
+        self.nb_iter = None
+
+    def init_parameters(self, x_tab, y_tab):
+        """
+        Initialize fit parameters with the default values of Hysteresis
+        (see init_hysteresis_batch_params for guesses from the data).
+
+        Parameters
+        ----------
+        x_tab : numpy.array(n*2*m) of float
+            x-values of the branches of each hysteresis.
+        y_tab : numpy.array(n*2*m) of float
+            y-values of the branches of each hysteresis.
+
+        Returns
+        -------
+        None
+        """
+        ones = np.ones(len(x_tab))
+        self.params = {name: {"value": value * ones, "vary": True}
+                       for name, value in zip(self.par_names,
+                                              [0., 0., 1., 1., 1., 1., 0., 0.])}
+        for name in ['coef_0', 'coef_1']:
+            self.params[name]["min"] = 0 * ones
+
+    def constrain(self, values):
+        """
+        Apply the constraints between parameters.
+
+        Parameters
+        ----------
+        values : numpy.array(n*8) of float
+            Parameter values of each hysteresis.
+
+        Returns
+        -------
+        values : numpy.array(n*8) of float
+            Constrained parameter values of each hysteresis.
+        """
+        values = values.copy()
+        for name, ref in self.tied.items():
+            values[:, self.par_names.index(name)] = \
+                values[:, self.par_names.index(ref)]
+        return values
+
+    def model(self, x_tab, values):
+        """
+        Evaluate the model (linear + sigmoid or arctan for each branch) for a
+        stack of parameters.
+
+        Parameters
+        ----------
+        x_tab : numpy.array(n*2*m) of float
+            x-values of the branches of each hysteresis.
+        values : numpy.array(n*8) of float
+            Parameter values of each hysteresis.
+
+        Returns
+        -------
+        y_tab : numpy.array(n*2*m) of float
+            y-values of the model.
+        """
+        offset, slope, ampli, coef, x0 = self.split(self.constrain(values))
+        with np.errstate(over='ignore', invalid='ignore'):
+            return linear(x_tab, offset, slope) + \
+                eval(self.model_name)(x_tab, ampli, coef, x0)
+
+    @staticmethod
+    def split(values):
+        """
+        Split parameter values in model arrays broadcastable with the
+        branches (n*2*m).
+
+        Parameters
+        ----------
+        values : numpy.array(n*8) of float
+            Parameter values of each hysteresis.
+
+        Returns
+        -------
+        offset, slope : numpy.array(n*1*1) of float
+            Parameters of the linear model.
+        ampli, coef, x0 : numpy.array(n*2*1) of float
+            Parameters of the sigmoid or arctan model of each branch.
+        """
+        return values[:, 0, np.newaxis, np.newaxis], \
+            values[:, 1, np.newaxis, np.newaxis], \
+            values[:, 2:4, np.newaxis], values[:, 4:6, np.newaxis], \
+            values[:, 6:8, np.newaxis]
+
+    def jacobian(self, x_tab, values, free):
+        """
+        Analytic jacobian of the model with respect to the free parameters,
+        computed for all the hysteresis at once.
+
+        Parameters
+        ----------
+        x_tab : numpy.array(n*2*m) of float
+            x-values of the branches of each hysteresis.
+        values : numpy.array(n*8) of float
+            Parameter values of each hysteresis.
+        free: numpy.array(8) of bool
+            Mask of free parameters.
+
+        Returns
+        -------
+        jac : numpy.array(n*2m*p) of float
+            Jacobian of the model (p free parameters, 0 for missing values).
+        """
+        offset, slope, ampli, coef, x0 = self.split(self.constrain(values))
+        jac_func = {'sigmoid': sigmoid_jac, 'arctan': arctan_jac}
+        with np.errstate(over='ignore', invalid='ignore'):
+            jac_branch = {**linear_jac(x_tab, offset, slope),
+                          **jac_func[self.model_name](x_tab, ampli, coef, x0)}
+        jac = np.zeros(x_tab.shape + (len(self.par_names),))
+        jac[..., 0] = jac_branch['offset']
+        jac[..., 1] = jac_branch['slope']
+        for i in range(2):
+            for cont, key in enumerate(['ampli', 'coef', 'x0']):
+                jac[:, i, :, 2 * cont + 2 + i] = jac_branch[key][:, i]
+        for name, ref in self.tied.items():
+            jac[..., self.par_names.index(ref)] += \
+                jac[..., self.par_names.index(name)]
+        jac = np.where(np.isfinite(jac), jac, 0.)
+
+        return jac[..., free].reshape(len(x_tab), -1, np.sum(free))
+
+    def fit(self, x_tab, y_tab, init_params=None):
+        """
+        Perform the fit of all the hysteresis.
+
+        Parameters
+        ----------
+        x_tab : array-like
+            x-values of the branches of each hysteresis (n*2*m, missing
+            values are nan, see stack_hysteresis).
+        y_tab : array-like
+            y-values of the branches of each hysteresis (n*2*m).
+        init_params: dict of dict, optional
+            Initial guesses for the fit parameters ('value', 'vary', 'min',
+            'max' keys, values can be float or array with one value per
+            hysteresis)
+
+        Returns
+        -------
+        None
+        """
+        x_tab = np.asarray(x_tab, dtype=float)
+        y_tab = np.asarray(y_tab, dtype=float)
+        nb_hyst = len(x_tab)
+        if init_params is None:
+            self.init_parameters(x_tab, y_tab)
+        else:
+            self.params = init_params
+
+        # Parameters stacked in 2D arrays (one line per hysteresis)
+        def stack(key, default):
+            return np.stack([np.broadcast_to(np.array(
+                default if self.params.get(name, {}).get(key) is None
+                else self.params[name][key], dtype=float), nb_hyst)
+                for name in self.par_names], axis=-1)
+
+        bound_min = stack('min', -np.inf)
+        bound_max = stack('max', np.inf)
+        free = np.array([self.params.get(name, {}).get('vary', True) and
+                         name not in self.tied for name in self.par_names])
+        values = self.constrain(np.clip(stack('value', 0.), bound_min,
+                                        bound_max))
+
+        # Missing values (nan) are excluded from the residuals
+        mask = np.isfinite(x_tab) & np.isfinite(y_tab)
+        x_tab = np.where(mask, x_tab, 0.)
+        y_tab = np.where(mask, y_tab, 0.)
+
+        # Second start with swapped x0 (orientation of the branches),
+        # solved with the first one
+        rows = np.arange(nb_hyst)
+        if self.swap_x0:
+            ind_x0 = [self.par_names.index('x0_0'),
+                      self.par_names.index('x0_1')]
+            swapped = values.copy()
+            swapped[:, ind_x0] = values[:, ind_x0[::-1]]
+            values = np.concatenate([values, swapped])
+            bound_min = np.concatenate([bound_min, bound_min])
+            bound_max = np.concatenate([bound_max, bound_max])
+            rows = np.concatenate([rows, rows])
+
+        def residual_func(values, index):
+            residual = np.where(
+                mask[rows[index]],
+                y_tab[rows[index]] - self.model(x_tab[rows[index]], values),
+                0.)
+            return residual.reshape(len(index), -1)
+
+        def jacobian_func(values, index):
+            jac = self.jacobian(x_tab[rows[index]], values, free)
+            return jac * mask[rows[index]].reshape(len(index), -1, 1)
+
+        values, success, nb_iter = batch_least_squares(
+            residual_func, jacobian_func, values, bound_min, bound_max, free,
+            max_iter=self.max_iter, ftol=self.ftol, xtol=self.xtol)
+
+        # Best fit of both starts
+        cost = np.sum(residual_func(values, np.arange(len(rows))) ** 2,
+                      axis=1)
+        cost = np.where(np.isfinite(cost), cost, np.inf)
+        best = np.arange(nb_hyst)
+        if self.swap_x0:
+            best = np.where(cost[nb_hyst:] < cost[:nb_hyst], best + nb_hyst,
+                            best)
+        self.values = self.constrain(values[best])
+        self.success, self.nb_iter = success[best], nb_iter[best]
+
+    def eval(self, x_tab):
+        """
+        Evaluate the fitted hysteresis at given x-values.
+
+        Parameters
+        ----------
+        x_tab : array-like
+            x-values of the branches of each hysteresis (n*2*m).
+
+        Returns
+        -------
+        y_fit_tab : numpy.array(n*2*m) of float
+            y-values of the fitted hysteresis.
+        """
+        if self.values is None:
+            raise ValueError("Fit has not been performed. Call fit() first.")
+
+        return self.model(np.asarray(x_tab, dtype=float), self.values)
+
+    def hysteresis(self, index):
+        """
+        Hysteresis object with the fitted parameters of a hysteresis of the
+        stack (e.g. for properties calculation and plotting).
+
+        Parameters
+        ----------
+        index : int
+            Index of the hysteresis in the stack.
+
+        Returns
+        -------
+        hyst : Hysteresis object
+            Fitted hysteresis.
+        """
+        if self.values is None:
+            raise ValueError("Fit has not been performed. Call fit() first.")
+        hyst = Hysteresis(model=self.model_name, asymmetric=self.asymmetric)
+        for name, value in zip(self.par_names, self.values[index]):
+            if not hyst.params[name].expr:
+                hyst.params[name].set(value=value)
+
+        return hyst
+
+    def report_fit_results(self, verbose=False):
+        """
+        Print and return the fit results.
+
+        Returns
+        -------
+        result_params: dict
+            Fitted values of each parameter (array with one value per
+            hysteresis).
+        """
+        if self.values is None:
+            raise ValueError("Fit has not been performed. Call fit() first.")
+        result_params = {name: self.values[:, cont]
+                         for cont, name in enumerate(self.par_names)}
+        if verbose:
+            print(f"{np.sum(self.success)}/{len(self.success)} converged fits")
+            for name, value in result_params.items():
+                print(f"{name}: mean={np.nanmean(value)}, "
+                      f"std={np.nanstd(value)}")
+        return result_params
+
+
+def stack_hysteresis(x_hyst_tab, y_hyst_tab):
+    """
+    Stack the branches of several hysteresis in 3D arrays (missing values of
+    the shortest branches are filled with nan)
+
+    Parameters
+    ----------
+    x_hyst_tab: list(n) of list(2) of numpy.array
+        x-values of the branches of each hysteresis
+    y_hyst_tab: list(n) of list(2) of numpy.array
+        y-values of the branches of each hysteresis
+
+    Returns
+    -------
+    x_tab: numpy.array(n*2*m) of float
+        x-values of the branches of each hysteresis
+    y_tab: numpy.array(n*2*m) of float
+        y-values of the branches of each hysteresis
+    """
+    length = max(len(branch) for hyst in x_hyst_tab for branch in hyst)
+    x_tab = np.full((len(x_hyst_tab), 2, length), np.nan)
+    y_tab = np.full((len(y_hyst_tab), 2, length), np.nan)
+    for cont, (x_hyst, y_hyst) in enumerate(zip(x_hyst_tab, y_hyst_tab)):
+        for i, (x_branch, y_branch) in enumerate(zip(x_hyst, y_hyst)):
+            x_tab[cont, i, :len(x_branch)] = x_branch
+            y_tab[cont, i, :len(y_branch)] = y_branch
+
+    return x_tab, y_tab
+
+
+def hysteresis_properties(offset, slope, ampli_l, coef_l, x0_l, ampli_r,
+                          coef_r, x0_r, model='sigmoid', infl_threshold=10.,
+                          sat_threshold=90.):
+    """
+    Main properties of hysteresis from the parameters of their left and right
+    branches (closed-form expressions, vectorized over hysteresis)
+
+    Parameters
+    ----------
+    offset, slope: float or numpy.array(n) of float
+        Parameters associated to the linear model (background)
+    ampli_l, coef_l, x0_l: float or numpy.array(n) of float
+        Parameters of the left branch (lowest x0)
+    ampli_r, coef_r, x0_r: float or numpy.array(n) of float
+        Parameters of the right branch (highest x0)
+    model: str, optional
+        Model name associated to the branch: 'sigmoid' or 'arctan'
+    infl_threshold: float, optional
+        Threshold related to the maximum deflection value (at x0) to
+        consider for the inflection points determination (in %)
+    sat_threshold: float, optional
+        Threshold related amplitude of hysteresis to consider for the 'x'
+        axis saturation domain determination (in %)
+
+    Returns
+    -------
+    props: dict
+        Properties of the hysteresis (float or numpy.array(n) of float)
+    """
+    def branch(x_val, ampli, coef, x0):
+        return linear(x_val, offset, slope) + \
+            eval(model)(x_val, ampli, coef, x0)
+
+    # Hysteresis properties calculation
+    x_shift = (x0_r + x0_l) / 2
+    x0_wid = x0_r - x0_l
+    area = 0.5 * (ampli_r + ampli_l) * (x0_r - x0_l)
+    diff_coef = (coef_r - coef_l) / coef_r
+
+    # Intersections points calculation
+    x_inters_r = intersection(offset, slope, ampli_r, coef_r, x0_r,
+                              model=model)
+    x_inters_l = intersection(offset, slope, ampli_l, coef_l, x0_l,
+                              model=model)
+    y_inters_r = branch(0., ampli_r, coef_r, x0_r)
+    y_inters_l = branch(0., ampli_l, coef_l, x0_l)
+
+    # Inflection points calculation
+    x_infl_r = x0_r - inflection(offset, slope, ampli_r, coef_r, model=model,
+                                 threshold=infl_threshold)
+    x_infl_l = x0_l + inflection(offset, slope, ampli_l, coef_l, model=model,
+                                 threshold=infl_threshold)
+
+    # Saturation domain calculation
+    x_sat_r = x0_r - saturation(ampli_r, coef_r, model=model,
+                                threshold=sat_threshold)
+    x_sat_l = x0_l + saturation(ampli_l, coef_l, model=model,
+                                threshold=sat_threshold)
+
+    return {'x sat l': x_sat_l,
+            'x sat r': x_sat_r,
+            'y sat l': ampli_l / 2 + offset,
+            'y sat r': -ampli_r / 2 + offset,
+            'x infl l': x_infl_l,
+            'x infl r': x_infl_r,
+            'y infl l': branch(x_infl_l, ampli_l, coef_l, x0_l),
+            'y infl r': branch(x_infl_r, ampli_r, coef_r, x0_r),
+            'x0 l': x0_l,
+            'x0 r': x0_r,
+            'x0 wid': np.abs(x0_wid),
+            'x shift': x_shift,
+            'y shift': offset,
+            'y0 l': branch(x_shift, ampli_l, coef_l, x0_l),
+            'y0 r': branch(x_shift, ampli_r, coef_r, x0_r),
+            'x inter l': x_inters_l,
+            'x inter r': x_inters_r,
+            'x wdw': np.abs(x_inters_r - x_inters_l),
+            'y inter l': y_inters_l,
+            'y inter r': y_inters_r,
+            'y wdw': np.abs(y_inters_l - y_inters_r),
+            'area': np.abs(area),
+            'diff coef': np.abs(diff_coef)}
+
+
+def root_fallback(func, x_val, x_guess, invalid, *pars):
+    """
+    Numerical root finding (scipy.optimize.root) for the invalid values of
+    a closed-form solution
+
+    Parameters
+    ----------
+    func: callable
+        Function func(x, *pars) of which the root is searched
+    x_val: numpy.array(n) of float
+        Closed-form solution
+    x_guess: numpy.array(n) of float
+        Initial guess of the root finding
+    invalid: numpy.array(n) of bool
+        Values of the closed-form solution to replace
+    pars: numpy.array(n) of float
+        Parameters of func
+
+    Returns
+    -------
+    x_val: numpy.array(n) of float
+        Solution
+    """
+    for index in np.flatnonzero(invalid):
+        x_val[index] = root(func, x0=x_guess[index],
+                            args=tuple(par[index] for par in pars)).x[0]
+
+    return x_val
+
+
+def intersection(offset, slope, ampli, coef, x0, model='sigmoid',
+                 max_iter=100, tol=1e-12):
+    """
+    Intersection of an hysteresis branch with the x-axis (closed-form
+    expression for a constant background, Newton iterations started from x0
+    otherwise)
+
+    Parameters
+    ----------
+    offset: float or numpy.array(n) of float
+        Offset parameter associated to the linear model
+    slope: float or numpy.array(n) of float
+        Slope parameter associated to the linear model
+    ampli: float or numpy.array(n) of float
+        Amplitude parameter associated to the model
+    coef: float or numpy.array(n) of float
+        Coef of dilatation parameter associated to the model.
+    x0: float or numpy.array(n) of float
+        Center parameter associated to the model
+    model: str, optional
+        Model name associated to the branch: 'sigmoid' or 'arctan'
+    max_iter: int, optional
+        Maximum number of Newton iterations
+    tol: float, optional
+        Tolerance on the Newton step
+
+    Returns
+    -------
+    x_inters: float or numpy.array(n) of float
+        Intersection x-axis coordinate
+    """
+    offset, slope, ampli, coef, x0 = \
+        np.broadcast_arrays(*[np.atleast_1d(np.asarray(par, dtype=float))
+                              for par in [offset, slope, ampli, coef, x0]])
+    func = eval(model)
+
+    # Constant background: inverse of the branch
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if model == 'sigmoid':
+            x_inters = x0 + 2 / coef * np.arctanh(-2 * offset / ampli)
+        else:
+            ratio = -offset / ampli
+            x_inters = np.where(np.abs(ratio) < np.pi / 2,
+                                x0 + np.tan(ratio) / coef, np.nan)
+        x_inters = np.where(offset == 0, x0, x_inters)
+
+        # Linear background: Newton iterations
+        lin = slope != 0
+        x_val = x0[lin].copy()
+        pars = [par[lin] for par in [offset, slope, ampli, coef, x0]]
+        converged = np.zeros_like(x_val, dtype=bool)
+        for _ in range(max_iter):
+            step = (linear(x_val, *pars[:2]) + func(x_val, *pars[2:])) / \
+                (pars[1] + func(x_val, *pars[2:], der=1))
+            x_val = x_val - step
+            converged = np.abs(step) <= tol * (1 + np.abs(x_val))
+            if np.all(converged):
+                break
+        x_inters[lin] = np.where(converged, x_val, np.nan)
+
+    invalid = ~np.isfinite(x_inters) & np.isfinite(x0)
+    x_inters = root_fallback(
+        lambda x_val, *pars: linear(x_val, *pars[:2]) + func(x_val, *pars[2:]),
+        x_inters, x0, invalid, offset, slope, ampli, coef, x0)
+
+    return x_inters if x_inters.size > 1 else x_inters[0]
+
+
 def inflection(offset, slope, ampli, coef, model='sigmoid', threshold=10.):
     """
-    Inflection x-axis coordinate determination
+    Inflection x-axis coordinate determination (closed-form expression)
 
     Parameters
     ----------
-    offset: float
+    offset: float or numpy.array(n) of float
         Offset parameter associated to the linear model
-    slope: float
+    slope: float or numpy.array(n) of float
         Slope parameter associated to the linear model
-    ampli: float
+    ampli: float or numpy.array(n) of float
         Amplitude parameter associated to the model
-    coef: float
+    coef: float or numpy.array(n) of float
         Coef of dilatation parameter associated to the model.
     model: str, optional
         Model name associated to the branch: 'sigmoid' or 'arctan'
@@ -456,30 +1096,45 @@ def inflection(offset, slope, ampli, coef, model='sigmoid', threshold=10.):
 
     Returns
     -------
-    x_infl0: float
+    x_infl0: float or numpy.array(n) of float
         Inflection x-axis coordinate
     """
-    sigmo_0 = Hysteresis(nbranches=1, model=model, offset=offset,
-                         slope=slope, ampli=ampli, coef=coef, x0=0.)
-    infl_rax = sigmo_0.eval(0., der=1)
-
-    def infl_fun(x):
-        return sigmo_0.eval(x, der=1) - infl_rax * threshold / 100
+    offset, slope, ampli, coef = \
+        np.broadcast_arrays(*[np.atleast_1d(np.asarray(par, dtype=float))
+                              for par in [offset, slope, ampli, coef]])
+    func = eval(model)
+    zeros = np.zeros_like(ampli)
+
+    # Derivative of the branch equal to threshold * derivative at x0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        max_der = func(zeros, ampli, coef, zeros, der=1)
+        infl_rax = slope + max_der
+        x_guess = ampli / (2 * infl_rax)
+        ratio = (infl_rax * threshold / 100 - slope) / max_der
+        if model == 'sigmoid':
+            x_infl0 = 2 / coef * np.arccosh(1 / np.sqrt(ratio))
+        else:
+            x_infl0 = np.sqrt(1 / ratio - 1) / coef
+        x_infl0 = np.copysign(x_infl0, x_guess)
 
-    x_infl0 = root(infl_fun, x0=ampli / (2 * infl_rax)).x[0]
+    invalid = ~np.isfinite(x_infl0) & np.isfinite(x_guess)
+    x_infl0 = root_fallback(
+        lambda x_val, *pars: pars[0] + func(x_val, *pars[1:3], 0., der=1) -
+        pars[3] * threshold / 100,
+        x_infl0, x_guess, invalid, slope, ampli, coef, infl_rax)
 
-    return x_infl0
+    return x_infl0 if x_infl0.size > 1 else x_infl0[0]
 
 
 def saturation(ampli, coef, model='sigmoid', threshold=90.):
     """
-    Saturation x-axis coordinate determination
+    Saturation x-axis coordinate determination (closed-form expression)
 
     Parameters
     ----------
-    ampli: float
+    ampli: float or numpy.array(n) of float
         Amplitude parameter associated to the model
-    coef: float
+    coef: float or numpy.array(n) of float
         Coef of dilatation parameter associated to the model.
     model: str, optional
         Model name associated to the branch: 'sigmoid' or 'arctan'
@@ -489,16 +1144,25 @@ def saturation(ampli, coef, model='sigmoid', threshold=90.):
 
     Returns
     -------
-    x_sat0: float
+    x_sat0: float or numpy.array(n) of float
         Saturation x-axis coordinate
     """
-    pure_sigmo_0 = Model(eval(model))
-    params_sigmo_0 = pure_sigmo_0.make_params(ampli=ampli, coef=coef, x0=0.)
-
-    def sat_fun(x):
-        return pure_sigmo_0.eval(params_sigmo_0, x=x) + \
-               (ampli / 2 * threshold / 100)
+    ampli, coef = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(par, dtype=float)) for par in [ampli, coef]])
+    func = eval(model)
+
+    # Branch (without background) equal to -threshold * ampli / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if model == 'sigmoid':
+            x_sat0 = - 2 / coef * np.arctanh(threshold / 100) * \
+                np.ones_like(ampli)
+        else:
+            x_sat0 = - np.tan(threshold / 200) / coef * np.ones_like(ampli)
 
-    x_sat0 = root(sat_fun, x0=np.array([0])).x[0]
+    invalid = ~np.isfinite(x_sat0) & np.isfinite(ampli)
+    x_sat0 = root_fallback(
+        lambda x_val, *pars: func(x_val, *pars, 0.) +
+        pars[0] / 2 * threshold / 100,
+        x_sat0, np.zeros_like(ampli), invalid, ampli, coef)
 
-    return x_sat0
+    return x_sat0 if x_sat0.size > 1 else x_sat0[0]
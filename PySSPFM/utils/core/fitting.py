@@ -8,16 +8,29 @@ from lmfit import Model, Parameters, minimize, report_fit
 
 from PySSPFM.settings import get_setting
 from PySSPFM.utils.core.basic_func import \
-    linear, gaussian, sho, sho_phase, sho_phase_switch
+    (linear, gaussian, sho, sho_phase, sho_phase_switch, linear_jac, sho_jac,
+     sho_phase_jac, sho_phase_switch_jac)
 from PySSPFM.utils.core.peak import width_peak
 
 
 class CurveFit:
     """ CurveFit object """
 
-    def __init__(self, model):
-        """ Main function of the class """
+    def __init__(self, model, jac=None):
+        """
+        Main function of the class
+
+        Parameters
+        ----------
+        model: lmfit.Model
+            Model added to the linear model
+        jac: function, optional
+            Function returning the partial derivatives of the model with
+            respect to its parameters (analytic jacobian). If None, the
+            jacobian is estimated by finite differences.
+        """
         self.model = Model(linear, independent_vars=['x', 'der']) + model
+        self.jac_funcs = None if jac is None else [linear_jac, jac]
         self.params = None
         self.result = None
 
@@ -65,10 +78,51 @@ class CurveFit:
         def objective(params):
             return y_val - self.model.eval(params, x=x_val)
 
-        # Perform the minimization
+        def objective_jac(params):
+            return - self.jacobian(params, x_val)
+
+        # Perform the minimization (with analytic jacobian for least squares
+        # methods). With 'leastsq', the bounds transformation cancels the
+        # gradient of a parameter initialized on a bound: finite differences
+        # are kept in this case.
         fit_method = get_setting('fit_method')
+        kwargs = {}
+        inside_bounds = all(par.min < par.value < par.max
+                            for par in self.params.values()
+                            if par.vary and not par.expr)
+        if self.jac_funcs is not None and \
+                fit_method.lower().startswith('least') and \
+                (inside_bounds or fit_method.lower().startswith('least_s')):
+            kwargs['Dfun'] = objective_jac
         self.result = minimize(
-            objective, self.params, args=(), method=fit_method)
+            objective, self.params, args=(), method=fit_method, **kwargs)
+
+    def jacobian(self, params, x_val):
+        """
+        Analytic jacobian of the model with respect to the free parameters.
+
+        Parameters
+        ----------
+        params: lmfit.Parameters
+            Parameters of the model.
+        x_val : array-like
+            The x-values of the data.
+
+        Returns
+        -------
+        jac : numpy.array(n*p) of float
+            Partial derivatives of the model (n x-values, p free parameters).
+        """
+        values = params.valuesdict()
+        jac = {}
+        for model, jac_func in zip(self.model.components, self.jac_funcs):
+            jac.update(jac_func(np.asarray(x_val, dtype=float),
+                                **{name: values[name]
+                                   for name in model.param_names}))
+        var_names = [name for name, par in params.items()
+                     if par.vary and not par.expr]
+
+        return np.column_stack([jac[name] for name in var_names])
 
     def eval(self, x_val):
         """
@@ -170,7 +224,7 @@ class ShoPeakFit(CurveFit):
 
     def __init__(self):
         model = Model(sho, independent_vars=['x', 'der'])
-        super().__init__(model)
+        super().__init__(model, jac=sho_jac)
 
     def init_parameters(self, x_val, y_val):
         # Implementation specific to Sho peak fitting
@@ -200,9 +254,11 @@ class ShoPhaseFit(CurveFit):
     def __init__(self, switch=False):
         if switch:
             model = Model(sho_phase_switch, independent_vars=['x', 'der'])
+            jac = sho_phase_switch_jac
         else:
             model = Model(sho_phase, independent_vars=['x', 'der'])
-        super().__init__(model)
+            jac = sho_phase_jac
+        super().__init__(model, jac=jac)
         self.switch = switch
 
     def init_parameters(self, x_val, y_val):
@@ -225,3 +281,418 @@ class ShoPhaseFit(CurveFit):
             "offset", value=guess_offset, vary=True,
             min=min(y_val), max=max(y_val))
         self.params.add("slope", value=0.0, vary=False, min=None, max=None)
+
+
+class ShoPeakBatchFit:
+    """
+    ShoPeakBatchFit object: SHO peak fitting of a stack of curves sharing the
+    same x-axis (vectorized Levenberg-Marquardt, one line per curve)
+    """
+    par_names = ["ampli", "coef", "x0", "offset", "slope"]
+
+    def __init__(self, max_iter=200, ftol=1e-8, xtol=1e-8):
+        """
+        Main function of the class
+
+        Parameters
+        ----------
+        max_iter: int, optional
+            Maximum number of iterations
+        ftol: float, optional
+            Tolerance on the relative reduction of the cost function
+        xtol: float, optional
+            Tolerance on the relative change of the parameters
+        """
+        self.max_iter = max_iter
+        self.ftol = ftol
+        self.xtol = xtol
+        self.params = None
+        self.values = None
+        self.success = None
+        self.nb_iter = None
+
+    def init_parameters(self, x_val, y_tab):
+        """
+        Initialize fit parameters with initial guesses (same guesses and
+        bounds as ShoPeakFit.init_parameters, for each curve).
+
+        Parameters
+        ----------
+        x_val : numpy.array(m) of float
+            x-values of the data.
+        y_tab : numpy.array(n*m) of float
+            y-values of the data (one line per curve).
+
+        Returns
+        -------
+        None
+        """
+        nb_curve, nb_val = y_tab.shape
+        ind_max = np.argmax(y_tab, axis=1)
+        y_max, y_min = np.max(y_tab, axis=1), np.min(y_tab, axis=1)
+        threshold = (y_max - y_min) / np.sqrt(2) + y_min
+
+        # Width of the peak (same method as peak.width_peak)
+        below = y_tab <= threshold[:, np.newaxis]
+        cols = np.arange(nb_val)
+        left = np.where(below & (cols < ind_max[:, np.newaxis]),
+                        cols, -1).max(axis=1)
+        left = np.where(left < 0, 0, left)
+        right = np.where(below & (cols >= ind_max[:, np.newaxis]),
+                         cols, nb_val).min(axis=1)
+        right = np.where(right >= nb_val, nb_val - 1, right)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q_fact = x_val[ind_max] / (x_val[right] - x_val[left])
+            ampli = (y_max - y_min) / q_fact
+
+        ones = np.ones(nb_curve)
+        self.params = {
+            "ampli": {"value": ampli, "vary": True,
+                      "min": 0 * ones, "max": 2 * ampli},
+            "coef": {"value": q_fact, "vary": True,
+                     "min": min(x_val) / (max(x_val) - min(x_val)) * ones,
+                     "max": np.inf * ones},
+            "x0": {"value": x_val[ind_max], "vary": True,
+                   "min": min(x_val) * ones, "max": max(x_val) * ones},
+            "offset": {"value": y_min, "vary": True, "min": 0 * ones,
+                       "max": y_max},
+            "slope": {"value": 0 * ones, "vary": False,
+                      "min": -np.inf * ones, "max": np.inf * ones}}
+
+    @staticmethod
+    def model(x_val, values):
+        """
+        Evaluate the model (linear + sho) for a stack of parameters.
+
+        Parameters
+        ----------
+        x_val : numpy.array(m) of float
+            x-values.
+        values : numpy.array(n*5) of float
+            Parameter values (ampli, coef, x0, offset, slope) of each curve.
+
+        Returns
+        -------
+        y_tab : numpy.array(n*m) of float
+            y-values of the model (one line per curve).
+        """
+        ampli, coef, x0, offset, slope = \
+            [values[:, [cont]] for cont in range(5)]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return linear(x_val, offset, slope) + sho(x_val, ampli, coef, x0)
+
+    @staticmethod
+    def jacobian(x_val, values, free):
+        """
+        Analytic jacobian of the model with respect to the free parameters,
+        computed for all the curves at once.
+
+        Parameters
+        ----------
+        x_val : numpy.array(m) of float
+            x-values.
+        values : numpy.array(n*5) of float
+            Parameter values of each curve.
+        free: numpy.array(5) of bool
+            Mask of free parameters.
+
+        Returns
+        -------
+        jac : numpy.array(n*m*p) of float
+            Jacobian of the model (p free parameters).
+        """
+        ampli, coef, x0, offset, slope = \
+            [values[:, [cont]] for cont in range(5)]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            jac = {**linear_jac(x_val, offset, slope),
+                   **sho_jac(x_val, ampli, coef, x0)}
+
+        return np.stack([jac[name] for name, is_free in
+                         zip(ShoPeakBatchFit.par_names, free) if is_free],
+                        axis=-1)
+
+    def fit(self, x_val, y_tab, init_params=None):
+        """
+        Perform the fit of all the curves.
+
+        Parameters
+        ----------
+        x_val : array-like
+            The x-values of the data, shared by all the curves.
+        y_tab : array-like
+            The y-values of the data (2D, one line per curve).
+        init_params: dict of dict, optional
+            Initial guesses for the fit parameters ('value', 'vary', 'min',
+            'max' keys, values can be float or array with one value per
+            curve)
+
+        Returns
+        -------
+        None
+        """
+        x_val = np.asarray(x_val, dtype=float)
+        y_tab = np.atleast_2d(np.asarray(y_tab, dtype=float))
+        nb_curve = len(y_tab)
+        if init_params is None:
+            self.init_parameters(x_val, y_tab)
+        else:
+            self.params = init_params
+
+        # Parameters stacked in 2D arrays (one line per curve)
+        def stack(key, default):
+            return np.stack([np.broadcast_to(np.array(
+                default if self.params[name].get(key) is None
+                else self.params[name][key], dtype=float), nb_curve)
+                for name in self.par_names], axis=-1)
+
+        bound_min = stack('min', -np.inf)
+        bound_max = stack('max', np.inf)
+        free = np.array([self.params[name].get('vary', True)
+                         for name in self.par_names])
+        values = np.clip(stack('value', np.nan), bound_min, bound_max)
+
+        self.values, self.success, self.nb_iter = batch_least_squares(
+            lambda values, index: y_tab[index] - self.model(x_val, values),
+            lambda values, index: self.jacobian(x_val, values, free),
+            values, bound_min, bound_max, free, max_iter=self.max_iter,
+            ftol=self.ftol, xtol=self.xtol)
+
+    def eval(self, x_val):
+        """
+        Evaluate the fitted peaks at given x-values.
+
+        Parameters
+        ----------
+        x_val : array-like
+            x-values at which to evaluate the peaks.
+
+        Returns
+        -------
+        y_fit_tab : numpy.array(n*m) of float
+            y-values of the fitted peaks (one line per curve).
+        """
+        if self.values is None:
+            raise ValueError("Fit has not been performed. Call fit() first.")
+
+        return self.model(np.asarray(x_val, dtype=float), self.values)
+
+    def report_fit_results(self, verbose=False):
+        """
+        Print and return the fit results.
+
+        Returns
+        -------
+        result_params: dict
+            Fitted values of each parameter (array with one value per curve).
+        """
+        if self.values is None:
+            raise ValueError("Fit has not been performed. Call fit() first.")
+        result_params = {name: self.values[:, cont]
+                         for cont, name in enumerate(self.par_names)}
+        if verbose:
+            print(f"{np.sum(self.success)}/{len(self.success)} converged fits")
+            for name, value in result_params.items():
+                print(f"{name}: mean={np.nanmean(value)}, "
+                      f"std={np.nanstd(value)}")
+        return result_params
+
+
+def batch_least_squares(residual_func, jacobian_func, values, bound_min,
+                        bound_max, free, max_iter=200, ftol=1e-8, xtol=1e-8):
+    """
+    Bounded Levenberg-Marquardt minimization of a stack of independent least
+    squares problems (one line per curve), vectorized over the curves:
+    the iterations are performed on the active (not converged) curves only.
+
+    Parameters
+    ----------
+    residual_func: callable
+        residual_func(values, index) returns the residuals (data - model,
+        numpy.array(k*m)) of the curves of index for the parameter values
+        (numpy.array(k*q))
+    jacobian_func: callable
+        jacobian_func(values, index) returns the jacobian of the model with
+        respect to the free parameters (numpy.array(k*m*p)) of the curves of
+        index for the parameter values (numpy.array(k*q))
+    values: numpy.array(n*q) of float
+        Initial parameter values of each curve
+    bound_min, bound_max: numpy.array(n*q) of float
+        Bounds of the parameters of each curve
+    free: numpy.array(q) of bool
+        Mask of free parameters (p free parameters)
+    max_iter: int, optional
+        Maximum number of iterations
+    ftol: float, optional
+        Tolerance on the relative reduction of the cost function
+    xtol: float, optional
+        Tolerance on the relative change of the parameters
+
+    Returns
+    -------
+    values: numpy.array(n*q) of float
+        Fitted parameter values of each curve
+    success: numpy.array(n) of bool
+        Convergence flag of each curve
+    nb_iter: numpy.array(n) of int
+        Number of iterations of each curve
+    """
+    nb_curve = len(values)
+    values = np.clip(values, bound_min, bound_max)
+    residual = residual_func(values, np.arange(nb_curve))
+    cost = 0.5 * np.sum(residual ** 2, axis=1)
+    damping = np.full(nb_curve, 1e-3)
+    active = np.isfinite(cost)
+    success = np.zeros(nb_curve, dtype=bool)
+    nb_iter = np.zeros(nb_curve, dtype=int)
+    for _ in range(max_iter):
+        index = np.flatnonzero(active)
+        if len(index) == 0:
+            break
+        nb_iter[index] += 1
+        jac = jacobian_func(values[index], index)
+        jtj = np.einsum('nmp,nmq->npq', jac, jac)
+        grad = np.einsum('nmp,nm->np', jac, residual[index])
+        # Parameters blocked on a bound are excluded from the step
+        blocked = \
+            ((values[index][:, free] <= bound_min[index][:, free]) &
+             (grad < 0)) | \
+            ((values[index][:, free] >= bound_max[index][:, free]) &
+             (grad > 0))
+        jtj[blocked[:, :, np.newaxis] | blocked[:, np.newaxis, :]] = 0.
+        grad[blocked] = 0.
+        diag = np.diagonal(jtj, axis1=1, axis2=2)
+        diag = np.maximum(diag, 1e-12 * np.max(diag, axis=1,
+                                               keepdims=True) + 1e-300)
+        damped = jtj + damping[index, np.newaxis, np.newaxis] * \
+            np.einsum('np,pq->npq', diag, np.eye(len(diag[0])))
+        try:
+            step = np.linalg.solve(damped, grad[..., np.newaxis])[..., 0]
+        except np.linalg.LinAlgError:
+            step = np.einsum('npq,nq->np', np.linalg.pinv(damped), grad)
+        new_values = values[index].copy()
+        new_values[:, free] += step
+        new_values = np.clip(new_values, bound_min[index],
+                             bound_max[index])
+        new_residual = residual_func(new_values, index)
+        new_cost = 0.5 * np.sum(new_residual ** 2, axis=1)
+
+        # Accept the steps reducing the cost function
+        better = new_cost < cost[index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel_cost = (cost[index] - new_cost) / cost[index]
+            rel_step = np.linalg.norm(new_values - values[index],
+                                      axis=1) / \
+                (np.linalg.norm(values[index], axis=1) + xtol)
+        accepted = index[better]
+        values[accepted] = new_values[better]
+        residual[accepted] = new_residual[better]
+        cost[accepted] = new_cost[better]
+        damping[index] = np.where(better, damping[index] / 10,
+                                  damping[index] * 10)
+
+        # Convergence mask (per curve)
+        converged = better & ((rel_cost < ftol) | (rel_step < xtol))
+        converged |= damping[index] > 1e16
+        success[index[converged]] = True
+        active[index[converged]] = False
+
+    return values, success, nb_iter
+
+
+
+class WarmStart:
+    """
+    WarmStart object: initial guesses of per-pixel fits from the converged
+    fits of neighbor pixels, for pixels processed in raster order (the left
+    pixel is used first, then the upper pixel if the number of columns of the
+    grid is known)
+    """
+
+    def __init__(self, nb_cols=None):
+        """
+        Main function of the class
+
+        Parameters
+        ----------
+        nb_cols: int, optional
+            Number of columns of the grid (pixels in a row). If None, the
+            previous pixel is the only neighbor.
+        """
+        self.nb_cols = int(nb_cols) if nb_cols else None
+        self.index = 0
+        self.seeds = {}
+
+    def move(self, index):
+        """
+        Move to a pixel (seeds that can no longer be used as neighbor are
+        dropped)
+
+        Parameters
+        ----------
+        index: int
+            Index of the pixel in raster order
+
+        Returns
+        -------
+        None
+        """
+        self.index = index
+        oldest = min(self.neighbors(), default=index)
+        for key in [key for key in self.seeds if key < oldest]:
+            del self.seeds[key]
+
+    def neighbors(self):
+        """
+        Neighbor pixels of the current pixel, by order of preference
+
+        Returns
+        -------
+        neighbors: list of int
+            Index of the neighbor pixels
+        """
+        if self.nb_cols is None:
+            return [self.index - 1]
+        neighbors = [self.index - 1] if self.index % self.nb_cols else []
+        neighbors.append(self.index - self.nb_cols)
+
+        return neighbors
+
+    def guess(self, key):
+        """
+        Initial guess of a fit of the current pixel
+
+        Parameters
+        ----------
+        key: str
+            Label of the fit (e.g. mode of the measurement)
+
+        Returns
+        -------
+        seed: object or None
+            Converged fit parameters of the first neighbor pixel that has
+            some (None if there is no converged neighbor)
+        """
+        for neighbor in self.neighbors():
+            seed = self.seeds.get(neighbor, {}).get(key)
+            if seed is not None:
+                return seed
+
+        return None
+
+    def update(self, key, seed):
+        """
+        Save the converged fit parameters of the current pixel
+
+        Parameters
+        ----------
+        key: str
+            Label of the fit (e.g. mode of the measurement)
+        seed: object or None
+            Converged fit parameters (None if the fit failed)
+
+        Returns
+        -------
+        None
+        """
+        if seed is not None:
+            self.seeds.setdefault(self.index, {})[key] = seed
@@ -2,13 +2,22 @@
 Tools for multiprocessing
 """
 
+import os
+import math
+import numbers
+import traceback
 import multiprocessing
 from functools import partial
+import numpy as np
+
+from PySSPFM.settings import \
+    get_setting, settings_snapshot, load_settings_snapshot
+from PySSPFM.utils.core.fitting import WarmStart
 
 from PySSPFM.data_processing.datacube_to_nanoloop_s1 import \
     single_script as single_script_s1
 from PySSPFM.data_processing.nanoloop_to_hyst_s2 import \
-    single_script as single_script_s2
+    single_script as single_script_s2, single_script_fused
 from PySSPFM.toolbox.phase_offset_analyzer import \
     single_script as single_script_offset
 from PySSPFM.toolbox.phase_inversion_analyzer import \
@@ -18,30 +27,483 @@ from PySSPFM.toolbox.force_curve_clustering import \
     single_script as single_script_forcecurve
 
 
+def physical_cores():
+    """
+    Number of physical cores of the computer (psutil module is used if
+    installed, else the number of logical cores is returned)
+
+    Returns
+    -------
+    nb_cores: int
+        Number of physical cores
+    """
+    try:
+        import psutil  # noqa
+        nb_cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        nb_cores = None
+
+    return nb_cores or os.cpu_count() or 1
+
+
+def scheduler_pars(nb_tasks, processes=None, chunksize=None,
+                   max_tasks_per_child=None):
+    """
+    Parameters of the pool scheduler: values of the 'processes',
+    'chunksize' and 'max_tasks_per_child' settings are used if not provided
+
+    Parameters
+    ----------
+    nb_tasks: int
+        Number of tasks (i.e. pixels) to process
+    processes: int or str, optional
+        Number of worker processes ('auto': number of physical cores)
+    chunksize: int or str, optional
+        Number of tasks sent together to a worker process ('auto': tasks
+        split in 4 chunks per worker process)
+    max_tasks_per_child: int, optional
+        Number of tasks completed by a worker process before it is replaced
+        by a new one (memory release). Worker processes live as long as the
+        pool if None.
+
+    Returns
+    -------
+    processes: int
+        Number of worker processes
+    chunksize: int
+        Number of tasks sent together to a worker process
+    max_tasks_per_child: int or None
+        Number of tasks completed by a worker process before it is replaced
+    """
+    processes = processes or get_setting("processes")
+    if processes == 'auto':
+        processes = physical_cores()
+    processes = max(1, min(int(processes), nb_tasks))
+    chunksize = chunksize or get_setting("chunksize")
+    if chunksize == 'auto':
+        chunksize = math.ceil(nb_tasks / (4 * processes))
+    chunksize = max(1, int(chunksize))
+    max_tasks_per_child = max_tasks_per_child or \
+        get_setting("max_tasks_per_child")
+
+    return processes, chunksize, max_tasks_per_child
+
+
+def make_pool(processes=16, max_tasks_per_child=None):
+    """
+    Create a multiprocessing pool whose workers share the settings of the
+    parent process (settings files are not read again by the workers).
+
+    Parameters
+    ----------
+    processes: int, optional
+        Number of worker processes.
+    max_tasks_per_child: int, optional
+        Number of tasks completed by a worker process before it is replaced
+        by a new one. Worker processes live as long as the pool if None.
+
+    Returns
+    -------
+    pool: multiprocessing.pool.Pool
+        Pool of worker processes.
+    """
+    return multiprocessing.Pool(processes=processes,
+                                initializer=load_settings_snapshot,
+                                initargs=(settings_snapshot(),),
+                                maxtasksperchild=max_tasks_per_child)
+
+
+def run_task(indexed_task, func, common_args):
+    """
+    Run a task in a worker process: the exception raised by the task is
+    returned (and not raised) in order not to abort the other tasks
+
+    Parameters
+    ----------
+    indexed_task: tuple
+        Index of the task and its argument
+    func: callable
+        Function called with the argument of the task and common_args
+    common_args: dict
+        Arguments common to all the tasks
+
+    Returns
+    -------
+    index: int
+        Index of the task
+    result: object
+        Result of the task (None if failed)
+    error: tuple of str or None
+        Error message and traceback of the task (None if succeeded)
+    """
+    index, task = indexed_task
+    try:
+        return index, func(task, common_args), None
+    except Exception as error:  # noqa
+        return index, None, (f'{type(error).__name__}: {error}',
+                             traceback.format_exc())
+
+
+def run_tasks(func, tasks, common_args, labels=None, processes=None,
+              chunksize=None, max_tasks_per_child=None, progress=None,
+              consumer=None, report=True):
+    """
+    Fault-tolerant pool scheduler: tasks are distributed in chunks to the
+    worker processes (imap_unordered) and their results are reassembled in
+    the order of the tasks. A failed task does not abort the run, its error
+    is captured in the error report.
+
+    Parameters
+    ----------
+    func: callable
+        Function called with the argument of each task and common_args
+        (module level function, to be pickled)
+    tasks: list
+        Argument of each task (e.g. path of each pixel file)
+    common_args: dict
+        Arguments common to all the tasks
+    labels: list of str, optional
+        Label of each task for the error report (default: str of the task)
+    processes: int or str, optional
+        Number of worker processes (default: 'processes' setting)
+    chunksize: int or str, optional
+        Number of tasks sent together to a worker process
+        (default: 'chunksize' setting)
+    max_tasks_per_child: int, optional
+        Number of tasks completed by a worker process before it is replaced
+        (default: 'max_tasks_per_child' setting)
+    progress: callable, optional
+        Function called with (nb_done, nb_tasks) each time a task is
+        completed (see print_progress)
+    consumer: callable, optional
+        Function called in the parent process with (index, result) each time
+        a task succeeds (e.g. single writer of a file shared by all the
+        tasks): the result is then not kept in results
+    report: bool, optional
+        If True, print the error report of the failed tasks
+
+    Returns
+    -------
+    results: list
+        Result of each task, in the order of the tasks (None if failed)
+    errors: list of dict
+        Error report: index, label, error message and traceback of each
+        failed task
+    """
+    tasks = list(tasks)
+    labels = labels or [str(task) for task in tasks]
+    results, errors = [None] * len(tasks), []
+    if not tasks:
+        return results, errors
+    processes, chunksize, max_tasks_per_child = scheduler_pars(
+        len(tasks), processes=processes, chunksize=chunksize,
+        max_tasks_per_child=max_tasks_per_child)
+
+    with make_pool(processes=processes,
+                   max_tasks_per_child=max_tasks_per_child) as pool:
+        outs = pool.imap_unordered(
+            partial(run_task, func=func, common_args=common_args),
+            enumerate(tasks), chunksize=chunksize)
+        for nb_done, (index, result, error) in enumerate(outs, start=1):
+            if error is None and consumer is not None:
+                consumer(index, result)
+            elif error is None:
+                results[index] = result
+            else:
+                errors.append({'index': index, 'label': labels[index],
+                               'error': error[0], 'traceback': error[1]})
+            if progress is not None:
+                progress(nb_done, len(tasks))
+
+    errors.sort(key=lambda error: error['index'])
+    if errors and report:
+        print(error_report(errors))
+
+    return results, errors
+
+
+def row_blocks(nb_tasks, nb_cols=None, processes=1):
+    """
+    Split the tasks (pixels in raster order) in contiguous blocks of whole
+    rows of the grid (4 blocks per worker process if possible)
+
+    Parameters
+    ----------
+    nb_tasks: int
+        Number of tasks (i.e. pixels)
+    nb_cols: int, optional
+        Number of columns of the grid (pixels in a row). If None, each task
+        is considered as a row.
+    processes: int, optional
+        Number of worker processes
+
+    Returns
+    -------
+    blocks: list of tuple(2) of int
+        Start (included) and end (excluded) index of each block
+    """
+    nb_cols = int(nb_cols) if nb_cols else 1
+    nb_rows = math.ceil(nb_tasks / nb_cols)
+    rows_per_block = max(1, math.ceil(nb_rows / (4 * processes)))
+    block_size = rows_per_block * nb_cols
+
+    return [(start, min(start + block_size, nb_tasks))
+            for start in range(0, nb_tasks, block_size)]
+
+
+def run_block(block, common_args, func, nb_cols=None):
+    """
+    Run a block of tasks (pixels in raster order) sequentially in a worker
+    process, each fit of a pixel starting from the converged fits of its
+    neighbors in the block (see WarmStart). The exception raised by a task is
+    returned as in run_task.
+
+    Parameters
+    ----------
+    block: tuple
+        Index of the first task of the block and arguments of the tasks
+    common_args: dict
+        Arguments common to all the tasks
+    func: callable
+        Function called with the argument of each task and common_args
+        completed with 'warm_start' key
+    nb_cols: int, optional
+        Number of columns of the grid (pixels in a row)
+
+    Returns
+    -------
+    outs: list of tuple
+        Index, result and error of each task of the block (see run_task)
+    """
+    start, tasks = block
+    warm_start = WarmStart(nb_cols=nb_cols)
+    common_args = {**common_args, 'warm_start': warm_start}
+    outs = []
+    for index, task in enumerate(tasks, start=start):
+        warm_start.move(index)
+        outs.append(run_task((index, task), func, common_args))
+
+    return outs
+
+
+def run_block_tasks(func, tasks, common_args, nb_cols=None, labels=None,
+                    processes=None, max_tasks_per_child=None, progress=None,
+                    consumer=None):
+    """
+    Pool scheduler with warm start: same as run_tasks, but each worker
+    process handles a contiguous block of rows of the grid (see row_blocks
+    and run_block), so that the fit of each pixel can start from the
+    converged fits of its neighbors
+
+    Parameters
+    ----------
+    func: callable
+        Function called with the argument of each task and common_args
+        completed with 'warm_start' key (module level function, to be
+        pickled)
+    tasks: list
+        Argument of each task (e.g. path of each pixel file), in raster order
+    common_args: dict
+        Arguments common to all the tasks
+    nb_cols: int, optional
+        Number of columns of the grid (pixels in a row)
+    labels: list of str, optional
+        Label of each task for the error report (default: str of the task)
+    processes: int or str, optional
+        Number of worker processes (default: 'processes' setting)
+    max_tasks_per_child: int, optional
+        Number of blocks completed by a worker process before it is replaced
+        (default: 'max_tasks_per_child' setting)
+    progress: callable, optional
+        Function called with (nb_done, nb_tasks) each time a block of tasks
+        is completed (see print_progress)
+    consumer: callable, optional
+        Function called in the parent process with (index, result) each time
+        a task succeeds: the result is then not kept in results
+
+    Returns
+    -------
+    results: list
+        Result of each task, in the order of the tasks (None if failed)
+    errors: list of dict
+        Error report: index, label, error message and traceback of each
+        failed task
+    """
+    tasks = list(tasks)
+    labels = labels or [str(task) for task in tasks]
+    results, errors = [None] * len(tasks), []
+    if not tasks:
+        return results, errors
+    processes, _, _ = scheduler_pars(len(tasks), processes=processes)
+    blocks = row_blocks(len(tasks), nb_cols=nb_cols, processes=processes)
+    nb_done = [0]
+
+    def block_consumer(_, outs):
+        for index, result, error in outs:
+            if error is None and consumer is not None:
+                consumer(index, result)
+            elif error is None:
+                results[index] = result
+            else:
+                errors.append({'index': index, 'label': labels[index],
+                               'error': error[0], 'traceback': error[1]})
+        nb_done[0] += len(outs)
+        if progress is not None:
+            progress(nb_done[0], len(tasks))
+
+    _, block_errors = run_tasks(
+        partial(run_block, func=func, nb_cols=nb_cols),
+        [(start, tasks[start:end]) for start, end in blocks], common_args,
+        labels=[f'{labels[start]} ... {labels[end - 1]}'
+                for start, end in blocks],
+        processes=processes, chunksize=1,
+        max_tasks_per_child=max_tasks_per_child, consumer=block_consumer,
+        report=False)
+    for block_error in block_errors:
+        start, end = blocks[block_error['index']]
+        errors.extend({'index': index, 'label': labels[index],
+                       'error': block_error['error'],
+                       'traceback': block_error['traceback']}
+                      for index in range(start, end))
+
+    errors.sort(key=lambda error: error['index'])
+    if errors:
+        print(error_report(errors))
+
+    return results, errors
+
+
+def print_progress(nb_done, nb_tasks):
+    """
+    Progress callback of run_tasks: print the number of completed tasks
+
+    Parameters
+    ----------
+    nb_done: int
+        Number of completed tasks
+    nb_tasks: int
+        Number of tasks
+
+    Returns
+    -------
+    None
+    """
+    print(f'\r{nb_done}/{nb_tasks} tasks completed', end='',
+          flush=True)
+    if nb_done == nb_tasks:
+        print()
+
+
+def error_report(errors, tracebacks=False):
+    """
+    Text report of the failed tasks of run_tasks
+
+    Parameters
+    ----------
+    errors: list of dict
+        Error report of run_tasks
+    tracebacks: bool, optional
+        If True, the traceback of each error is added
+
+    Returns
+    -------
+    report: str
+        Text report
+    """
+    lines = [f'{len(errors)} task(s) failed:']
+    for error in errors:
+        lines.append(f"- n°{error['index'] + 1} ({error['label']}): "
+                     f"{error['error']}")
+        if tracebacks:
+            lines.append(error['traceback'])
+
+    return '\n'.join(lines)
+
+
+def nan_like(value):
+    """
+    Placeholder of a result with the same structure: numerical values are
+    replaced by nan, and other objects by None
+
+    Parameters
+    ----------
+    value: object
+        Result of a task
+
+    Returns
+    -------
+    placeholder: object
+        Placeholder of the result
+    """
+    if isinstance(value, dict):
+        return {key: nan_like(elem) for key, elem in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(nan_like(elem) for elem in value)
+    if isinstance(value, np.ndarray) and \
+            np.issubdtype(value.dtype, np.number):
+        return np.full(value.shape, np.nan)
+    if isinstance(value, numbers.Number):
+        return np.nan
+
+    return None
+
+
+def fill_failed(results, errors):
+    """
+    Replace the results of the failed tasks by placeholders (see nan_like)
+    built from the first successful result, so that the results of the
+    other tasks (e.g. pixels of a map) keep their position
+
+    Parameters
+    ----------
+    results: list
+        Result of each task (None if failed)
+    errors: list of dict
+        Error report of run_tasks
+
+    Returns
+    -------
+    results: list
+        Result of each task (placeholder if failed)
+    """
+    if not errors:
+        return results
+    failed = [error['index'] for error in errors]
+    templates = [result for cont, result in enumerate(results)
+                 if cont not in failed]
+    if not templates:
+        raise RuntimeError(error_report(errors, tracebacks=True))
+    template = templates[0]
+
+    return [nan_like(template) if cont in failed else result
+            for cont, result in enumerate(results)]
+
+
 def process_single_file_s1_classic(file_path, common_args):
-    single_script_s1(file_path_in=file_path, **common_args)
+    result = single_script_s1(file_path_in=file_path, **common_args)
+    return result
 
 
 def process_single_file_s1_phase(list_args, common_args):
-    single_script_s1(file_path_in=list_args[0],
-                     phase_offset=list_args[1], **common_args)
-
-
-def run_multi_proc_s1(file_paths, phase_tab, common_args, processes=16):
-    with multiprocessing.Pool(processes=processes) as pool:
-        if phase_tab is not None:
-            list_args = []
-            for cont, (file_path, phase_val) in \
-                    enumerate(zip(file_paths, phase_tab)):
-                list_args.append([file_path])
-                list_args[cont] += [phase_val]
-            pool.map(partial(
-                process_single_file_s1_phase, common_args=common_args),
-                list_args)
-        else:
-            pool.map(partial(
-                process_single_file_s1_classic, common_args=common_args),
-                file_paths)
+    result = single_script_s1(file_path_in=list_args[0],
+                              phase_offset=list_args[1], **common_args)
+    return result
+
+
+def run_multi_proc_s1(file_paths, phase_tab, common_args, processes=None,
+                      progress=None, consumer=None, warm_start=False,
+                      nb_cols=None):
+    run = partial(run_block_tasks, nb_cols=nb_cols) if warm_start \
+        else run_tasks
+    if phase_tab is not None:
+        run(process_single_file_s1_phase,
+            [[file_path, phase_val]
+             for file_path, phase_val in zip(file_paths, phase_tab)],
+            common_args, labels=file_paths, processes=processes,
+            progress=progress, consumer=consumer)
+    else:
+        run(process_single_file_s1_classic, file_paths, common_args,
+            processes=processes, progress=progress, consumer=consumer)
 
 
 def process_single_file_s2_classic(tab_path, common_args):
@@ -55,21 +517,49 @@ def process_single_file_s2_revert(list_args, common_args):
     return result
 
 
-def run_multi_proc_s2(tab_paths, tab_user_pars, common_args, processes=16):
-    with multiprocessing.Pool(processes=processes) as pool:
-        if tab_user_pars is not None:
-            list_args = []
-            for cont, (tab_path, user_pars) in \
-                    enumerate(zip(tab_paths, tab_user_pars)):
-                list_args.append([tab_path])
-                list_args[cont] += [user_pars]
-            results = pool.starmap(
-                process_single_file_s2_revert,
-                [(list_arg, common_args) for list_arg in list_args])
-        else:
-            results = pool.starmap(
-                process_single_file_s2_classic,
-                [(tab_path, common_args) for tab_path in tab_paths])
+def run_multi_proc_s2(tab_paths, tab_user_pars, common_args, processes=None,
+                      progress=None, warm_start=False, nb_cols=None):
+    run = partial(run_block_tasks, nb_cols=nb_cols) if warm_start \
+        else run_tasks
+    if tab_user_pars is not None:
+        results, errors = run(
+            process_single_file_s2_revert,
+            [[tab_path, user_pars]
+             for tab_path, user_pars in zip(tab_paths, tab_user_pars)],
+            common_args, labels=tab_paths, processes=processes,
+            progress=progress)
+    else:
+        results, errors = run(
+            process_single_file_s2_classic, tab_paths, common_args,
+            processes=processes, progress=progress)
+    results = fill_failed(results, errors)
+
+    # Unpack the results
+    tab_best_loops = [res[0] for res in results]
+    tab_properties = [res[1] for res in results]
+    tab_other_properties = [res[2] for res in results]
+
+    return tab_best_loops, tab_properties, tab_other_properties
+
+
+def process_single_file_fused(list_args, common_args):
+    result = single_script_fused(file_path_in=list_args[0],
+                                 phase_offset=list_args[1],
+                                 user_pars=list_args[2], cont=list_args[3],
+                                 **common_args)
+    return result
+
+
+def run_multi_proc_fused(file_paths, phase_tab, tab_user_pars, common_args,
+                         processes=None, progress=None):
+    results, errors = run_tasks(
+        process_single_file_fused,
+        [[file_path, phase_val, user_pars, cont]
+         for cont, (file_path, phase_val, user_pars) in
+         enumerate(zip(file_paths, phase_tab, tab_user_pars))],
+        common_args, labels=file_paths, processes=processes,
+        progress=progress)
+    results = fill_failed(results, errors)
 
     # Unpack the results
     tab_best_loops = [res[0] for res in results]
@@ -84,20 +574,19 @@ def process_single_file_free(file_name, common_args):
     return result
 
 
-def run_multi_proc_free(file_names, common_args, processes=16):
+def run_multi_proc_free(file_names, common_args, processes=None,
+                        progress=None):
     tab_best_loops, tab_properties, tab_mean_voltage, tab_diff_piezorep_mean = \
         [], [], [], []
-    with multiprocessing.Pool(processes=processes) as pool:
-        results = [pool.apply_async(process_single_file_free,
-                                    (file_name, common_args))
-                   for file_name in file_names]
-        for result in results:
-            out = result.get()
-            best_loops, properties, mean_voltage, diff_piezorep_mean = out
-            tab_best_loops.append(best_loops)
-            tab_properties.append(properties)
-            tab_mean_voltage.append(mean_voltage)
-            tab_diff_piezorep_mean.append(diff_piezorep_mean)
+    results, errors = run_tasks(process_single_file_free, file_names,
+                                common_args, processes=processes,
+                                progress=progress)
+    for out in fill_failed(results, errors):
+        best_loops, properties, mean_voltage, diff_piezorep_mean = out
+        tab_best_loops.append(best_loops)
+        tab_properties.append(properties)
+        tab_mean_voltage.append(mean_voltage)
+        tab_diff_piezorep_mean.append(diff_piezorep_mean)
     return (tab_best_loops, tab_properties, tab_mean_voltage,
             tab_diff_piezorep_mean)
 
@@ -107,15 +596,13 @@ def process_phase_offset_analyzer(file_path_in, common_args):
     return result
 
 
-def run_multi_phase_offset_analyzer(file_paths_in, common_args, processes=16):
-    tab_phase_offset_val = []
-    with multiprocessing.Pool(processes=processes) as pool:
-        results = [pool.apply_async(process_phase_offset_analyzer,
-                                    (file_path_in, common_args))
-                   for file_path_in in file_paths_in]
-        for result in results:
-            phase_offset_val, _ = result.get()
-            tab_phase_offset_val.append(phase_offset_val)
+def run_multi_phase_offset_analyzer(file_paths_in, common_args,
+                                    processes=None, progress=None):
+    results, errors = run_tasks(process_phase_offset_analyzer, file_paths_in,
+                                common_args, processes=processes,
+                                progress=progress)
+    tab_phase_offset_val = [phase_offset_val for phase_offset_val, _ in
+                            fill_failed(results, errors)]
     return tab_phase_offset_val
 
 
@@ -131,25 +618,20 @@ def process_phase_inversion_analyzer_phase(list_args, common_args):
 
 
 def run_multi_phase_inversion_analyzer(file_paths_in, phase_tab, common_args,
-                                       processes=16):
-    tab_phase_grad_val = []
-    with multiprocessing.Pool(processes=processes) as pool:
-        if phase_tab is not None:
-            list_args = []
-            for cont, (file_path, phase_val) in \
-                    enumerate(zip(file_paths_in, phase_tab)):
-                list_args.append([file_path])
-                list_args[cont] += [phase_val]
-            results = pool.map(partial(
-                process_phase_inversion_analyzer_phase,
-                common_args=common_args), list_args)
-        else:
-            results = [pool.apply_async(
-                process_phase_inversion_analyzer_classic,
-                (file_path_in, common_args)) for file_path_in in file_paths_in]
-        for result in results:
-            phase_grad_val, _ = result.get()
-            tab_phase_grad_val.append(phase_grad_val)
+                                       processes=None, progress=None):
+    if phase_tab is not None:
+        results, errors = run_tasks(
+            process_phase_inversion_analyzer_phase,
+            [[file_path, phase_val]
+             for file_path, phase_val in zip(file_paths_in, phase_tab)],
+            common_args, labels=file_paths_in, processes=processes,
+            progress=progress)
+    else:
+        results, errors = run_tasks(
+            process_phase_inversion_analyzer_classic, file_paths_in,
+            common_args, processes=processes, progress=progress)
+    tab_phase_grad_val = [phase_grad_val for phase_grad_val, _ in
+                          fill_failed(results, errors)]
     return tab_phase_grad_val
 
 
@@ -158,16 +640,15 @@ def process_single_forcecurve(file_path_in, common_args):
     return result
 
 
-def run_multi_proc_forcecurve(file_paths_in, common_args, processes=16):
+def run_multi_proc_forcecurve(file_paths_in, common_args, processes=None,
+                              progress=None):
     height_tab, force_tab, tab_other_properties = [], [], []
-    with multiprocessing.Pool(processes=processes) as pool:
-        results = [pool.apply_async(process_single_forcecurve,
-                                    (file_path_in, common_args))
-                   for file_path_in in file_paths_in]
-        for result in results:
-            out = result.get()
-            height, force, other_properties = out
-            height_tab.append(height)
-            force_tab.append(force)
-            tab_other_properties.append(other_properties)
+    results, errors = run_tasks(process_single_forcecurve, file_paths_in,
+                                common_args, processes=processes,
+                                progress=progress)
+    for out in fill_failed(results, errors):
+        height, force, other_properties = out
+        height_tab.append(height)
+        force_tab.append(force)
+        tab_other_properties.append(other_properties)
     return height_tab, force_tab, tab_other_properties
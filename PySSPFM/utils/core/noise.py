@@ -4,7 +4,7 @@ Utilities methods for noise generation and filtering
 import numpy as np
 from scipy.special import erf
 from scipy.optimize import root
-from scipy.signal import butter, lfilter
+from scipy.signal import butter, lfilter, sosfilt, convolve
 
 
 def noise(y, noise_pars, relative=False):
@@ -172,7 +172,7 @@ def filter_mean(signal, window_size):
     Parameters
     ----------
     signal : np.ndarray
-        Input signal.
+        Input signal. If 2D, each line is filtered independently.
     window_size : int
         Size of the moving window for the mean filter.
 
@@ -182,7 +182,11 @@ def filter_mean(signal, window_size):
         Filtered signal.
     """
     window = np.ones(window_size) / window_size
-    filtered_signal = np.convolve(signal, window, mode='same')
+    if np.ndim(signal) == 2:
+        filtered_signal = convolve(signal, window[np.newaxis, :],
+                                   mode='same', method='direct')
+    else:
+        filtered_signal = np.convolve(signal, window, mode='same')
 
     return filtered_signal
 
@@ -231,3 +235,85 @@ def butter_filter(signal, sampling_frequency, cutoff_frequency,
     filtered_signal = lfilter(coef_b, coef_a, signal)
 
     return filtered_signal
+
+
+class ButterFilterBank:
+    """
+    Bank of Butterworth filters: each filter (type, order, cutoff frequency,
+    sampling frequency) is designed once and stored as second-order sections,
+    then applied to whole 2D blocks of signals (one signal per line)
+    """
+
+    def __init__(self):
+        """ Main function of the class """
+        self.sos = {}
+
+    def design(self, sampling_frequency, cutoff_frequency, filter_type="low",
+               filter_order=1):
+        """
+        Second-order sections of a Butterworth filter, designed at the first
+        call only
+
+        Parameters
+        ----------
+        sampling_frequency : float
+            Sampling frequency of the signals.
+        cutoff_frequency : float or tuple
+            Cutoff frequency or frequencies of the filter.
+        filter_type : str
+            Type of the filter ('low', 'high', 'bandpass', or 'bandstop').
+            Default is "low".
+        filter_order : int, optional
+            Order of the filter. Default is 1.
+
+        Returns
+        -------
+        sos : np.ndarray
+            Second-order sections of the filter.
+        """
+        key = (filter_type, filter_order,
+               tuple(np.ravel(cutoff_frequency).tolist()),
+               float(sampling_frequency))
+        if key not in self.sos:
+            nyquist = 0.5 * sampling_frequency
+            if filter_type in ('low', 'high'):
+                normal_cutoff = cutoff_frequency / nyquist
+            elif filter_type in ('bandpass', 'bandstop'):
+                normal_cutoff = np.array(cutoff_frequency) / nyquist
+            else:
+                raise ValueError("Invalid filter type. Use 'low', 'high', "
+                                 "'bandpass', or 'bandstop'.")
+            self.sos[key] = butter(filter_order, normal_cutoff,
+                                   btype=filter_type, analog=False,
+                                   output='sos')
+
+        return self.sos[key]
+
+    def filter(self, signal, sampling_frequency, cutoff_frequency,
+               filter_type="low", filter_order=1):
+        """
+        Apply a Butterworth filter to the input signal(s).
+
+        Parameters
+        ----------
+        signal : np.ndarray
+            Input signal. If 2D, each line is filtered independently.
+        sampling_frequency : float
+            Sampling frequency of the input signal(s).
+        cutoff_frequency : float or tuple
+            Cutoff frequency or frequencies of the filter.
+        filter_type : str
+            Type of the filter ('low', 'high', 'bandpass', or 'bandstop').
+            Default is "low".
+        filter_order : int, optional
+            Order of the filter. Default is 1.
+
+        Returns
+        -------
+        filtered_signal : np.ndarray
+            Filtered signal(s).
+        """
+        sos = self.design(sampling_frequency, cutoff_frequency,
+                          filter_type=filter_type, filter_order=filter_order)
+
+        return sosfilt(sos, signal, axis=-1)
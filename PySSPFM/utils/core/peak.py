@@ -225,6 +225,66 @@ def width_peak(x_val, y_val, index_cent, threshold):
             'ind left': index_left}
 
 
+def half_power_width(x_val, y_block, interp=False):
+    """
+    Width of the peak of each line of a 2D array at half power (-3 dB, i.e.
+    maximum / sqrt(2)): the left edge is the first value above the threshold
+    and the right edge the first value below the threshold after the
+    maximum. All the lines are processed at once.
+
+    Parameters
+    ----------
+    x_val: list(m) or numpy.array(m) of float
+        Array of x-axis values (increasing)
+    y_block: numpy.array(n*p) of float
+        2D array of y-axis values (one peak per line), truncated to the
+        length of x_val if p > m
+    interp: bool, optional
+        If True, the edges are linearly interpolated between the two samples
+        around the threshold (sub-sample accuracy). Otherwise, the edges are
+        the samples themselves.
+
+    Returns
+    -------
+    res_width: dict
+        Dict of arrays(n) of width, right and left x edge coordinates (nan if
+        the right edge is not found) and index of the maximum
+    """
+    x_val = np.asarray(x_val, dtype=float)
+    y_block = np.atleast_2d(np.asarray(y_block, dtype=float))
+    nb_x = min(len(x_val), y_block.shape[1])
+    x_val, y_block = x_val[:nb_x], y_block[:, :nb_x]
+    rows = np.arange(len(y_block))
+    ind_max = np.argmax(y_block, axis=1)
+    threshold = y_block[rows, ind_max] / np.sqrt(2)
+
+    mask_left = y_block >= threshold[:, np.newaxis]
+    mask_right = (x_val >= x_val[ind_max][:, np.newaxis]) & \
+        (y_block <= threshold[:, np.newaxis])
+    found = np.any(mask_left, axis=1) & np.any(mask_right, axis=1)
+    ind_left = np.argmax(mask_left, axis=1)
+    ind_right = np.argmax(mask_right, axis=1)
+
+    def edge(index, inside):
+        # Linear interpolation between the samples index - 1 and index
+        if not interp:
+            return x_val[index]
+        prev = np.where(inside, index - 1, index)
+        y_prev, y_next = y_block[rows, prev], y_block[rows, index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where(inside & (y_next != y_prev),
+                            (threshold - y_prev) / (y_next - y_prev), 0.)
+        return x_val[prev] + frac * (x_val[index] - x_val[prev])
+
+    x_left = np.where(found, edge(ind_left, ind_left > 0), np.nan)
+    x_right = np.where(found, edge(ind_right, ind_right > ind_max), np.nan)
+
+    return {'width': x_right - x_left,
+            'x right': x_right,
+            'x left': x_left,
+            'ind max': ind_max}
+
+
 def guess_bckgnd(y_val, x_bckgnd=10):
     """
     Guess constant background component of a peak
@@ -91,3 +91,71 @@ def interpolate(x_meas, y_meas, discret, interp_type='default'):
     return {'x interp': x_interp,
             'y interp': y_interp,
             'interp func': interp_func}
+
+
+def interpolate_batch(x_tab, y_tab, discret):
+    """
+    Perform linear interpolation of several curves at once (same result as
+    interpolate with 'linear' interp_type for each curve).
+
+    Parameters
+    ----------
+    x_tab: numpy.array(n*m)
+        Array of x values (one line per curve, missing values at the end of
+        the lines are nan).
+    y_tab: numpy.array(n*m)
+        Array of y values (one line per curve).
+    discret: int
+        Discretization factor for interpolation.
+
+    Returns
+    -------
+    result: dict
+        Dictionary containing the interpolated x and y values
+        (numpy.array(n*(m*discret)), nan beyond the length of each curve).
+    """
+    x_tab = np.asarray(x_tab, dtype=float)
+    y_tab = np.asarray(y_tab, dtype=float)
+    nb_curve, nb_val = x_tab.shape
+    valid = np.isfinite(x_tab)
+    length = np.sum(valid, axis=1)
+
+    # x interpolation arrays
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_min = np.min(np.where(valid, x_tab, np.inf), axis=1)
+        x_max = np.max(np.where(valid, x_tab, -np.inf), axis=1)
+        cols = np.arange(nb_val * discret)
+        x_interp = x_min[:, np.newaxis] + cols * \
+            ((x_max - x_min) / (length * discret - 1))[:, np.newaxis]
+    x_interp[cols >= (length * discret)[:, np.newaxis]] = np.nan
+
+    # Segment of each interpolated value: sorted x of all the curves in a
+    # single increasing array (curve index + normalized x)
+    order = np.argsort(np.where(valid, x_tab, np.inf), axis=1)
+    x_sort = np.take_along_axis(x_tab, order, axis=1)
+    y_sort = np.take_along_axis(y_tab, order, axis=1)
+    rows = np.arange(nb_curve)[:, np.newaxis]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(x_max > x_min, x_max - x_min, 1.)[:, np.newaxis]
+        keys = np.where(np.isfinite(x_sort),
+                        (x_sort - x_min[:, np.newaxis]) / scale, 1.5)
+        query = (x_interp - x_min[:, np.newaxis]) / scale
+    ind = np.searchsorted((keys + 2 * rows).ravel(),
+                          (np.nan_to_num(query) + 2 * rows).ravel(),
+                          side='right').reshape(x_interp.shape)
+    ind = np.clip(ind - rows * nb_val - 1, 0,
+                  np.maximum(length - 2, 0)[:, np.newaxis])
+
+    # y interpolated values
+    x_left = np.take_along_axis(x_sort, ind, axis=1)
+    y_left = np.take_along_axis(y_sort, ind, axis=1)
+    ind_right = np.minimum(ind + 1, nb_val - 1)
+    x_right = np.take_along_axis(x_sort, ind_right, axis=1)
+    y_right = np.take_along_axis(y_sort, ind_right, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        y_interp = np.where(x_right != x_left, y_left + (x_interp - x_left) *
+                            (y_right - y_left) / (x_right - x_left), y_left)
+    y_interp[np.isnan(x_interp)] = np.nan
+
+    return {'x interp': x_interp,
+            'y interp': y_interp}
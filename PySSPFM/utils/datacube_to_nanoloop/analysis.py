@@ -7,9 +7,13 @@ Module used for the scripts of sspfm 1st step data analysis
 import numpy as np
 
 from PySSPFM.utils.core.basic_func import sho, sho_phase
-from PySSPFM.utils.core.noise import filter_mean, butter_filter
-from PySSPFM.utils.core.peak import width_peak
-from PySSPFM.utils.core.fitting import ShoPeakFit, ShoPhaseFit
+from PySSPFM.utils.core.noise import filter_mean, ButterFilterBank
+from PySSPFM.utils.core.peak import width_peak, half_power_width
+from PySSPFM.utils.core.fitting import \
+    ShoPeakFit, ShoPhaseFit, ShoPeakBatchFit
+
+# Butterworth filters designed once for all the segments (and measurements)
+FILTER_BANK = ButterFilterBank()
 
 
 class SegmentInfo:
@@ -67,11 +71,17 @@ class SegmentSweep:
     Segment voltage of sspfm bias signal and associated amplitude and
     phase measure for frequency sweep in resonance
     """
+    __slots__ = ('amp', 'pha', 'res_freq', 'q_fact', 'bckgnd', 'best_fit',
+                 'pha_best_fit', 'error', 'segment_info', 'start_ind',
+                 'end_ind', 'len', 'time_tab_init', 'freq_tab_init',
+                 'amp_tab_init', 'pha_tab_init', 'time_tab', 'freq_tab',
+                 'amp_tab', 'pha_tab')
 
     def __init__(self, segment_info, dict_meas, start_freq_init=200.,
                  end_freq_init=300., cut_seg=None, filter_type=None,
-                 filter_cutoff_frequency=None, filter_order=None, fit_pars=None,
-                 guess_init=None):
+                 filter_cutoff_frequency=None, filter_order=None,
+                 freq_axis=None, fit_pars=None, guess_init=None,
+                 filtered_meas=None, lean=False, q_interp=False):
         """
         Main function of the class
 
@@ -94,10 +104,27 @@ class SegmentSweep:
             segment
         filter_order: int
             Order of the filter for amplitude and phase in the segment
+        freq_axis: numpy.array, optional
+            Frequency axis of the full segment (in kHz), shared by all the
+            segments (see gen_run_plan). If None, it is computed from
+            start_freq_init and end_freq_init.
         fit_pars: dict, optional
             Dict of fit parameters (if fit mode)
-        guess_init: dict, optional
-            Dict of initial parameters to perform the fit (if fit mode)
+        guess_init: list(5) of float, optional
+            List of initial guess peak parameters to perform the fit (if fit
+            mode), e.g. peak parameters of a neighbor pixel (see
+            peak_params)
+        filtered_meas: dict, optional
+            Amplitude and phase of the full ('init') and cut ('cut') segment,
+            already filtered (see SegmentBlocks.segment)
+        lean: bool, optional
+            If True, only the cut segment is kept: the full segment arrays
+            (*_tab_init, only used for figures) are set to None and are not
+            filtered
+        q_interp: bool, optional
+            If True, the edges of the -3 dB bandwidth are interpolated
+            between the samples to find the quality factor (if max mode, see
+            q_fact_max)
         """
         (self.amp, self.pha, self.res_freq, self.q_fact, self.bckgnd) = \
             (None, None, None, None, None)
@@ -107,8 +134,9 @@ class SegmentSweep:
         mode = segment_info.seg_info['mode']
         self.time_tab_init = dict_meas['times'][segment_info.start_ind_init:
                                                 segment_info.end_ind_init]
-        self.freq_tab_init = np.linspace(start_freq_init, end_freq_init,
-                                         segment_info.len_init, endpoint=False)
+        self.freq_tab_init = np.linspace(
+            start_freq_init, end_freq_init, segment_info.len_init,
+            endpoint=False) if freq_axis is None else freq_axis
         self.amp_tab_init = dict_meas['amp'][segment_info.start_ind_init:
                                              segment_info.end_ind_init]
         self.pha_tab_init = dict_meas['pha'][segment_info.start_ind_init:
@@ -136,33 +164,35 @@ class SegmentSweep:
             self.pha_tab = dict_meas['pha'][self.start_ind:self.end_ind]
 
         # Measure filtered
-        if filter_type == 'mean':
-            self.amp_tab = filter_mean(self.amp_tab, filter_order)
-            self.amp_tab_init = filter_mean(self.amp_tab_init, filter_order)
-            self.pha_tab = filter_mean(self.pha_tab, filter_order)
-            self.pha_tab_init = filter_mean(self.pha_tab_init, filter_order)
-        elif filter_type in ['low', 'high', 'bandpass', 'bandstop']:
-            sampling_frequency = \
-                len(self.time_tab) / (self.time_tab[-1] - self.time_tab[0])
-            self.amp_tab = butter_filter(
-                self.amp_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.amp_tab_init = butter_filter(
-                self.amp_tab_init, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.pha_tab = butter_filter(
-                self.pha_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.pha_tab_init = butter_filter(
-                self.pha_tab_init, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
+        filter_pars = {'filter_type': filter_type,
+                       'filter_cutoff_frequency': filter_cutoff_frequency,
+                       'filter_order': filter_order}
+        if filtered_meas is not None:
+            self.amp_tab = filtered_meas['cut']['amp']
+            self.pha_tab = filtered_meas['cut']['pha']
+            if not lean:
+                self.amp_tab_init = filtered_meas['init']['amp']
+                self.pha_tab_init = filtered_meas['init']['pha']
+        else:
+            self.amp_tab = filter_segment(self.amp_tab, self.time_tab,
+                                          **filter_pars)
+            self.pha_tab = filter_segment(self.pha_tab, self.time_tab,
+                                          **filter_pars)
+            if not lean:
+                self.amp_tab_init = filter_segment(
+                    self.amp_tab_init, self.time_tab, **filter_pars)
+                self.pha_tab_init = filter_segment(
+                    self.pha_tab_init, self.time_tab, **filter_pars)
+        if lean:
+            (self.time_tab_init, self.freq_tab_init, self.amp_tab_init,
+             self.pha_tab_init) = (None, None, None, None)
 
         # Segment treatment
         if mode == 'max':
             self.amp = max(self.amp_tab)
             self.pha = self.pha_tab[np.argmax(self.amp_tab)]
             self.res_freq = self.freq_tab[np.argmax(self.amp_tab)]
-            self.q_fact = self.q_fact_max()
+            self.q_fact = self.q_fact_max(interp=q_interp)
         elif mode == 'fit':
             self.treatment_fit(fit_pars=fit_pars, guess_init=guess_init)
         else:
@@ -250,6 +280,15 @@ class SegmentSweep:
         sho_peak.fit(self.freq_tab, self.amp_tab, init_params=init_params)
         peak_pars = sho_peak.report_fit_results()
 
+        # Unsuccessful fit from the initial guess: fit from the default guess
+        if init_params is not None and not (
+                sho_peak.result.success and
+                all(np.isfinite(par.value) for par in peak_pars.values()) and
+                min(self.freq_tab) <= peak_pars['x0'].value <=
+                max(self.freq_tab)):
+            sho_peak.fit(self.freq_tab, self.amp_tab)
+            peak_pars = sho_peak.report_fit_results()
+
         # Extraction of parameters
         self.amp = peak_pars['ampli'].value * peak_pars['coef'].value
         self.res_freq = peak_pars['x0'].value
@@ -270,6 +309,23 @@ class SegmentSweep:
         # plt.axvline(self.res_freq, ls=':', c='k')
         # plt.show()
 
+    def peak_params(self):
+        """
+        Fitted peak parameters, used as initial guess of the fit of the
+        same segment for a neighbor pixel (see peak_fit)
+
+        Returns
+        -------
+        guess_init: list(5) of float or None
+            Peak parameters (ampli, coef, x0, offset, slope), None if the
+            fit is unsuccessful
+        """
+        if self.error or not self.q_fact or self.bckgnd is None:
+            return None
+
+        return [self.amp / self.q_fact, self.q_fact, self.res_freq,
+                self.bckgnd, 0.]
+
     def phase_fit(self):
         """ Function used to fit the resonance phase with SHO model """
         # Reduce domain of phase signal to fit
@@ -350,33 +406,28 @@ class SegmentSweep:
 
         return switch, coef_func
 
-    def q_fact_max(self):
+    def q_fact_max(self, interp=False):
         """
-        Find the quality factor without peak fitting and return the quality
-        factor.
+        Find the quality factor without peak fitting (resonance frequency
+        divided by the -3 dB bandwidth, see half_power_width) and return the
+        quality factor.
 
         Parameters
         ----------
+        interp: bool, optional
+            If True, the edges of the bandwidth are linearly interpolated
+            between the samples around the threshold
 
         Returns
         -------
-        qual_factor: float or None
+        qual_factor: float
             The calculated quality factor if it can be determined, otherwise
-            None.
-        """
-        thresh_amp = self.amp / np.sqrt(2)
-        coord_wid = []
-        for elem_freq, elem_amp in zip(self.freq_tab, self.amp_tab):
-            if elem_amp >= thresh_amp:
-                coord_wid.append(elem_freq)
-                break
-        for elem_freq, elem_amp in zip(self.freq_tab, self.amp_tab):
-            if elem_freq >= self.res_freq:
-                if elem_amp <= thresh_amp:
-                    coord_wid.append(elem_freq)
-                    break
-        qual_factor = self.res_freq / (coord_wid[1] - coord_wid[0]) \
-            if len(coord_wid) == 2 else np.nan
+            nan.
+        """
+        width = half_power_width(self.freq_tab, [self.amp_tab],
+                                 interp=interp)['width'][0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            qual_factor = self.res_freq / width
 
         return qual_factor
 
@@ -386,10 +437,14 @@ class SegmentStable:
     Segment voltage of sspfm bias signal and associated amplitude and
     phase measure for dfrt or single frequency measure
     """
+    __slots__ = ('amp', 'pha', 'res_freq', 'inc_amp', 'inc_pha',
+                 'inc_res_freq', 'segment_info', 'start_ind', 'end_ind', 'len',
+                 'time_tab_init', 'amp_tab_init', 'pha_tab_init',
+                 'freq_tab_init', 'time_tab', 'amp_tab', 'pha_tab', 'freq_tab')
 
     def __init__(self, segment_info, dict_meas, cut_seg=None,
                  filter_type=None, filter_cutoff_frequency=None,
-                 filter_order=None):
+                 filter_order=None, filtered_meas=None, lean=False):
         """
         Main function of the class
 
@@ -408,50 +463,29 @@ class SegmentStable:
             segment
         filter_order: int
             Order of the filter for amplitude and phase in the segment
+        filtered_meas: dict, optional
+            Amplitude, phase (and frequency) of the full ('init') and cut
+            ('cut') segment, already filtered (see SegmentBlocks.segment)
+        lean: bool, optional
+            If True, only the cut segment is kept: the full segment arrays
+            (*_tab_init, only used for figures) are set to None
         """
         (self.amp, self.pha, self.res_freq, self.inc_amp, self.inc_pha,
          self.inc_res_freq) = (None, None, None, None, None, None)
         self.segment_info = segment_info
-        self.time_tab_init = dict_meas['times'][segment_info.start_ind_init:
-                                                segment_info.end_ind_init]
-        self.amp_tab_init = dict_meas['amp'][segment_info.start_ind_init:
-                                             segment_info.end_ind_init]
-        self.pha_tab_init = dict_meas['pha'][segment_info.start_ind_init:
-                                             segment_info.end_ind_init]
-        self.freq_tab_init = dict_meas.get('freq', None)
-        self.freq_tab_init = dict_meas['freq'][segment_info.start_ind_init:
-                                               segment_info.end_ind_init] \
-            if self.freq_tab_init else None
-
-        # Measure filtered
-        if filter_type == 'mean':
-            self.amp_tab_init = filter_mean(self.amp_tab_init, filter_order)
-            self.pha_tab_init = filter_mean(self.pha_tab_init, filter_order)
-            self.freq_tab_init = filter_mean(self.freq_tab_init, filter_order) \
-                if self.freq_tab_init else None
-        elif filter_type in ['low', 'high', 'bandpass', 'bandstop']:
-            sampling_frequency = \
-                len(self.time_tab_init) / (self.time_tab_init[-1] -
-                                           self.time_tab_init[0])
-            self.amp_tab_init = butter_filter(
-                self.amp_tab_init, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.pha_tab_init = butter_filter(
-                self.pha_tab_init, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.freq_tab_init = butter_filter(
-                self.freq_tab_init, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order) if self.freq_tab_init else None
+        time_tab_init = dict_meas['times'][segment_info.start_ind_init:
+                                           segment_info.end_ind_init]
+        keys = ['amp', 'pha']
+        if len(dict_meas.get('freq', [])) > 0:
+            keys.append('freq')
 
         # Cut beginning and end of the segment
         if cut_seg is None:
             self.start_ind = segment_info.start_ind_init
             self.end_ind = segment_info.end_ind_init
             self.len = segment_info.len_init
-            self.time_tab = self.time_tab_init
-            self.amp_tab = self.amp_tab_init
-            self.pha_tab = self.pha_tab_init
-            self.freq_tab = self.freq_tab_init
+            self.time_tab = time_tab_init
+            cut = slice(None)
         else:
             incr_start = int(cut_seg['start'] / 100 * segment_info.len_init)
             incr_end = int(cut_seg['end'] / 100 * segment_info.len_init)
@@ -460,22 +494,41 @@ class SegmentStable:
             self.len = self.end_ind - self.start_ind
             self.time_tab = dict_meas['times'][self.start_ind:self.end_ind]
             incr_end = incr_end if incr_end != 0 else 1
-            self.amp_tab = \
-                self.amp_tab_init[incr_start:segment_info.len_init-incr_end]
-            self.pha_tab = \
-                self.pha_tab_init[incr_start:segment_info.len_init-incr_end]
-            self.freq_tab = \
-                self.freq_tab_init[incr_start:segment_info.len_init-incr_end] \
-                if self.freq_tab_init else None
+            cut = slice(incr_start, segment_info.len_init - incr_end)
+
+        # Measure filtered (on the full segment, then cut)
+        if filtered_meas is not None:
+            tab_init, tab = filtered_meas['init'], filtered_meas['cut']
+        else:
+            tab_init = {
+                key: filter_segment(
+                    dict_meas[key][segment_info.start_ind_init:
+                                   segment_info.end_ind_init],
+                    time_tab_init, filter_type=filter_type,
+                    filter_cutoff_frequency=filter_cutoff_frequency,
+                    filter_order=filter_order)
+                for key in keys}
+            tab = {key: values[cut] for key, values in tab_init.items()}
+        self.amp_tab, self.pha_tab = tab['amp'], tab['pha']
+        self.freq_tab = tab.get('freq', None)
+        if lean:
+            (self.time_tab_init, self.amp_tab_init, self.pha_tab_init,
+             self.freq_tab_init) = (None, None, None, None)
+        else:
+            self.time_tab_init = time_tab_init
+            self.amp_tab_init, self.pha_tab_init = \
+                tab_init['amp'], tab_init['pha']
+            self.freq_tab_init = tab_init.get('freq', None)
 
         # Segment treatment
         self.amp = np.mean(self.amp_tab)
         self.pha = np.mean(self.pha_tab)
-        self.res_freq = np.mean(self.freq_tab) if self.freq_tab else None
+        self.res_freq = np.mean(self.freq_tab) \
+            if self.freq_tab is not None else None
         self.inc_amp = np.sqrt(np.var(self.amp_tab))
         self.inc_pha = np.sqrt(np.var(self.pha_tab))
         self.inc_res_freq = np.sqrt(np.var(self.freq_tab)) \
-            if self.freq_tab else None
+            if self.freq_tab is not None else None
 
 
 class SegmentStableDFRT:
@@ -483,10 +536,20 @@ class SegmentStableDFRT:
     Segment voltage of sspfm bias signal and associated amplitude and
     phase measure for dfrt if sidebands are measured
     """
+    # Attribute name of each measurement of dict_meas
+    meas_names = {'amp': 'amp_main', 'pha': 'pha_main', 'freq': 'freq_main',
+                  'amp sb_l': 'amp_sbl', 'pha sb_l': 'pha_sbl',
+                  'freq sb_l': 'freq_sbl', 'amp sb_r': 'amp_sbr',
+                  'pha sb_r': 'pha_sbr', 'freq sb_r': 'freq_sbr'}
+    __slots__ = ('amp', 'pha', 'res_freq', 'q_fact', 'segment_info',
+                 'start_ind', 'end_ind', 'len', 'time_tab_init',
+                 'time_tab') + tuple(
+        f'{name}{suffix}' for name in meas_names.values()
+        for suffix in ('', '_tab', '_tab_init'))
 
     def __init__(self, segment_info, dict_meas, cut_seg=None,
                  filter_type=None, filter_cutoff_frequency=None,
-                 filter_order=None):
+                 filter_order=None, filtered_meas=None, lean=False):
         """
         Main function of the class
 
@@ -505,36 +568,19 @@ class SegmentStableDFRT:
             segment
         filter_order: int
             Order of the filter for amplitude and phase in the segment
+        filtered_meas: dict, optional
+            Main and sideband measurements of the full ('init') and cut
+            ('cut') segment, already filtered (see SegmentBlocks.segment)
+        lean: bool, optional
+            If True, only the cut segment is kept: the full segment arrays
+            (*_tab_init, only used for figures) are set to None and are not
+            filtered
         """
         (self.amp, self.pha, self.res_freq, self.q_fact) = \
             (None, None, None, None)
         self.segment_info = segment_info
         self.time_tab_init = dict_meas['times'][segment_info.start_ind_init:
                                                 segment_info.end_ind_init]
-        self.amp_main_tab_init = dict_meas['amp'][segment_info.start_ind_init:
-                                                  segment_info.end_ind_init]
-        self.pha_main_tab_init = dict_meas['pha'][segment_info.start_ind_init:
-                                                  segment_info.end_ind_init]
-        self.freq_main_tab_init = dict_meas['freq'][segment_info.start_ind_init:
-                                                    segment_info.end_ind_init]
-        self.amp_sbl_tab_init = \
-            dict_meas['amp sb_l'][segment_info.start_ind_init:
-                                  segment_info.end_ind_init]
-        self.pha_sbl_tab_init = \
-            dict_meas['pha sb_l'][segment_info.start_ind_init:
-                                  segment_info.end_ind_init]
-        self.freq_sbl_tab_init = \
-            dict_meas['freq sb_l'][segment_info.start_ind_init:
-                                   segment_info.end_ind_init]
-        self.amp_sbr_tab_init = \
-            dict_meas['amp sb_r'][segment_info.start_ind_init:
-                                  segment_info.end_ind_init]
-        self.pha_sbr_tab_init = \
-            dict_meas['pha sb_r'][segment_info.start_ind_init:
-                                  segment_info.end_ind_init]
-        self.freq_sbr_tab_init = \
-            dict_meas['freq sb_r'][segment_info.start_ind_init:
-                                   segment_info.end_ind_init]
 
         # Cut beginning and end of the segment
         if cut_seg is None:
@@ -542,15 +588,6 @@ class SegmentStableDFRT:
             self.end_ind = segment_info.end_ind_init
             self.len = segment_info.len_init
             self.time_tab = self.time_tab_init
-            self.amp_main_tab = self.amp_main_tab_init
-            self.pha_main_tab = self.pha_main_tab_init
-            self.freq_main_tab = self.freq_main_tab_init
-            self.amp_sbl_tab = self.amp_sbl_tab_init
-            self.pha_sbl_tab = self.pha_sbl_tab_init
-            self.freq_sbl_tab = self.freq_sbl_tab_init
-            self.amp_sbr_tab = self.amp_sbr_tab_init
-            self.pha_sbr_tab = self.pha_sbr_tab_init
-            self.freq_sbr_tab = self.freq_sbr_tab_init
         else:
             incr_start = int(cut_seg['start'] / 100 * segment_info.len_init)
             incr_end = int(cut_seg['end'] / 100 * segment_info.len_init)
@@ -558,118 +595,30 @@ class SegmentStableDFRT:
             self.end_ind = segment_info.end_ind_init - incr_end
             self.len = self.end_ind - self.start_ind
             self.time_tab = dict_meas['times'][self.start_ind:self.end_ind]
-            self.amp_main_tab = dict_meas['amp'][self.start_ind:self.end_ind]
-            self.pha_main_tab = dict_meas['pha'][self.start_ind:self.end_ind]
-            self.freq_main_tab = dict_meas['freq'][self.start_ind:self.end_ind]
-            self.amp_sbl_tab = dict_meas['amp sb_l'][self.start_ind:
-                                                     self.end_ind]
-            self.pha_sbl_tab = dict_meas['pha sb_l'][self.start_ind:
-                                                     self.end_ind]
-            self.freq_sbl_tab = dict_meas['freq sb_l'][self.start_ind:
-                                                       self.end_ind]
-            self.amp_sbr_tab = dict_meas['amp sb_r'][self.start_ind:
-                                                     self.end_ind]
-            self.pha_sbr_tab = dict_meas['pha sb_r'][self.start_ind:
-                                                     self.end_ind]
-            self.freq_sbr_tab = dict_meas['freq sb_r'][self.start_ind:
-                                                       self.end_ind]
+
         # Measure filtered
-        if filter_type == 'mean':
-            self.amp_main_tab = filter_mean(self.amp_main_tab, filter_order)
-            self.amp_main_tab_init = filter_mean(self.amp_main_tab_init,
-                                                 filter_order)
-            self.pha_main_tab = filter_mean(self.pha_main_tab, filter_order)
-            self.pha_main_tab_init = filter_mean(self.pha_main_tab_init,
-                                                 filter_order)
-            self.freq_main_tab = filter_mean(self.freq_main_tab, filter_order)
-            self.freq_main_tab_init = filter_mean(self.freq_main_tab_init,
-                                                  filter_order)
-            self.amp_sbl_tab = filter_mean(self.amp_sbl_tab, filter_order)
-            self.amp_sbl_tab_init = filter_mean(self.amp_sbl_tab_init,
-                                                filter_order)
-            self.pha_sbl_tab = filter_mean(self.pha_sbl_tab, filter_order)
-            self.pha_sbl_tab_init = filter_mean(self.pha_sbl_tab_init,
-                                                filter_order)
-            self.freq_sbl_tab = filter_mean(self.freq_sbl_tab, filter_order)
-            self.freq_sbl_tab_init = filter_mean(self.freq_sbl_tab_init,
-                                                 filter_order)
-            self.amp_sbr_tab = filter_mean(self.amp_sbr_tab, filter_order)
-            self.amp_sbr_tab_init = filter_mean(self.amp_sbr_tab_init,
-                                                filter_order)
-            self.pha_sbr_tab = filter_mean(self.pha_sbr_tab, filter_order)
-            self.pha_sbr_tab_init = filter_mean(self.pha_sbr_tab_init,
-                                                filter_order)
-            self.freq_sbr_tab = filter_mean(self.freq_sbr_tab, filter_order)
-            self.freq_sbr_tab_init = filter_mean(self.freq_sbr_tab_init,
-                                                 filter_order)
-        elif filter_type in ['low', 'high', 'bandpass', 'bandstop']:
-            sampling_frequency = \
-                len(self.time_tab) / (self.time_tab[-1] - self.time_tab[0])
-            self.amp_main_tab = butter_filter(
-                self.amp_main_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.amp_main_tab_init = butter_filter(
-                self.amp_main_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.pha_main_tab = butter_filter(
-                self.pha_main_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.pha_main_tab_init = butter_filter(
-                self.pha_main_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.freq_main_tab = butter_filter(
-                self.freq_main_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.freq_main_tab_init = butter_filter(
-                self.freq_main_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.amp_sbl_tab = butter_filter(
-                self.amp_sbl_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.amp_sbl_tab_init = butter_filter(
-                self.amp_sbl_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.pha_sbl_tab = butter_filter(
-                self.pha_sbl_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.pha_sbl_tab_init = butter_filter(
-                self.pha_sbl_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.freq_sbl_tab = butter_filter(
-                self.freq_sbl_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.freq_sbl_tab_init = butter_filter(
-                self.freq_sbl_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.amp_sbr_tab = butter_filter(
-                self.amp_sbr_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.amp_sbr_tab_init = butter_filter(
-                self.amp_sbr_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.pha_sbr_tab = butter_filter(
-                self.pha_sbr_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.pha_sbr_tab_init = butter_filter(
-                self.pha_sbr_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
-            self.freq_sbr_tab = butter_filter(
-                self.freq_sbr_tab, sampling_frequency, filter_cutoff_frequency,
-                filter_type, filter_order)
-            self.freq_sbr_tab_init = butter_filter(
-                self.freq_sbr_tab_init, sampling_frequency,
-                filter_cutoff_frequency, filter_type, filter_order)
+        filter_pars = {'filter_type': filter_type,
+                       'filter_cutoff_frequency': filter_cutoff_frequency,
+                       'filter_order': filter_order}
+        if filtered_meas is not None:
+            tab_init, tab = filtered_meas['init'], filtered_meas['cut']
+        else:
+            tab = {key: filter_segment(
+                dict_meas[key][self.start_ind:self.end_ind], self.time_tab,
+                **filter_pars) for key in self.meas_names}
+            tab_init = None if lean else {key: filter_segment(
+                dict_meas[key][segment_info.start_ind_init:
+                               segment_info.end_ind_init],
+                self.time_tab, **filter_pars) for key in self.meas_names}
+        if lean:
+            self.time_tab_init = None
 
         # Segment treatment
-        self.amp_main = np.mean(self.amp_main_tab)
-        self.pha_main = np.mean(self.pha_main_tab)
-        self.freq_main = np.mean(self.freq_main_tab)
-        self.amp_sbl = np.mean(self.amp_sbl_tab)
-        self.pha_sbl = np.mean(self.pha_sbl_tab)
-        self.freq_sbl = np.mean(self.freq_sbl_tab)
-        self.amp_sbr = np.mean(self.amp_sbr_tab)
-        self.pha_sbr = np.mean(self.pha_sbr_tab)
-        self.freq_sbr = np.mean(self.freq_sbr_tab)
+        for key, name in self.meas_names.items():
+            setattr(self, f'{name}_tab', tab[key])
+            setattr(self, f'{name}_tab_init',
+                    None if lean else tab_init[key])
+            setattr(self, name, np.mean(tab[key]))
 
         self.process_sidebands()
 
@@ -706,6 +655,490 @@ class SegmentStableDFRT:
             sho_phase(self.freq_sbl, 1, self.q_fact, self.res_freq)
 
 
+class SegmentBlocks:
+    """
+    Measurements of all the segments stacked in 2D arrays (one line per
+    segment) and filtered at once, to be consumed by SegmentSweep,
+    SegmentStable and SegmentStableDFRT objects
+    """
+
+    def __init__(self, index_cut, seg_sample, dict_meas, keys, cut_seg=None,
+                 filter_type=None, filter_cutoff_frequency=None,
+                 filter_order=None, filter_cut=True, lean=False):
+        """
+        Main function of the class
+
+        Parameters
+        ----------
+        index_cut: list(n) of int
+            Starting index of each segment
+        seg_sample: int
+            Number of samples of each segment
+        dict_meas: dict
+            All measurement in extracted file
+        keys: list(p) of str
+            Keys of the measurements of dict_meas to stack and filter
+        cut_seg: dict, optional
+            Dict of percent cut of the start and end of the segment
+        filter_type: str
+            Type of the filter for the measurements in the segment
+        filter_cutoff_frequency: float or tuple
+            Cutoff frequency of the filter for the measurements in the segment
+        filter_order: int
+            Order of the filter for the measurements in the segment
+        filter_cut: bool, optional
+            If True, the cut segments are filtered on their own, with the
+            sampling frequency of the cut segment (as in SegmentSweep and
+            SegmentStableDFRT), else they are cut in the filtered full
+            segments (as in SegmentStable)
+        lean: bool, optional
+            If True, the full segments (only used for figures) are not kept,
+            nor filtered if the cut segments are filtered on their own
+        """
+        filter_pars = {'filter_type': filter_type,
+                       'filter_cutoff_frequency': filter_cutoff_frequency,
+                       'filter_order': filter_order}
+        start_ind = np.array(index_cut, dtype=int)
+        len_init = int(seg_sample)
+        if cut_seg is None:
+            incr_start, incr_end = 0, 0
+        else:
+            incr_start = int(cut_seg['start'] / 100 * len_init)
+            incr_end = int(cut_seg['end'] / 100 * len_init)
+        times = np.asarray(dict_meas['times'])
+        times_init = stack_segments(times, start_ind, 0, len_init)
+        times_cut = stack_segments(times, start_ind, incr_start,
+                                   len_init - incr_end)
+
+        tab_init, self.tab = {}, {}
+        for key in keys:
+            if not (lean and filter_cut and cut_seg is not None):
+                tab_init[key] = filter_block(
+                    stack_segments(dict_meas[key], start_ind, 0, len_init),
+                    times_cut if filter_cut else times_init, **filter_pars)
+            if cut_seg is None:
+                self.tab[key] = tab_init[key]
+            elif filter_cut:
+                self.tab[key] = filter_block(
+                    stack_segments(dict_meas[key], start_ind, incr_start,
+                                   len_init - incr_end),
+                    times_cut, **filter_pars)
+            else:
+                self.tab[key] = tab_init[key][
+                    :, incr_start:len_init - (incr_end or 1)]
+        self.tab_init = None if lean else tab_init
+
+    def segment(self, num):
+        """
+        Filtered measurements of a single segment
+
+        Parameters
+        ----------
+        num: int
+            Index of the segment
+
+        Returns
+        -------
+        filtered_meas: dict
+            Measurements of the full ('init', None in lean mode) and cut
+            ('cut') segment
+        """
+        return {'init': {key: tab[num] for key, tab in self.tab_init.items()}
+                if self.tab_init is not None else None,
+                'cut': {key: tab[num] for key, tab in self.tab.items()}}
+
+
+class SegmentBatch:
+    """
+    Vectorized treatment of all the segments of a measurement (max, fit and
+    single frequency modes): amplitude and phase of the segments are stacked
+    in 2D arrays (one line per segment) and processed at once
+    """
+
+    def __init__(self, index_cut, seg_sample, dict_meas, mode='max',
+                 start_freq_init=200., end_freq_init=300., cut_seg=None,
+                 filter_type=None, filter_cutoff_frequency=None,
+                 filter_order=None, fit_pars=None, q_interp=False):
+        """
+        Main function of the class
+
+        Parameters
+        ----------
+        index_cut: list(n) of int
+            Starting index of each segment
+        seg_sample: int
+            Number of samples of each segment
+        dict_meas: dict
+            All measurement in extracted file
+        mode: str, optional
+            Operating mode for analysis: 'max' or 'fit' (frequency sweep in
+            resonance), 'single_freq' or 'dfrt' (without sideband
+            measurements)
+        start_freq_init: float, optional
+            Starting frequency of the sweep (if max or fit mode) (in kHz)
+        end_freq_init: float, optional
+            Ending frequency of the sweep (if max or fit mode) (in kHz)
+        cut_seg: dict, optional
+            Dict of percent cut of the start and end of the segment
+        filter_type: str
+            Type of the filter for amplitude and phase in the segment
+        filter_cutoff_frequency: float or tuple
+            Cutoff frequency of the filter for amplitude and phase in the
+            segment
+        filter_order: int
+            Order of the filter for amplitude and phase in the segment
+        fit_pars: dict, optional
+            Dict of fit parameters (if fit mode, phase fit is not available)
+        q_interp: bool, optional
+            If True, the edges of the -3 dB bandwidth are interpolated
+            between the samples to find the quality factors (if max mode, see
+            q_fact_max)
+        """
+        assert mode in ['max', 'fit', 'single_freq', 'dfrt']
+        (self.amp, self.pha, self.res_freq, self.q_fact, self.bckgnd,
+         self.inc_amp, self.inc_pha, self.inc_res_freq) = \
+            (None, None, None, None, None, None, None, None)
+        self.fitted, self.success = None, None
+        self.mode = mode
+        self.q_interp = q_interp
+        self.filter_pars = {'type': filter_type,
+                            'cutoff frequency': filter_cutoff_frequency,
+                            'order': filter_order}
+        self.start_ind_init = np.array(index_cut, dtype=int)
+        self.len_init = int(seg_sample)
+        self.times = np.asarray(dict_meas['times'])
+        self.cut_seg = cut_seg
+        if cut_seg is None:
+            self.incr_start, self.incr_end = 0, 0
+        else:
+            self.incr_start = int(cut_seg['start'] / 100 * self.len_init)
+            self.incr_end = int(cut_seg['end'] / 100 * self.len_init)
+
+        # Segment treatment
+        if mode in ['max', 'fit']:
+            incr_end = self.incr_end if self.incr_end != 0 else 1
+            freq_tab_init = np.linspace(start_freq_init, end_freq_init,
+                                        self.len_init, endpoint=False)
+            self.freq_tab = freq_tab_init if cut_seg is None else \
+                freq_tab_init[self.incr_start:-incr_end]
+            if mode == 'max':
+                self.treatment_max(dict_meas)
+            else:
+                self.treatment_fit(dict_meas, fit_pars=fit_pars)
+        else:
+            self.treatment_stable(dict_meas)
+
+    def block(self, values, start, end):
+        """
+        Stack the [start:end] part of all the segments in a 2D array
+
+        Parameters
+        ----------
+        values: list or numpy.array of float
+            Measurement values
+        start: int
+            Index of the first sample, relative to the start of the segment
+        end: int
+            Index of the last sample (excluded), relative to the start of the
+            segment
+
+        Returns
+        -------
+        block: numpy.array(n*m) of float
+            2D array of the segment values (one line per segment)
+        """
+        return stack_segments(values, self.start_ind_init, start, end)
+
+    def filter_block(self, block, times):
+        """
+        Apply the segment filter to each line of a 2D array
+
+        Parameters
+        ----------
+        block: numpy.array(n*m) of float
+            2D array of the segment values (one line per segment)
+        times: numpy.array(n*m) of float
+            2D array of the segment times (one line per segment)
+
+        Returns
+        -------
+        block: numpy.array(n*m) of float
+            2D array of the filtered segment values
+        """
+        return filter_block(
+            block, times, filter_type=self.filter_pars['type'],
+            filter_cutoff_frequency=self.filter_pars['cutoff frequency'],
+            filter_order=self.filter_pars['order'])
+
+    def treatment_max(self, dict_meas):
+        """
+        Treatment for max mode
+
+        Parameters
+        ----------
+        dict_meas: dict
+            All measurement in extracted file
+
+        Returns
+        -------
+        None
+        """
+        start, end = self.incr_start, self.len_init - self.incr_end
+        times = self.block(self.times, start, end)
+        amp_tab = self.filter_block(
+            self.block(dict_meas['amp'], start, end), times)
+        pha_tab = self.filter_block(
+            self.block(dict_meas['pha'], start, end), times)
+        ind_max = np.argmax(amp_tab, axis=1)
+        rows = np.arange(len(amp_tab))
+        self.amp = amp_tab[rows, ind_max]
+        self.pha = pha_tab[rows, ind_max]
+        self.res_freq = self.freq_tab[ind_max]
+        self.q_fact = self.q_fact_max(amp_tab)
+
+    def q_fact_max(self, amp_tab):
+        """
+        Find the quality factor of all the segments at once without peak
+        fitting (same method as SegmentSweep.q_fact_max)
+
+        Parameters
+        ----------
+        amp_tab: numpy.array(n*m) of float
+            2D array of the segment amplitude values
+
+        Returns
+        -------
+        qual_factor: numpy.array(n) of float
+            The calculated quality factors (nan if it can't be determined)
+        """
+        width = half_power_width(self.freq_tab, amp_tab,
+                                 interp=self.q_interp)['width']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            qual_factor = self.res_freq / width
+
+        return qual_factor
+
+    def treatment_fit(self, dict_meas, fit_pars=None):
+        """
+        Treatment for fit mode: the resonance peaks of all the segments are
+        fitted at once with the SHO model (ShoPeakBatchFit)
+
+        Parameters
+        ----------
+        dict_meas: dict
+            All measurement in extracted file
+        fit_pars: dict, optional
+            Dict of fit parameters
+
+        Returns
+        -------
+        None
+        """
+        fit_pars = fit_pars or {
+            'sens peak detect': 1.5,
+            'detect peak': False,
+            'fit pha': False
+        }
+        start, end = self.incr_start, self.len_init - self.incr_end
+        times = self.block(self.times, start, end)
+        nb_freq = len(self.freq_tab)
+        amp_tab = self.filter_block(
+            self.block(dict_meas['amp'], start, end), times)[:, :nb_freq]
+        pha_tab = self.filter_block(
+            self.block(dict_meas['pha'], start, end), times)[:, :nb_freq]
+
+        # Peak detection
+        self.fitted = np.ones(len(amp_tab), dtype=bool)
+        if fit_pars['detect peak']:
+            threshold = np.mean(amp_tab, axis=1) * fit_pars['sens peak detect']
+            self.fitted = np.any(amp_tab > threshold[:, np.newaxis], axis=1)
+
+        # Peak fitting
+        self.amp, self.pha, self.res_freq, self.q_fact, self.bckgnd = \
+            [np.full(len(amp_tab), np.nan) for _ in range(5)]
+        self.success = np.zeros(len(amp_tab), dtype=bool)
+        if np.any(self.fitted):
+            sho_peak = ShoPeakBatchFit()
+            sho_peak.fit(self.freq_tab, amp_tab[self.fitted])
+            peak_pars = sho_peak.report_fit_results()
+            best_fit = sho_peak.eval(self.freq_tab)
+            rows = np.arange(len(best_fit))
+            self.amp[self.fitted] = peak_pars['ampli'] * peak_pars['coef']
+            self.res_freq[self.fitted] = peak_pars['x0']
+            self.bckgnd[self.fitted] = peak_pars['offset']
+            self.q_fact[self.fitted] = peak_pars['coef']
+            self.pha[self.fitted] = \
+                pha_tab[self.fitted][rows, np.argmax(best_fit, axis=1)]
+            self.success[self.fitted] = sho_peak.success
+
+    def treatment_stable(self, dict_meas):
+        """
+        Treatment for single frequency and dfrt (without sidebands) modes
+
+        Parameters
+        ----------
+        dict_meas: dict
+            All measurement in extracted file
+
+        Returns
+        -------
+        None
+        """
+        times = self.block(self.times, 0, self.len_init)
+        incr_end = self.incr_end if self.incr_end != 0 else 1
+        cut = slice(None) if self.cut_seg is None else \
+            slice(self.incr_start, self.len_init - incr_end)
+        tabs = {}
+        for key in ['amp', 'pha', 'freq']:
+            if key in dict_meas and len(dict_meas[key]) > 0:
+                tabs[key] = self.filter_block(
+                    self.block(dict_meas[key], 0, self.len_init),
+                    times)[:, cut]
+        self.amp = np.mean(tabs['amp'], axis=1)
+        self.pha = np.mean(tabs['pha'], axis=1)
+        self.inc_amp = np.sqrt(np.var(tabs['amp'], axis=1))
+        self.inc_pha = np.sqrt(np.var(tabs['pha'], axis=1))
+        if 'freq' in tabs:
+            self.res_freq = np.mean(tabs['freq'], axis=1)
+            self.inc_res_freq = np.sqrt(np.var(tabs['freq'], axis=1))
+
+    def dict_res(self):
+        """
+        Results of the segment treatment, organized as the dict of lists
+        built from the list of Segment objects
+
+        Returns
+        -------
+        dict_res: dict
+            Results (amplitude, phase ...) for all the segments
+        """
+        nb_seg = len(self.start_ind_init)
+
+        def to_list(values):
+            if values is None:
+                return [None] * nb_seg
+            if self.fitted is not None:
+                # Segments without peak (not fitted)
+                return [elem if fitted else None
+                        for elem, fitted in zip(values, self.fitted)]
+            return list(values)
+
+        if self.mode in ['max', 'fit']:
+            dict_res = {'Amplitude': to_list(self.amp),
+                        'Phase': to_list(self.pha),
+                        'Res Freq': to_list(self.res_freq),
+                        'Q Fact': to_list(self.q_fact)}
+        else:
+            dict_res = {'Amplitude': to_list(self.amp),
+                        'Phase': to_list(self.pha),
+                        'Res Freq': to_list(self.res_freq),
+                        'Sigma Amp': to_list(self.inc_amp),
+                        'Sigma Pha': to_list(self.inc_pha),
+                        'Sigma Res Freq': to_list(self.inc_res_freq)}
+
+        return dict_res
+
+
+def stack_segments(values, start_ind, start, end):
+    """
+    Stack the [start:end] part of segments in a 2D array
+
+    Parameters
+    ----------
+    values: list or numpy.array of float
+        Measurement values
+    start_ind: numpy.array(n) of int
+        Starting index of each segment
+    start: int
+        Index of the first sample, relative to the start of the segment
+    end: int
+        Index of the last sample (excluded), relative to the start of the
+        segment
+
+    Returns
+    -------
+    block: numpy.array(n*m) of float
+        2D array of the segment values (one line per segment)
+    """
+    return np.asarray(values)[start_ind[:, np.newaxis] + np.arange(start, end)]
+
+
+def filter_block(block, times, filter_type=None, filter_cutoff_frequency=None,
+                 filter_order=None):
+    """
+    Apply the segment filter to each line of a 2D array. Butterworth filters
+    are designed once (FILTER_BANK) and applied at once to all the segments
+    sharing the same sampling frequency.
+
+    Parameters
+    ----------
+    block: numpy.array(n*m) of float
+        2D array of the segment values (one line per segment)
+    times: numpy.array(n*k) of float
+        2D array of the segment times used for the sampling frequency (one
+        line per segment)
+    filter_type: str, optional
+        Type of the filter
+    filter_cutoff_frequency: float or tuple, optional
+        Cutoff frequency of the filter
+    filter_order: int, optional
+        Order of the filter
+
+    Returns
+    -------
+    block: numpy.array(n*m) of float
+        2D array of the filtered segment values
+    """
+    if filter_type == 'mean':
+        block = filter_mean(block, filter_order)
+    elif filter_type in ['low', 'high', 'bandpass', 'bandstop']:
+        sampling_frequency = times.shape[1] / (times[:, -1] - times[:, 0])
+        block = np.array(block, dtype=float)
+        for elem in np.unique(sampling_frequency):
+            mask = sampling_frequency == elem
+            block[mask] = FILTER_BANK.filter(
+                block[mask], elem, filter_cutoff_frequency,
+                filter_type=filter_type, filter_order=filter_order)
+
+    return block
+
+
+def filter_segment(values, times, filter_type=None,
+                   filter_cutoff_frequency=None, filter_order=None):
+    """
+    Apply the segment filter to the values of a single segment (Butterworth
+    filters are designed once, see FILTER_BANK)
+
+    Parameters
+    ----------
+    values: list or numpy.array(m) of float
+        Segment values
+    times: list or numpy.array(k) of float
+        Segment times used for the sampling frequency
+    filter_type: str, optional
+        Type of the filter
+    filter_cutoff_frequency: float or tuple, optional
+        Cutoff frequency of the filter
+    filter_order: int, optional
+        Order of the filter
+
+    Returns
+    -------
+    values: list or numpy.array(m) of float
+        Filtered segment values
+    """
+    if filter_type == 'mean':
+        values = filter_mean(values, filter_order)
+    elif filter_type in ['low', 'high', 'bandpass', 'bandstop']:
+        sampling_frequency = len(times) / (times[-1] - times[0])
+        values = FILTER_BANK.filter(
+            np.asarray(values, dtype=float), sampling_frequency,
+            filter_cutoff_frequency, filter_type=filter_type,
+            filter_order=filter_order)
+
+    return values
+
+
 def external_calib(amplitude_out, phase_out, meas_pars=None):
     """
     Convert the output amplitude and phase from an external acquisition device
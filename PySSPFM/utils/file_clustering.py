@@ -5,10 +5,8 @@ File and directory path management for clustering script
 import os
 import numpy as np
 
-from PySSPFM.utils.core.path_management import \
-    get_filenames_with_conditions, sort_filenames
-from PySSPFM.utils.raw_extraction import \
-    csv_meas_sheet_extract, raw_data_extraction_without_script
+from PySSPFM.utils.raw_extraction import csv_meas_sheet_extract, \
+    raw_data_extraction_without_script, datacube_filenames
 
 
 def curve_extraction(dir_path_in, tab_label, mode="classic", extension="spm"):
@@ -23,7 +21,8 @@ def curve_extraction(dir_path_in, tab_label, mode="classic", extension="spm"):
         List of measurement name for the curve
     extension: str, optional
         Extension of files.
-        Four possible values: 'spm' or 'txt' or 'csv' or 'xlsx'.
+        Six possible values: 'spm' or 'txt' or 'csv' or 'xlsx' or 'npy' or
+        'grid' (grid datacube container).
     mode: str
         Mode of measurement used (extraction of measurements).
         Two possible values: 'classic' (sweep or single frequency) or 'dfrt'.
@@ -36,9 +35,7 @@ def curve_extraction(dir_path_in, tab_label, mode="classic", extension="spm"):
         List containing y-axis data for each mode.
     """
 
-    filenames = get_filenames_with_conditions(dir_path_in, prefix=None,
-                                              extension=extension)
-    sorted_filenames, _, _ = sort_filenames(filenames)
+    sorted_filenames = datacube_filenames(dir_path_in, extension=extension)
 
     data_lab_x = {}
     data_lab_y = {}
@@ -50,7 +47,8 @@ def curve_extraction(dir_path_in, tab_label, mode="classic", extension="spm"):
         file_path_in = os.path.join(dir_path_in, filename)
         dict_meas = raw_data_extraction_without_script(
             file_path_in, extension=extension,
-            mode_dfrt=bool(mode.lower() == 'dfrt'))
+            mode_dfrt=bool(mode.lower() == 'dfrt'),
+            channels=['times'] + list(tab_label))
         for label in tab_label:
             data_lab_x[label].append(dict_meas["times"])
             data_lab_y[label].append(dict_meas[label])
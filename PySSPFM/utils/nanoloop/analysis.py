@@ -13,7 +13,7 @@ class MultiLoop:
     """ MultiLoop object associated to a y measure """
 
     def __init__(self, write_volt, y_meas, read_volt, mode='Off field',
-                 y_sigma=None):
+                 y_sigma=None, index=None):
         """
         Main function of the class
 
@@ -29,6 +29,9 @@ class MultiLoop:
             Measurement mode ('Off field' or 'On field')
         y_sigma: list or numpy.array, optional
             List or array of uncertainties in the measured values
+        index: tuple(2) of numpy.array of int, optional
+            Precomputed (right, left) branch indexes (see branch_index), to
+            be shared between loops with the same write voltage
 
         Returns
         -------
@@ -52,7 +55,7 @@ class MultiLoop:
         self.write_mode = ''
         self.guess_write_mode()
         self.find_marker()
-        self.divide_left_right()
+        self.divide_left_right(index=index)
 
     def guess_write_mode(self):
         """ Guess write mode of sspfm bias with write segment """
@@ -99,7 +102,7 @@ class MultiLoop:
                 'write_mode should be "Zero, up", or "Zero, down", '
                 'or "High, down", or "Low, up"')
 
-    def divide_left_right(self, closed=True):
+    def divide_left_right(self, closed=True, index=None):
         """
         Divide the loop into 2 segments: left and right
 
@@ -108,110 +111,29 @@ class MultiLoop:
         closed: bool, optional
             If close is True, duplicate the first measurement in the last
             position to close the loop
+        index: tuple(2) of numpy.array of int, optional
+            Precomputed (right, left) branch indexes (see branch_index)
 
         Returns
         -------
         None
         """
-        ite = len(self.write_volt)
-        lab = ''
-        write_v_seg = {'right': [], 'left': []}
-        y_meas_seg = {'right': [], 'left': []}
-        y_sigma_seg = {'right': [], 'left': []} \
-            if self.y_sigma is not None else None
-
-        write_v_max, write_v_min = max(self.write_volt), min(self.write_volt)
-        y_meas_min = self.y_meas[np.argmin(self.write_volt)]
-        y_meas_max = self.y_meas[np.argmax(self.write_volt)]
-        y_sigma_min = self.y_sigma[np.argmin(self.write_volt)] \
-            if self.y_sigma is not None else None
-        y_sigma_max = self.y_sigma[np.argmax(self.write_volt)] \
-            if self.y_sigma is not None else None
-
-        for cont in range(ite - 1):
-            if self.write_volt[cont + 1] > self.write_volt[cont]:
-                write_v_seg['right'].append(self.write_volt[cont])
-                y_meas_seg['right'].append(self.y_meas[cont])
-                if self.y_sigma is not None:
-                    y_sigma_seg['right'].append(self.y_sigma[cont])
-                lab = 'right'
-            else:
-                write_v_seg['left'].append(self.write_volt[cont])
-                y_meas_seg['left'].append(self.y_meas[cont])
-                if self.y_sigma is not None:
-                    y_sigma_seg['left'].append(self.y_sigma[cont])
-                lab = 'left'
-
-        for key in ['right', 'left']:
-            if lab == key:
-                write_v_seg[key].append(self.write_volt[-1])
-                y_meas_seg[key].append(self.y_meas[-1])
-                if self.y_sigma is not None:
-                    y_sigma_seg[key].append(self.y_sigma[-1])
-
-        seg_left, seg_right = [], []
-        for elem in [write_v_seg, y_meas_seg, y_sigma_seg]:
-            if elem:
-                seg_left.append(elem['left'])
-                seg_right.append(elem['right'])
-
-        seg = {
-            'right': sort_2d_arr(np.array(seg_right), 'line', 0),
-            'left': sort_2d_arr(np.array(seg_left), 'line', 0, reverse=True)
-        }
-
-        for key in ['right', 'left']:
-            cont = 0
-            if self.write_volt is not None:
-                write_v_seg[key] = seg[key][cont]
-                cont += 1
-            if self.y_meas is not None:
-                y_meas_seg[key] = seg[key][cont]
-                cont += 1
-            if self.y_sigma is not None:
-                y_sigma_seg[key] = seg[key][cont]
-                cont += 1
-
-        if closed:
-            if write_v_seg['right'][0] != write_v_min:
-                write_v_seg['right'] = \
-                    np.insert(write_v_seg['right'], 0, write_v_min)
-                y_meas_seg['right'] = \
-                    np.insert(y_meas_seg['right'], 0, y_meas_min)
-                if self.y_sigma is not None:
-                    y_sigma_seg['right'] = \
-                        np.insert(y_sigma_seg['right'], 0, y_sigma_min)
-            if write_v_seg['left'][0] != write_v_max:
-                write_v_seg['left'] = \
-                    np.insert(write_v_seg['left'], 0, write_v_max)
-                y_meas_seg['left'] = \
-                    np.insert(y_meas_seg['left'], 0, y_meas_max)
-                if self.y_sigma is not None:
-                    y_sigma_seg['left'] = \
-                        np.insert(y_sigma_seg['left'], 0, y_sigma_max)
-            if write_v_seg['right'][-1] != write_v_max:
-                write_v_seg['right'] = \
-                    np.append(write_v_seg['right'], write_v_max)
-                y_meas_seg['right'] = np.append(y_meas_seg['right'], y_meas_max)
-                if self.y_sigma is not None:
-                    y_sigma_seg['right'] = \
-                        np.append(y_sigma_seg['right'], y_sigma_max)
-            if write_v_seg['left'][-1] != write_v_min:
-                write_v_seg['left'] = \
-                    np.append(write_v_seg['left'], write_v_min)
-                y_meas_seg['left'] = np.append(y_meas_seg['left'], y_meas_min)
-                if self.y_sigma is not None:
-                    y_sigma_seg['left'] = \
-                        np.append(y_sigma_seg['left'], y_sigma_min)
-
-        self.write_volt_right = write_v_seg['right']
-        self.write_volt_left = write_v_seg['left']
-        self.y_meas_right = y_meas_seg['right']
-        self.y_meas_left = y_meas_seg['left']
-        self.y_sigma_right = y_sigma_seg['right'] \
-            if self.y_sigma is not None else None
-        self.y_sigma_left = y_sigma_seg['left'] \
-            if self.y_sigma is not None else None
+        if index is None:
+            index = branch_index(self.write_volt, closed=closed)
+        index_right, index_left = index
+
+        write_volt = np.asarray(self.write_volt, dtype=float)
+        y_meas = float_array(self.y_meas)
+        self.write_volt_right = write_volt[index_right]
+        self.write_volt_left = write_volt[index_left]
+        self.y_meas_right = y_meas[index_right]
+        self.y_meas_left = y_meas[index_left]
+        if self.y_sigma is not None:
+            y_sigma = float_array(self.y_sigma)
+            self.y_sigma_right = y_sigma[index_right]
+            self.y_sigma_left = y_sigma[index_left]
+        else:
+            self.y_sigma_right, self.y_sigma_left = None, None
 
 
 class MeanLoop:
@@ -238,14 +160,15 @@ class MeanLoop:
         self.write_volt_right = loop.write_volt_right
         self.write_marker = loop.write_marker
 
-        # Multi measurement
-        self.multi_y_meas = [single_loop.y_meas for single_loop in multi_loop]
-        self.multi_y_marker = \
-            [single_loop.y_marker for single_loop in multi_loop]
-        self.multi_y_meas_left = \
-            [single_loop.y_meas_left for single_loop in multi_loop]
-        self.multi_y_meas_right = \
-            [single_loop.y_meas_right for single_loop in multi_loop]
+        # Multi measurement (2d arrays: one line per loop)
+        self.multi_y_meas = np.array(
+            [single_loop.y_meas for single_loop in multi_loop])
+        self.multi_y_marker = np.array(
+            [single_loop.y_marker for single_loop in multi_loop])
+        self.multi_y_meas_left = np.array(
+            [single_loop.y_meas_left for single_loop in multi_loop])
+        self.multi_y_meas_right = np.array(
+            [single_loop.y_meas_right for single_loop in multi_loop])
 
         def sigma_treatment(sigmas):
             """
@@ -337,30 +260,37 @@ class AllMultiLoop:
 
         self.read_volt = read_volt
 
+        # Branch indexes shared by all the measurements
+        index = branch_index(write_volt)
+
         # Amplitude and phase
         amp_loops = MultiLoop(
-            write_volt, amp, read_volt, mode=mode, y_sigma=amp_sigma)
+            write_volt, amp, read_volt, mode=mode, y_sigma=amp_sigma,
+            index=index)
         self.amp = amp_loops
         pha_loops = MultiLoop(
-            write_volt, pha, read_volt, mode=mode, y_sigma=pha_sigma)
+            write_volt, pha, read_volt, mode=mode, y_sigma=pha_sigma,
+            index=index)
         self.pha = pha_loops
 
         # Treated phase
         treated_pha = phase_treatment(pha, pha_calib)
         treated_pha_loops = MultiLoop(
-            write_volt, treated_pha, read_volt, mode=mode, y_sigma=pha_sigma)
+            write_volt, treated_pha, read_volt, mode=mode, y_sigma=pha_sigma,
+            index=index)
         self.treated_pha = treated_pha_loops
 
         func = pha_calib["func"]
 
-        # Piezoresponse
-        piezorep = list(np.zeros(len(amp)))
-        for i, (elem_amp, elem_pha) in enumerate(zip(amp, treated_pha)):
-            if elem_amp is not None and elem_pha is not None:
-                piezorep[i] = elem_amp * func(np.deg2rad(elem_pha))
+        # Piezoresponse (0 where amplitude or phase is missing)
+        amp_arr, pha_arr = float_array(amp), float_array(treated_pha)
+        valid = np.not_equal(amp_arr, None) & np.not_equal(pha_arr, None)
+        piezorep = np.zeros(len(amp))
+        piezorep[valid] = amp_arr[valid] * func(
+            np.deg2rad(pha_arr[valid].astype(float)))
 
         # Uncertainty on piezoresponse
-        if amp_sigma and pha_sigma:
+        if has_values(amp_sigma) and has_values(pha_sigma):
             piezorep_sigma = np.abs(piezorep) * np.sqrt(
                 (np.array(amp_sigma) / np.array(amp))**2 +
                 (np.array(pha_sigma) / np.array(pha))**2)
@@ -369,23 +299,24 @@ class AllMultiLoop:
 
         # MultiLoop of piezoresponse
         piezorep_loops = MultiLoop(
-            write_volt, piezorep, read_volt, mode=mode, y_sigma=piezorep_sigma)
+            write_volt, piezorep, read_volt, mode=mode, y_sigma=piezorep_sigma,
+            index=index)
         self.piezorep = piezorep_loops
 
         # Resonance frequency
-        if res_freq:
+        if has_values(res_freq):
             res_freq_loops = MultiLoop(
                 write_volt, res_freq, read_volt, mode=mode,
-                y_sigma=res_freq_sigma)
+                y_sigma=res_freq_sigma, index=index)
             self.res_freq = res_freq_loops
         else:
             self.res_freq, res_freq_loops = None, None
 
         # Quality factor
-        if q_fact:
+        if has_values(q_fact):
             q_fact_loops = MultiLoop(
                 write_volt, q_fact, read_volt, mode=mode,
-                y_sigma=q_fact_sigma)
+                y_sigma=q_fact_sigma, index=index)
             self.q_fact = q_fact_loops
         else:
             self.q_fact, q_fact_loops = None, None
@@ -465,6 +396,91 @@ class AllMeanLoop:
         }
 
 
+def branch_index(write_volt, closed=True):
+    """
+    Indexes of the right (increasing write voltage) and left (decreasing
+    write voltage) branches of a loop, each sorted by write voltage
+
+    Parameters
+    ----------
+    write_volt: list(n) or numpy.array(n) of float
+        Write voltage values (in V)
+    closed: bool, optional
+        If True, the extreme write voltage points are added at both ends of
+        the branches to close the loop
+
+    Returns
+    -------
+    index_right: numpy.array of int
+        Indexes of the right branch points, sorted by increasing write voltage
+    index_left: numpy.array of int
+        Indexes of the left branch points, sorted by decreasing write voltage
+    """
+    write_volt = np.asarray(write_volt, dtype=float)
+
+    # Each point belongs to the branch of the following write step, the last
+    # point to the branch of the last write step
+    rising = np.diff(write_volt) > 0
+    rising = np.append(rising, rising[-1:])
+
+    # Single stable sort: increasing for right points, decreasing for left
+    order = np.argsort(np.where(rising, write_volt, -write_volt),
+                       kind='stable')
+    index_right = order[rising[order]]
+    index_left = order[~rising[order]]
+
+    if closed:
+        ind_min, ind_max = np.argmin(write_volt), np.argmax(write_volt)
+        write_v_min, write_v_max = write_volt[ind_min], write_volt[ind_max]
+        if len(index_right) == 0 or \
+                write_volt[index_right[0]] != write_v_min:
+            index_right = np.insert(index_right, 0, ind_min)
+        if len(index_left) == 0 or write_volt[index_left[0]] != write_v_max:
+            index_left = np.insert(index_left, 0, ind_max)
+        if write_volt[index_right[-1]] != write_v_max:
+            index_right = np.append(index_right, ind_max)
+        if write_volt[index_left[-1]] != write_v_min:
+            index_left = np.append(index_left, ind_min)
+
+    return index_right, index_left
+
+
+def float_array(values):
+    """
+    Convert values to a float array, missing values (None) being kept as is
+
+    Parameters
+    ----------
+    values: list(n) or numpy.array(n)
+        Values to convert
+
+    Returns
+    -------
+    arr: numpy.array(n)
+        Float array, or object array if values contain None
+    """
+    arr = np.asarray(values)
+
+    return arr if arr.dtype == object else arr.astype(float, copy=False)
+
+
+def has_values(values):
+    """
+    Check if a measurement (list or array) is available and not empty
+
+    Parameters
+    ----------
+    values: list(n) or numpy.array(n) or None
+        Measurement values
+
+    Returns
+    -------
+    bool
+        True if values is not None and not empty
+    """
+    return values is not None and len(values) > 0
+
+
 def phase_up_down(phase_tab, pha_calib):
     """
     Phase up and down treatment
@@ -735,13 +751,11 @@ def mean_measure(multi_meas, sigma_flag=True, multi_meas_sigma=None):
 
     Returns
     -------
-    mean_meas: list(m) of float
+    mean_meas: numpy.array(m) of float
         Mean of mean multi measure values
-    sigma_meas: list(m) of float
+    sigma_meas: numpy.array(m) of float
         Sigma of mean multi measure values
     """
-    mean_meas, sigma_meas = [], []
-
     def weighted_mean_with_uncertainty(sigmas):
         """
         Calculate weighted mean with uncertainty.
@@ -756,24 +770,26 @@ def mean_measure(multi_meas, sigma_flag=True, multi_meas_sigma=None):
         sigma: float
             Weighted uncertainty
         """
-        weights = 1 / np.array(sigmas) ** 2
+        weights = 1 / np.array(sigmas, dtype=float) ** 2
         sigma = 1 / np.sqrt(np.sum(weights))
         return sigma
 
-    transp = np.transpose(multi_meas)
-    for i in range(np.shape(transp)[0]):
-        mean_meas_val = np.mean(list(filter(
-            lambda x: x is not None, transp[i])))
-        mean_meas.append(mean_meas_val)
-        if sigma_flag:
-            sigma_meas.append(np.sqrt(np.var(list(filter(
-                lambda x: x is not None, transp[i])))))
-        elif multi_meas_sigma:
-            unc = weighted_mean_with_uncertainty(multi_meas_sigma)
-            sigma_meas.append(unc)
-
-    if not sigma_meas:
-        sigma_meas = None
+    # One line per measure point, contiguous for the reductions
+    transp = np.transpose(np.array(multi_meas))
+    if transp.dtype == object:
+        # Missing values (None) are removed point by point
+        columns = [np.array([elem for elem in column if elem is not None],
+                            dtype=float) for column in transp]
+        mean_meas = np.array([np.mean(column) for column in columns])
+        sigma_meas = np.array([np.std(column) for column in columns])
+    else:
+        transp = np.ascontiguousarray(transp, dtype=float)
+        mean_meas = np.mean(transp, axis=1)
+        sigma_meas = np.std(transp, axis=1)
+
+    if not sigma_flag:
+        sigma_meas = np.full(len(mean_meas), weighted_mean_with_uncertainty(
+            multi_meas_sigma)) if multi_meas_sigma else None
 
     return mean_meas, sigma_meas
 
@@ -1,11 +1,19 @@
 """
 Module used for nanoloop: - save and read files
+                          - consolidated nanoloop store of a grid
 """
 
 from datetime import datetime
 import os
+import json
 import numpy as np
 
+NANOLOOP_KEYS = ['Index Pix', 'Read Volt', 'Write Volt', 'Amplitude', 'Phase',
+                 'Res Freq', 'Q Fact', 'Sigma Amp', 'Sigma Pha',
+                 'Sigma Res Freq', 'Sigma Q Fact']
+NANOLOOP_STORE_NAME = 'nanoloops_store'
+NANOLOOP_STORE_CACHE = {}
+
 
 def sort_nanoloop_data(ss_pfm_bias, write_nb_voltages, read_nb_voltages,
                        dict_res, unit='a.u'):
@@ -75,6 +83,33 @@ def sort_nanoloop_data(ss_pfm_bias, write_nb_voltages, read_nb_voltages,
     return loop, tuple(fmt), header
 
 
+def nanoloop_file_name(file_name_root, mode='Off field'):
+    """
+    Name of the nanoloop text file of a measurement file
+
+    Parameters
+    ----------
+    file_name_root: str
+        Name of root for the file (name of the measurement file without
+        extension)
+    mode: str, optional
+        'Off field' or 'On field'
+
+    Returns
+    -------
+    file_name: str
+        Name of the nanoloop text file
+    """
+    if mode == 'Off field':
+        lab = 'off_f_'
+    elif mode == 'On field':
+        lab = 'on_f_'
+    else:
+        raise IOError('mode in [\'Off field\',\'On field\']')
+
+    return lab + file_name_root + '.txt'
+
+
 def save_nanoloop_file(dir_path_out, file_name_root, loop_dict, fmt, header,
                        segment_info=None, mode='Off field'):
     """
@@ -106,17 +141,8 @@ def save_nanoloop_file(dir_path_out, file_name_root, loop_dict, fmt, header,
     if not os.path.isdir(dir_path_out):
         os.makedirs(dir_path_out)
 
-    if mode == 'Off field':
-        lab = 'off_f_'
-    elif mode == 'On field':
-        lab = 'on_f_'
-    else:
-        raise IOError('mode in [\'Off field\',\'On field\']')
-
-    usual_keys = ['Index Pix', 'Read Volt', 'Write Volt', 'Amplitude', 'Phase',
-                  'Res Freq', 'Q Fact', 'Sigma Amp', 'Sigma Pha',
-                  'Sigma Res Freq', 'Sigma Q Fact']
-    file_path_out = os.path.join(dir_path_out, lab + file_name_root + '.txt')
+    file_path_out = os.path.join(dir_path_out,
+                                 nanoloop_file_name(file_name_root, mode=mode))
 
     # Add data and segment info in the file header
     date = datetime.now().strftime('%Y-%m-%d %H;%M')
@@ -130,7 +156,7 @@ def save_nanoloop_file(dir_path_out, file_name_root, loop_dict, fmt, header,
         segment_info_str = ''
     # Title of the rows
     loop_tab = [loop_dict[key]
-                for key in usual_keys if loop_dict[key] is not None]
+                for key in NANOLOOP_KEYS if loop_dict[key] is not None]
 
     header = date_str + segment_info_str + header
 
@@ -164,44 +190,17 @@ def extract_nanoloop_data(file_path_in):
     other_properties: dict
         Other properties about the segment (topography, mechanical measurement)
     """
-    assert os.path.isfile(file_path_in)
-
-    def count_header_lines(f_path):
-        """
-        Count the header of lines starting with '#' at the beginning of the
-        file.
-
-        Parameters
-        ----------
-        f_path : str
-            Path to the text file.
-
-        Returns
-        -------
-        count : int
-            Number of lines starting with '#' at the beginning of the file.
-        """
-        count = 0
-        with open(f_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                if line.strip().startswith('#'):
-                    count += 1
-                else:
-                    break
-        return count
-
-    num_header_lines = count_header_lines(file_path_in)
-    data_tab = np.transpose(np.genfromtxt(file_path_in, delimiter='\t\t',
-                                          skip_header=num_header_lines))
-    with open(file_path_in, encoding='latin-1') as data_file:
-        lines = data_file.readlines()
+    # Nanoloop of the consolidated store of the directory (no txt file)
+    if not os.path.isfile(file_path_in) and \
+            nanoloop_store_exists(os.path.split(file_path_in)[0]):
+        return read_store_nanoloop(file_path_in)
 
-    header = [line.replace('# ', '') for line in lines if line.startswith('#')]
+    header, data_tab = read_nanoloop_file(file_path_in)
 
     # Extract other segment properties
     other_properties = None
     for line in header:
-        if 'Segment other properties: ' in line:
+        if line.startswith('Segment other properties: '):
             line_other_properties = \
                 line.replace('Segment other properties: ', '')
             tab_other_properties = line_other_properties.split(', ')
@@ -211,10 +210,128 @@ def extract_nanoloop_data(file_path_in):
                 other_properties[splited_prop[0]] = splited_prop[1]
 
     # Extract title of the rows
-    meas_keys = header[-1].split('\t')
-    if "\n" in meas_keys:
-        meas_keys.remove("\n")
+    meas_keys = [key for key in header[-1].split('\t') if key]
+
+    if os.path.split(file_path_in)[1].split('_')[0] == 'on':
+        label = 'On field'
+    else:
+        label = 'Off field'
+
+    data_dict, dict_str = nanoloop_data_dict(meas_keys, data_tab, mode=label)
+
+    return data_dict, dict_str, other_properties
+
 
+def read_nanoloop_file(file_path_in):
+    """
+    Read a nanoloop txt file in a single pass: the file is read once in
+    memory, the header lines (starting with '#') are separated from the
+    numeric block, which is converted with a whitespace tokenizer
+    (np.genfromtxt is only used as a fallback for irregular blocks)
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of loop txt file (in)
+
+    Returns
+    -------
+    header: list of str
+        Header lines of the file (without '# ' and end of line)
+    data_tab: numpy.array(m*n) of float
+        Nanoloop data (m rows of length n)
+    """
+    assert os.path.isfile(file_path_in)
+
+    with open(file_path_in, encoding='latin-1') as data_file:
+        lines = data_file.read().splitlines()
+
+    num_header_lines = 0
+    for line in lines:
+        if not line.strip().startswith('#'):
+            break
+        num_header_lines += 1
+    header = [line.strip()[2:] if line.strip().startswith('# ')
+              else line.strip()[1:] for line in lines[:num_header_lines]]
+    data_lines = [line for line in lines[num_header_lines:] if line.strip()]
+
+    nb_col = len(data_lines[0].split()) if data_lines else 0
+    tokens = ' '.join(data_lines).split()
+    if nb_col == 0 or len(tokens) != nb_col * len(data_lines):
+        # Irregular block (missing values): np.genfromtxt management
+        data_tab = np.atleast_2d(np.genfromtxt(data_lines, delimiter='\t\t'))
+        return header, np.transpose(data_tab)
+
+    try:
+        values = np.array(tokens, dtype=float)
+    except ValueError:
+        # Values saved as 'np.nan', 'None' ...: nan as with np.genfromtxt
+        values = np.empty(len(tokens))
+        for cont, token in enumerate(tokens):
+            try:
+                values[cont] = float(token)
+            except ValueError:
+                values[cont] = np.nan
+
+    return header, values.reshape(len(data_lines), nb_col).T
+
+
+def nanoloop_data(loop_dict, header, other_properties=None, mode='Off field'):
+    """
+    Nanoloop data of a pixel in memory (result of sort_nanoloop_data), with
+    the same structure as the data extracted from the nanoloop txt file
+    (see extract_nanoloop_data) without the text round trip
+
+    Parameters
+    ----------
+    loop_dict: dict
+        Nanoloop data (result of sort_nanoloop_data)
+    header: str
+        Title of data (result of sort_nanoloop_data)
+    other_properties: dict, optional
+        Other properties about the segment (topography, mechanical
+        measurement ...)
+    mode: str, optional
+        'Off field' or 'On field'
+
+    Returns
+    -------
+    data_dict: dict
+        Object containing all the data loop
+    dict_str: dict
+        Used for figure annotation
+    other_properties: dict
+        Other properties about the segment (topography, mechanical measurement)
+    """
+    meas_keys = [key for key in header.split('\t') if key]
+    data_tab = np.array([loop_dict[key] for key in NANOLOOP_KEYS
+                         if loop_dict[key] is not None], dtype=float)
+    data_dict, dict_str = nanoloop_data_dict(meas_keys, data_tab, mode=mode)
+
+    return data_dict, dict_str, \
+        dict(other_properties) if other_properties else None
+
+
+def nanoloop_data_dict(meas_keys, data_tab, mode='Off field'):
+    """
+    Identify the nanoloop data with the titles of the rows
+
+    Parameters
+    ----------
+    meas_keys: list of str
+        Titles of the rows (e.g. 'Amplitude (a.u)')
+    data_tab: numpy.array(m*n) of float
+        Nanoloop data (m rows of length n)
+    mode: str, optional
+        'Off field' or 'On field'
+
+    Returns
+    -------
+    data_dict: dict
+        Object containing all the data loop
+    dict_str: dict
+        Used for figure annotation
+    """
     data_dict = {}
     key_labs = ['index', 'read', 'write', 'amplitude', 'phase', 'freq',
                 'q fact', 'sigma amp', 'sigma pha']
@@ -226,23 +343,280 @@ def extract_nanoloop_data(file_path_in):
             if lab in key.lower():
                 name = lab
                 index += 1
-        data_values = data_tab[index]
-        data_values = [np.nan if np.isnan(value) else value for value in
-                       data_values]
-        data_dict[name] = data_values
+        data_dict[name] = list(data_tab[index])
 
     unit = ''
     for elem in meas_keys:
         if 'Amplitude' in elem:
             unit = elem.split()[1][1:-1]
 
-    if os.path.split(file_path_in)[1].split('_')[0] == 'on':
-        label, col = 'On field', 'y'
-    else:
-        label, col = 'Off field', 'w'
+    col = 'y' if mode == 'On field' else 'w'
+    dict_str = {'unit': unit, 'label': mode, 'col': col}
 
-    dict_str = {'unit': unit, 'label': label, 'col': col}
+    return data_dict, dict_str
 
-    data_file.close()
 
-    return data_dict, dict_str, other_properties
+def init_nanoloop_store(dir_path_out, file_names_root):
+    """
+    Init a consolidated nanoloop store of a grid: the nanoloops of all the
+    pixels (i.e. measurement files) are saved in a single (pixel * mode *
+    measurement * point) array (.npy file, NaN padded) and a json header
+    (name of each nanoloop, keys and annotation of each mode, other
+    properties of each pixel), instead of one txt file per pixel and per mode.
+    The store has a single writer (see write_nanoloop_store): with
+    multiprocessing, the nanoloops are sent to the parent process.
+
+    Parameters
+    ----------
+    dir_path_out: str
+        Path of the nanoloop directory (out)
+    file_names_root: list of str
+        Name of root of each pixel (name of the measurement file without
+        extension), in the order of the pixels
+
+    Returns
+    -------
+    store: dict
+        Nanoloop store in writing mode (the array is created with the first
+        written pixel)
+    """
+    if not os.path.isdir(dir_path_out):
+        os.makedirs(dir_path_out)
+
+    return {'path': dir_path_out, 'data': None,
+            'header': {'pixels': list(file_names_root), 'modes': [],
+                       'files': {}, 'keys': {}, 'dict str': {},
+                       'other properties': [None] * len(file_names_root),
+                       'written': [False] * len(file_names_root),
+                       'lengths': [None] * len(file_names_root),
+                       'shape': None, 'dtype': 'float64'}}
+
+
+def write_nanoloop_store(store, index, tab_nanoloops):
+    """
+    Write the nanoloops of a pixel in the store: the pixel is checked first,
+    so that a pixel not consistent with the store (measurements, length)
+    raises IOError without being partly written
+
+    Parameters
+    ----------
+    store: dict
+        Nanoloop store in writing mode (see init_nanoloop_store)
+    index: int
+        Index of the pixel
+    tab_nanoloops: list of tuple
+        Name of the nanoloop file and nanoloop data (data_dict, dict_str,
+        other_properties) for each mode (see nanoloop_data)
+
+    Returns
+    -------
+    None
+    """
+    header = store['header']
+    if store['data'] is None:
+        # Structure of the store: modes, keys and length of the first pixel
+        for file_name, (data_dict, dict_str, _) in tab_nanoloops:
+            header['modes'].append(dict_str['label'])
+            header['keys'][dict_str['label']] = list(data_dict.keys())
+            header['dict str'][dict_str['label']] = dict(dict_str)
+            header['files'][dict_str['label']] = \
+                [None] * len(header['pixels'])
+        nb_keys = max(len(keys) for keys in header['keys'].values())
+        nb_points = max(len(values) for _, (data_dict, _, _) in tab_nanoloops
+                        for values in data_dict.values())
+        header['shape'] = [len(header['pixels']), len(header['modes']),
+                           nb_keys, nb_points]
+        store['data'] = np.lib.format.open_memmap(
+            os.path.join(store['path'], NANOLOOP_STORE_NAME + '.npy.tmp'),
+            mode='w+', dtype=np.float64, shape=tuple(header['shape']))
+        store['data'][:] = np.nan
+
+    for file_name, (data_dict, dict_str, _) in tab_nanoloops:
+        keys = header['keys'].get(dict_str['label'])
+        if list(data_dict.keys()) != keys:
+            raise IOError(f"measurements of {file_name} ({list(data_dict)}) "
+                          f"not consistent with the store ({keys})")
+        nb_points = max((len(values) for values in data_dict.values()),
+                        default=0)
+        if nb_points > header['shape'][3]:
+            raise IOError(f"length of {file_name} ({nb_points}) greater "
+                          f"than the length of the store "
+                          f"({header['shape'][3]})")
+
+    other_properties, lengths = None, [0] * len(header['modes'])
+    for file_name, (data_dict, dict_str, other_prop) in tab_nanoloops:
+        mode_index = header['modes'].index(dict_str['label'])
+        keys = header['keys'][dict_str['label']]
+        for key_index, key in enumerate(keys):
+            values = np.asarray(data_dict[key], dtype=np.float64)
+            store['data'][index, mode_index, key_index, :len(values)] = values
+            lengths[mode_index] = max(lengths[mode_index], len(values))
+        header['files'][dict_str['label']][index] = file_name
+        other_properties = other_properties or other_prop
+    # Other properties saved as in the txt files (values as str)
+    header['other properties'][index] = \
+        {key: str(value) for key, value in other_properties.items()} \
+        if other_properties else None
+    header['lengths'][index] = lengths
+    header['written'][index] = True
+
+
+def close_nanoloop_store(store):
+    """
+    Close the nanoloop store in writing mode: the array file and the json
+    header are saved (the array is renamed once complete)
+
+    Parameters
+    ----------
+    store: dict
+        Nanoloop store in writing mode (see init_nanoloop_store)
+
+    Returns
+    -------
+    file_path_out: str or None
+        Path of the .npy nanoloop store file (out), None if no pixel written
+    """
+    if store['data'] is None:
+        return None
+    store['data'].flush()
+    store['data'] = None
+    file_path_out = os.path.join(store['path'], NANOLOOP_STORE_NAME + '.npy')
+    os.replace(file_path_out + '.tmp', file_path_out)
+    header_path_out = os.path.join(store['path'],
+                                   NANOLOOP_STORE_NAME + '.json')
+    with open(header_path_out, 'w', encoding='utf-8') as file:
+        json.dump(store['header'], file, indent=4)
+
+    return file_path_out
+
+
+def nanoloop_store_exists(dir_path_in):
+    """
+    Check if a directory contains a consolidated nanoloop store
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Path of the nanoloop directory (in)
+
+    Returns
+    -------
+    exists: bool
+        True if the directory contains a nanoloop store
+    """
+    return os.path.isfile(os.path.join(dir_path_in,
+                                       NANOLOOP_STORE_NAME + '.json'))
+
+
+def open_nanoloop_store(dir_path_in):
+    """
+    Open the consolidated nanoloop store of a directory (see
+    init_nanoloop_store). The store is opened once per process
+    (memory-mapped array and header kept in NANOLOOP_STORE_CACHE) and opened
+    again only if it is modified.
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Path of the nanoloop directory (in)
+
+    Returns
+    -------
+    store: dict
+        'data': numpy.memmap(n*k*m*p) of float, (pixel * mode * measurement *
+        point) array in read only mode, 'header': dict, header of the store,
+        'file index': dict, (pixel index, mode index) of each nanoloop name
+    """
+    file_path_in = os.path.join(dir_path_in, NANOLOOP_STORE_NAME + '.npy')
+    header_path_in = os.path.join(dir_path_in, NANOLOOP_STORE_NAME + '.json')
+    signature = (os.stat(file_path_in).st_mtime_ns,
+                 os.stat(header_path_in).st_mtime_ns)
+    cache_key = os.path.abspath(dir_path_in)
+    store = NANOLOOP_STORE_CACHE.get(cache_key)
+
+    if store is None or store['signature'] != signature:
+        with open(header_path_in, 'r', encoding='utf-8') as file:
+            header = json.load(file)
+        data = np.load(file_path_in, mmap_mode='r')
+        if list(data.shape) != header['shape']:
+            raise IOError(f"shape of {file_path_in} ({data.shape}) is not "
+                          f"consistent with its header ({header['shape']})")
+        file_index = {}
+        for mode_index, mode in enumerate(header['modes']):
+            for pixel_index, file_name in enumerate(header['files'][mode]):
+                if file_name is not None:
+                    file_index[file_name] = (pixel_index, mode_index)
+        store = {'signature': signature, 'data': data, 'header': header,
+                 'file index': file_index}
+        NANOLOOP_STORE_CACHE[cache_key] = store
+
+    return store
+
+
+def store_nanoloop_paths(dir_path_in, mode=''):
+    """
+    Paths of the nanoloops of the store (name of the nanoloop txt files
+    which are replaced by the store), in the order of the pixels
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Path of the nanoloop directory (in)
+    mode: str, optional
+        To not have a restricted selection, mode = ''
+        To select only Off Field measurement: mode = 'off_f'
+        To select only On Field measurement: mode = 'on_f'
+
+    Returns
+    -------
+    file_paths_in: list of list of str
+        Paths of the nanoloops of each written pixel (off field first)
+    """
+    header = open_nanoloop_store(dir_path_in)['header']
+    modes = {'off_f': ['Off field'], 'on_f': ['On field'],
+             '': ['Off field', 'On field']}[mode]
+    modes = [elem for elem in modes if elem in header['modes']]
+
+    return [[os.path.join(dir_path_in, header['files'][elem][index])
+             for elem in modes]
+            for index, written in enumerate(header['written']) if written]
+
+
+def read_store_nanoloop(file_path_in):
+    """
+    Read the nanoloop data of a pixel of the store (random access, no
+    parsing), with the same structure as the data extracted from the
+    nanoloop txt file (see extract_nanoloop_data)
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the nanoloop: path of the store directory joined with the
+        name of the nanoloop txt file
+
+    Returns
+    -------
+    data_dict: dict
+        Object containing all the data loop
+    dict_str: dict
+        Used for figure annotation
+    other_properties: dict
+        Other properties about the segment (topography, mechanical measurement)
+    """
+    dir_path_in, file_name = os.path.split(file_path_in)
+    store = open_nanoloop_store(dir_path_in)
+    try:
+        pixel_index, mode_index = store['file index'][file_name]
+    except KeyError as error:
+        raise IOError(f"{file_name} not in the nanoloop store of "
+                      f"{dir_path_in}") from error
+    header = store['header']
+    mode = header['modes'][mode_index]
+    length = header['lengths'][pixel_index][mode_index]
+    data_tab = store['data'][pixel_index, mode_index, :, :length]
+    data_dict = {key: list(data_tab[key_index])
+                 for key_index, key in enumerate(header['keys'][mode])}
+    other_properties = header['other properties'][pixel_index]
+
+    return data_dict, dict(header['dict str'][mode]), \
+        dict(other_properties) if other_properties else None
@@ -6,10 +6,11 @@ Module used for the scripts of sspfm 2d step data analysis
 
 import numpy as np
 
-from PySSPFM.utils.core.signal import interpolate
+from PySSPFM.utils.core.signal import interpolate, interpolate_batch
 # pylint: disable=unused-import
 from PySSPFM.utils.core.basic_func import linear, sigmoid, arctan
-from PySSPFM.utils.core.curve_hysteresis import Hysteresis
+from PySSPFM.utils.core.curve_hysteresis import \
+    Hysteresis, HysteresisBatchFit, stack_hysteresis
 from PySSPFM.utils.core.noise import filter_mean
 from PySSPFM.utils.nanoloop.plot import plot_meanloop
 from PySSPFM.utils.nanoloop.analysis import AllMeanLoop
@@ -194,6 +195,182 @@ def init_hysteresis_params(hyst, counterclockwise, grounded_tip,
     return bckgnd
 
 
+def init_hysteresis_batch_params(x_tab, y_tab, counterclockwise,
+                                 grounded_tip, analysis_mode='mean_loop',
+                                 locked_elec_slope=None):
+    """
+    Initiate hysteresis parameters and bckgnd function from analysis_mode for
+    the fit of a stack of hysteresis (same bounds and initial guesses as
+    init_hysteresis_params for each hysteresis, computed at once)
+
+    Parameters
+    ----------
+    x_tab: numpy.array(n*2*m) of float
+        x values of the branches of each hysteresis (missing values are nan)
+    y_tab: numpy.array(n*2*m) of float
+        y values of the branches of each hysteresis (missing values are nan)
+    counterclockwise: bool or list(n) of bool
+        Specifies if the hysteresis is counterclockwise (for each hysteresis)
+    grounded_tip: bool or list(n) of bool
+        Flag indicating whether the tip is grounded (for each hysteresis).
+    analysis_mode: str, optional
+        Operating mode for the reader: three possible mode:
+        - 'on_f_loop' for on field measurement
+        - 'mean_loop' for off field measurement with a constant value of read
+        voltage
+        - 'multi_loop' for off field measurement with different value of read
+        voltage
+    locked_elec_slope: str, optional
+        Electrostatic slope sign is locked with this parameter
+
+    Returns
+    -------
+    init_params: dict of dict
+        Initial guesses for the fit parameters ('value', 'vary', 'min', 'max'
+        keys, arrays with one value per hysteresis), see HysteresisBatchFit
+    bckgnd: str
+        Keyword to take into account baseline in the hysteresis model among
+        ('linear', 'offset', None)
+    """
+    x_tab = np.asarray(x_tab, dtype=float)
+    y_tab = np.asarray(y_tab, dtype=float)
+    ones = np.ones(len(x_tab))
+    counterclockwise = np.broadcast_to(
+        np.asarray(counterclockwise, dtype=bool), ones.shape)
+    grounded_tip = np.broadcast_to(np.asarray(grounded_tip, dtype=bool),
+                                   ones.shape)
+
+    # Amplitude of hysteresis is set to a negative value for counterclockwise
+    # loop and vice versa (Neumayer et al. : doi: 10.1063/5.0011631)
+    amp_fact = np.where(counterclockwise, 1., -1.)
+
+    # Min and max limits
+    x_min, x_max = np.nanmin(x_tab, axis=(1, 2)), np.nanmax(x_tab, axis=(1, 2))
+    y_min, y_max = np.nanmin(y_tab, axis=(1, 2)), np.nanmax(y_tab, axis=(1, 2))
+
+    # Interpolate and calculate difference for each branch of hysteresis:
+    # Determination of differential hysteresis loop
+    branch_1 = interpolate_batch(x_tab[:, 0], y_tab[:, 0], 1)
+    branch_2 = interpolate_batch(x_tab[:, 1], y_tab[:, 1], 1)
+    diff_hyst = np.abs(branch_1['y interp'] - branch_2['y interp'])
+    valid = np.isfinite(diff_hyst)
+    diff_hyst = filter_mean(np.where(valid, diff_hyst, 0.), window_size=5)
+
+    # ampli_0: max of differential hysteresis loop
+    guess_amp = np.max(np.where(valid, diff_hyst, -np.inf), axis=1)
+
+    # x0_0 and x0_1: max(abs(slopes)) of differential hysteresis loop
+    slopes = np.diff(diff_hyst, axis=1)
+    valid_slopes = valid[:, 1:]
+    ind_max = np.argmax(np.where(valid_slopes, slopes, -np.inf), axis=1)
+    ind_min = np.argmin(np.where(valid_slopes, slopes, np.inf), axis=1)
+    guess_x0s = [np.take_along_axis(branch_1['x interp'],
+                                    ind_max[:, np.newaxis], axis=1)[:, 0],
+                 np.take_along_axis(branch_2['x interp'],
+                                    ind_min[:, np.newaxis], axis=1)[:, 0]]
+
+    init_params = {
+        "offset": {"value": 0 * ones, "vary": True, "min": y_min,
+                   "max": y_max},
+        "slope": {"value": 0 * ones, "vary": True, "min": -np.inf * ones,
+                  "max": np.inf * ones},
+        "x0_0": {"value": np.min(guess_x0s, axis=0), "vary": True,
+                 "min": x_min, "max": x_max},
+        "x0_1": {"value": np.max(guess_x0s, axis=0), "vary": True,
+                 "min": x_min, "max": x_max}}
+    for cont in range(2):
+        # Slope of switch is set to positive value
+        init_params[f"coef_{cont}"] = {"value": ones, "vary": True,
+                                       "min": 0 * ones, "max": np.inf * ones}
+        init_params[f"ampli_{cont}"] = {
+            "value": amp_fact * guess_amp, "vary": True,
+            "min": np.where(counterclockwise, 0., -np.inf),
+            "max": np.where(counterclockwise, np.inf, 0.)}
+
+    # Set bckgnd and slope based on analysis_mode
+    if analysis_mode in ['mean_loop', 'multi_loop']:
+        bckgnd = 'offset'
+        init_params['slope']['vary'] = False
+    elif analysis_mode == 'on_f_loop':
+        bckgnd = 'linear'
+        if locked_elec_slope is None:
+            # Grounded tip -> negative slope of electrostatic component
+            # Grounded bottom -> positive slope of electrostatic component
+            coef_slope = np.where(grounded_tip, -1., 1.)
+        elif locked_elec_slope == 'positive':
+            coef_slope = ones
+        elif locked_elec_slope == 'negative':
+            coef_slope = -ones
+        else:
+            raise NotImplementedError(
+                "locked_elec_slope should be None or 'negative' or 'positive'")
+        init_params['slope'] = {
+            "value": coef_slope * (y_max - y_min) / (x_max - x_min),
+            "vary": True, "min": np.where(coef_slope > 0, 0., -np.inf),
+            "max": np.where(coef_slope > 0, np.inf, 0.)}
+    else:
+        raise IOError('analysis_mode must be one of [\'mean_loop\', '
+                      '\'multi_loop\', \'on_f_loop\']')
+
+    return init_params, bckgnd
+
+
+def batch_hyst_fit(x_hyst_tab, y_hyst_tab, counterclockwise, grounded_tip,
+                   analysis_mode='mean_loop', model='sigmoid',
+                   asymmetric=False, locked_elec_slope=None):
+    """
+    Fit the hysteresis of all the pixels at once (vectorized solver, see
+    HysteresisBatchFit), with the same bounds and initial guesses as the
+    fit of hyst_analysis
+
+    Parameters
+    ----------
+    x_hyst_tab: list(n) of list(2) of numpy.array(m)
+        Write voltage value associated with the left and right segments of
+        the hysteresis (in V) of each pixel
+    y_hyst_tab: list(n) of list(2) of numpy.array(m)
+        Piezoresponse value associated with the left and right segments of
+        the hysteresis (in a.u or nm) of each pixel
+    counterclockwise: bool or list(n) of bool
+        Specifies if the hysteresis is counterclockwise (for each pixel)
+    grounded_tip: bool or list(n) of bool
+        Flag indicating whether the tip is grounded (for each pixel).
+    analysis_mode: str, optional
+        Operating mode for the reader: three possible modes:
+        - 'on_f_loop' for on-field measurement
+        - 'mean_loop' for off-field measurement with a constant value
+        of read voltage
+        - 'multi_loop' for off-field measurement with different values
+        of read voltage
+    model: str, optional
+        Algebraic model of the branch: 'sigmoid' or 'arctan'
+    asymmetric: bool, optional
+        Activation keyword to deal with asymmetric hysteresis
+    locked_elec_slope: str, optional
+        Electrostatic slope sign is locked with this parameter
+
+    Returns
+    -------
+    fit_params: dict
+        Fitted values of each hysteresis parameter ('offset', 'slope',
+        'ampli_0', 'ampli_1', 'coef_0', 'coef_1', 'x0_0', 'x0_1'),
+        numpy.array(n) with one value per pixel
+    success: numpy.array(n) of bool
+        Convergence flag of the fit of each pixel
+    bckgnd: str
+        Keyword to take into account baseline in the hysteresis model among
+        ('linear', 'offset', None)
+    """
+    x_tab, y_tab = stack_hysteresis(x_hyst_tab, y_hyst_tab)
+    init_params, bckgnd = init_hysteresis_batch_params(
+        x_tab, y_tab, counterclockwise, grounded_tip,
+        analysis_mode=analysis_mode, locked_elec_slope=locked_elec_slope)
+    hyst_batch = HysteresisBatchFit(model=model, asymmetric=asymmetric)
+    hyst_batch.fit(x_tab, y_tab, init_params=init_params)
+
+    return hyst_batch.report_fit_results(), hyst_batch.success, bckgnd
+
+
 def find_best_nanoloop(loop_tab, counterclockwise, grounded_tip,
                        analysis_mode='mean_loop', del_1st_loop=False,
                        model='sigmoid', asymmetric=False, method='leastsq',
@@ -285,7 +462,7 @@ def hyst_analysis(x_hyst, y_hyst, best_loop, counterclockwise, grounded_tip,
                   dict_str=None, infl_threshold=10, sat_threshold=90,
                   model='sigmoid', asymmetric=False, method='leastsq',
                   analysis_mode='mean_loop', locked_elec_slope=None,
-                  make_plots=False):
+                  make_plots=False, fit_params=None, init_fit_params=None):
     """
     Generate hysteresis, perform fit and extract parameters + properties
 
@@ -329,6 +506,13 @@ def hyst_analysis(x_hyst, y_hyst, best_loop, counterclockwise, grounded_tip,
         Electrostatic slope sign is locked with this parameter
     make_plots: bool, optional
         Activation key for matplotlib figure generation
+    fit_params: dict, optional
+        Fitted values of the hysteresis parameters (e.g. for the pixel in the
+        result of batch_hyst_fit): the hysteresis is not fitted if provided
+    init_fit_params: dict, optional
+        Initial values of the hysteresis parameters (e.g. fitted values of a
+        neighbor pixel, see WarmStart): the fit is performed again from the
+        default initial values if unsuccessful
 
     Returns
     -------
@@ -348,11 +532,34 @@ def hyst_analysis(x_hyst, y_hyst, best_loop, counterclockwise, grounded_tip,
     bckgnd = init_hysteresis_params(
         best_hyst, counterclockwise, grounded_tip, analysis_mode=analysis_mode,
         locked_elec_slope=locked_elec_slope, x_hyst=x_hyst, y_hyst=y_hyst)
-    try:
-        best_hyst.fit(x_hyst, y_hyst, verbosity=False, method=method)
-    except ValueError:
-        print("ValueError management with except: hysteresis fit is "
-              "unsuccessful")
+    if fit_params is not None:
+        for key, value in fit_params.items():
+            if not best_hyst.params[key].expr:
+                best_hyst.params[key].set(value=value)
+    else:
+        # Fit from the parameters of a neighbor pixel (warm start), performed
+        # again from the default initial values if unsuccessful
+        if init_fit_params is not None:
+            for key, value in init_fit_params.items():
+                if not best_hyst.params[key].expr:
+                    best_hyst.params[key].set(value=value)
+            try:
+                best_hyst.fit(x_hyst, y_hyst, verbosity=False, method=method)
+            except ValueError:
+                best_hyst.success = False
+            if not best_hyst.success:
+                best_hyst = Hysteresis(model=model, asymmetric=asymmetric)
+                init_hysteresis_params(
+                    best_hyst, counterclockwise, grounded_tip,
+                    analysis_mode=analysis_mode,
+                    locked_elec_slope=locked_elec_slope, x_hyst=x_hyst,
+                    y_hyst=y_hyst)
+        if init_fit_params is None or not best_hyst.success:
+            try:
+                best_hyst.fit(x_hyst, y_hyst, verbosity=False, method=method)
+            except ValueError:
+                print("ValueError management with except: hysteresis fit is "
+                      "unsuccessful")
 
     # Plot multiloop
     if make_plots:
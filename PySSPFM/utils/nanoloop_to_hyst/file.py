@@ -4,13 +4,20 @@ Module used for the scripts of sspfm 2d step data analysis
     - Open and read files
     - Print info
     - Save measurements and parameters
+    - Binary property store of sspfm maps
 """
 
 import os
+import json
 import numpy as np
 
 from PySSPFM.utils.core.path_management import \
     get_filenames_with_conditions, sort_filenames
+from PySSPFM.utils.nanoloop.file import \
+    nanoloop_store_exists, store_nanoloop_paths
+
+PROPERTY_STORE_NAME = 'properties_store'
+PROPERTY_STORE_CACHE = {}
 
 
 def create_file_nanoloop_paths(dir_path_in_raw, mode=''):
@@ -52,9 +59,35 @@ def create_file_nanoloop_paths(dir_path_in_raw, mode=''):
     return file_paths_in
 
 
+def nanoloop_file_names(dir_path_in):
+    """
+    Names of all nanoloop txt loop files of a directory. If the directory
+    contains a consolidated nanoloop store, the names of its nanoloops are
+    returned (see store_nanoloop_paths).
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Path of the txt nanoloop files directory (in)
+
+    Returns
+    ----------
+    file_names: list of str
+        Names of the nanoloop txt files
+    """
+    if nanoloop_store_exists(dir_path_in):
+        return [os.path.split(file_path)[1]
+                for tab_path in store_nanoloop_paths(dir_path_in)
+                for file_path in tab_path]
+
+    return [file for file in os.listdir(dir_path_in) if file.endswith('.txt')]
+
+
 def generate_file_nanoloop_paths(dir_path_in, mode=''):
     """
-    Generate paths of all nanoloop txt loop files (i.e. pixel)
+    Generate paths of all nanoloop txt loop files (i.e. pixel).
+    If the directory contains a consolidated nanoloop store, the paths of
+    its nanoloops are generated (see store_nanoloop_paths).
 
     Parameters
     ----------
@@ -73,6 +106,9 @@ def generate_file_nanoloop_paths(dir_path_in, mode=''):
     assert os.path.isdir(dir_path_in)
     assert mode in ['', 'off_f', 'on_f']
 
+    if nanoloop_store_exists(dir_path_in):
+        return store_nanoloop_paths(dir_path_in, mode=mode)
+
     tab_file_name = {'off_f': [], 'on_f': []}
     if mode == '':
         for key in ['off_f', 'on_f']:
@@ -148,6 +184,158 @@ def save_properties(properties, dir_path_out, dim_pix=None, dim_mic=None,
                        newline='\n', header=header, fmt='%s')
 
 
+def save_property_store(properties, dir_path_out, dim_pix=None, dim_mic=None,
+                        file_prefix_out=None):
+    """
+    Save properties for sspfm maps in a binary property store: a (property *
+    pixel) array saved in a .npy file (memory-mapped when read, one line per
+    property) and a json header (mode and name of each property, map
+    dimensions). The store can be exported in the txt property files (see
+    export_property_store).
+
+    Parameters
+    ----------
+    properties: dict
+        Dictionary of properties of sspfm maps
+    dir_path_out: str
+        Path of the directory for saving the property store (output)
+    dim_pix: dict('x': ,'y':) of int, optional
+        Dictionary of map dimensions for 'x' and 'y' axis (in pixels)
+    dim_mic: dict('x': ,'y':) of float, optional
+        Dictionary of map dimensions for 'x' and 'y' axis (in microns)
+    file_prefix_out: str, optional
+        Prefix for the names of the property files (used for the export in
+        txt property files)
+
+    Returns
+    -------
+    file_path_out: str
+        Path of the .npy property store file (out)
+    """
+    file_prefix_out = file_prefix_out or "properties_"
+    if not os.path.isdir(dir_path_out):
+        os.makedirs(dir_path_out)
+
+    tab_keys, tab_props = [], []
+    for key, values in properties.items():
+        for sub_key, sub_values in values.items():
+            list_sub_values = \
+                [elem if elem != 'None' else np.nan for elem in sub_values]
+            tab_keys.append([key, sub_key])
+            tab_props.append(np.array(list_sub_values, dtype=float).ravel())
+    lengths = [len(props) for props in tab_props]
+    data = np.full((len(tab_props), max(lengths, default=0)), np.nan)
+    for cont, props in enumerate(tab_props):
+        data[cont, :len(props)] = props
+
+    file_path_out = os.path.join(dir_path_out, PROPERTY_STORE_NAME + '.npy')
+    with open(file_path_out + '.tmp', 'wb') as file:
+        np.save(file, data)
+    os.replace(file_path_out + '.tmp', file_path_out)
+
+    header = {'modes': list(properties.keys()),
+              'properties': tab_keys,
+              'lengths': lengths,
+              'dim pix': {key: int(value) for key, value in
+                          dim_pix.items()} if dim_pix else None,
+              'dim mic': {key: float(value) for key, value in
+                          dim_mic.items()} if dim_mic else None,
+              'file prefix': file_prefix_out,
+              'shape': list(data.shape),
+              'dtype': 'float64'}
+    header_path_out = os.path.join(dir_path_out, PROPERTY_STORE_NAME + '.json')
+    with open(header_path_out, 'w', encoding='utf-8') as file:
+        json.dump(header, file, indent=4)
+
+    return file_path_out
+
+
+def property_store_exists(dir_path_in):
+    """
+    Check if a directory contains a binary property store
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Path of the directory of the property files (in)
+
+    Returns
+    -------
+    exists: bool
+        True if the directory contains a property store
+    """
+    return os.path.isfile(os.path.join(dir_path_in,
+                                       PROPERTY_STORE_NAME + '.json'))
+
+
+def open_property_store(dir_path_in):
+    """
+    Open the binary property store of a directory (see save_property_store).
+    The store is opened once per process (memory-mapped array and header
+    kept in PROPERTY_STORE_CACHE) and opened again only if it is modified.
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Path of the directory of the property files (in)
+
+    Returns
+    -------
+    store: dict
+        'data': numpy.memmap(n*p) of float, (property * pixel) array in read
+        only mode, 'header': dict, header of the store, 'properties': dict,
+        values of each property of each mode (memory-mapped line of the
+        array, no copy)
+    """
+    file_path_in = os.path.join(dir_path_in, PROPERTY_STORE_NAME + '.npy')
+    header_path_in = os.path.join(dir_path_in, PROPERTY_STORE_NAME + '.json')
+    signature = (os.stat(file_path_in).st_mtime_ns,
+                 os.stat(header_path_in).st_mtime_ns)
+    cache_key = os.path.abspath(dir_path_in)
+    store = PROPERTY_STORE_CACHE.get(cache_key)
+
+    if store is None or store['signature'] != signature:
+        with open(header_path_in, 'r', encoding='utf-8') as file:
+            header = json.load(file)
+        data = np.load(file_path_in, mmap_mode='r')
+        if list(data.shape) != header['shape']:
+            raise IOError(f"shape of {file_path_in} ({data.shape}) is not "
+                          f"consistent with its header ({header['shape']})")
+        properties = {mode: {} for mode in header['modes']}
+        for cont, ((mode, key), length) in enumerate(
+                zip(header['properties'], header['lengths'])):
+            properties[mode][key] = data[cont, :length]
+        store = {'signature': signature, 'data': data, 'header': header,
+                 'properties': properties}
+        PROPERTY_STORE_CACHE[cache_key] = store
+
+    return store
+
+
+def export_property_store(dir_path_in, dir_path_out=None):
+    """
+    Export the binary property store of a directory in txt property files
+    (see save_properties), for compatibility
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Path of the directory of the property store (in)
+    dir_path_out: str, optional
+        Path of the directory for saving the property files (output)
+        (default: dir_path_in)
+
+    Returns
+    -------
+    None
+    """
+    store = open_property_store(dir_path_in)
+    header = store['header']
+    save_properties(store['properties'], dir_path_out or dir_path_in,
+                    dim_pix=header['dim pix'], dim_mic=header['dim mic'],
+                    file_prefix_out=header['file prefix'])
+
+
 def save_best_nanoloops(tab_best_loops, dir_path_out,
                         file_prefix_out="best_loop_"):
     """
@@ -185,6 +373,9 @@ def save_best_nanoloops(tab_best_loops, dir_path_out,
                 data_saved.append([])
             for cont, loop in enumerate(value):
                 tab_index.append([])
+                # Pixel failed in multiprocessing mode (see fill_failed)
+                if loop is None:
+                    continue
                 dict_best_loop = {'voltage': loop.amp.write_volt,
                                   'piezoresponse': loop.piezorep.y_meas,
                                   'amp': loop.amp.y_meas,
@@ -251,6 +442,9 @@ def add_header_labels(tab_best_loops, tab_data=None, fmt=None):
 def extract_properties(dir_path_in):
     """
     Extract properties from txt saving files in the specified directory.
+    If the directory contains a binary property store, the properties of
+    the store are read (see open_property_store), and txt files of the
+    other modes (e.g. phase offset) are added.
 
     Parameters
     ----------
@@ -269,6 +463,15 @@ def extract_properties(dir_path_in):
     (properties, dim_pix, dim_mic) = ({}, {}, {})
     dim = ''
 
+    # Binary property store
+    if property_store_exists(dir_path_in):
+        store = open_property_store(dir_path_in)
+        properties = {mode: {key: list(values) for key, values in
+                             props.items()}
+                      for mode, props in store['properties'].items()}
+        dim_pix = dict(store['header']['dim pix'] or {})
+        dim_mic = dict(store['header']['dim mic'] or {})
+
     # Extraction of property files
     file_names = os.listdir(dir_path_in)
     file_names = [file_name for file_name in file_names
@@ -289,6 +492,9 @@ def extract_properties(dir_path_in):
             mode = lines[0][2:-1]
         else:
             mode = os.path.splitext(file_name_in)[0]
+        # Mode already extracted from the property store
+        if mode in properties:
+            continue
         dim = lines[1][2:-3].split(', ')
 
         # Properties extraction
@@ -0,0 +1,350 @@
+"""
+Module used for the on-disk cache of measurements extracted from raw
+measurement files (spm, txt, csv, xlsx):
+    - save and load cache entries (binary npz files)
+    - size-bounded least recently used (LRU) eviction
+    - command line interface to inspect and clear the cache
+        python -m PySSPFM.utils.raw_cache {info,clear}
+"""
+
+import os
+import io
+import json
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+import numpy as np
+
+from PySSPFM.settings import get_setting
+
+SCRIPT_DICT_KEY = '__script_dict__'
+
+
+def get_cache_dir(cache_dir=None):
+    """
+    Get (and create if necessary) the cache directory
+
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Cache directory (default: 'raw_cache_path' setting)
+
+    Returns
+    -------
+    cache_dir: pathlib.Path
+        Cache directory
+    """
+    cache_dir = Path(cache_dir or get_setting("raw_cache_path")).expanduser()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    return cache_dir
+
+
+def cache_key(file_path_in, mode_dfrt=False):
+    """
+    Key of the cache entry of a raw measurement file: hash of its path, size
+    and modification time, of the extraction mode and of the
+    'key_measurement_extraction' setting (measurement identification)
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the raw measurement file (in)
+    mode_dfrt: bool, optional
+        If mode_dfrt is True, a dfrt measure is performed and vice versa
+
+    Returns
+    -------
+    key: str
+        Key of the cache entry
+    """
+    stat = os.stat(file_path_in)
+    content = json.dumps([os.path.abspath(file_path_in), stat.st_size,
+                          stat.st_mtime_ns, bool(mode_dfrt),
+                          get_setting("key_measurement_extraction")],
+                         sort_keys=True)
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def encode_script_dict(script_dict):
+    """
+    Encode the script parameters of a cache entry in a json byte array (no
+    pickle: entries of a shared cache directory are not trusted)
+
+    Parameters
+    ----------
+    script_dict: dict
+        All parameters for sspfm voltage signal and other measurement
+        parameters
+
+    Returns
+    -------
+    array: numpy.array of uint8
+        Json encoded script parameters
+    """
+    content = json.dumps(script_dict,
+                         default=lambda value: np.asarray(value).tolist())
+
+    return np.frombuffer(content.encode('utf-8'), dtype=np.uint8)
+
+
+def decode_script_dict(array):
+    """
+    Decode the script parameters of a cache entry (see encode_script_dict):
+    the ranges (json lists) are converted back to tuples
+
+    Parameters
+    ----------
+    array: numpy.array of uint8
+        Json encoded script parameters
+
+    Returns
+    -------
+    script_dict: dict
+        All parameters for sspfm voltage signal and other measurement
+        parameters
+    """
+    script_dict = json.loads(array.tobytes().decode('utf-8'))
+    if not isinstance(script_dict, dict):
+        raise ValueError('script parameters of the cache entry are not a dict')
+
+    return {key: tuple(value) if isinstance(value, list) else value
+            for key, value in script_dict.items()}
+
+
+def load_cache_entry(file_path_in, mode_dfrt=False, cache_dir=None,
+                     channels=None):
+    """
+    Load the measurements of a raw measurement file from the cache
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the raw measurement file (in)
+    mode_dfrt: bool, optional
+        If mode_dfrt is True, a dfrt measure is performed and vice versa
+    cache_dir: str, optional
+        Cache directory (default: 'raw_cache_path' setting)
+    channels: list of str, optional
+        Measurements to load (keys of dict_meas): the other arrays of the
+        entry are not read. All the measurements are loaded if None.
+
+    Returns
+    -------
+    dict_meas: dict or None
+        All measurement in extracted file (None if not in the cache)
+    script_dict: dict or None
+        All parameters for sspfm voltage signal and other measurement
+        parameters (None if not saved in the cache entry)
+    """
+    entry_path = get_cache_dir(cache_dir) / \
+        (cache_key(file_path_in, mode_dfrt=mode_dfrt) + '.npz')
+    try:
+        with np.load(entry_path) as entry:
+            dict_meas = {key: entry[key] for key in entry.files
+                         if key != SCRIPT_DICT_KEY and
+                         (channels is None or key in channels)}
+            script_dict = decode_script_dict(entry[SCRIPT_DICT_KEY]) \
+                if SCRIPT_DICT_KEY in entry.files else None
+    except (OSError, ValueError):
+        return None, None
+
+    # Access time for LRU eviction (modification time of the entry)
+    try:
+        os.utime(entry_path)
+    except OSError:
+        pass
+
+    return dict_meas, script_dict
+
+
+def save_cache_entry(file_path_in, dict_meas, script_dict=None,
+                     mode_dfrt=False, cache_dir=None, max_size=None):
+    """
+    Save the measurements of a raw measurement file in the cache, and evict
+    the least recently used entries if the cache size exceeds max_size
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the raw measurement file (in)
+    dict_meas: dict
+        All measurement in extracted file
+    script_dict: dict, optional
+        All parameters for sspfm voltage signal and other measurement
+        parameters
+    mode_dfrt: bool, optional
+        If mode_dfrt is True, a dfrt measure is performed and vice versa
+    cache_dir: str, optional
+        Cache directory (default: 'raw_cache_path' setting)
+    max_size: float, optional
+        Maximum size of the cache in MB (default: 'raw_cache_size' setting)
+
+    Returns
+    -------
+    entry_path: pathlib.Path
+        Path of the cache entry
+    """
+    cache_dir = get_cache_dir(cache_dir)
+    entry_path = cache_dir / \
+        (cache_key(file_path_in, mode_dfrt=mode_dfrt) + '.npz')
+    arrays = {key: np.asarray(value, dtype=np.float64)
+              for key, value in dict_meas.items()}
+    if script_dict is not None:
+        arrays[SCRIPT_DICT_KEY] = encode_script_dict(script_dict)
+
+    # Atomic writing (entries can be saved by several processes)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    file_desc, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(file_desc, 'wb') as file:
+        file.write(buffer.getvalue())
+    os.replace(tmp_path, entry_path)
+
+    evict_cache(max_size=max_size, cache_dir=cache_dir)
+
+    return entry_path
+
+
+def cache_entries(cache_dir=None):
+    """
+    List the entries of the cache, from the least to the most recently used
+
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Cache directory (default: 'raw_cache_path' setting)
+
+    Returns
+    -------
+    entries: list of tuple
+        (path, size in bytes, last access time) of each entry
+    """
+    entries = []
+    for entry in os.scandir(get_cache_dir(cache_dir)):
+        if entry.name.endswith('.npz'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((Path(entry.path), stat.st_size, stat.st_mtime))
+
+    return sorted(entries, key=lambda entry: entry[2])
+
+
+def evict_cache(max_size=None, cache_dir=None):
+    """
+    Remove the least recently used entries of the cache until its size is
+    lower than max_size
+
+    Parameters
+    ----------
+    max_size: float, optional
+        Maximum size of the cache in MB (default: 'raw_cache_size' setting)
+    cache_dir: str, optional
+        Cache directory (default: 'raw_cache_path' setting)
+
+    Returns
+    -------
+    nb_removed: int
+        Number of removed entries
+    """
+    if max_size is None:
+        max_size = get_setting("raw_cache_size")
+    entries = cache_entries(cache_dir)
+    size = sum(entry[1] for entry in entries)
+    nb_removed = 0
+    for path, entry_size, _ in entries:
+        if size <= max_size * 1024 ** 2:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        size -= entry_size
+        nb_removed += 1
+
+    return nb_removed
+
+
+def cache_info(cache_dir=None):
+    """
+    Information about the cache
+
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Cache directory (default: 'raw_cache_path' setting)
+
+    Returns
+    -------
+    info: dict
+        Cache directory, number of entries, size and maximum size (in MB)
+    """
+    entries = cache_entries(cache_dir)
+
+    return {'path': str(get_cache_dir(cache_dir)),
+            'entries': len(entries),
+            'size [MB]': sum(entry[1] for entry in entries) / 1024 ** 2,
+            'max size [MB]': get_setting("raw_cache_size")}
+
+
+def clear_cache(cache_dir=None):
+    """
+    Remove all the entries of the cache
+
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Cache directory (default: 'raw_cache_path' setting)
+
+    Returns
+    -------
+    nb_removed: int
+        Number of removed entries
+    """
+    return evict_cache(max_size=0, cache_dir=cache_dir)
+
+
+def main(args=None):
+    """
+    Command line interface to inspect and clear the cache
+
+    Parameters
+    ----------
+    args: list of str, optional
+        Command line arguments (default: sys.argv)
+
+    Returns
+    -------
+    None
+    """
+    parser = argparse.ArgumentParser(
+        description="On-disk cache of raw measurement files (PySSPFM)")
+    parser.add_argument('command', choices=['info', 'clear', 'evict'],
+                        help="'info': print cache information, 'clear': "
+                             "remove all entries, 'evict': remove least "
+                             "recently used entries beyond the maximum size")
+    parser.add_argument('--path', default=None,
+                        help="cache directory (default: 'raw_cache_path' "
+                             "setting)")
+    parser.add_argument('--max-size', type=float, default=None,
+                        help="maximum size in MB for 'evict' "
+                             "(default: 'raw_cache_size' setting)")
+    pars = parser.parse_args(args)
+
+    if pars.command == 'info':
+        for key, value in cache_info(cache_dir=pars.path).items():
+            print(f'{key}: {value}')
+    elif pars.command == 'clear':
+        nb_removed = clear_cache(cache_dir=pars.path)
+        print(f'{nb_removed} entries removed')
+    else:
+        nb_removed = evict_cache(max_size=pars.max_size, cache_dir=pars.path)
+        print(f'{nb_removed} entries removed')
+
+
+if __name__ == '__main__':
+    main()
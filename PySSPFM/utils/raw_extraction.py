@@ -5,10 +5,19 @@ Inspired by SS_PFM script, Nanoscope, Bruker
 """
 
 import os
+import json
+import shutil
 import pandas as pd
 import numpy as np
 
 from PySSPFM.settings import get_setting
+from PySSPFM.utils.core.path_management import \
+    get_filenames_with_conditions, sort_filenames
+from PySSPFM.utils.raw_cache import load_cache_entry, save_cache_entry
+
+MEAS_SHEET_CACHE = {}
+GRID_DATACUBE_NAME = 'datacube_grid'
+GRID_CACHE = {}
 
 
 class NanoscopeError(Exception):
@@ -27,7 +36,8 @@ class NanoscopeError(Exception):
         super().__init__(self.message)
 
 
-def data_identification(raw_dict, type_file, mode_dfrt=False):
+def data_identification(raw_dict, type_file, mode_dfrt=False,
+                        channels=None):
     """
     Extract and identify all the measurements contained in a table file
     (txt, csv, xlsx)
@@ -40,6 +50,9 @@ def data_identification(raw_dict, type_file, mode_dfrt=False):
         Type of the raw measurement file (spm or table)
     mode_dfrt: bool, optional
         If mode_dfrt is True, a dfrt measure is performed and vice versa
+    channels: list of str, optional
+        Measurements to identify (keys of dict_meas, e.g. 'times', 'amp',
+        'pha'). All the measurements are identified if None.
 
     Returns
     -------
@@ -52,6 +65,8 @@ def data_identification(raw_dict, type_file, mode_dfrt=False):
     dict_identify_mea = key_measurement_extraction[type_file][strg]
 
     for key, value in dict_identify_mea.items():
+        if channels is not None and value not in channels:
+            continue
         try:
             dict_meas[value] = raw_dict[key]
         except KeyError:
@@ -64,6 +79,36 @@ def data_identification(raw_dict, type_file, mode_dfrt=False):
     return dict_meas
 
 
+def selected_meas_names(type_file, mode_dfrt=False, channels=None):
+    """
+    Names of the channels of a raw measurement file corresponding to the
+    requested measurements (see 'key_measurement_extraction' setting)
+
+    Parameters
+    ----------
+    type_file: str
+        Type of the raw measurement file (spm or table)
+    mode_dfrt: bool, optional
+        If mode_dfrt is True, a dfrt measure is performed and vice versa
+    channels: list of str, optional
+        Measurements to extract (keys of dict_meas, e.g. 'times', 'amp',
+        'pha'). All the channels are extracted if None.
+
+    Returns
+    -------
+    meas_names: list of str or None
+        Names of the channels to read in the file (None: all the channels)
+    """
+    if channels is None:
+        return None
+    strg = 'dfrt' if mode_dfrt else 'classic'
+    key_measurement_extraction = get_setting("key_measurement_extraction")
+    dict_identify_mea = key_measurement_extraction[type_file][strg]
+
+    return [key for key, value in dict_identify_mea.items()
+            if value in channels]
+
+
 def extr_bias_pars(file_path_in_bias):
     """
     Identify and extract SS PFM bias data of txt saving file
@@ -91,7 +136,8 @@ def extr_bias_pars(file_path_in_bias):
     return script_dict
 
 
-def extr_data_spm(file_path_in, mode_dfrt=False, verbose=False):
+def extr_data_spm(file_path_in, mode_dfrt=False, verbose=False,
+                  channels=None):
     """
     Data extraction from spm file and identification
 
@@ -103,6 +149,9 @@ def extr_data_spm(file_path_in, mode_dfrt=False, verbose=False):
         If mode_dfrt is True, a dfrt measure is performed and vice versa
     verbose: bool, optional
         If True, print name of signal in extracted measurement file
+    channels: list of str, optional
+        Measurements to identify (keys of dict_meas, e.g. 'times', 'amp',
+        'pha'). All the measurements are identified if None.
 
     Returns
     ----------
@@ -145,15 +194,16 @@ def extr_data_spm(file_path_in, mode_dfrt=False, verbose=False):
 
     # Data identification
     dict_meas = data_identification(
-        raw_dict, type_file='spm', mode_dfrt=mode_dfrt)
+        raw_dict, type_file='spm', mode_dfrt=mode_dfrt, channels=channels)
 
     return dict_meas, script_dict
 
 
-def extr_data_table(file_path_in, mode_dfrt=False):
+def extr_data_table(file_path_in, mode_dfrt=False, sign_pars=None,
+                    channels=None):
     """
     Extract and identify data from a raw measurement table file
-    (txt, csv, xlsx).
+    (txt, csv, xlsx) or binary datacube file (npy).
     Lines header and delimiter should be adjusted according to the input raw
     measurement file
 
@@ -164,6 +214,13 @@ def extr_data_table(file_path_in, mode_dfrt=False):
     mode_dfrt: bool, optional
         If True, perform a dfrt measurement; otherwise, perform the default
         measurement.
+    sign_pars: dict, optional
+        All sspfm bias parameters of the measurement sheet, already extracted
+        (the measurement sheet is not read if provided)
+    channels: list of str, optional
+        Measurements to extract (keys of dict_meas, e.g. 'times', 'amp',
+        'pha'): only the corresponding columns are read. All the
+        measurements are extracted if None.
 
     Returns
     -------
@@ -176,41 +233,434 @@ def extr_data_table(file_path_in, mode_dfrt=False):
     # Extraction of SS PFM bias info organized in terms of ramp script
     # parameters
     root_in, _ = os.path.split(file_path_in)
-    script_dict = script_dict_from_meas_sheet(root_in)
+    script_dict = script_dict_from_meas_sheet(root_in, sign_pars=sign_pars)
+
+    # Extract and identify measurements from the file
+    meas_names_sel = selected_meas_names('table', mode_dfrt=mode_dfrt,
+                                         channels=channels)
+    raw_data, meas_names = read_table_file(file_path_in,
+                                           meas_names_sel=meas_names_sel)
+    raw_dict = dict(zip(meas_names, raw_data))
+    dict_meas = data_identification(
+        raw_dict, type_file='table', mode_dfrt=mode_dfrt, channels=channels)
+
+    return dict_meas, script_dict
+
+
+def read_table_file(file_path_in, meas_names_sel=None):
+    """
+    Read all the measurements of a raw measurement table file
+    (txt, csv, xlsx) or binary datacube file (npy), without identification
 
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the measurement file (input)
+    meas_names_sel: list of str, optional
+        Names of the channels to read (the other columns are not parsed,
+        and the other channels of npy file are not loaded from the disk).
+        All the channels are read if None.
+
+    Returns
+    -------
+    raw_data: numpy.array(m*p) of float
+        Measurements (m channels of p values)
+    meas_names: list(m) of str
+        Names of the channels
+    """
     file_type = os.path.splitext(file_path_in)[1][1:]
     header_lines = get_setting('header_lines')
 
-    # Extract and identify measurements from the file
+    def usecols(name):
+        return meas_names_sel is None or name in meas_names_sel
+
     if file_type == 'txt':
         delimiter = get_setting('delimiter')
         index_line_meas_name = get_setting('index_line_meas_name')
-        raw_data = np.genfromtxt(
-            file_path_in, delimiter=delimiter, skip_header=header_lines).T
         # Extraire le header
         with open(file_path_in, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-            meas_names = \
-                lines[index_line_meas_name].strip("# \n").split(delimiter)
+            for cont, line in enumerate(file):
+                if cont == index_line_meas_name:
+                    meas_names = line.strip("# \n").split(delimiter)
+                    break
+        if meas_names_sel is None:
+            raw_data = np.genfromtxt(
+                file_path_in, delimiter=delimiter, skip_header=header_lines).T
+        else:
+            # Only the selected columns are parsed
+            indexs = [cont for cont, name in enumerate(meas_names)
+                      if usecols(name)]
+            meas_names = [meas_names[index] for index in indexs]
+            raw_data = np.reshape(np.genfromtxt(
+                file_path_in, delimiter=delimiter, skip_header=header_lines,
+                usecols=indexs).T, (len(indexs), -1)) if indexs else []
     elif file_type == 'csv':
-        data_frame = pd.read_csv(file_path_in)[header_lines-1:]
+        data_frame = pd.read_csv(
+            file_path_in, usecols=usecols)[header_lines-1:]
         raw_data = np.array(data_frame[1:]).T
         meas_names = data_frame.columns.tolist()
     elif file_type == 'xlsx':
-        data_frame = pd.read_excel(file_path_in)[header_lines-1:]
+        data_frame = pd.read_excel(
+            file_path_in, usecols=usecols)[header_lines-1:]
         raw_data = np.array(data_frame[1:]).T
         meas_names = data_frame.columns.tolist()
+    elif file_type == 'npy':
+        raw_data, meas_names = read_datacube_npy(file_path_in)
+        if meas_names_sel is not None:
+            # Lazy access: each selected channel is a view of the memmap
+            indexs = [cont for cont, name in enumerate(meas_names)
+                      if usecols(name)]
+            raw_data = [raw_data[index] for index in indexs]
+            meas_names = [meas_names[index] for index in indexs]
     else:
-        raise IOError("file_type should be 'txt', 'csv', or 'xlsx'")
-    raw_dict = dict(zip(meas_names, raw_data))
+        raise IOError("file_type should be 'txt', 'csv', 'xlsx' or 'npy'")
+
+    return raw_data, meas_names
+
+
+def save_datacube_npy(file_path_out, raw_data, meas_names):
+    """
+    Save the measurements of a raw measurement file (i.e a pixel) in binary
+    format: 2D array (one line per channel) saved in a .npy file, with a json
+    header file (same name, .json extension) containing the channel names
+
+    Parameters
+    ----------
+    file_path_out: str
+        Path of the .npy measurement file (out)
+    raw_data: list(m) of list(p) or numpy.array(m*p) of float
+        Measurements (m channels of p values)
+    meas_names: list(m) of str
+        Names of the channels (measurement names of the table file)
+
+    Returns
+    -------
+    header_path_out: str
+        Path of the json header file (out)
+    """
+    raw_data = np.asarray(raw_data, dtype=np.float64)
+    assert raw_data.ndim == 2 and len(raw_data) == len(meas_names)
+    np.save(file_path_out, raw_data)
+
+    header = {'channels': list(meas_names), 'shape': list(raw_data.shape),
+              'dtype': str(raw_data.dtype)}
+    header_path_out = os.path.splitext(file_path_out)[0] + '.json'
+    with open(header_path_out, 'w', encoding='utf-8') as file:
+        json.dump(header, file, indent=4)
+
+    return header_path_out
+
+
+def read_datacube_npy(file_path_in):
+    """
+    Read a binary measurement file (see save_datacube_npy). The file is
+    memory-mapped: channels are read from the disk only when used (no parsing
+    and no copy).
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the .npy measurement file (in)
+
+    Returns
+    -------
+    raw_data: numpy.memmap(m*p) of float
+        Measurements (m channels of p values), in read only mode
+    meas_names: list(m) of str
+        Names of the channels
+    """
+    header_path_in = os.path.splitext(file_path_in)[0] + '.json'
+    with open(header_path_in, 'r', encoding='utf-8') as file:
+        header = json.load(file)
+
+    raw_data = np.load(file_path_in, mmap_mode='r')
+    meas_names = header['channels']
+    if list(raw_data.shape) != header['shape']:
+        raise IOError(f"shape of {file_path_in} ({raw_data.shape}) is not "
+                      f"consistent with its header ({header['shape']})")
+
+    return raw_data, meas_names
+
+
+def save_grid_datacube(dir_path_in, extension='spm', dir_path_out=None,
+                       verbose=False):
+    """
+    Convert all the raw measurement files (i.e pixels) of a directory in a
+    single grid datacube container: a (pixel * channel * sample) array saved
+    in a .npy file (memory-mapped when read) and a json header file with
+    channel names and pixel index (pixel name, file index, grid coordinates
+    and number of samples). Pixels are sorted as with sort_filenames, and
+    the grid coordinates are determined with the number of pixels in x of the
+    measurement sheet (copied in dir_path_out).
+    Pixels of the container are named as the raw measurement files with the
+    '.grid' extension, and can be read with data_extraction.
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Directory path of the raw measurement files (in)
+    extension: str, optional
+        Extension of the raw measurement files ('spm', 'txt', 'csv', 'xlsx'
+        or 'npy')
+    dir_path_out: str, optional
+        Directory path of the grid datacube container (out)
+        (default: dir_path_in)
+    verbose: bool, optional
+        Activation key for verbosity
+
+    Returns
+    -------
+    file_path_out: str
+        Path of the .npy grid datacube file (out)
+    """
+    dir_path_out = dir_path_out or dir_path_in
+    if not os.path.isdir(dir_path_out):
+        os.makedirs(dir_path_out)
+
+    file_names = get_filenames_with_conditions(dir_path_in,
+                                               extension=extension)
+    file_names = [file_name for file_name in file_names
+                  if file_name != 'SS_PFM_bias.txt' and
+                  not file_name.startswith(GRID_DATACUBE_NAME)]
+    file_names, file_indexs, _ = sort_filenames(file_names)
+    file_indexs = file_indexs or list(range(1, len(file_names) + 1))
+
+    # Measurement sheet (grid dimension)
+    file_path_in_csv = find_meas_sheet(dir_path_in)
+    meas_pars, _ = csv_meas_sheet_extract(dir_path_in)
+    grid_x = int(meas_pars['Grid x [pix]'])
+    if os.path.abspath(dir_path_out) != os.path.abspath(dir_path_in):
+        shutil.copy(file_path_in_csv, dir_path_out)
+
+    # Channels and number of samples of the grid (first pixel)
+    type_file = 'spm' if 'spm' in extension else 'table'
+    raw_data, channels = read_raw_file(os.path.join(dir_path_in,
+                                                    file_names[0]))
+    shape = [len(file_names), len(channels), len(raw_data[0])]
+    file_path_out = os.path.join(dir_path_out, GRID_DATACUBE_NAME + '.npy')
+    file_path_tmp = file_path_out + '.tmp'
+    grid_data = np.lib.format.open_memmap(
+        file_path_tmp, mode='w+', dtype=np.float64, shape=tuple(shape))
+
+    lengths = []
+    for cont, file_name in enumerate(file_names):
+        if verbose:
+            print(f'- {file_name}')
+        if cont > 0:
+            raw_data, meas_names = read_raw_file(
+                os.path.join(dir_path_in, file_name))
+            raw_data = [raw_data[meas_names.index(channel)]
+                        if channel in meas_names else [np.nan]
+                        for channel in channels]
+        length = max(len(values) for values in raw_data)
+        # Longer pixel: sample axis of the container is extended
+        if length > shape[2]:
+            old_grid_data = np.array(grid_data[:cont])
+            del grid_data
+            shape[2] = length
+            grid_data = np.lib.format.open_memmap(
+                file_path_tmp, mode='w+', dtype=np.float64, shape=tuple(shape))
+            grid_data[:cont] = np.nan
+            grid_data[:cont, :, :old_grid_data.shape[2]] = old_grid_data
+        grid_data[cont] = np.nan
+        for index, values in enumerate(raw_data):
+            grid_data[cont, index, :len(values)] = values
+        lengths.append(length)
+    grid_data.flush()
+    del grid_data
+    os.replace(file_path_tmp, file_path_out)
+
+    header = {
+        'channels': list(channels),
+        'type file': type_file,
+        'pixels': [os.path.splitext(file_name)[0] + '.grid'
+                   for file_name in file_names],
+        'index': [int(index) for index in file_indexs],
+        'coordinates': [[cont % grid_x, cont // grid_x]
+                        for cont in range(len(file_names))],
+        'lengths': lengths,
+        'shape': shape,
+        'dtype': 'float64'}
+    header_path_out = os.path.join(dir_path_out, GRID_DATACUBE_NAME + '.json')
+    with open(header_path_out, 'w', encoding='utf-8') as file:
+        json.dump(header, file, indent=4)
+
+    return file_path_out
+
+
+def read_raw_file(file_path_in):
+    """
+    Read all the measurements of a raw measurement file (spm, txt, csv, xlsx
+    or npy), without identification
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the measurement file (in)
+
+    Returns
+    -------
+    raw_data: list(m) of numpy.array(p) of float
+        Measurements (m channels of p values)
+    meas_names: list(m) of str
+        Names of the channels
+    """
+    if file_path_in.endswith('.spm'):
+        raw_dict = data_structure(file_path_in).raw_dict
+        meas_names = list(raw_dict.keys())
+        raw_data = [np.asarray(value, dtype=np.float64)
+                    for value in raw_dict.values()]
+    else:
+        raw_data, meas_names = read_table_file(file_path_in)
+        raw_data = list(raw_data)
+
+    return raw_data, list(meas_names)
+
+
+def open_grid_datacube(dir_path_in):
+    """
+    Open the grid datacube container of a directory (see save_grid_datacube).
+    The container is opened once per process (memory-mapped array and
+    header kept in GRID_CACHE) and opened again only if it is modified.
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Directory path of the grid datacube container (in)
+
+    Returns
+    -------
+    grid: dict
+        'data': numpy.memmap(n*m*p) of float, (pixel * channel * sample)
+        array in read only mode, 'header': dict, header of the container,
+        'pixel index': dict, index in the array of each pixel name
+    """
+    file_path_in = os.path.join(dir_path_in, GRID_DATACUBE_NAME + '.npy')
+    header_path_in = os.path.join(dir_path_in, GRID_DATACUBE_NAME + '.json')
+    signature = (os.stat(file_path_in).st_mtime_ns,
+                 os.stat(header_path_in).st_mtime_ns)
+    cache_key = os.path.abspath(dir_path_in)
+    grid = GRID_CACHE.get(cache_key)
+
+    if grid is None or grid['signature'] != signature:
+        with open(header_path_in, 'r', encoding='utf-8') as file:
+            header = json.load(file)
+        data = np.load(file_path_in, mmap_mode='r')
+        if list(data.shape) != header['shape']:
+            raise IOError(f"shape of {file_path_in} ({data.shape}) is not "
+                          f"consistent with its header ({header['shape']})")
+        grid = {'signature': signature, 'data': data, 'header': header,
+                'pixel index': {name: cont for cont, name
+                                in enumerate(header['pixels'])}}
+        GRID_CACHE[cache_key] = grid
+
+    return grid
+
+
+def read_grid_pixel(file_path_in):
+    """
+    Read all the measurements of a pixel of a grid datacube container,
+    without identification (no parsing and no copy)
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the pixel: directory path of the container joined with the
+        pixel name ('.grid' extension)
+
+    Returns
+    -------
+    raw_data: numpy.memmap(m*p) of float
+        Measurements (m channels of p values), in read only mode
+    meas_names: list(m) of str
+        Names of the channels
+    type_file: str
+        Type of the initial raw measurement file (spm or table)
+    """
+    dir_path_in, pixel_name = os.path.split(file_path_in)
+    grid = open_grid_datacube(dir_path_in)
+    try:
+        index = grid['pixel index'][pixel_name]
+    except KeyError as error:
+        raise IOError(f"{pixel_name} not in the grid datacube of "
+                      f"{dir_path_in}") from error
+    length = grid['header']['lengths'][index]
+    raw_data = grid['data'][index, :, :length]
+
+    return raw_data, grid['header']['channels'], grid['header']['type file']
+
+
+def extr_data_grid(file_path_in, mode_dfrt=False, sign_pars=None,
+                   channels=None):
+    """
+    Extract and identify data of a pixel of a grid datacube container
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the pixel: directory path of the container joined with the
+        pixel name ('.grid' extension)
+    mode_dfrt: bool, optional
+        If mode_dfrt is True, a dfrt measure is performed and vice versa
+    sign_pars: dict, optional
+        All sspfm bias parameters of the measurement sheet, already extracted
+        (the measurement sheet is not read if provided)
+    channels: list of str, optional
+        Measurements to extract (keys of dict_meas, e.g. 'times', 'amp',
+        'pha'): only the corresponding channels are loaded from the disk.
+        All the measurements are extracted if None.
+
+    Returns
+    -------
+    dict_meas: dict
+        All measurement in extracted file
+    script_dict: dict
+        All parameters for sspfm voltage signal and other measurement
+        parameters
+    """
+    root_in, _ = os.path.split(file_path_in)
+    script_dict = script_dict_from_meas_sheet(root_in, sign_pars=sign_pars)
+
+    raw_data, meas_names, type_file = read_grid_pixel(file_path_in)
     dict_meas = data_identification(
-        raw_dict, type_file='table', mode_dfrt=mode_dfrt)
+        dict(zip(meas_names, raw_data)), type_file=type_file,
+        mode_dfrt=mode_dfrt, channels=channels)
 
     return dict_meas, script_dict
 
 
+def datacube_filenames(dir_path_in, extension='spm'):
+    """
+    Sorted names of the raw measurement files (i.e pixels) of a directory.
+    For the grid datacube container (extension 'grid'), the names of the
+    pixels are read in its header (no directory listing).
+
+    Parameters
+    ----------
+    dir_path_in: str
+        Directory path of the raw measurement files (in)
+    extension: str, optional
+        Extension of the raw measurement files ('spm', 'txt', 'csv', 'xlsx',
+        'npy' or 'grid')
+
+    Returns
+    -------
+    file_names: list of str
+        Sorted names of the raw measurement files
+    """
+    if extension.lstrip('.') == 'grid':
+        file_names = list(open_grid_datacube(dir_path_in)['header']['pixels'])
+    else:
+        file_names = get_filenames_with_conditions(dir_path_in,
+                                                   extension=extension)
+        file_names, _, _ = sort_filenames(file_names)
+
+    return file_names
+
+
 def raw_data_extraction_without_script(file_path_in, extension="spm",
-                                       mode_dfrt=False):
+                                       mode_dfrt=False, sign_pars=None,
+                                       channels=None):
     """
     Extracts data from different types of files.
 
@@ -219,25 +669,53 @@ def raw_data_extraction_without_script(file_path_in, extension="spm",
     file_path_in : str
         Path to the input file.
     extension : str, optional
-        File extension. Default is "spm".
+        File extension ("grid" for a pixel of a grid datacube container).
+        Default is "spm".
     mode_dfrt: bool, optional
         If mode_dfrt is True, a dfrt measure is performed and vice versa
+    sign_pars: dict, optional
+        All sspfm bias parameters of the measurement sheet, already extracted
+        (the measurement sheet is not read if provided)
+    channels: list of str, optional
+        Measurements to extract (keys of dict_meas, e.g. 'times', 'amp',
+        'pha'): only the corresponding columns (table files) or channels
+        (npy and grid datacube) are read. All the measurements are extracted
+        if None.
 
     Returns
     -------
     dict_meas : dict
         Dictionary containing measurement data.
     """
+    raw_cache = use_raw_cache(file_path_in)
+    if raw_cache:
+        dict_meas, _ = load_cache_entry(file_path_in, mode_dfrt=mode_dfrt,
+                                        channels=channels)
+        if dict_meas is not None:
+            return dict_meas
+
     if "spm" in extension:
 
         data_extract = data_structure(file_path_in)
         raw_dict = data_extract.raw_dict
         # Data identification
         dict_meas = data_identification(
-            raw_dict, type_file=extension, mode_dfrt=mode_dfrt)
+            raw_dict, type_file=extension, mode_dfrt=mode_dfrt,
+            channels=channels)
+
+    elif "grid" in extension:
+        raw_data, meas_names, type_file = read_grid_pixel(file_path_in)
+        dict_meas = data_identification(
+            dict(zip(meas_names, raw_data)), type_file=type_file,
+            mode_dfrt=mode_dfrt, channels=channels)
 
     else:
-        dict_meas, _ = extr_data_table(file_path_in, mode_dfrt=mode_dfrt)
+        dict_meas, _ = extr_data_table(file_path_in, mode_dfrt=mode_dfrt,
+                                       sign_pars=sign_pars, channels=channels)
+
+    # Only complete extractions are saved in the cache
+    if raw_cache and channels is None:
+        save_raw_cache_entry(file_path_in, dict_meas, mode_dfrt=mode_dfrt)
 
     return dict_meas
 
@@ -277,18 +755,28 @@ def data_structure(file_path_in):
     return data_extract
 
 
-def data_extraction(file_path_in, mode_dfrt=False, verbose=False):
+def data_extraction(file_path_in, mode_dfrt=False, verbose=False,
+                    sign_pars=None, channels=None):
     """
     Data extraction from measurement file and identification
 
     Parameters
     ----------
     file_path_in: str
-        Path of the measurement file (in)
+        Path of the measurement file (in), or of a pixel of a grid datacube
+        container ('.grid' extension, see save_grid_datacube)
     mode_dfrt: bool, optional
         If mode_dfrt is True, a dfrt measure is performed and vice versa
     verbose: bool, optional
         If True, print name of signal in extracted measurement file
+    sign_pars: dict, optional
+        All sspfm bias parameters of the measurement sheet, already extracted
+        (the measurement sheet is not read if provided, for table files)
+    channels: list of str, optional
+        Measurements to extract (keys of dict_meas, e.g. 'times', 'amp',
+        'pha'): only the corresponding columns (table files) or channels
+        (npy and grid datacube) are read. All the measurements are extracted
+        if None.
 
     Returns
     ----------
@@ -298,19 +786,95 @@ def data_extraction(file_path_in, mode_dfrt=False, verbose=False):
         All parameters for sspfm voltage signal and other measurement
         parameters
     """
+    if file_path_in.endswith('.grid'):
+        return extr_data_grid(file_path_in, mode_dfrt=mode_dfrt,
+                              sign_pars=sign_pars, channels=channels)
+
     assert os.path.isfile(file_path_in)
 
+    # On-disk cache: script parameters of table files are extracted from the
+    # measurement sheet (not saved in the cache)
+    raw_cache = use_raw_cache(file_path_in)
+    if raw_cache:
+        dict_meas, script_dict = load_cache_entry(
+            file_path_in, mode_dfrt=mode_dfrt, channels=channels)
+        if dict_meas is not None and not file_path_in.endswith('.spm'):
+            root_in, _ = os.path.split(file_path_in)
+            script_dict = script_dict_from_meas_sheet(root_in,
+                                                      sign_pars=sign_pars)
+        if dict_meas is not None and script_dict is not None:
+            return dict_meas, script_dict
+
     if file_path_in.endswith('.spm'):
         dict_meas, script_dict = extr_data_spm(
-            file_path_in, mode_dfrt=mode_dfrt, verbose=verbose)
+            file_path_in, mode_dfrt=mode_dfrt, verbose=verbose,
+            channels=channels)
     else:
         dict_meas, script_dict = extr_data_table(
-            file_path_in, mode_dfrt=mode_dfrt)
+            file_path_in, mode_dfrt=mode_dfrt, sign_pars=sign_pars,
+            channels=channels)
+
+    # Only complete extractions are saved in the cache
+    if raw_cache and channels is None:
+        save_raw_cache_entry(
+            file_path_in, dict_meas, mode_dfrt=mode_dfrt,
+            script_dict=script_dict if file_path_in.endswith('.spm') else None)
 
     return dict_meas, script_dict
 
 
-def script_dict_from_meas_sheet(dir_path_in_csv, verbose=False):
+def use_raw_cache(file_path_in):
+    """
+    Check if the on-disk cache (see raw_cache module) is used for a raw
+    measurement file: 'raw_cache' setting is True, and the file is not a
+    binary file (npy or grid datacube, read without parsing)
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the raw measurement file (in)
+
+    Returns
+    -------
+    raw_cache: bool
+        True if the cache is used
+    """
+    return bool(get_setting("raw_cache")) and \
+        os.path.splitext(file_path_in)[1] not in ['.npy', '.grid']
+
+
+def save_raw_cache_entry(file_path_in, dict_meas, script_dict=None,
+                         mode_dfrt=False):
+    """
+    Save the measurements of a raw measurement file in the on-disk cache.
+    The analysis is not interrupted if the entry can't be saved.
+
+    Parameters
+    ----------
+    file_path_in: str
+        Path of the raw measurement file (in)
+    dict_meas: dict
+        All measurement in extracted file
+    script_dict: dict, optional
+        All parameters for sspfm voltage signal and other measurement
+        parameters
+    mode_dfrt: bool, optional
+        If mode_dfrt is True, a dfrt measure is performed and vice versa
+
+    Returns
+    -------
+    None
+    """
+    try:
+        save_cache_entry(file_path_in, dict_meas, script_dict=script_dict,
+                         mode_dfrt=mode_dfrt)
+    except (OSError, ValueError, TypeError) as error:
+        print(f"raw cache: {os.path.split(file_path_in)[1]} not saved "
+              f"({error})")
+
+
+def script_dict_from_meas_sheet(dir_path_in_csv, verbose=False,
+                                sign_pars=None):
     """
     Extract script parameters from a CSV measurement sheet
 
@@ -320,13 +884,20 @@ def script_dict_from_meas_sheet(dir_path_in_csv, verbose=False):
         Directory path containing the CSV measurement sheet (in)
     verbose: bool, optional
         Activation key for verbosity
+    sign_pars: dict, optional
+        All sspfm bias parameters of the measurement sheet, already extracted
+        (the measurement sheet is not read if provided)
 
     Returns
     -------
     script_dict: dict
         A dictionary containing script parameters
     """
-    _, csv_sspfm_bias = csv_meas_sheet_extract(dir_path_in_csv, verbose=False)
+    if sign_pars is None:
+        _, csv_sspfm_bias = csv_meas_sheet_extract(dir_path_in_csv,
+                                                   verbose=False)
+    else:
+        csv_sspfm_bias = sign_pars
 
     script_dict = {
         'Write Voltage Range (V)': (
@@ -359,9 +930,39 @@ def script_dict_from_meas_sheet(dir_path_in_csv, verbose=False):
     return script_dict
 
 
+def find_meas_sheet(dir_path_in_csv):
+    """
+    Find the path of the measurement sheet in a directory
+
+    Parameters
+    ----------
+    dir_path_in_csv: str
+        Path of the csv file directory (or of the measurement sheet)
+
+    Returns
+    -------
+    file_path_in_csv: str
+        Path of the measurement sheet ('' if not found)
+    """
+    file_path_in_csv = ''
+    meas_sheet_name = get_setting("default_parameters_file_name")
+    if meas_sheet_name in dir_path_in_csv:
+        file_path_in_csv = dir_path_in_csv
+    else:
+        for elem in os.listdir(dir_path_in_csv):
+            if meas_sheet_name in elem.replace("~$", ""):
+                file_path_in_csv = os.path.join(dir_path_in_csv,
+                                                elem.replace("~$", ""))
+
+    return file_path_in_csv
+
+
 def csv_meas_sheet_extract(dir_path_in_csv, verbose=False):
     """
-    Extract parameters saved in a csv file
+    Extract parameters saved in a csv file.
+    The measurement sheet is parsed once per process: parameters are kept in
+    memory (MEAS_SHEET_CACHE), for each directory, and the sheet is parsed
+    again only if the directory or the sheet is modified (modification time).
 
     Parameters
     ----------
@@ -379,22 +980,51 @@ def csv_meas_sheet_extract(dir_path_in_csv, verbose=False):
     """
     assert os.path.isdir(dir_path_in_csv), "Invalid directory path"
 
-    file_path_in_csv = ''
-    meas_pars_sheet = 'measure parameters'
-    bias_pars_sheet = 'sspfm bias parameters'
-    meas_sheet_name = get_setting("default_parameters_file_name")
-    if meas_sheet_name in dir_path_in_csv:
-        file_path_in_csv = dir_path_in_csv
+    cache_key = os.path.abspath(dir_path_in_csv)
+    dir_mtime = os.stat(dir_path_in_csv).st_mtime_ns
+    cached = MEAS_SHEET_CACHE.get(cache_key)
+    if cached is not None and cached['dir mtime'] == dir_mtime:
+        file_path_in_csv = cached['path']
     else:
-        for elem in os.listdir(dir_path_in_csv):
-            if meas_sheet_name in elem.replace("~$", ""):
-                file_path_in_csv = os.path.join(dir_path_in_csv,
-                                                elem.replace("~$", ""))
+        file_path_in_csv = find_meas_sheet(dir_path_in_csv)
 
     if verbose:
         name = os.path.split(file_path_in_csv)[1]
         print(f'- meas sheet name: "{name}"\n')
 
+    file_stat = os.stat(file_path_in_csv)
+    signature = (file_stat.st_mtime_ns, file_stat.st_size)
+    if cached is None or cached['path'] != file_path_in_csv or \
+            cached['signature'] != signature:
+        csv_meas, csv_sspfm_bias = read_meas_sheet(file_path_in_csv)
+        cached = {'dir mtime': dir_mtime, 'path': file_path_in_csv,
+                  'signature': signature, 'meas pars': csv_meas,
+                  'sign pars': csv_sspfm_bias}
+        MEAS_SHEET_CACHE[cache_key] = cached
+
+    # Copies are returned: parameters can be modified by the caller
+    return dict(cached['meas pars']), dict(cached['sign pars'])
+
+
+def read_meas_sheet(file_path_in_csv):
+    """
+    Parse the measurement sheet (without cache)
+
+    Parameters
+    ----------
+    file_path_in_csv: str
+        Path of the measurement sheet
+
+    Returns
+    -------
+    csv_meas: dict
+        All measurement parameters saved in the csv file
+    csv_sspfm_bias: dict
+        All sspfm bias parameters saved in the csv file
+    """
+    meas_pars_sheet = 'measure parameters'
+    bias_pars_sheet = 'sspfm bias parameters'
+
     excel_meas = pd.read_excel(file_path_in_csv, sheet_name=meas_pars_sheet)
     csv_meas = dict(zip(excel_meas['Parameter'].tolist(),
                         excel_meas['Value'].tolist()))
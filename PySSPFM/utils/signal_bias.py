@@ -18,48 +18,36 @@ def write_vec(sign_pars, thresh=0.):
 
     Returns
     -------
-    write_voltage: list(n) of float
-        List of write voltage value (in V)
+    write_voltage: numpy.array(n) of float
+        Array of write voltage value (in V)
     """
     mode_w = sign_pars['Mode (W)']
-    write_voltage = np.linspace(sign_pars['Min volt (W) [V]'],
-                                sign_pars['Max volt (W) [V]'],
-                                sign_pars['Nb volt (W)'])
-
+    min_volt = sign_pars['Min volt (W) [V]']
+    max_volt = sign_pars['Max volt (W) [V]']
+    write_voltage = np.linspace(min_volt, max_volt, sign_pars['Nb volt (W)'])
     write_voltage_inverted = np.sort(write_voltage)[::-1]
-    new_write_voltage = []
 
     if mode_w == 'Zero, up':
-        new_write_voltage.extend([elem for elem in write_voltage if
-                                  elem >= thresh and
-                                  elem != sign_pars['Max volt (W) [V]']])
-        new_write_voltage.extend(write_voltage_inverted)
-        new_write_voltage.extend([elem for elem in write_voltage if
-                                  elem < thresh and
-                                  elem != sign_pars['Min volt (W) [V]']])
+        parts = [write_voltage[(write_voltage >= thresh) &
+                               (write_voltage != max_volt)],
+                 write_voltage_inverted,
+                 write_voltage[(write_voltage < thresh) &
+                               (write_voltage != min_volt)]]
     elif mode_w == 'Zero, down':
-        new_write_voltage.extend([elem for elem in
-                                  write_voltage_inverted if elem <= thresh])
-        new_write_voltage.extend([elem for elem in
-                                  write_voltage if elem not in
-                                  (sign_pars['Min volt (W) [V]'],
-                                   sign_pars['Max volt (W) [V]'])])
-        new_write_voltage.extend([elem for elem in write_voltage_inverted if
-                                  elem > thresh])
+        parts = [write_voltage_inverted[write_voltage_inverted <= thresh],
+                 write_voltage[(write_voltage != min_volt) &
+                               (write_voltage != max_volt)],
+                 write_voltage_inverted[write_voltage_inverted > thresh]]
     elif mode_w == 'Low, up':
-        new_write_voltage.extend([elem for elem in write_voltage if
-                                  elem != sign_pars['Max volt (W) [V]']])
-        new_write_voltage.extend([elem for elem in write_voltage_inverted if
-                                  elem != sign_pars['Min volt (W) [V]']])
+        parts = [write_voltage[write_voltage != max_volt],
+                 write_voltage_inverted[write_voltage_inverted != min_volt]]
     elif mode_w == 'High, down':
-        new_write_voltage.extend([elem for elem in write_voltage_inverted if
-                                  elem != sign_pars['Min volt (W) [V]']])
-        new_write_voltage.extend([elem for elem in write_voltage if
-                                  elem != sign_pars['Max volt (W) [V]']])
+        parts = [write_voltage_inverted[write_voltage_inverted != min_volt],
+                 write_voltage[write_voltage != max_volt]]
     else:
         raise NotImplementedError
 
-    return new_write_voltage
+    return np.concatenate(parts)
 
 
 def read_vec(ckpfm_pars):
@@ -122,34 +110,42 @@ def sspfm_time(ss_pfm_bias, sspfm_pars, gen_hold_segment=True):
 
     Returns
     -------
-    ss_pfm_times_calc: list(n*(nb_samp/seg)) of float
-        List of time associated with sspfm bias signal (in s)
-    ss_pfm_bias_calc: list(n*(nb_samp/seg)) of float
-        List of sspfm bias signal associated with time (in V)
+    ss_pfm_times_calc: numpy.array(n*(nb_samp/seg)) of float
+        Array of time associated with sspfm bias signal (in s)
+    ss_pfm_bias_calc: numpy.array(n*(nb_samp/seg)) of float
+        Array of sspfm bias signal associated with time (in V)
     """
-    times_bias = []
+    nb_seg = len(ss_pfm_bias)
+    write_seg = np.arange(nb_seg) % 2 == 0
     if gen_hold_segment:
-        sum_time = sspfm_pars['Hold seg durat (start) [ms]']/1000
+        start_time = sspfm_pars['Hold seg durat (start) [ms]']/1000
     else:
-        sum_time = 0
-
-    for cont, _ in enumerate(ss_pfm_bias):
-        ite = sspfm_pars['Seg durat (W) [ms]'] / 1000 if cont % 2 == 0 else \
-            sspfm_pars['Seg durat (R) [ms]'] / 1000
-        times_bias.append(sum_time)
-        sum_time += ite
-
-    ss_pfm_times_calc, ss_pfm_bias_calc = [], []
-    for cont, (elem_bias, time_bias) in enumerate(zip(ss_pfm_bias, times_bias)):
-        ite = sspfm_pars['Seg sample (W)'] if cont % 2 == 0 else \
-            sspfm_pars['Seg sample (R)']
-        if cont != len(ss_pfm_bias) - 1:
-            sub_time = np.linspace(time_bias, times_bias[cont + 1], ite)
-        else:
-            sub_time = np.linspace(time_bias, time_bias +
-                                   sspfm_pars['Seg durat (R) [ms]'] / 1000, ite)
-        ss_pfm_bias_calc.extend([elem_bias] * ite)
-        ss_pfm_times_calc.extend(sub_time)
+        start_time = 0
+
+    # Start and end time of each segment (cumulative sum of the durations)
+    seg_durat = np.where(write_seg, sspfm_pars['Seg durat (W) [ms]'] / 1000,
+                         sspfm_pars['Seg durat (R) [ms]'] / 1000)
+    times_bias = np.cumsum(np.concatenate([[start_time], seg_durat]))
+    start_times = times_bias[:-1]
+    end_times = times_bias[1:].copy()
+    if nb_seg > 0:
+        end_times[-1] = \
+            start_times[-1] + sspfm_pars['Seg durat (R) [ms]'] / 1000
+
+    # Time of each sample: linear spacing in each segment (as np.linspace)
+    seg_sample = np.where(write_seg, sspfm_pars['Seg sample (W)'],
+                          sspfm_pars['Seg sample (R)'])
+    seg_index = np.repeat(np.arange(nb_seg), seg_sample)
+    seg_first = np.cumsum(seg_sample) - seg_sample
+    step = np.divide(end_times - start_times, seg_sample - 1,
+                     out=np.zeros(nb_seg), where=seg_sample > 1)
+    ss_pfm_times_calc = \
+        (np.arange(len(seg_index)) - seg_first[seg_index]) * \
+        step[seg_index] + start_times[seg_index]
+    last = seg_sample > 1
+    ss_pfm_times_calc[(seg_first + seg_sample - 1)[last]] = end_times[last]
+    ss_pfm_bias_calc = np.repeat(np.asarray(ss_pfm_bias, dtype=float),
+                                 seg_sample)
 
     if gen_hold_segment:
         bias_hold_segment = {
@@ -196,10 +192,9 @@ def sspfm_generator(sspfm_pars, thresh=0., open_mode=False):
 
     Returns
     -------
-    ss_pfm_bias: list(n) of float
-        List of SS PFM signal values calculated (in V)
+    ss_pfm_bias: numpy.array(n) of float
+        Array of SS PFM signal values calculated (in V)
     """
-    ss_pfm_bias = []
     min_volt_w = sspfm_pars['Min volt (W) [V]']
     max_volt_w = sspfm_pars['Max volt (W) [V]']
     med_volt_w = np.mean([max_volt_w, min_volt_w])
@@ -213,18 +208,23 @@ def sspfm_generator(sspfm_pars, thresh=0., open_mode=False):
     if sspfm_pars['Mode (R)'] == 'High to Low':
         read_voltage = np.flip(read_voltage)
 
-    # For each sspfm cycle
-    for cont, read_value in enumerate(read_voltage):
-
+    # Generate write voltage of each sspfm cycle
+    if open_mode:
         # Write voltage range increase for each iteration
-        if open_mode:
+        write_voltage = []
+        for cont in range(len(read_voltage)):
             sspfm_pars['Min volt (W) [V]'] = med_volt_w - incr * (cont + 1)
             sspfm_pars['Max volt (W) [V]'] = med_volt_w + incr * (cont + 1)
-        # Generate write voltage
-        write_voltage = write_vec(sspfm_pars, thresh=thresh)
+            write_voltage.append(write_vec(sspfm_pars, thresh=thresh))
+    else:
+        write_voltage = \
+            [write_vec(sspfm_pars, thresh=thresh)] * len(read_voltage)
 
-        for write_value in write_voltage:
-            ss_pfm_bias += [write_value, read_value]
+    # Interleave write and read values
+    nb_write = [len(elem) for elem in write_voltage]
+    ss_pfm_bias = np.empty(2 * sum(nb_write))
+    ss_pfm_bias[::2] = np.concatenate([np.zeros(0)] + write_voltage)
+    ss_pfm_bias[1::2] = np.repeat(read_voltage, nb_write)
 
     return ss_pfm_bias
 
@@ -322,7 +322,7 @@ def extract_sspfm_bias_pars(ss_pfm_bias):
 
     Parameters
     ----------
-    ss_pfm_bias : list
+    ss_pfm_bias : list or numpy.array
         List of SSPFM bias values.
 
     Returns
@@ -332,8 +332,8 @@ def extract_sspfm_bias_pars(ss_pfm_bias):
     """
 
     # Separate write and read vectors
-    write_vector = ss_pfm_bias[::2]
-    read_vector = ss_pfm_bias[1::2]
+    write_vector = list(ss_pfm_bias[::2])
+    read_vector = list(ss_pfm_bias[1::2])
 
     # Count the number of cycles with maximum write bias
     nb_cycle = write_vector.count(max(write_vector))
@@ -1,10 +1,20 @@
 """
 Example of nanoloop_to_hyst_s2 methods
 """
+import os
+import copy
+import random
+import shutil
+import tempfile
 import numpy as np
 
+from PySSPFM.settings import get_setting
 from PySSPFM.utils.path_for_runable import save_path_example
-from PySSPFM.data_processing.nanoloop_to_hyst_s2 import multi_script
+from PySSPFM.utils.raw_extraction import csv_meas_sheet_extract
+from PySSPFM.utils.datacube_to_nanoloop.gen_data import gen_segments
+from PySSPFM.data_processing.nanoloop_to_hyst_s2 import \
+    multi_script, multi_script_fused, single_script, batch_hyst_pixels
+from examples.utils.datacube_to_nanoloop.ex_gen_data import pars_segment
 
 
 def main_pars():
@@ -136,7 +146,7 @@ def loop_dict_gen(ferro_pars, sign_pars):
     return loop_dict
 
 
-def ex_multi_script(make_plots=False, verbose=False):
+def ex_multi_script(make_plots=False, verbose=False, engine='object'):
     """
     Example of multi_script function.
 
@@ -146,6 +156,8 @@ def ex_multi_script(make_plots=False, verbose=False):
         Flag indicating whether to make plots (default is False).
     verbose: bool, optional
         Verbosity flag (default is False).
+    engine: str, optional
+        Hysteresis fit engine: 'object' or 'batch' (default is 'object').
 
     Returns
     ----------
@@ -157,6 +169,7 @@ def ex_multi_script(make_plots=False, verbose=False):
     index_pix_phase_2 = [2, 3, 4, 10, 11, 12, 13, 14, 18, 19, 20, 28]
 
     user_pars, sign_pars, meas_pars, ferro_pars_1, ferro_pars_2 = main_pars()
+    user_pars['engine'] = engine
 
     # Update measurement parameters
     meas_pars['Grid x [pix]'] = nb_pix_x
@@ -191,7 +204,153 @@ def ex_multi_script(make_plots=False, verbose=False):
                  save=save, root_out=dir_path_out)
 
 
+def ex_multi_script_fused(nb_pix=2, verbose=False):
+    """
+    Example of multi_script_fused function (fused step 1 -> step 2
+    analysis), compared with the second step analysis of the txt nanoloop
+    files (side output).
+
+    Parameters
+    ----------
+    nb_pix: int, optional
+        Number of generated measurement files (i.e. pixels).
+    verbose: bool, optional
+        Verbosity flag (default is False).
+
+    Returns
+    ----------
+    res: dict
+        Properties and best loops of the fused analysis and of the txt
+        nanoloop analysis, and names of the txt nanoloop files.
+    """
+    res = {}
+    out = pars_segment()
+    (_, sign_pars, hold_dict, noise_pars, meas_range, _, user_pars_s1) = out
+    sign_pars.update({'Nb volt (R)': 3, 'Nb meas (W)': 1, 'Nb meas (R)': 1,
+                      'Low freq [kHz]': 200, 'High freq [kHz]': 400})
+    user_pars_s1['seg pars']['mode'] = 'max'
+    user_pars_s1['pha pars']['method'] = 'static'
+    user_pars, _, _, _, _ = main_pars()
+    np.random.seed(0)
+    random.seed(0)
+
+    dir_path_in = os.path.join(get_setting("example_root_path_in"),
+                               "KNN500n_reduced_datacube_txt")
+    meas_sheet_name = get_setting("default_parameters_file_name")
+    delimiter = get_setting('delimiter')
+    key_meas = {value: key for key, value in
+                get_setting('key_measurement_extraction')['table'][
+                    'classic'].items()}
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        dir_path_meas = os.path.join(dir_path, 'datacube')
+        os.makedirs(dir_path_meas)
+        shutil.copy(os.path.join(dir_path_in, meas_sheet_name), dir_path_meas)
+        meas_pars, _ = csv_meas_sheet_extract(dir_path_meas)
+        meas_pars['External meas'] = 'no'
+
+        # Generate the measurement files
+        for index in range(1, nb_pix + 1):
+            dict_meas = gen_segments(
+                copy.deepcopy(sign_pars), mode='max',
+                seg_noise_pars=noise_pars, hold_dict=hold_dict,
+                alea_target_range=meas_range)
+            keys = [key for key, value in dict_meas.items()
+                    if len(value) > 0 and key in key_meas]
+            np.savetxt(os.path.join(dir_path_meas, f'pix.0_{index:05d}.txt'),
+                       np.array([dict_meas[key] for key in keys]).T,
+                       delimiter=delimiter,
+                       header=delimiter.join(key_meas[key] for key in keys))
+
+        # ex multi_script_fused
+        root_out = os.path.join(dir_path, 'out')
+        all_properties, tab_best_loops = multi_script_fused(
+            user_pars_s1, user_pars, dir_path_meas, meas_pars, sign_pars,
+            mode='max', file_format='.txt', verbose=verbose, txt_save=True,
+            root_out=root_out)
+        res['fused'] = all_properties
+        res['fused best loops'] = tab_best_loops
+
+        # Second step analysis of the txt nanoloop files (side output)
+        dir_path_nanoloops = os.path.join(
+            root_out, get_setting('default_nanoloops_folder_name'))
+        res['nanoloop files'] = sorted(os.listdir(dir_path_nanoloops))
+        res['txt'], res['txt best loops'] = [], {'on': [], 'off': []}
+        for cont in range(nb_pix):
+            tab_path_in = [
+                os.path.join(dir_path_nanoloops,
+                             f'{mode}_f_pix.0_{cont + 1:05d}.txt')
+                for mode in ['off', 'on']]
+            best_loops, properties, other_properties, _ = single_script(
+                tab_path_in, user_pars, meas_pars, sign_pars, cont=cont)
+            res['txt'].append({**properties,
+                               'other': other_properties['off']})
+            for key, value in best_loops.items():
+                res['txt best loops'][key].append(value)
+
+    return res
+
+
+def ex_batch_hyst_pixels(nb_pix=6, verbose=False):
+    """
+    Example of batch_hyst_pixels function (batch engine: hysteresis of all
+    the pixels fitted at once), compared with the fit of each pixel ('object'
+    engine).
+
+    Parameters
+    ----------
+    nb_pix: int, optional
+        Number of generated pixels.
+    verbose: bool, optional
+        Verbosity flag (default is False).
+
+    Returns
+    ----------
+    res: dict
+        Properties of each pixel with the 'object' and 'batch' engines.
+    """
+    user_pars, sign_pars, meas_pars, ferro_pars_1, ferro_pars_2 = main_pars()
+    loop_dicts = []
+    for i in range(nb_pix):
+        for mode in ['off', 'on']:
+            loop_dict = loop_dict_gen(
+                ferro_pars_2 if i % 2 else ferro_pars_1, sign_pars)
+            loop_dict['mode'] = mode
+            loop_dicts.append(loop_dict)
+    file_paths_in = [[f'{mode}_f_file{i + 1}.txt' for mode in ['off', 'on']]
+                     for i in range(nb_pix)]
+
+    # ex batch_hyst_pixels
+    np.random.seed(0)
+    tab_pixels, tab_fit_params = batch_hyst_pixels(
+        file_paths_in, user_pars, meas_pars, sign_pars, test_dicts=loop_dicts)
+
+    res = {'object': [], 'batch': []}
+    np.random.seed(0)
+    for cont, tab_path_in in enumerate(file_paths_in):
+        _, properties, _, _ = single_script(
+            tab_path_in, user_pars, meas_pars, sign_pars, cont=cont,
+            test_dicts=loop_dicts)
+        res['object'].append(properties)
+        _, properties, _, _ = single_script(
+            tab_path_in, user_pars, meas_pars, sign_pars, cont=cont,
+            pixels=tab_pixels[cont], tab_fit_params=tab_fit_params[cont])
+        res['batch'].append(properties)
+
+    if verbose:
+        for key in ['object', 'batch']:
+            print(f'{key} engine:')
+            for cont, properties in enumerate(res[key]):
+                print(f'\tpixel {cont}: x0 (off): '
+                      f'{properties["off"]["fit pars: x0_0"]}, '
+                      f'{properties["off"]["fit pars: x0_1"]}')
+
+    return res
+
+
 if __name__ == '__main__':
     figs = []
 
     ex_multi_script(make_plots=True, verbose=True)
+    ex_multi_script_fused(verbose=True)
+    ex_batch_hyst_pixels(verbose=True)
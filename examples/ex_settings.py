@@ -2,8 +2,13 @@
 Example of settings methods
 """
 import os
+import shutil
+import tempfile
+import time
 
-from PySSPFM.settings import get_settings_dict, get_path_from_json, get_setting
+from PySSPFM.settings import \
+    get_settings_dict, get_path_from_json, get_setting, \
+    get_cached_settings_dict, settings_snapshot, load_settings_snapshot
 
 
 def ex_get_settings_dict(mode='classic', verbose=False):
@@ -48,6 +53,64 @@ def ex_get_settings_dict(mode='classic', verbose=False):
     return settings_dict
 
 
+def ex_settings_cache(verbose=False):
+    """
+    Example of settings cache: get_cached_settings_dict, settings_snapshot
+    and load_settings_snapshot functions
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        If True, prints the results.
+
+    Returns
+    -------
+    res: dict
+        Results of the example.
+    """
+    res = {}
+
+    # ex get_cached_settings_dict: file parsed once, parsed again when modified
+    json_file_path = os.path.join(get_setting("example_root_path_in"),
+                                  "default_settings.json")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_file_path = os.path.join(tmp_dir, "settings.json")
+        shutil.copy(json_file_path, tmp_file_path)
+        first_dict = get_cached_settings_dict(tmp_file_path)
+        res['same object'] = get_cached_settings_dict(tmp_file_path) is \
+            first_dict
+        with open(tmp_file_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+        with open(tmp_file_path, 'w', encoding='utf-8') as file:
+            file.write(content.replace('"fit_method": "nelder"',
+                                       '"fit_method": "leastsq"'))
+        mtime = time.time() + 10
+        os.utime(tmp_file_path, (mtime, mtime))
+        res['fit method before'] = first_dict["fit_method"]
+        res['fit method after'] = \
+            get_cached_settings_dict(tmp_file_path)["fit_method"]
+
+    # ex get_setting: returned values can be modified without side effect
+    figsize = get_setting("figsize")
+    figsize.append(0)
+    res['figsize'] = get_setting("figsize")
+
+    # ex settings_snapshot and load_settings_snapshot (used in workers)
+    snapshot = settings_snapshot()
+    snapshot["fit_method"] = "least_square"
+    load_settings_snapshot(snapshot)
+    res['fit method snapshot'] = get_setting("fit_method")
+    load_settings_snapshot(None)
+    res['fit method restored'] = get_setting("fit_method")
+
+    if verbose:
+        for key, value in res.items():
+            print(f"{key}: {value}")
+
+    return res
+
+
 if __name__ == "__main__":
     ex_get_settings_dict(mode='classic', verbose=True)
     ex_get_settings_dict(mode='default', verbose=True)
+    ex_settings_cache(verbose=True)
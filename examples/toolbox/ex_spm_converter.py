@@ -20,7 +20,7 @@ def example_spm_converter(ext, make_plots=False, verbose=False):
     Parameters
     ----------
     ext: str
-        Converted file extension ['txt', 'csv', 'xlsx']
+        Converted file extension ['txt', 'csv', 'xlsx', 'npy']
     make_plots: bool, optional
         Indicates whether to generate plots
     verbose: bool, optional
@@ -32,7 +32,7 @@ def example_spm_converter(ext, make_plots=False, verbose=False):
         Dictionary of measurements and script information or list of figures
         and data files
     """
-    assert ext in ['txt', 'csv', 'xlsx']
+    assert ext in ['txt', 'csv', 'xlsx', 'npy']
 
     # Define paths
     dir_path_in = os.path.join(get_setting("example_root_path_in"),
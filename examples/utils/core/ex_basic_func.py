@@ -6,6 +6,7 @@ import matplotlib.pyplot as plt
 
 from PySSPFM.utils.path_for_runable import save_path_example
 from PySSPFM.utils.core.figure import print_plots
+from PySSPFM.utils.core import basic_func
 from PySSPFM.utils.core.basic_func import \
     (linear, sigmoid, arctan, gaussian, lorentzian, pseudovoigt, sho, sho_phase,
      sho_phase_switch)
@@ -72,6 +73,63 @@ def ex_basic_func(model, make_plots=False):
         return y
 
 
+def ex_basic_func_jac(model, make_plots=False):
+    """
+    Example of basic function jacobian (partial derivatives with respect to
+    the parameters), compared with finite differences
+
+    Parameters
+    ----------
+    model: str
+        Curve model name
+    make_plots: bool, optional
+        Activation key for plot generation
+
+    Returns
+    -------
+    a list of Matplotlib.Figures or dict of analytic and numerical partial
+    derivatives
+    """
+    if model in ['linear']:
+        x = np.linspace(-10, 10, 201)
+        pars = {'offset': 1., 'slope': 0.1}
+    elif model in ['sigmoid', 'arctan']:
+        x = np.linspace(-10, 10, 201)
+        pars = {'ampli': 1., 'coef': 2., 'x0': 2.}
+    elif model in ['sho', 'sho_phase', 'sho_phase_switch']:
+        # x = x0 excluded (phase switch)
+        x = np.linspace(200, 300, 1000)
+        pars = {'ampli': 1., 'coef': 100., 'x0': 250.}
+    else:
+        raise IOError("model not defined")
+
+    func = getattr(basic_func, model)
+    jac = getattr(basic_func, f'{model}_jac')(x, **pars)
+
+    # Partial derivatives with centered finite differences
+    jac_num = {}
+    for key, value in pars.items():
+        step = 1e-6 * max(abs(value), 1.)
+        pars_left, pars_right = dict(pars), dict(pars)
+        pars_left[key] -= step
+        pars_right[key] += step
+        jac_num[key] = (func(x, **pars_right) - func(x, **pars_left)) / \
+            (2 * step)
+
+    if make_plots:
+        fig = plt.figure()
+        fig.sfn = f"ex_{model}_basic_func_jac"
+        plt.grid()
+        for key in pars:
+            plt.plot(x, jac[key], label=f'd/d{key}')
+            plt.plot(x, jac_num[key], 'k:')
+        plt.legend()
+
+        return [fig]
+    else:
+        return jac, jac_num
+
+
 if __name__ == '__main__':
     # saving path management
     dir_path_out, save_plots = save_path_example(
@@ -86,5 +144,8 @@ if __name__ == '__main__':
     figs += ex_basic_func('sho', make_plots=True)
     figs += ex_basic_func('sho_phase', make_plots=True)
     figs += ex_basic_func('sho_phase_switch', make_plots=True)
+    for elem in ['linear', 'sigmoid', 'arctan', 'sho', 'sho_phase',
+                 'sho_phase_switch']:
+        figs += ex_basic_func_jac(elem, make_plots=True)
     print_plots(figs, save_plots=save_plots, show_plots=True,
                 dirname=dir_path_out, transparent=False)
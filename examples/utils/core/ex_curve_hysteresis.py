@@ -7,8 +7,9 @@ import matplotlib.pyplot as plt
 from PySSPFM.utils.path_for_runable import save_path_example
 from PySSPFM.utils.core.figure import print_plots
 from PySSPFM.utils.core import noise
-from PySSPFM.utils.core.basic_func import linear, sigmoid
-from PySSPFM.utils.core.curve_hysteresis import Hysteresis
+from PySSPFM.utils.core.basic_func import linear, sigmoid, arctan
+from PySSPFM.utils.core.curve_hysteresis import \
+    Hysteresis, hysteresis_properties
 
 
 def ex_hysteresis(asymmetric=False, verbose=False, make_plots=False):
@@ -60,6 +61,48 @@ def ex_hysteresis(asymmetric=False, verbose=False, make_plots=False):
         return hyster_fit.params, hyster_fit.props
 
 
+def ex_hysteresis_properties(model='sigmoid', verbose=False):
+    """ Example of closed-form properties calculation for a set of
+    hysteresis (vectorized over hysteresis) """
+    np.random.seed(0)
+
+    # Hysteresis parameters (with linear background)
+    nhyst = 10
+    offset = np.random.uniform(-1, 1, nhyst)
+    slope = np.random.uniform(-0.1, 0.1, nhyst)
+    ampli = np.random.uniform(5, 10, nhyst)
+    coef_l = np.random.uniform(1, 3, nhyst)
+    coef_r = np.random.uniform(1, 3, nhyst)
+    x0_l = np.random.uniform(-5, -1, nhyst)
+    x0_r = np.random.uniform(1, 5, nhyst)
+
+    # Properties of all hysteresis at once
+    props = hysteresis_properties(offset, slope, ampli, coef_l, x0_l,
+                                  ampli, coef_r, x0_r, model=model)
+
+    # Properties of each hysteresis with Hysteresis object
+    props_ref = []
+    for i in range(nhyst):
+        hyst = Hysteresis(model=model, asymmetric=True, offset=offset[i],
+                          slope=slope[i], ampli=ampli[i],
+                          coef=(coef_l[i], coef_r[i]), x0=(x0_l[i], x0_r[i]))
+        hyst.properties(bckgnd='linear')
+        props_ref.append(hyst.props)
+
+    # Branches evaluation at x-axis intersection points
+    model_func = sigmoid if model == 'sigmoid' else arctan
+    y_inter = [linear(props[f'x inter {side}'], offset, slope) +
+               model_func(props[f'x inter {side}'], ampli, coef, x0)
+               for side, coef, x0 in zip(['l', 'r'], [coef_l, coef_r],
+                                         [x0_l, x0_r])]
+
+    if verbose:
+        print("Properties of the first hysteresis :",
+              {key: value[0] for key, value in props.items()})
+
+    return props, props_ref, y_inter
+
+
 if __name__ == '__main__':
     # saving path management
     dir_path_out, save_plots = save_path_example(
@@ -67,5 +110,7 @@ if __name__ == '__main__':
     figs = []
     figs += ex_hysteresis(verbose=True, make_plots=True)
     figs += ex_hysteresis(asymmetric=True, verbose=True, make_plots=True)
+    ex_hysteresis_properties(model='sigmoid', verbose=True)
+    ex_hysteresis_properties(model='arctan', verbose=True)
     print_plots(figs, save_plots=save_plots, show_plots=True,
                 dirname=dir_path_out, transparent=False)
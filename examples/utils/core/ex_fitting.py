@@ -2,13 +2,15 @@
 Examples of fitting functions and class
 """
 import numpy as np
+import matplotlib.pyplot as plt
 
 from PySSPFM.utils.path_for_runable import save_path_example
 from PySSPFM.utils.core.figure import print_plots
 from PySSPFM.utils.core import noise
 from PySSPFM.utils.core.basic_func import \
     linear, gaussian, sho, sho_phase, sho_phase_switch
-from PySSPFM.utils.core.fitting import GaussianPeakFit, ShoPeakFit, ShoPhaseFit
+from PySSPFM.utils.core.fitting import \
+    GaussianPeakFit, ShoPeakFit, ShoPhaseFit, ShoPeakBatchFit
 
 
 def ex_gaussian_peak_fit(verbose=False, make_plots=False):
@@ -71,6 +73,42 @@ def ex_sho_peak_fit(verbose=False, make_plots=False):
         return sho_pars
 
 
+def ex_sho_peak_batch_fit(verbose=False, make_plots=False):
+    """ Example of sho peak fitting for a stack of curves """
+    np.random.seed(0)
+
+    # Sho parameters (x0 varies from one curve to another)
+    offset, slope = 2, 0
+    ampli, coef = 1, 10
+    tab_x0 = np.linspace(10, 12, 5)
+    noise_ampli = 2
+
+    # Noised sho creation
+    x = np.linspace(0, 20, 201)
+    y_tab = []
+    for x0 in tab_x0:
+        y_target = linear(x, offset, slope) + sho(x, ampli, coef, x0)
+        y_tab.append(noise.normal(y_target, noise_ampli))
+    y_tab = np.array(y_tab)
+
+    # Sho fitting (all the curves at once)
+    sho_peak_batch = ShoPeakBatchFit()
+    sho_peak_batch.fit(x, y_tab, init_params=None)
+    sho_pars = sho_peak_batch.report_fit_results(verbose=verbose)
+
+    if make_plots:
+        fig, ax = plt.subplots()
+        for y_val, y_fit in zip(y_tab, sho_peak_batch.eval(x)):
+            ax.scatter(x, y_val, alpha=0.5)
+            ax.plot(x, y_fit)
+        ax.set_xlabel('x')
+        ax.set_ylabel('y')
+        fig.sfn = "ex_sho_peak_batch_fit"
+        return [fig]
+    else:
+        return sho_pars, sho_peak_batch.success
+
+
 def ex_sho_phase_fit(verbose=False, make_plots=False):
     """ Example of sho phase fitting """
     np.random.seed(0)
@@ -138,6 +176,7 @@ if __name__ == '__main__':
     figs = []
     figs += ex_gaussian_peak_fit(verbose=True, make_plots=True)
     figs += ex_sho_peak_fit(verbose=True, make_plots=True)
+    figs += ex_sho_peak_batch_fit(verbose=True, make_plots=True)
     figs += ex_sho_phase_fit(verbose=True, make_plots=True)
     figs += ex_sho_phase_switch_fit(verbose=True, make_plots=True)
     print_plots(figs, save_plots=save_plots, show_plots=True,
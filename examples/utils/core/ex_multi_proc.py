@@ -0,0 +1,153 @@
+"""
+Example of multi_proc methods
+"""
+import numpy as np
+
+from PySSPFM.utils.core.multi_proc import \
+    run_tasks, run_block_tasks, row_blocks, print_progress, error_report, \
+    fill_failed, scheduler_pars
+
+
+def square_root_task(value, common_args):
+    """
+    Task of the example: square root of a value, with an error for negative
+    values (i.e. a failed pixel)
+
+    Parameters
+    ----------
+    value: float
+        Value of the task
+    common_args: dict
+        Arguments common to all the tasks ('coef' key)
+
+    Returns
+    -------
+    result: dict
+        Value and square root of the value multiplied by the coefficient
+    """
+    if value < 0:
+        raise ValueError(f"negative value: {value}")
+
+    return {'value': value, 'sqrt': common_args['coef'] * np.sqrt(value)}
+
+
+def neighbor_task(value, common_args):
+    """
+    Task of the warm start example: the value of the task is 'fitted' from
+    the value of a neighbor pixel (initial guess), with an error for negative
+    values (i.e. a failed pixel)
+
+    Parameters
+    ----------
+    value: float
+        Value of the task
+    common_args: dict
+        Arguments common to all the tasks ('warm_start' key, see WarmStart)
+
+    Returns
+    -------
+    result: dict
+        Value of the task and initial guess from the neighbor pixel
+    """
+    warm_start = common_args['warm_start']
+    guess = warm_start.guess('value')
+    if value < 0:
+        raise ValueError(f"negative value: {value}")
+    warm_start.update('value', value)
+
+    return {'value': value, 'guess': guess}
+
+
+def ex_multi_proc(verbose=False):
+    """
+    Example of run_tasks function: fault-tolerant pool scheduler with
+    ordered reassembly of the results, error report and progress callback
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        If True, prints the results and the progress of the tasks
+
+    Returns
+    -------
+    res: dict
+        Results of the example
+    """
+    res = {}
+    values = [4., 9., -1., 16., 25., -4., 36.]
+    progress_tab = []
+
+    def progress(nb_done, nb_tasks):
+        progress_tab.append(nb_done)
+        if verbose:
+            print_progress(nb_done, nb_tasks)
+
+    # ex scheduler_pars
+    res['scheduler pars'] = scheduler_pars(len(values), processes=2,
+                                           chunksize='auto')
+
+    # ex run_tasks
+    results, errors = run_tasks(
+        square_root_task, values, {'coef': 2.},
+        labels=[f'pixel {cont + 1}' for cont in range(len(values))],
+        processes=2, chunksize=2, max_tasks_per_child=2, progress=progress)
+    res['results'] = results
+    res['failed'] = [error['index'] for error in errors]
+    res['progress'] = progress_tab
+
+    # ex error_report
+    res['report'] = error_report(errors)
+
+    # ex fill_failed
+    res['filled'] = fill_failed(results, errors)
+
+    if verbose:
+        print(res['report'])
+        for result in res['filled']:
+            print(result)
+
+    return res
+
+
+def ex_multi_proc_warm_start(verbose=False):
+    """
+    Example of run_block_tasks function: pool scheduler with warm start,
+    each worker process handles a contiguous block of rows of the grid
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        If True, prints the results of the tasks
+
+    Returns
+    -------
+    res: dict
+        Results of the example
+    """
+    res = {}
+    # Grid of 3 rows and 4 columns (pixels in raster order)
+    values = [1., 2., 3., 4., 5., -6., 7., 8., 9., 10., 11., 12.]
+    nb_cols = 4
+
+    # ex row_blocks
+    res['blocks'] = row_blocks(len(values), nb_cols=nb_cols, processes=2)
+
+    # ex run_block_tasks
+    results, errors = run_block_tasks(
+        neighbor_task, values, {}, nb_cols=nb_cols,
+        labels=[f'pixel {cont + 1}' for cont in range(len(values))],
+        processes=2)
+    res['results'] = results
+    res['failed'] = [error['index'] for error in errors]
+
+    if verbose:
+        print(error_report(errors))
+        for result in results:
+            print(result)
+
+    return res
+
+
+if __name__ == '__main__':
+    ex_multi_proc(verbose=True)
+    ex_multi_proc_warm_start(verbose=True)
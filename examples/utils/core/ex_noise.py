@@ -6,7 +6,8 @@ import matplotlib.pyplot as plt
 
 from PySSPFM.utils.path_for_runable import save_path_example
 from PySSPFM.utils.core.figure import plot_graph, plot_hist, print_plots
-from PySSPFM.utils.core.noise import noise, filter_mean, butter_filter, normal
+from PySSPFM.utils.core.noise import \
+    noise, filter_mean, butter_filter, normal, ButterFilterBank
 
 
 def ex_gen_noise(make_plots=False):
@@ -159,6 +160,55 @@ def ex_butter_filter(filter_type='low', make_plots=False):
         return filtered_signal
 
 
+def ex_butter_filter_bank(filter_type='low'):
+    """
+    Example of the ButterFilterBank class: a 2D block of signals is filtered
+    at once.
+
+    Parameters
+    ----------
+    filter_type : str, optional
+        Type of the filter ('low', 'high', 'bandpass', or 'bandstop').
+
+    Returns
+    -------
+    filtered_block: numpy.array
+        2D array of filtered signals (one signal per line).
+    ref_block: numpy.array
+        2D array of signals filtered one by one with butter_filter.
+    nb_filters: int
+        Number of filters designed by the bank.
+    """
+    freq1 = 5
+    freq2 = 20
+    sampling_rate = 1000  # Hz
+    t = np.linspace(0, 2, 2 * sampling_rate, endpoint=False)
+    signal = np.sin(2 * np.pi * freq1 * t) + 0.5 * np.sin(2 * np.pi * freq2 * t)
+    block = np.array([signal, 2 * signal, -signal + 1])
+
+    if filter_type in ("low", "high"):
+        cutoff_frequency = np.mean([freq1, freq2])
+    else:
+        cutoff_frequency = (freq1-0.5*freq1, freq1+0.5*freq1)
+
+    # ex ButterFilterBank
+    bank = ButterFilterBank()
+    filtered_block = bank.filter(
+        block, sampling_frequency=sampling_rate,
+        cutoff_frequency=cutoff_frequency, filter_type=filter_type,
+        filter_order=4)
+    _ = bank.filter(
+        block[0], sampling_frequency=sampling_rate,
+        cutoff_frequency=cutoff_frequency, filter_type=filter_type,
+        filter_order=4)
+    ref_block = np.array([butter_filter(
+        elem, sampling_frequency=sampling_rate,
+        cutoff_frequency=cutoff_frequency, filter_type=filter_type,
+        filter_order=4) for elem in block])
+
+    return filtered_block, ref_block, len(bank.sos)
+
+
 if __name__ == '__main__':
     # saving path management
     dir_path_out, save_plots = save_path_example(
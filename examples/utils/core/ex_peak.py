@@ -9,8 +9,8 @@ from PySSPFM.utils.core.figure import print_plots, plot_graph
 from PySSPFM.utils.core.noise import noise
 from PySSPFM.utils.core.basic_func import gaussian, linear
 from PySSPFM.utils.core.peak import \
-    (detect_peak, find_main_peaks, plot_main_peaks, width_peak, guess_bckgnd,
-     guess_affine)
+    (detect_peak, find_main_peaks, plot_main_peaks, width_peak,
+     half_power_width, guess_bckgnd, guess_affine)
 
 
 def ex_find_main_peaks(make_plots=False):
@@ -144,6 +144,52 @@ def ex_width_peak(make_plots=False):
         return width
 
 
+def ex_half_power_width(make_plots=False):
+    """
+    Example of half_power_width function.
+
+    Parameters
+    ----------
+    make_plots: bool, optional
+        Activation key for generating plots.
+
+    Returns
+    -------
+    tuple or list
+        When make_plots is True, returns a list containing the figure object.
+        When make_plots is False, returns the width information with and
+        without interpolation, and the target widths.
+    """
+    x = np.linspace(0, 10, 51)
+    fwhm = np.array([1., 2., 3.])
+    y = np.array([gaussian(x, ampli=2, fwhm=elem, x0=5.1) for elem in fwhm])
+    # Width of a gaussian peak at maximum / sqrt(2)
+    target_width = fwhm / np.sqrt(2)
+
+    # ex half_power_width
+    width_interp = half_power_width(x, y, interp=True)
+    width_raw = half_power_width(x, y, interp=False)
+
+    if make_plots:
+        fig, ax = plt.subplots(figsize=[18, 9])
+        fig.sfn = "ex_half_power_width"
+        plot_dict = {'title': 'half power width determination'}
+        tabs_dict = [{'form': f'{col}o-', 'legend': f'fwhm = {elem}'}
+                     for col, elem in zip(['g', 'b', 'r'], fwhm)]
+        plot_graph(ax, x, list(y), plot_dict=plot_dict, tabs_dict=tabs_dict)
+        for col, x_left, x_right in zip(['g', 'b', 'r'],
+                                        width_interp['x left'],
+                                        width_interp['x right']):
+            plt.axvline(x_left, ls=':', c=col, lw=2)
+            plt.axvline(x_right, ls=':', c=col, lw=2)
+        plt.axhline(2 / np.sqrt(2), ls='--', c='k', lw=2,
+                    label='threshold')
+        plt.legend()
+        return [fig]
+    else:
+        return width_interp, width_raw, target_width
+
+
 def ex_guess_affine(make_plots=False):
     """
     Example of guess_affine function.
@@ -232,6 +278,7 @@ if __name__ == '__main__':
     figs += ex_find_main_peaks(make_plots=True)
     figs += ex_detect_peak(verbose=True)
     figs += ex_width_peak(make_plots=True)
+    figs += ex_half_power_width(make_plots=True)
     figs += ex_guess_affine(make_plots=True)
     figs += ex_guess_bckgnd(make_plots=True)
     print_plots(figs, save_plots=save_plots, show_plots=True,
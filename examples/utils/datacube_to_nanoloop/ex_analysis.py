@@ -13,8 +13,8 @@ from PySSPFM.utils.core.figure import print_plots, plot_graph
 from PySSPFM.utils.datacube_to_nanoloop.plot import \
     plt_seg_max, plt_seg_fit, plt_seg_stable, plt_force_curve
 from PySSPFM.utils.datacube_to_nanoloop.analysis import \
-    (SegmentInfo, SegmentSweep, SegmentStable, external_calib, cut_function,
-     extract_other_properties)
+    (SegmentInfo, SegmentSweep, SegmentStable, SegmentBatch, external_calib,
+     cut_function, extract_other_properties)
 from PySSPFM.utils.raw_extraction import data_extraction, csv_meas_sheet_extract
 
 
@@ -235,6 +235,57 @@ def ex_segments(analysis, mode, make_plots=False):
         return segs[mode][4]
 
 
+def ex_segment_batch(analysis, mode, nb_seg_str='all', q_interp=False,
+                     verbose=False):
+    """
+    Example of SegmentBatch object, compared with the list of Segment objects.
+
+    Parameters
+    ----------
+    analysis: str
+        The type of analysis to perform. Possible values: 'max', 'fit',
+        'dfrt', 'single_freq'.
+    mode: str
+        The mode of operation. Possible values: 'on f', 'off f'.
+    nb_seg_str: str, optional
+        Number of segments to generate. Defaults to 'all'.
+    q_interp: bool, optional
+        Flag indicating whether to interpolate the -3 dB bandwidth edges of
+        the quality factors ('max' analysis). Defaults to False.
+    verbose: bool, optional
+        Flag indicating whether to print the results. Defaults to False.
+
+    Returns
+    -------
+    seg_batch: SegmentBatch object
+        All the segments treated with the batch engine.
+    segs: list of Segment objects
+        All the segments treated one by one.
+    """
+    assert mode in ['on f', 'off f']
+
+    sweep_freq = {'start': 200, 'end': 400}
+    seg_pars, sign_pars, _, _, _, fit_pars, _ = pars_segment()
+    segs, dict_meas = list_segs(mode=analysis, nb_seg_str=nb_seg_str)
+    cut_dict, _ = cut_function(sign_pars)
+    index_cut = cut_dict[mode][:len(segs[mode])]
+    seg_sample = sign_pars['Seg sample (W)'] if mode == 'on f' else \
+        sign_pars['Seg sample (R)']
+
+    # ex SegmentBatch
+    seg_batch = SegmentBatch(
+        index_cut, seg_sample, dict_meas, mode=analysis,
+        start_freq_init=sweep_freq['start'], end_freq_init=sweep_freq['end'],
+        cut_seg=seg_pars['cut seg [%]'], fit_pars=fit_pars,
+        q_interp=q_interp)
+
+    if verbose:
+        for key, value in seg_batch.dict_res().items():
+            print(f'{key}: {value[:5]}')
+
+    return seg_batch, segs[mode]
+
+
 def ex_extract_other_properties(make_plots=False):
     """
     Example of extract_other_properties function
@@ -280,6 +331,7 @@ if __name__ == '__main__':
     figs = []
     figs += ex_calib(make_plots=True)
     ex_cut_function(verbose=True)
+    ex_segment_batch('max', 'on f', verbose=True)
     figs += ex_segments('max', 'off f', make_plots=True)
     figs += ex_segments('max', 'on f', make_plots=True)
     figs += ex_segments('fit', 'off f', make_plots=True)
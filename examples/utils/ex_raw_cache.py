@@ -0,0 +1,99 @@
+"""
+Example of raw_cache methods
+"""
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from PySSPFM.settings import \
+    get_setting, settings_snapshot, load_settings_snapshot
+from PySSPFM.utils.raw_extraction import data_extraction
+from PySSPFM.utils.raw_cache import get_cache_dir, cache_key, \
+    load_cache_entry, cache_info, evict_cache, clear_cache, main
+
+
+def ex_raw_cache(verbose=False):
+    """
+    Example of raw_cache functions: data_extraction with on-disk cache,
+    cache_info, evict_cache and clear_cache
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        If True, prints the results
+
+    Returns
+    -------
+    res: dict
+        Results of the example
+    """
+    res = {}
+    dir_path_in = os.path.join(get_setting("example_root_path_in"),
+                               "KNN500n_reduced_datacube_txt")
+    meas_sheet_name = get_setting("default_parameters_file_name")
+    meas_names = ['Time', 'Amplitude', 'Phase', 'Freq', 'Bias']
+    delimiter = get_setting('delimiter')
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        shutil.copy(os.path.join(dir_path_in, meas_sheet_name), dir_path)
+        cache_dir = os.path.join(dir_path, 'raw_cache')
+        file_paths = [os.path.join(dir_path, f'KNN500n.0_0000{index}.txt')
+                      for index in range(1, 4)]
+        for file_path in file_paths:
+            np.savetxt(file_path, np.random.rand(200, len(meas_names)),
+                       delimiter=delimiter, header=delimiter.join(meas_names))
+
+        # On-disk cache activated (settings of the current process)
+        snapshot = settings_snapshot()
+        load_settings_snapshot({**snapshot, "raw_cache": True,
+                                "raw_cache_path": cache_dir})
+        try:
+            # ex data_extraction: file parsed and saved in the cache
+            dict_meas, script_dict = data_extraction(file_paths[0],
+                                                     mode_dfrt=True)
+            res['entries first'] = cache_info()['entries']
+            # ex data_extraction: measurements loaded from the cache
+            dict_meas_cache, script_dict_cache = data_extraction(
+                file_paths[0], mode_dfrt=True)
+            res['entries second'] = cache_info()['entries']
+            res['same data'] = all(
+                np.array_equal(np.array(value), dict_meas_cache[key])
+                for key, value in dict_meas.items())
+            res['same script'] = script_dict_cache == script_dict
+            # ex load_cache_entry: classic mode is another entry
+            res['classic entry'] = \
+                load_cache_entry(file_paths[0], mode_dfrt=False)[0]
+
+            # ex evict_cache: least recently used entries removed
+            for file_path in file_paths[1:]:
+                data_extraction(file_path, mode_dfrt=True)
+            # first entry: least recently used
+            os.utime(get_cache_dir() / (cache_key(file_paths[0],
+                                                  mode_dfrt=True) + '.npz'),
+                     (0, 0))
+            res['entries all'] = cache_info()['entries']
+            entry_size = cache_info()['size [MB]'] / res['entries all']
+            res['evicted'] = evict_cache(max_size=2.5 * entry_size)
+            res['first evicted'] = \
+                load_cache_entry(file_paths[0], mode_dfrt=True)[0] is None
+
+            # ex main (command line interface)
+            if verbose:
+                main(['info'])
+
+            # ex clear_cache
+            res['cleared'] = clear_cache()
+            res['entries end'] = cache_info()['entries']
+        finally:
+            load_settings_snapshot(None)
+
+    if verbose:
+        for key, value in res.items():
+            print(f'{key}: {value}')
+
+    return res
+
+
+if __name__ == "__main__":
+    ex_raw_cache(verbose=True)
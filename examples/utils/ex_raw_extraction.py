@@ -2,12 +2,19 @@
 Example of raw_extraction methods
 """
 import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
 
 from PySSPFM.settings import get_setting
 from PySSPFM.utils.path_for_runable import save_path_example
 from PySSPFM.utils.core.figure import print_plots
 from PySSPFM.utils.datacube_to_nanoloop.plot import plt_signals
-from PySSPFM.utils.raw_extraction import data_extraction, csv_meas_sheet_extract
+from PySSPFM.utils.raw_extraction import \
+    data_extraction, csv_meas_sheet_extract, save_datacube_npy, \
+    save_grid_datacube, open_grid_datacube, datacube_filenames, \
+    MEAS_SHEET_CACHE
 
 
 def ex_data_extraction(ext, make_plots=False, verbose=False):
@@ -89,6 +96,224 @@ def ex_csv_meas_sheet_extract(verbose=False):
     return meas_pars, sign_pars
 
 
+def ex_meas_sheet_cache(verbose=False):
+    """
+    Example of measurement sheet cache (csv_meas_sheet_extract) and
+    data_extraction with parameters already extracted
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        If True, prints the results
+
+    Returns
+    -------
+    res: dict
+        Results of the example
+    """
+    res = {}
+    dir_path_in = os.path.join(get_setting("example_root_path_in"),
+                               "KNN500n_reduced_datacube_txt")
+    meas_sheet_name = get_setting("default_parameters_file_name")
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        # Measurement sheet and a small raw measurement table file
+        shutil.copy(os.path.join(dir_path_in, meas_sheet_name), dir_path)
+        file_path = os.path.join(dir_path, 'KNN500n_SSPFM.0_00056.txt')
+        delimiter = get_setting('delimiter')
+        np.savetxt(file_path, np.random.rand(10, 3), delimiter=delimiter,
+                   header=delimiter.join(['Time', 'Amplitude', 'Phase']))
+
+        # ex csv_meas_sheet_extract: sheet parsed once, copies returned
+        meas_pars, sign_pars = csv_meas_sheet_extract(dir_path)
+        res['cached'] = os.path.abspath(dir_path) in MEAS_SHEET_CACHE
+        sign_pars['Mode (R)'] = 'modified'
+        res['sign pars'] = csv_meas_sheet_extract(dir_path)[1]
+        res['meas pars'] = meas_pars
+
+        # ex data_extraction with sign_pars (measurement sheet is not read)
+        _, res['script dict'] = data_extraction(file_path, mode_dfrt=True)
+        _, res['script dict sign pars'] = data_extraction(
+            file_path, mode_dfrt=True, sign_pars=res['sign pars'])
+
+    if verbose:
+        for key, value in res.items():
+            print(f'{key}: {value}')
+
+    return res
+
+
+def ex_datacube_npy(verbose=False):
+    """
+    Example of binary datacube file (npy): save_datacube_npy and
+    data_extraction functions, compared with txt datacube file
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        If True, prints the results
+
+    Returns
+    -------
+    dict_meas_npy: dict
+        All measurements extracted from the npy file
+    dict_meas_txt: dict
+        All measurements extracted from the txt file
+    """
+    dir_path_in = os.path.join(get_setting("example_root_path_in"),
+                               "KNN500n_reduced_datacube_txt")
+    meas_sheet_name = get_setting("default_parameters_file_name")
+    meas_names = ['Time', 'Amplitude', 'Phase', 'Freq', 'Bias']
+    raw_data = np.random.rand(len(meas_names), 200)
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        shutil.copy(os.path.join(dir_path_in, meas_sheet_name), dir_path)
+        file_path = os.path.join(dir_path, 'KNN500n_SSPFM.0_00056')
+
+        # Same measurements saved in txt and npy file
+        delimiter = get_setting('delimiter')
+        np.savetxt(file_path + '.txt', raw_data.T, delimiter=delimiter,
+                   header=delimiter.join(meas_names), fmt='%.18e')
+        # ex save_datacube_npy
+        save_datacube_npy(file_path + '.npy', raw_data, meas_names)
+
+        # ex data_extraction
+        dict_meas_txt, _ = data_extraction(file_path + '.txt', mode_dfrt=True)
+        dict_meas_npy, _ = data_extraction(file_path + '.npy', mode_dfrt=True)
+        dict_meas_npy = {key: np.array(value)
+                         for key, value in dict_meas_npy.items()}
+
+    if verbose:
+        for key, value in dict_meas_npy.items():
+            print(f'{key}: {value[:5]}')
+
+    return dict_meas_npy, dict_meas_txt
+
+
+def ex_grid_datacube(nb_pix=10, verbose=False):
+    """
+    Example of grid datacube container: save_grid_datacube,
+    datacube_filenames and data_extraction functions, compared with the
+    initial txt datacube files
+
+    Parameters
+    ----------
+    nb_pix: int, optional
+        Number of pixels (i.e raw measurement files)
+    verbose: bool, optional
+        If True, prints the results
+
+    Returns
+    -------
+    res: dict
+        Results of the example
+    """
+    res = {}
+    dir_path_in = os.path.join(get_setting("example_root_path_in"),
+                               "KNN500n_reduced_datacube_txt")
+    meas_sheet_name = get_setting("default_parameters_file_name")
+    meas_names = ['Time', 'Amplitude', 'Phase', 'Freq', 'Bias']
+    delimiter = get_setting('delimiter')
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        # Raw measurement txt files (one per pixel, not the same length)
+        shutil.copy(os.path.join(dir_path_in, meas_sheet_name), dir_path)
+        for index in np.random.permutation(nb_pix) + 1:
+            raw_data = np.random.rand(len(meas_names), 200 - index % 3)
+            np.savetxt(os.path.join(dir_path, f'KNN500n.0_{index:05d}.txt'),
+                       raw_data.T, delimiter=delimiter,
+                       header=delimiter.join(meas_names), fmt='%.18e')
+
+        # ex save_grid_datacube
+        dir_path_out = os.path.join(dir_path, 'grid')
+        save_grid_datacube(dir_path, extension='txt',
+                           dir_path_out=dir_path_out, verbose=verbose)
+        header = open_grid_datacube(dir_path_out)['header']
+        res['shape'] = header['shape']
+        res['index'] = header['index']
+        res['coordinates'] = header['coordinates']
+
+        # ex datacube_filenames
+        txt_file_names = datacube_filenames(dir_path, extension='txt')
+        grid_file_names = datacube_filenames(dir_path_out, extension='grid')
+        res['file names'] = grid_file_names
+
+        # ex data_extraction: pixels of the container vs txt files
+        res['same data'] = True
+        for txt_file_name, grid_file_name in zip(txt_file_names,
+                                                 grid_file_names):
+            dict_meas_txt, _ = data_extraction(
+                os.path.join(dir_path, txt_file_name), mode_dfrt=True)
+            dict_meas_grid, _ = data_extraction(
+                os.path.join(dir_path_out, grid_file_name), mode_dfrt=True)
+            for key, value in dict_meas_txt.items():
+                res['same data'] &= bool(np.array_equal(
+                    np.array(dict_meas_grid[key]), np.array(value)))
+
+    if verbose:
+        for key, value in res.items():
+            print(f'{key}: {value}')
+
+    return res
+
+
+def ex_channel_selection(verbose=False):
+    """
+    Example of data_extraction function with a selection of channels
+    (column-selective reading of txt, csv and npy datacube files)
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        If True, prints the results
+
+    Returns
+    -------
+    res: dict
+        For each extension: keys of the extracted measurements, and
+        comparison with the complete extraction
+    """
+    res = {}
+    dir_path_in = os.path.join(get_setting("example_root_path_in"),
+                               "KNN500n_reduced_datacube_txt")
+    meas_sheet_name = get_setting("default_parameters_file_name")
+    meas_names = ['time', 'Amplitude', 'Phase', 'Freq', 'Bias']
+    raw_data = np.random.rand(len(meas_names), 200)
+    channels = ['times', 'pha']
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        shutil.copy(os.path.join(dir_path_in, meas_sheet_name), dir_path)
+        file_path = os.path.join(dir_path, 'KNN500n_SSPFM.0_00056')
+
+        # Same measurements saved in txt, csv and npy file
+        delimiter = get_setting('delimiter')
+        np.savetxt(file_path + '.txt', raw_data.T, delimiter=delimiter,
+                   header=delimiter.join(meas_names), fmt='%.18e')
+        pd.DataFrame(raw_data.T, columns=meas_names).to_csv(
+            file_path + '.csv', index=False)
+        save_datacube_npy(file_path + '.npy', raw_data, meas_names)
+
+        for ext in ['txt', 'csv', 'npy']:
+            # ex data_extraction: complete and selective extraction
+            dict_meas, _ = data_extraction(f'{file_path}.{ext}',
+                                           mode_dfrt=True)
+            dict_meas_sel, _ = data_extraction(f'{file_path}.{ext}',
+                                               mode_dfrt=True,
+                                               channels=channels)
+            res[ext] = {
+                'keys': sorted(dict_meas_sel.keys()),
+                'same data': all(
+                    np.array_equal(np.array(dict_meas_sel[key]),
+                                   np.array(dict_meas[key]))
+                    for key in channels)}
+
+    if verbose:
+        for key, value in res.items():
+            print(f'{key}: {value}')
+
+    return res
+
+
 if __name__ == "__main__":
     # saving path management
     dir_path_out, save_plots = save_path_example(
@@ -99,5 +324,9 @@ if __name__ == "__main__":
     figs += ex_data_extraction('csv', make_plots=True, verbose=True)
     figs += ex_data_extraction('xlsx', make_plots=True, verbose=True)
     ex_csv_meas_sheet_extract(verbose=True)
+    ex_meas_sheet_cache(verbose=True)
+    ex_datacube_npy(verbose=True)
+    ex_grid_datacube(verbose=True)
+    ex_channel_selection(verbose=True)
     print_plots(figs, save_plots=save_plots, show_plots=True,
                 dirname=dir_path_out, transparent=False)
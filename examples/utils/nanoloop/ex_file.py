@@ -12,7 +12,10 @@ from PySSPFM.utils.core.figure import print_plots, plot_graph
 from PySSPFM.utils.signal_bias import sspfm_generator
 from PySSPFM.utils.nanoloop.gen_data import gen_nanoloops
 from PySSPFM.utils.nanoloop.file import \
-    sort_nanoloop_data, save_nanoloop_file, extract_nanoloop_data
+    sort_nanoloop_data, save_nanoloop_file, extract_nanoloop_data, \
+    read_nanoloop_file, NANOLOOP_KEYS, nanoloop_file_name, nanoloop_data, \
+    init_nanoloop_store, write_nanoloop_store, close_nanoloop_store
+from PySSPFM.utils.nanoloop_to_hyst.file import generate_file_nanoloop_paths
 
 
 def example_file(make_plots=False, verbose=False):
@@ -166,6 +169,133 @@ def example_file(make_plots=False, verbose=False):
         return loop_tabs, fmts, headers, datas_dicts, dict_strs
 
 
+def example_read_nanoloop_file(verbose=False):
+    """
+    Example of read_nanoloop_file function (single pass reading), compared
+    to np.genfromtxt.
+
+    Parameters
+    ----------
+    verbose: bool, optional
+        Flag indicating whether to print verbose output.
+
+    Returns
+    -------
+    res: dict
+        Results of the example
+    """
+    dir_path_out_data = os.path.join(
+        get_setting("default_data_path_out"), "test_nanoloop_file")
+    if not os.path.isdir(dir_path_out_data):
+        os.makedirs(dir_path_out_data)
+
+    # Nanoloop file with segment properties and a missing value
+    loop_dict = {key: None for key in NANOLOOP_KEYS}
+    loop_dict['Index Pix'] = [1, 1, 2, 2]
+    loop_dict['Read Volt'] = [0., 0., 1., 1.]
+    loop_dict['Write Volt'] = [-5., 5., -5., 5.]
+    loop_dict['Amplitude'] = [1.5, 2.5, None, 4.5]
+    loop_dict['Phase'] = [0., 180., 0., 180.]
+    header = 'Loop index\tRead Volt (V)\tWrite Volt (V)\t' \
+             'Amplitude (nm)\tPhase (deg)\t'
+    fmt = ('%i', '%.2f', '%.2f', '%.3e', '%.3f')
+    file_path_out = save_nanoloop_file(
+        dir_path_out_data, 'read_file', loop_dict, fmt, header,
+        segment_info={'height': 12.5, 'phase offset': 45})
+
+    # ex read_nanoloop_file
+    res = {}
+    res['header'], res['data tab'] = read_nanoloop_file(file_path_out)
+    res['data tab ref'] = np.transpose(
+        np.genfromtxt(file_path_out, delimiter='\t\t', skip_header=4))
+    # ex extract_nanoloop_data
+    res['data dict'], _, res['other properties'] = \
+        extract_nanoloop_data(file_path_out)
+
+    if verbose:
+        for key, value in res.items():
+            print(f'{key}: {value}')
+
+    return res
+
+
+def example_nanoloop_store(nb_pix=3, dir_path_out=None, verbose=False):
+    """
+    Example of nanoloop store functions: nanoloops of several pixels saved
+    in txt files and in a consolidated nanoloop store, then read with
+    generate_file_nanoloop_paths and extract_nanoloop_data.
+
+    Parameters
+    ----------
+    nb_pix: int, optional
+        Number of pixels.
+    dir_path_out: str, optional
+        Output directory of the example (default is the test_nanoloop_store
+        folder of the default output path).
+    verbose: bool, optional
+        Flag indicating whether to print verbose output.
+
+    Returns
+    -------
+    res: dict
+        Results of the example
+    """
+    dir_path_out = dir_path_out or os.path.join(
+        get_setting("default_data_path_out"), "test_nanoloop_store")
+    if os.path.isdir(dir_path_out):
+        shutil.rmtree(dir_path_out)
+    dir_path_out_txt = os.path.join(dir_path_out, 'txt')
+    dir_path_out_store = os.path.join(dir_path_out, 'store')
+
+    # Nanoloops of the pixels: 2 read voltages, 6 write voltages
+    np.random.seed(0)
+    write_nb_voltages, read_nb_voltages = 6, 2
+    nb_points = read_nb_voltages * (write_nb_voltages - 1) * 2
+    sspfm_bias = np.ravel([[write, 0.] for write in
+                           np.tile(np.linspace(-5, 5, nb_points // 2), 2)])
+    file_names_root = [f'pix.0_{index:05d}' for index in range(1, nb_pix + 1)]
+
+    # ex init_nanoloop_store
+    store = init_nanoloop_store(dir_path_out_store, file_names_root)
+    for index, file_name_root in enumerate(file_names_root):
+        segment_info = {'height': np.random.rand(), 'phase offset': 45}
+        tab_nanoloops = []
+        for mode in ['Off field', 'On field']:
+            dict_res = {'Amplitude': np.random.rand(nb_points),
+                        'Phase': 180 * np.random.rand(nb_points)}
+            loop_dict, fmt, header = sort_nanoloop_data(
+                sspfm_bias, write_nb_voltages, read_nb_voltages, dict_res,
+                unit='nm')
+            save_nanoloop_file(dir_path_out_txt, file_name_root, loop_dict,
+                               fmt, header, segment_info=segment_info,
+                               mode=mode)
+            tab_nanoloops.append((
+                nanoloop_file_name(file_name_root, mode=mode),
+                nanoloop_data(loop_dict, header, segment_info, mode=mode)))
+        # ex write_nanoloop_store
+        write_nanoloop_store(store, index, tab_nanoloops)
+    # ex close_nanoloop_store
+    close_nanoloop_store(store)
+
+    # ex generate_file_nanoloop_paths and extract_nanoloop_data
+    res = {'store files': sorted(os.listdir(dir_path_out_store))}
+    for key, dir_path in zip(['txt', 'store'],
+                             [dir_path_out_txt, dir_path_out_store]):
+        file_paths = generate_file_nanoloop_paths(dir_path)
+        res[f'{key} names'] = [[os.path.split(file_path)[1]
+                                for file_path in tab_path]
+                               for tab_path in file_paths]
+        res[f'{key} data'] = [[extract_nanoloop_data(file_path)
+                               for file_path in tab_path]
+                              for tab_path in file_paths]
+
+    if verbose:
+        for key in ['store files', 'txt names', 'store names']:
+            print(f'{key}: {res[key]}')
+
+    return res
+
+
 if __name__ == '__main__':
     # saving path management
     dir_path_out, save_plots = save_path_example(
@@ -13,7 +13,7 @@ from PySSPFM.utils.nanoloop.phase import gen_dict_pha
 from PySSPFM.utils.nanoloop_to_hyst.gen_data import gen_data_dict
 from PySSPFM.utils.nanoloop_to_hyst.analysis import \
     (sort_prop, gen_analysis_mode, find_best_nanoloop, hyst_analysis,
-     electrostatic_analysis)
+     electrostatic_analysis, batch_hyst_fit)
 
 
 def ex_sort_prop(verbose=False):
@@ -172,6 +172,78 @@ def example_analysis(analysis='mean_off', make_plots=False, verbose=False):
                 electrostatic_dict)
 
 
+def example_batch_hyst_fit(analysis='mean_off', nb_pix=10, verbose=False):
+    """
+    Example of batch_hyst_fit function: hysteresis of several pixels fitted
+    at once, compared with the fit of each pixel (hyst_analysis).
+
+    Parameters
+    ----------
+    analysis: str, optional
+        Type of analysis to perform: "mean_off" or "mean_on".
+        Default is 'mean_off'.
+    nb_pix: int, optional
+        Number of generated pixels.
+    verbose: bool, optional
+        Flag indicating whether to print verbose output. Default is False.
+
+    Returns
+    -------
+    fit_params: dict
+        Fitted parameters of all the pixels (batch fit)
+    success: numpy.array(nb_pix) of bool
+        Convergence flag of the batch fit of each pixel
+    ref_params: dict
+        Fitted parameters of all the pixels (fit of each pixel)
+    """
+    np.random.seed(0)
+    mode = 'on' if analysis == 'mean_on' else 'off'
+
+    meas_pars = {'SSPFM Bias app': 'Sample',
+                 'Sign of d33': 'positive'}
+    dict_pha = gen_dict_pha(meas_pars, 'offset', main_elec=False)
+    pars, sign_pars, pha_val = gen_pars()
+    analysis_mode = gen_analysis_mode(mode=mode,
+                                      read_mode=sign_pars['Mode (R)'])
+
+    # Hysteresis of each pixel (random coercive voltage and amplitude)
+    x_hyst_tab, y_hyst_tab, ref_params = [], [], {}
+    for _ in range(nb_pix):
+        pars['ferro']['coer l'] = np.random.uniform(-3, -1)
+        pars['ferro']['amp'] = np.random.uniform(5, 15)
+        datas_dict, dict_str = gen_data_dict(
+            pars, q_fact=1., mode=mode, pha_val=pha_val)
+        loop_tab, _, _ = nanoloop_treatment(
+            datas_dict, sign_pars, dict_pha=dict_pha, dict_str=dict_str)
+        x_hyst, y_hyst, best_loop, _, _ = find_best_nanoloop(
+            loop_tab, dict_pha['counterclockwise'], dict_pha['grounded tip'],
+            analysis_mode=analysis_mode)
+        x_hyst_tab.append(x_hyst)
+        y_hyst_tab.append(y_hyst)
+
+        # Fit of the pixel
+        best_hyst, _, _, _ = hyst_analysis(
+            x_hyst, y_hyst, best_loop, dict_pha['counterclockwise'],
+            dict_pha['grounded tip'], method='least_square',
+            analysis_mode=analysis_mode)
+        for key, par in best_hyst.params.items():
+            ref_params.setdefault(key, []).append(par.value)
+
+    # ex batch_hyst_fit
+    fit_params, success, bckgnd = batch_hyst_fit(
+        x_hyst_tab, y_hyst_tab, dict_pha['counterclockwise'],
+        dict_pha['grounded tip'], analysis_mode=analysis_mode)
+
+    if verbose:
+        print('\t- ex batch_hyst_fit:')
+        print(f'\t\tbckgnd: {bckgnd}')
+        print(f'\t\tconverged fits: {np.sum(success)}/{nb_pix}')
+        for key, value in fit_params.items():
+            print(f'\t\t{key}: {value}')
+
+    return fit_params, success, ref_params
+
+
 if __name__ == '__main__':
     # saving path management
     dir_path_out, save_plots = save_path_example(
@@ -185,5 +257,6 @@ if __name__ == '__main__':
                              verbose=True)
     figs += example_analysis(analysis='mean_on', make_plots=True,
                              verbose=True)
+    example_batch_hyst_fit(analysis='mean_off', verbose=True)
     print_plots(figs, save_plots=save_plots, show_plots=True,
                 dirname=dir_path_out, transparent=False)
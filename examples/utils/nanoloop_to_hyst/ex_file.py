@@ -9,7 +9,8 @@ from PySSPFM.settings import get_setting
 from PySSPFM.utils.path_for_runable import save_path_example
 from PySSPFM.utils.nanoloop_to_hyst.file import \
     (create_file_nanoloop_paths, generate_file_nanoloop_paths,
-     save_properties, extract_properties, extract_main_elec_tab)
+     save_properties, extract_properties, extract_main_elec_tab,
+     save_property_store, open_property_store, export_property_store)
 
 
 def example_file(verbose=False):
@@ -104,6 +105,76 @@ def example_file(verbose=False):
             properties, dim_pix, dim_mic, main_elec_tab)
 
 
+def example_property_store(root_out=None, verbose=False):
+    """
+    Example of property store methods: properties saved in txt files and in
+    a binary property store, then extracted, and store exported in txt files.
+
+    Parameters
+    ----------
+    root_out: str, optional
+        Output directory of the example, defaults to the test_property_store
+        folder of the default output path.
+    verbose: bool, optional
+        Whether to print verbose output, defaults to False.
+
+    Returns
+    -------
+    res: dict
+        Results of the example.
+    """
+    root_out = root_out or os.path.join(
+        get_setting("default_data_path_out"), "test_property_store")
+    if os.path.isdir(root_out):
+        shutil.rmtree(root_out)
+    dir_path_out = {key: os.path.join(root_out, key)
+                    for key in ['txt', 'store', 'export']}
+
+    properties = ex_sort_prop()
+    properties['on']['prop n°0'][3] = 'None'
+    properties['other'] = {'height': [float(cont) for cont in range(64)],
+                           'deflection': [cont / 3 for cont in range(64)]}
+    dim_pix = {'x': 8,
+               'y': 8}
+    dim_mic = {'x': 3.5,
+               'y': 3.5}
+
+    # ex save_properties and save_property_store
+    save_properties(properties, dir_path_out['txt'], dim_pix=dim_pix,
+                    dim_mic=dim_mic)
+    save_property_store(properties, dir_path_out['store'], dim_pix=dim_pix,
+                        dim_mic=dim_mic)
+    res = {'store files': sorted(os.listdir(dir_path_out['store']))}
+
+    # ex open_property_store (memory-mapped properties)
+    res['store'] = open_property_store(dir_path_out['store'])['properties']
+
+    # ex extract_properties
+    for key in ['txt', 'store']:
+        res[f'extract {key}'] = extract_properties(dir_path_out[key])
+
+    # ex export_property_store
+    export_property_store(dir_path_out['store'],
+                          dir_path_out=dir_path_out['export'])
+    res['export files'] = sorted(os.listdir(dir_path_out['export']))
+    res['same export'] = True
+    for file_name in res['export files']:
+        with open(os.path.join(dir_path_out['txt'], file_name),
+                  encoding='utf-8') as file:
+            content_txt = file.read()
+        with open(os.path.join(dir_path_out['export'], file_name),
+                  encoding='utf-8') as file:
+            content_export = file.read()
+        res['same export'] &= content_txt == content_export
+
+    if verbose:
+        print('\t- ex property store')
+        for key in ['store files', 'export files', 'same export']:
+            print(f'\t\t{key}: {res[key]}')
+
+    return res
+
+
 if __name__ == '__main__':
     # saving path management
     dir_path_out, save_plots = save_path_example(
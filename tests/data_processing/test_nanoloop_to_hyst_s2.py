@@ -3,7 +3,9 @@ Test nanoloop_to_hyst_s2 methods
 """
 
 import pytest
-from examples.data_processing.ex_nanoloop_to_hyst_s2 import ex_multi_script
+import numpy as np
+from examples.data_processing.ex_nanoloop_to_hyst_s2 import \
+    ex_multi_script, ex_multi_script_fused, ex_batch_hyst_pixels
 
 
 # class TestMain(unittest.TestCase):
@@ -13,3 +15,47 @@ def test_multi_script():
     """ Test ex_multi_script """
 
     ex_multi_script()
+
+
+def test_multi_script_batch():
+    """ Test ex_multi_script with batch engine """
+
+    ex_multi_script(engine='batch')
+
+
+def test_multi_script_fused():
+    """ Test ex_multi_script_fused """
+
+    res = ex_multi_script_fused(nb_pix=2)
+
+    assert res['nanoloop files'] == [
+        'off_f_pix.0_00001.txt', 'off_f_pix.0_00002.txt',
+        'on_f_pix.0_00001.txt', 'on_f_pix.0_00002.txt']
+    for key in ['off', 'on', 'coupled', 'other']:
+        assert list(res['fused'][key].keys()) == \
+            list(res['txt'][0][key].keys())
+        for values in res['fused'][key].values():
+            assert len(values) == 2
+    # Differences: rounding of the txt nanoloop files
+    for mode in ['off', 'on']:
+        for loop_fused, loop_txt in zip(res['fused best loops'][mode],
+                                        res['txt best loops'][mode]):
+            piezorep = np.array(loop_txt.piezorep.y_meas)
+            assert loop_fused.piezorep.write_volt == \
+                pytest.approx(loop_txt.piezorep.write_volt, abs=1e-2)
+            assert loop_fused.piezorep.y_meas == pytest.approx(
+                piezorep, abs=1e-2 * np.max(np.abs(piezorep)))
+
+
+def test_batch_hyst_pixels():
+    """ Test ex_batch_hyst_pixels """
+
+    res = ex_batch_hyst_pixels(nb_pix=6)
+
+    for props_object, props_batch in zip(res['object'], res['batch']):
+        for mode in ['off', 'on']:
+            assert list(props_batch[mode].keys()) == \
+                list(props_object[mode].keys())
+            for key in ['ampli_0', 'x0_0', 'x0_1']:
+                assert props_batch[mode][f'fit pars: {key}'] == pytest.approx(
+                    props_object[mode][f'fit pars: {key}'], rel=1e-3)
@@ -3,7 +3,7 @@ Test settings methods
 """
 import pytest
 
-from examples.ex_settings import ex_get_settings_dict
+from examples.ex_settings import ex_get_settings_dict, ex_settings_cache
 
 
 # class TestSignalBias(unittest.TestCase):
@@ -148,3 +148,16 @@ def test_get_settings_dict_default():
         "electrostatic_offset": True}
 
     assert def_settings_dict == target_def_settings_dict
+
+
+def test_settings_cache():
+    """ Test settings cache (mtime invalidation and snapshot) """
+
+    res = ex_settings_cache()
+
+    assert res['same object']
+    assert res['fit method before'] == "nelder"
+    assert res['fit method after'] == "leastsq"
+    assert res['figsize'] == [18, 9]
+    assert res['fit method snapshot'] == "least_square"
+    assert res['fit method restored'] == "nelder"
@@ -4,7 +4,8 @@ Test basic func functionalities
 from pytest import approx
 import numpy as np
 
-from examples.utils.core.ex_basic_func import ex_basic_func
+from examples.utils.core.ex_basic_func import \
+    ex_basic_func, ex_basic_func_jac
 
 
 def test_linear_basic_func():
@@ -77,3 +78,12 @@ def test_sho_phase_switch_basic_func():
     # print(np.sum(y))
 
     assert np.sum(y) == approx(-0.8435083552967626)
+
+
+def test_basic_func_jac():
+    """ test basic func jacobians (compared with finite differences) """
+    for model in ['linear', 'sigmoid', 'arctan', 'sho', 'sho_phase',
+                  'sho_phase_switch']:
+        jac, jac_num = ex_basic_func_jac(model, make_plots=False)
+        for key, value in jac.items():
+            assert value == approx(jac_num[key], rel=1e-4, abs=1e-8)
@@ -3,7 +3,8 @@ Test hysteresis functionalities
 """
 from pytest import approx
 
-from examples.utils.core.ex_curve_hysteresis import ex_hysteresis
+from examples.utils.core.ex_curve_hysteresis import \
+    ex_hysteresis, ex_hysteresis_properties
 
 
 def test_hysteresis():
@@ -62,3 +63,18 @@ def test_hysteresis():
     assert props['area'] == approx(ref_props[21])
     assert props['diff coef'] == approx(ref_props[22])
     assert props['R_2 hyst'] == approx(ref_props[23])
+
+
+def test_hysteresis_properties():
+    """
+    Testing closed-form hysteresis properties (vectorized over hysteresis)
+    """
+    for model in ['sigmoid', 'arctan']:
+        props, props_ref, y_inter = ex_hysteresis_properties(model=model)
+
+        assert y_inter[0] == approx(0., abs=1e-9)
+        assert y_inter[1] == approx(0., abs=1e-9)
+
+        for i, prop_ref in enumerate(props_ref):
+            for key, value in prop_ref.items():
+                assert props[key][i] == approx(value)
@@ -4,8 +4,8 @@ Test fitting functionalities
 from pytest import approx
 
 from examples.utils.core.ex_fitting import \
-    (ex_gaussian_peak_fit, ex_sho_peak_fit, ex_sho_phase_fit,
-     ex_sho_phase_switch_fit)
+    (ex_gaussian_peak_fit, ex_sho_peak_fit, ex_sho_peak_batch_fit,
+     ex_sho_phase_fit, ex_sho_phase_switch_fit)
 
 
 def test_gaussian_peak_fit():
@@ -32,6 +32,22 @@ def test_sho_peak_fit():
         assert elem_pars == approx(elem_target)
 
 
+def test_sho_peak_batch_fit():
+    """ test ex_sho_peak_batch_fit """
+    sho_pars, success = ex_sho_peak_batch_fit()
+    # for key, value in sho_pars.items():
+    #     print(key, list(value))
+    assert all(success)
+    # First curve is the same as in ex_sho_peak_fit
+    target_pars = [1.0612698195104044, 9.568395446904102, 9.998240445405514,
+                   1.9359077592571658, 0.0]
+    for elem_pars, elem_target in zip(sho_pars.values(), target_pars):
+        assert elem_pars[0] == approx(elem_target, rel=1e-3)
+    assert sho_pars['x0'] == approx([9.99824038997505, 10.485423307992018,
+                                     11.003614598721631, 11.479778941924774,
+                                     12.016808314361635], rel=1e-3)
+
+
 def test_sho_phase_fit():
     """ test ex_sho_phase_fit """
     sho_phase_pars = ex_sho_phase_fit()
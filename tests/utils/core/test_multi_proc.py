@@ -0,0 +1,38 @@
+"""
+Test multi_proc methods
+"""
+from pytest import approx
+import numpy as np
+
+from examples.utils.core.ex_multi_proc import \
+    ex_multi_proc, ex_multi_proc_warm_start
+
+
+# class TestMultiProc(unittest.TestCase):
+
+
+def test_multi_proc():
+    """ Test ex_multi_proc """
+    res = ex_multi_proc()
+
+    assert res['scheduler pars'][:2] == (2, 1)
+    assert res['failed'] == [2, 5]
+    assert res['progress'] == list(range(1, 8))
+    assert [result['sqrt'] for result in res['results']
+            if result is not None] == approx([4., 6., 8., 10., 12.])
+    assert 'pixel 3' in res['report']
+    assert 'negative value: -4.0' in res['report']
+    assert np.isnan(res['filled'][2]['value'])
+    assert np.isnan(res['filled'][5]['sqrt'])
+    assert res['filled'][6]['sqrt'] == approx(12.)
+
+
+def test_multi_proc_warm_start():
+    """ Test ex_multi_proc_warm_start """
+    res = ex_multi_proc_warm_start()
+
+    assert res['blocks'] == [(0, 4), (4, 8), (8, 12)]
+    assert res['failed'] == [5]
+    assert [result['guess'] if result else None
+            for result in res['results']] == \
+        [None, 1., 2., 3., None, None, None, 7., None, 9., 10., 11.]
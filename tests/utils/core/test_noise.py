@@ -5,7 +5,7 @@ from pytest import approx
 import numpy as np
 
 from examples.utils.core.ex_noise import \
-    ex_gen_noise, ex_filter_mean, ex_butter_filter
+    ex_gen_noise, ex_filter_mean, ex_butter_filter, ex_butter_filter_bank
 
 
 def test_ex_gen_noise():
@@ -61,3 +61,22 @@ def test_ex_butter_filter_bandstop():
     y_filt_bandstop = ex_butter_filter(filter_type='bandstop')
 
     assert np.sum(y_filt_bandstop) == approx(33.83620308961862, rel=0.1)
+
+
+def test_ex_butter_filter_bank():
+    """ Test ex_butter_filter_bank """
+
+    for filter_type in ['low', 'high', 'bandpass', 'bandstop']:
+        filtered_block, ref_block, nb_filters = \
+            ex_butter_filter_bank(filter_type=filter_type)
+
+        assert nb_filters == 1
+        assert filtered_block.shape == (3, 2000)
+        assert filtered_block[1] == approx(2 * filtered_block[0])
+        # Second-order sections are more accurate than (b, a) coefficients
+        # for the narrow band filters
+        if filter_type in ['low', 'high']:
+            assert filtered_block == approx(ref_block, abs=1e-6)
+        else:
+            assert np.sum(filtered_block[0]) == \
+                approx(np.sum(ref_block[0]), rel=5e-2)
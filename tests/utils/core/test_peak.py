@@ -5,8 +5,8 @@ from pytest import approx
 import numpy as np
 
 from examples.utils.core.ex_peak import \
-    (ex_find_main_peaks, ex_detect_peak, ex_width_peak, ex_guess_affine,
-     ex_guess_bckgnd)
+    (ex_find_main_peaks, ex_detect_peak, ex_width_peak, ex_half_power_width,
+     ex_guess_affine, ex_guess_bckgnd)
 
 
 def test_ex_find_main_peaks():
@@ -40,6 +40,21 @@ def test_ex_width_peak():
     assert width['ind right'] == 61
 
 
+def test_ex_half_power_width():
+    """ Test ex_half_power_width """
+
+    width_interp, width_raw, target_width = ex_half_power_width(
+        make_plots=False)
+
+    assert list(width_interp['ind max']) == [25, 25, 25]
+    assert width_raw['width'] == approx([0.8, 1.6, 2.0])
+    assert width_interp['width'] == approx(target_width, rel=5e-2)
+    assert np.all(np.abs(width_interp['width'] - target_width) <
+                  np.abs(width_raw['width'] - target_width))
+    assert width_interp['x left'] + width_interp['x right'] == \
+        approx([10.2, 10.2, 10.2])
+
+
 def test_ex_guess_affine():
     """ Test ex_guess_affine """
 
@@ -6,7 +6,8 @@ from pytest import approx, skip
 import numpy as np
 
 from examples.utils.datacube_to_nanoloop.ex_analysis import \
-    ex_calib, ex_cut_function, ex_segments, ex_extract_other_properties
+    (ex_calib, ex_cut_function, ex_segments, ex_segment_batch,
+     ex_extract_other_properties)
 
 
 # class TestAnalysis(unittest.TestCase):
@@ -267,6 +268,59 @@ def test_segments_dfrt_off():
     assert np.sum(seg.time_tab_init) == approx(47.5)
 
 
+def test_segment_batch_max():
+    """ Test ex_segment_batch, with 'max' analysis """
+
+    seg_batch, segs = ex_segment_batch('max', 'on f')
+
+    assert seg_batch.amp == approx([seg.amp for seg in segs])
+    assert seg_batch.pha == approx([seg.pha for seg in segs])
+    assert seg_batch.res_freq == approx([seg.res_freq for seg in segs])
+    assert seg_batch.q_fact == approx([seg.q_fact for seg in segs],
+                                      nan_ok=True)
+    assert seg_batch.amp[4] == approx(2012.7048661231383)
+    assert seg_batch.q_fact[4] == approx(163.0)
+
+
+def test_segment_batch_max_q_interp():
+    """ Test ex_segment_batch, with 'max' analysis and interpolated -3 dB
+    bandwidth """
+
+    seg_batch, segs = ex_segment_batch('max', 'on f', q_interp=True)
+
+    assert seg_batch.q_fact == approx(
+        [seg.q_fact_max(interp=True) for seg in segs], nan_ok=True)
+    assert seg_batch.q_fact[4] == approx(122.6381827607953)
+
+
+def test_segment_batch_fit():
+    """ Test ex_segment_batch, with 'fit' analysis """
+
+    seg_batch, segs = ex_segment_batch('fit', 'on f', nb_seg_str='5')
+
+    assert all(seg_batch.success)
+    assert seg_batch.amp == approx([seg.amp for seg in segs], rel=1e-3)
+    assert seg_batch.res_freq == approx([seg.res_freq for seg in segs],
+                                        rel=1e-3)
+    assert seg_batch.q_fact == approx([seg.q_fact for seg in segs], rel=1e-3)
+    assert seg_batch.bckgnd == approx([seg.bckgnd for seg in segs], abs=1e-3)
+
+
+def test_segment_batch_single_freq():
+    """ Test ex_segment_batch, with 'single_freq' analysis """
+
+    seg_batch, segs = ex_segment_batch('single_freq', 'off f')
+    dict_res = seg_batch.dict_res()
+
+    assert seg_batch.amp == approx([seg.amp for seg in segs])
+    assert seg_batch.pha == approx([seg.pha for seg in segs])
+    assert seg_batch.inc_amp == approx([seg.inc_amp for seg in segs])
+    assert seg_batch.inc_pha == approx([seg.inc_pha for seg in segs])
+    assert seg_batch.res_freq is None
+    assert dict_res['Res Freq'] == [None] * len(segs)
+    assert len(dict_res['Sigma Amp']) == len(segs)
+
+
 def test_extract_other_properties():
     """ Test ex_extract_other_properties """
 
@@ -4,7 +4,8 @@ Test file methods
 from pytest import approx
 import numpy as np
 
-from examples.utils.nanoloop.ex_file import example_file
+from examples.utils.nanoloop.ex_file import \
+    example_file, example_read_nanoloop_file, example_nanoloop_store
 
 
 # class TestFile(unittest.TestCase):
@@ -41,3 +42,39 @@ def test_file():
                              'Write Volt (V)	Amplitude (nm)	'
                              'Phase (deg)	')
     assert headers['on'] == headers['off']
+
+
+def test_read_nanoloop_file():
+    """ Test example_read_nanoloop_file """
+
+    res = example_read_nanoloop_file()
+
+    assert res['header'][-1] == ('Loop index\tRead Volt (V)\t'
+                                 'Write Volt (V)\tAmplitude (nm)\t'
+                                 'Phase (deg)')
+    assert res['data tab'].shape == (5, 4)
+    assert np.array_equal(res['data tab'], res['data tab ref'],
+                          equal_nan=True)
+    assert np.isnan(res['data dict']['amplitude'][2])
+    assert np.nansum(res['data dict']['amplitude']) == approx(8.5)
+    assert res['other properties'] == {'height': '12.5', 'phase offset': '45'}
+
+
+def test_nanoloop_store(tmp_path):
+    """ Test example_nanoloop_store """
+
+    res = example_nanoloop_store(dir_path_out=str(tmp_path))
+
+    assert res['store files'] == ['nanoloops_store.json',
+                                  'nanoloops_store.npy']
+    assert res['store names'] == res['txt names']
+    assert len(res['store names']) == 3
+    for tab_txt, tab_store in zip(res['txt data'], res['store data']):
+        for (txt_dict, txt_str, txt_prop), (store_dict, store_str,
+                                            store_prop) in \
+                zip(tab_txt, tab_store):
+            assert store_str == txt_str
+            assert store_prop == txt_prop
+            assert list(store_dict.keys()) == list(txt_dict.keys())
+            for key, value in txt_dict.items():
+                assert store_dict[key] == approx(value, rel=1e-3, abs=5e-3)
@@ -5,7 +5,7 @@ from pytest import approx
 import numpy as np
 
 from examples.utils.nanoloop_to_hyst.ex_analysis import \
-    example_analysis, ex_sort_prop
+    example_analysis, ex_sort_prop, example_batch_hyst_fit
 
 
 # class TestAnalysis(unittest.TestCase):
@@ -128,3 +128,26 @@ def test_analysis_mean_on():
     assert np.sum(list(props_no_bckgnd.values())) == approx(55.2989653801296)
 
     assert np.sum(elec_list) == approx(1.781444848093118)
+
+
+def test_batch_hyst_fit_mean_off():
+    """ Test example_batch_hyst_fit: off field: mean loop """
+
+    fit_params, success, ref_params = example_batch_hyst_fit(
+        analysis='mean_off')
+
+    assert np.all(success)
+    for key, value in ref_params.items():
+        assert fit_params[key] == approx(value, rel=1e-5, abs=1e-5)
+
+
+def test_batch_hyst_fit_mean_on():
+    """ Test example_batch_hyst_fit: on field: mean loop """
+
+    fit_params, success, ref_params = example_batch_hyst_fit(
+        analysis='mean_on')
+
+    assert np.all(success)
+    assert fit_params['slope'] == approx(ref_params['slope'], abs=1e-3)
+    for key in ['ampli_0', 'x0_0', 'x0_1']:
+        assert fit_params[key] == approx(ref_params[key], rel=1e-3)
@@ -4,7 +4,8 @@ Test file methods
 import os
 import numpy as np
 
-from examples.utils.nanoloop_to_hyst.ex_file import example_file
+from examples.utils.nanoloop_to_hyst.ex_file import \
+    example_file, example_property_store
 
 
 # class TestFile(unittest.TestCase):
@@ -95,3 +96,28 @@ def test_file():
     if os.getenv('GITHUB_ACTIONS') != 'true':
         assert target_file_names == file_names_from_raw
         assert target_file_names == file_names_from_nanoloops
+
+
+def test_property_store(tmp_path):
+    """ Test example_property_store """
+
+    res = example_property_store(root_out=str(tmp_path))
+    properties_txt, dim_pix_txt, dim_mic_txt = res['extract txt']
+    properties_store, dim_pix_store, dim_mic_store = res['extract store']
+
+    assert res['store files'] == ['properties_store.json',
+                                  'properties_store.npy']
+    assert res['export files'] == ['properties_coupled.txt',
+                                   'properties_off.txt', 'properties_on.txt',
+                                   'properties_other.txt']
+    assert res['same export']
+    assert dim_pix_store == dim_pix_txt == {'x': 8, 'y': 8}
+    assert dim_mic_store == dim_mic_txt == {'x': 3.5, 'y': 3.5}
+    assert sorted(properties_store) == sorted(properties_txt)
+    assert np.isnan(res['store']['on']['prop n°0'][3])
+    assert np.sum(res['store']['other']['height']) == 2016
+    for mode, props in properties_txt.items():
+        assert len(properties_store[mode]) == len(props)
+        for values_txt, values_store in zip(props.values(),
+                                            properties_store[mode].values()):
+            assert np.array_equal(values_txt, values_store, equal_nan=True)
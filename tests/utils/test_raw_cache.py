@@ -0,0 +1,23 @@
+"""
+Test raw_cache methods
+"""
+from examples.utils.ex_raw_cache import ex_raw_cache
+
+
+# class TestRawCache(unittest.TestCase):
+
+
+def test_raw_cache():
+    """ Test ex_raw_cache """
+    res = ex_raw_cache()
+
+    assert res['entries first'] == 1
+    assert res['entries second'] == 1
+    assert res['same data']
+    assert res['same script']
+    assert res['classic entry'] is None
+    assert res['entries all'] == 3
+    assert res['evicted'] == 1
+    assert res['first evicted']
+    assert res['cleared'] == 2
+    assert res['entries end'] == 0
@@ -6,7 +6,8 @@ import numpy as np
 
 from PySSPFM.utils.raw_extraction import NanoscopeError
 from examples.utils.ex_raw_extraction import \
-    ex_data_extraction, ex_csv_meas_sheet_extract
+    ex_data_extraction, ex_csv_meas_sheet_extract, ex_meas_sheet_cache, \
+    ex_datacube_npy, ex_grid_datacube, ex_channel_selection
 
 
 # class TestExtract(unittest.TestCase):
@@ -174,3 +175,44 @@ def test_csv_meas_sheet_extract():
         assert meas_pars[key] == value
     for key, value in target_sign.items():
         assert sign_pars[key] == value
+
+
+def test_meas_sheet_cache():
+    """ Test ex_meas_sheet_cache """
+    res = ex_meas_sheet_cache()
+
+    assert res['cached']
+    assert res['sign pars']['Mode (R)'] == 'Single Read Step'
+    assert res['meas pars']['Grid x [pix]'] == 8
+    assert res['script dict sign pars'] == res['script dict']
+    assert res['script dict']['Write Number of Voltages'] == 51
+
+
+def test_datacube_npy():
+    """ Test ex_datacube_npy """
+    dict_meas_npy, dict_meas_txt = ex_datacube_npy()
+
+    assert list(dict_meas_npy.keys()) == list(dict_meas_txt.keys())
+    for key, value in dict_meas_txt.items():
+        assert dict_meas_npy[key] == approx(np.array(value))
+
+
+def test_grid_datacube():
+    """ Test ex_grid_datacube """
+    res = ex_grid_datacube(nb_pix=10)
+
+    assert res['shape'] == [10, 5, 200]
+    assert res['index'] == list(range(1, 11))
+    assert res['coordinates'][:2] == [[0, 0], [1, 0]]
+    assert res['coordinates'][-1] == [1, 1]
+    assert res['file names'][0] == 'KNN500n.0_00001.grid'
+    assert res['same data']
+
+
+def test_channel_selection():
+    """ Test ex_channel_selection """
+    res = ex_channel_selection()
+
+    for ext in ['txt', 'csv', 'npy']:
+        assert res[ext]['keys'] == ['deflection', 'pha', 'times', 'tip_bias']
+        assert res[ext]['same data']